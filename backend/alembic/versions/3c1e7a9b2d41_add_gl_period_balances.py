@@ -0,0 +1,54 @@
+"""Add GL period balance snapshot table
+
+Revision ID: 3c1e7a9b2d41
+Revises: fdb6cdf1facf
+Create Date: 2025-06-09 10:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e7a9b2d41'
+down_revision: Union[str, None] = 'fdb6cdf1facf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('gl_period_balances',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('debit_total', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('credit_total', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('is_closed', sa.Boolean(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['gl_accounts.id'], ),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['period_id'], ['accounting_periods.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_id', 'period_id', name='_gl_period_balance_uc')
+    )
+    op.create_index(op.f('ix_gl_period_balances_id'), 'gl_period_balances', ['id'], unique=False)
+
+    # Backfill snapshots for existing periods from the ledger
+    op.execute("""
+        INSERT INTO gl_period_balances (company_id, account_id, period_id, debit_total, credit_total, is_closed)
+        SELECT p.company_id, t.account_id, p.id, SUM(t.debit_amount), SUM(t.credit_amount), COALESCE(p.is_closed, false)
+        FROM accounting_periods p
+        JOIN gl_transactions t
+          ON t.company_id = p.company_id
+         AND t.transaction_date BETWEEN p.start_date AND p.end_date
+        GROUP BY p.company_id, t.account_id, p.id, p.is_closed
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_gl_period_balances_id'), table_name='gl_period_balances')
+    op.drop_table('gl_period_balances')
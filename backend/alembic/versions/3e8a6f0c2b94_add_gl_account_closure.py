@@ -0,0 +1,63 @@
+"""Add GL account closure table
+
+Revision ID: 3e8a6f0c2b94
+Revises: 7c2d4e8b1f39
+Create Date: 2025-07-04 14:52:08.317442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a6f0c2b94'
+down_revision: Union[str, None] = '7c2d4e8b1f39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Deeper chains can only come from a parent_account_id cycle
+MAX_DEPTH = 64
+
+
+def upgrade() -> None:
+    op.create_table('gl_account_closure',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['gl_accounts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['gl_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index(
+        'ix_gl_account_closure_descendant', 'gl_account_closure', ['descendant_id'],
+        unique=False, postgresql_include=['ancestor_id', 'depth']
+    )
+
+    # Every account paired with each ancestor up its parent_account_id chain
+    op.execute(f"""
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT parent_account_id, id, 1
+            FROM gl_accounts
+            WHERE parent_account_id IS NOT NULL
+            UNION ALL
+            SELECT a.parent_account_id, t.descendant_id, t.depth + 1
+            FROM tree t
+            JOIN gl_accounts a ON a.id = t.ancestor_id
+            WHERE a.parent_account_id IS NOT NULL AND t.depth < {MAX_DEPTH}
+        )
+        INSERT INTO gl_account_closure (company_id, ancestor_id, descendant_id, depth)
+        SELECT a.company_id, t.ancestor_id, t.descendant_id, MIN(t.depth)
+        FROM tree t
+        JOIN gl_accounts a ON a.id = t.descendant_id
+        WHERE t.ancestor_id <> t.descendant_id
+        GROUP BY a.company_id, t.ancestor_id, t.descendant_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_gl_account_closure_descendant', table_name='gl_account_closure')
+    op.drop_table('gl_account_closure')
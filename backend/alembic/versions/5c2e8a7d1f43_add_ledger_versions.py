@@ -0,0 +1,39 @@
+"""Add ledger versions for the report result cache
+
+Revision ID: 5c2e8a7d1f43
+Revises: 9b4d1f6e2a75
+Create Date: 2025-07-10 14:05:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a7d1f43'
+down_revision: Union[str, None] = '9b4d1f6e2a75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # No backfill: a company without rows is at version 0
+    op.create_table('ledger_versions',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('company_id', 'slot', name='_ledger_version_uc')
+    )
+    op.create_index(op.f('ix_ledger_versions_id'), 'ledger_versions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ledger_versions_id'), table_name='ledger_versions')
+    op.drop_table('ledger_versions')
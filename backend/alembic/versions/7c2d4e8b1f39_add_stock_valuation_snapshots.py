@@ -0,0 +1,79 @@
+"""Add stock valuation snapshots
+
+Revision ID: 7c2d4e8b1f39
+Revises: d58e0b3f7a26
+Create Date: 2025-07-02 10:17:45.208931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d4e8b1f39'
+down_revision: Union[str, None] = 'd58e0b3f7a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_valuation_snapshots',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('quantity_on_hand', sa.Numeric(precision=15, scale=4), nullable=False),
+    sa.Column('cost_price', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('total_value', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('item_id', 'snapshot_date', name='_stock_valuation_snapshot_uc')
+    )
+    op.create_index(op.f('ix_stock_valuation_snapshots_id'), 'stock_valuation_snapshots', ['id'], unique=False)
+    op.create_index('ix_stock_valuation_company_date', 'stock_valuation_snapshots', ['company_id', 'snapshot_date'], unique=False)
+    op.create_index(
+        'ix_inventory_items_company_type_code', 'inventory_items',
+        ['company_id', 'item_type', 'item_code'], unique=False
+    )
+
+    # Closing stock for every day with transactions, as running totals of the ledger
+    op.execute("""
+        INSERT INTO stock_valuation_snapshots (company_id, item_id, snapshot_date, quantity_on_hand, cost_price, total_value)
+        SELECT company_id, item_id, day, quantity,
+               CASE WHEN quantity > 0 THEN ROUND(value / quantity, 2) ELSE 0 END,
+               value
+        FROM (
+            SELECT i.company_id, t.item_id, t.transaction_date::date AS day,
+                   SUM(SUM(t.quantity)) OVER w AS quantity,
+                   SUM(SUM(t.total_cost)) OVER w AS value
+            FROM inventory_transactions t
+            JOIN inventory_items i ON i.id = t.item_id
+            GROUP BY i.company_id, t.item_id, t.transaction_date::date
+            WINDOW w AS (PARTITION BY t.item_id ORDER BY t.transaction_date::date)
+        ) days
+    """)
+
+    # Each item's latest snapshot (today if it has no transactions) holds its current values
+    op.execute("""
+        INSERT INTO stock_valuation_snapshots (company_id, item_id, snapshot_date, quantity_on_hand, cost_price, total_value)
+        SELECT i.company_id, i.id,
+               COALESCE((SELECT MAX(s.snapshot_date) FROM stock_valuation_snapshots s WHERE s.item_id = i.id), CURRENT_DATE),
+               i.quantity_on_hand, i.cost_price, ROUND(i.quantity_on_hand * i.cost_price, 2)
+        FROM inventory_items i
+        ON CONFLICT ON CONSTRAINT _stock_valuation_snapshot_uc DO UPDATE
+        SET quantity_on_hand = EXCLUDED.quantity_on_hand,
+            cost_price = EXCLUDED.cost_price,
+            total_value = EXCLUDED.total_value
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_items_company_type_code', table_name='inventory_items')
+    op.drop_index('ix_stock_valuation_company_date', table_name='stock_valuation_snapshots')
+    op.drop_index(op.f('ix_stock_valuation_snapshots_id'), table_name='stock_valuation_snapshots')
+    op.drop_table('stock_valuation_snapshots')
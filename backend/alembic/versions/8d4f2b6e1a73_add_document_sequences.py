@@ -0,0 +1,63 @@
+"""Add document number sequences
+
+Revision ID: 8d4f2b6e1a73
+Revises: 3c1e7a9b2d41
+Create Date: 2025-06-10 14:27:51.903214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2b6e1a73'
+down_revision: Union[str, None] = '3c1e7a9b2d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, number column, scope expression, number pattern, sequence width)
+# AR/AP numbers take any caller-chosen prefix (POST /ar/transactions/next-number/{prefix}),
+# so every alphabetic prefix followed by six digits gets a counter per company
+EXISTING_NUMBERS = [
+    ('ar_transactions', 'transaction_number', 'company_id', '^[A-Za-z_-]+[0-9]{6}$', 6),
+    ('ap_transactions', 'transaction_number', 'company_id', '^[A-Za-z_-]+[0-9]{6}$', 6),
+    ('ar_transactions', 'transaction_number', '0', '^INV[0-9]{8}$', 4),
+    ('ap_transactions', 'transaction_number', '0', '^SINV[0-9]{8}$', 4),
+    ('sales_orders', 'order_number', '0', '^SO[0-9]{8}$', 4),
+    ('purchase_orders', 'order_number', '0', '^PO[0-9]{8}$', 4),
+    ('goods_received_vouchers', 'grv_number', '0', '^GRV[0-9]{8}$', 4),
+]
+
+
+def upgrade() -> None:
+    op.create_table('document_sequences',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('prefix', sa.String(length=30), nullable=False),
+    sa.Column('last_value', sa.BigInteger(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('company_id', 'prefix', name='_document_sequence_uc')
+    )
+    op.create_index(op.f('ix_document_sequences_id'), 'document_sequences', ['id'], unique=False)
+
+    # Seed counters so new numbers continue after the ones already issued
+    for table, column, scope, pattern, width in EXISTING_NUMBERS:
+        op.execute(f"""
+            INSERT INTO document_sequences (company_id, prefix, last_value)
+            SELECT {scope}, left({column}, length({column}) - {width}), MAX(right({column}, {width})::bigint)
+            FROM {table}
+            WHERE {column} ~ '{pattern}'
+            GROUP BY 1, 2
+            ON CONFLICT ON CONSTRAINT _document_sequence_uc
+            DO UPDATE SET last_value = GREATEST(document_sequences.last_value, excluded.last_value)
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_document_sequences_id'), table_name='document_sequences')
+    op.drop_table('document_sequences')
@@ -0,0 +1,167 @@
+"""Add period close jobs, GL closing balances and the closed period ledger guard
+
+Revision ID: 9b4d1f6e2a75
+Revises: 3e8a6f0c2b94
+Create Date: 2025-07-08 09:26:41.583104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4d1f6e2a75'
+down_revision: Union[str, None] = '3e8a6f0c2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level, so a batch insert checks its distinct (company, date)
+# pairs once. Period rows are share-locked while checking, which makes the
+# close wait for postings in flight and later postings see it.
+GUARD_FUNCTION = """
+    CREATE OR REPLACE FUNCTION gl_transactions_closed_period_guard() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        companies integer[];
+        days date[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(company_id), array_agg(transaction_date) INTO companies, days
+            FROM (SELECT DISTINCT company_id, transaction_date FROM new_rows) t;
+        ELSIF TG_OP = 'UPDATE' THEN
+            -- Flags such as is_reversed may still change on closed-period lines
+            SELECT array_agg(company_id), array_agg(transaction_date) INTO companies, days
+            FROM (
+                SELECT DISTINCT v.company_id, v.transaction_date
+                FROM old_rows o
+                JOIN new_rows n ON n.id = o.id
+                CROSS JOIN LATERAL (VALUES (o.company_id, o.transaction_date), (n.company_id, n.transaction_date))
+                    AS v(company_id, transaction_date)
+                WHERE (n.company_id, n.account_id, n.transaction_date, n.debit_amount, n.credit_amount)
+                      IS DISTINCT FROM (o.company_id, o.account_id, o.transaction_date, o.debit_amount, o.credit_amount)
+            ) t;
+        ELSE
+            -- Deleting a company cascades to its ledger
+            SELECT array_agg(company_id), array_agg(transaction_date) INTO companies, days
+            FROM (
+                SELECT DISTINCT o.company_id, o.transaction_date FROM old_rows o
+                WHERE EXISTS (SELECT 1 FROM companies c WHERE c.id = o.company_id)
+            ) t;
+        END IF;
+
+        IF companies IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        PERFORM 1 FROM accounting_periods p
+        WHERE EXISTS (
+            SELECT 1 FROM unnest(companies, days) AS t(company_id, day)
+            WHERE t.company_id = p.company_id AND t.day BETWEEN p.start_date AND p.end_date
+        )
+        FOR SHARE;
+
+        IF EXISTS (
+            SELECT 1 FROM accounting_periods p
+            WHERE p.is_closed AND EXISTS (
+                SELECT 1 FROM unnest(companies, days) AS t(company_id, day)
+                WHERE t.company_id = p.company_id AND t.day BETWEEN p.start_date AND p.end_date
+            )
+        ) THEN
+            RAISE EXCEPTION 'GL transactions dated in a closed accounting period cannot be changed'
+                USING ERRCODE = 'check_violation';
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+"""
+
+GUARD_TRIGGERS = {
+    'gl_transactions_closed_period_insert': 'AFTER INSERT ON gl_transactions REFERENCING NEW TABLE AS new_rows',
+    'gl_transactions_closed_period_update': 'AFTER UPDATE ON gl_transactions REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'gl_transactions_closed_period_delete': 'AFTER DELETE ON gl_transactions REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    op.create_table('period_close_jobs',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('requested_by_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('completed_steps', sa.JSON(), nullable=False),
+    sa.Column('current_step', sa.String(length=30), nullable=True),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['period_id'], ['accounting_periods.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_period_close_jobs_id'), 'period_close_jobs', ['id'], unique=False)
+    op.create_index('ix_period_close_jobs_period', 'period_close_jobs', ['period_id'], unique=False)
+    op.create_index(
+        'ix_period_close_jobs_active_company', 'period_close_jobs', ['company_id'],
+        unique=True, postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+
+    op.create_table('gl_closing_balances',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('debit_total', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('credit_total', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['account_id'], ['gl_accounts.id'], ),
+    sa.ForeignKeyConstraint(['period_id'], ['accounting_periods.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('period_id', 'account_id', name='_gl_closing_balance_uc')
+    )
+    op.create_index(op.f('ix_gl_closing_balances_id'), 'gl_closing_balances', ['id'], unique=False)
+
+    # Closing balances for each period closed along with every earlier one,
+    # summed from the sealed period balances
+    op.execute("""
+        WITH periods AS (
+            SELECT id, company_id, start_date,
+                   bool_and(is_closed) OVER (PARTITION BY company_id ORDER BY start_date) AS all_closed
+            FROM accounting_periods
+        )
+        INSERT INTO gl_closing_balances (company_id, account_id, period_id, debit_total, credit_total)
+        SELECT p.company_id, b.account_id, p.id, SUM(b.debit_total), SUM(b.credit_total)
+        FROM periods p
+        JOIN periods earlier ON earlier.company_id = p.company_id AND earlier.start_date <= p.start_date
+        JOIN gl_period_balances b ON b.period_id = earlier.id
+        WHERE p.all_closed
+        GROUP BY p.company_id, b.account_id, p.id
+    """)
+
+    op.execute(GUARD_FUNCTION)
+    for name, event in GUARD_TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {event} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION gl_transactions_closed_period_guard()"
+        )
+
+
+def downgrade() -> None:
+    for name in GUARD_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON gl_transactions")
+    op.execute("DROP FUNCTION IF EXISTS gl_transactions_closed_period_guard()")
+    op.drop_index(op.f('ix_gl_closing_balances_id'), table_name='gl_closing_balances')
+    op.drop_table('gl_closing_balances')
+    op.drop_index('ix_period_close_jobs_active_company', table_name='period_close_jobs')
+    op.drop_index('ix_period_close_jobs_period', table_name='period_close_jobs')
+    op.drop_index(op.f('ix_period_close_jobs_id'), table_name='period_close_jobs')
+    op.drop_table('period_close_jobs')
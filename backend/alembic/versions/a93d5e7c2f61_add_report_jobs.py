@@ -0,0 +1,53 @@
+"""Add background report jobs
+
+Revision ID: a93d5e7c2f61
+Revises: f6b27a1c8d04
+Create Date: 2025-06-25 10:12:37.418260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d5e7c2f61'
+down_revision: Union[str, None] = 'f6b27a1c8d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('report_jobs',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('requested_by_id', sa.Integer(), nullable=True),
+    sa.Column('report_type', sa.String(length=50), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('parameters', sa.JSON(), nullable=False),
+    sa.Column('params_hash', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('rows_written', sa.Integer(), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=True),
+    sa.Column('file_path', sa.String(length=500), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_jobs_id'), 'report_jobs', ['id'], unique=False)
+    op.create_index('ix_report_jobs_company_hash', 'report_jobs', ['company_id', 'params_hash', 'status'], unique=False)
+    op.create_index('ix_report_jobs_company_status', 'report_jobs', ['company_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_jobs_company_status', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_company_hash', table_name='report_jobs')
+    op.drop_index(op.f('ix_report_jobs_id'), table_name='report_jobs')
+    op.drop_table('report_jobs')
@@ -0,0 +1,41 @@
+"""Add partial indexes on open AR/AP items for ageing
+
+Revision ID: b7e3c9d15f20
+Revises: 8d4f2b6e1a73
+Create Date: 2025-06-12 10:04:37.518240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c9d15f20'
+down_revision: Union[str, None] = '8d4f2b6e1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OPEN_ITEM_INDEXES = [
+    ('ix_ar_transactions_open_items', 'ar_transactions', 'customer_id'),
+    ('ix_ap_transactions_open_items', 'ap_transactions', 'supplier_id'),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name, party_column in OPEN_ITEM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            ['company_id', party_column],
+            unique=False,
+            postgresql_where=sa.text('is_posted AND allocated_amount < amount'),
+            postgresql_include=['transaction_type_id', 'transaction_date', 'due_date', 'amount', 'allocated_amount']
+        )
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in OPEN_ITEM_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,58 @@
+"""Add composite indexes for GL, AR and AP report queries
+
+Revision ID: c4f81d2a7e95
+Revises: e2a94f6c3b18
+Create Date: 2025-06-18 14:37:05.914327
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f81d2a7e95'
+down_revision: Union[str, None] = 'e2a94f6c3b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, INCLUDE columns)
+LEDGER_INDEXES = [
+    ('ix_gl_transactions_company_account_date', 'gl_transactions',
+     ['company_id', 'account_id', 'transaction_date'], ['debit_amount', 'credit_amount']),
+    ('ix_gl_transactions_company_date', 'gl_transactions',
+     ['company_id', 'transaction_date'], ['account_id', 'debit_amount', 'credit_amount']),
+    ('ix_gl_transactions_company_journal', 'gl_transactions',
+     ['company_id', 'journal_entry_id'], []),
+    ('ix_gl_period_balances_period', 'gl_period_balances',
+     ['period_id'], ['account_id', 'debit_total', 'credit_total']),
+    ('ix_ar_transactions_company_customer_posted_date', 'ar_transactions',
+     ['company_id', 'customer_id', 'is_posted', 'transaction_date'], []),
+    ('ix_ar_transactions_company_date', 'ar_transactions',
+     ['company_id', 'transaction_date', 'id'], []),
+    ('ix_ap_transactions_company_supplier_posted_date', 'ap_transactions',
+     ['company_id', 'supplier_id', 'is_posted', 'transaction_date'], []),
+    ('ix_ap_transactions_company_date', 'ap_transactions',
+     ['company_id', 'transaction_date', 'id'], []),
+]
+
+# accounting_periods(company_id, start_date, end_date) is already indexed by
+# the _period_dates_uc unique constraint, and open AR/AP items by the partial
+# ix_*_transactions_open_items indexes from b7e3c9d15f20.
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns, include in LEDGER_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            columns,
+            unique=False,
+            postgresql_include=include
+        )
+
+
+def downgrade() -> None:
+    for index_name, table_name, _, _ in reversed(LEDGER_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,77 @@
+"""Add customer and supplier balance summaries
+
+Revision ID: d58e0b3f7a26
+Revises: a93d5e7c2f61
+Create Date: 2025-06-27 09:41:12.630584
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd58e0b3f7a26'
+down_revision: Union[str, None] = 'a93d5e7c2f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (summary table, party table, party column, ledger table, transaction type table, balance sign)
+SUMMARIES = [
+    ('customer_balance_summaries', 'customers', 'customer_id', 'ar_transactions', 'ar_transaction_types', 1),
+    ('supplier_balance_summaries', 'suppliers', 'supplier_id', 'ap_transactions', 'ap_transaction_types', -1),
+]
+
+
+def upgrade() -> None:
+    for table_name, party_table, party_column, ledger_table, type_table, sign in SUMMARIES:
+        op.create_table(table_name,
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column(party_column, sa.Integer(), nullable=False),
+        sa.Column('total_debits', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('total_credits', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('open_item_count', sa.Integer(), nullable=False),
+        sa.Column('oldest_open_date', sa.Date(), nullable=True),
+        sa.Column('last_activity_date', sa.Date(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint([party_column], [f'{party_table}.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(party_column, name=f"_{party_table[:-1]}_balance_summary_uc")
+        )
+        op.create_index(op.f(f'ix_{table_name}_id'), table_name, ['id'], unique=False)
+
+        # Build from the posted ledger and bring current_balance into line with it
+        op.execute(f"""
+            INSERT INTO {table_name} (company_id, {party_column}, total_debits, total_credits, transaction_count,
+                                      open_item_count, oldest_open_date, last_activity_date)
+            SELECT t.company_id, t.{party_column},
+                   COALESCE(SUM(CASE WHEN tt.affects_balance = 'debit' THEN t.amount ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN tt.affects_balance = 'credit' THEN t.amount ELSE 0 END), 0),
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE t.allocated_amount < t.amount),
+                   MIN(t.transaction_date) FILTER (WHERE t.allocated_amount < t.amount),
+                   MAX(t.transaction_date)
+            FROM {ledger_table} t
+            JOIN {type_table} tt ON tt.id = t.transaction_type_id
+            WHERE t.is_posted
+            GROUP BY t.company_id, t.{party_column}
+        """)
+        op.execute(f"""
+            UPDATE {party_table} p
+            SET current_balance = COALESCE(
+                (SELECT {sign} * (s.total_debits - s.total_credits) FROM {table_name} s WHERE s.{party_column} = p.id),
+                0
+            )
+        """)
+
+
+def downgrade() -> None:
+    for table_name, _, _, _, _, _ in reversed(SUMMARIES):
+        op.drop_index(op.f(f'ix_{table_name}_id'), table_name=table_name)
+        op.drop_table(table_name)
@@ -0,0 +1,59 @@
+"""Add trigram and prefix search indexes for customer, supplier and item lookups
+
+Revision ID: e2a94f6c3b18
+Revises: b7e3c9d15f20
+Create Date: 2025-06-16 09:21:48.302114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a94f6c3b18'
+down_revision: Union[str, None] = 'b7e3c9d15f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, index name stem)
+SEARCH_COLUMNS = [
+    ('customers', 'customer_code', 'ix_customers_code'),
+    ('customers', 'name', 'ix_customers_name'),
+    ('suppliers', 'supplier_code', 'ix_suppliers_code'),
+    ('suppliers', 'name', 'ix_suppliers_name'),
+    ('inventory_items', 'item_code', 'ix_inventory_items_code'),
+    ('inventory_items', 'description', 'ix_inventory_items_description'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for table_name, column_name, stem in SEARCH_COLUMNS:
+        # Substring (ILIKE '%term%') and similarity matches
+        op.create_index(
+            f'{stem}_trgm',
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column_name: 'gin_trgm_ops'}
+        )
+        # Case-insensitive prefix matches and prefix order:
+        # lower(column) COLLATE "C" LIKE 'term%' ORDER BY lower(column) COLLATE "C"
+        op.create_index(
+            f'{stem}_prefix',
+            table_name,
+            [sa.text(f'(lower({column_name}) COLLATE "C")')],
+            unique=False
+        )
+
+
+def downgrade() -> None:
+    for table_name, _, stem in SEARCH_COLUMNS:
+        op.drop_index(f'{stem}_prefix', table_name=table_name)
+        op.drop_index(f'{stem}_trgm', table_name=table_name)
+    # pg_trgm is left installed; other objects may depend on it
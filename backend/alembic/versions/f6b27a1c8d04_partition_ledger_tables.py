@@ -0,0 +1,36 @@
+"""Range-partition gl_transactions and inventory_transactions by transaction_date
+
+Revision ID: f6b27a1c8d04
+Revises: c4f81d2a7e95
+Create Date: 2025-06-23 11:48:19.605732
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.partitioning import convert_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b27a1c8d04'
+down_revision: Union[str, None] = 'c4f81d2a7e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# AR/AP are left to `python -m app.partition_ledgers`: partitioning them drops
+# the allocation foreign keys, which is an explicit operator decision.
+PARTITIONED_TABLES = ['gl_transactions', 'inventory_transactions']
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table_name in PARTITIONED_TABLES:
+        convert_table(bind, table_name, partitioned=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table_name in PARTITIONED_TABLES:
+        convert_table(bind, table_name, partitioned=False)
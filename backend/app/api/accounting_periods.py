@@ -1,18 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from typing import Any, List
+from sqlalchemy import select, and_, or_
+from typing import Any, List, Optional
 from datetime import date
 
 from app.core.database import get_db
+from app.core.pagination import paginate
+from app.core.partitioning import ensure_partitions
+from app.core.period_cache import period_cache
 from app.models.accounting_period import AccountingPeriod
 from app.models.user import User
 from app.schemas.accounting_period import (
     AccountingPeriodCreate, AccountingPeriodUpdate, 
     AccountingPeriodResponse, AccountingPeriodList,
-    PeriodValidation
+    PeriodValidation, PeriodCloseJobResponse
 )
 from app.dependencies import get_current_active_user, require_permission
+from app.services.period_close_service import PeriodCloseService
 
 router = APIRouter()
 
@@ -20,6 +24,8 @@ router = APIRouter()
 async def list_accounting_periods(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; replaces skip"),
+    include_total: bool = Query(True, description="Return total (estimated for large results)"),
     company_id: int = Query(None, description="Filter by company ID"),
     financial_year: int = Query(None, description="Filter by financial year"),
     include_closed: bool = Query(True, description="Include closed periods"),
@@ -44,19 +50,16 @@ async def list_accounting_periods(
     if not include_closed:
         query = query.where(AccountingPeriod.is_closed == False)
     
-    # Get total count
-    count_result = await db.execute(select(func.count()).select_from(query.subquery()))
-    total = count_result.scalar()
-    
-    # Get periods
-    result = await db.execute(
-        query.offset(skip).limit(limit).order_by(AccountingPeriod.start_date)
+    page = await paginate(
+        db, query, [(AccountingPeriod.start_date, False), (AccountingPeriod.id, False)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
     )
-    periods = result.scalars().all()
     
     return {
-        "total": total,
-        "items": periods
+        "total": page.total,
+        "total_estimated": page.total_estimated,
+        "items": page.items,
+        "next_cursor": page.next_cursor
     }
 
 @router.post("/validate", response_model=PeriodValidation)
@@ -136,7 +139,10 @@ async def create_accounting_period(
     # Create period
     period = AccountingPeriod(**period_in.dict())
     db.add(period)
+    # Ledger partitions for the new period's dates
+    await ensure_partitions(db, period.start_date, period.end_date)
     await db.commit()
+    period_cache.invalidate(period.company_id)
     await db.refresh(period)
     
     return period
@@ -237,22 +243,31 @@ async def update_accounting_period(
     
     # Update fields
     update_data = period_in.dict(exclude_unset=True)
+    if update_data.get("is_closed") is not None and update_data["is_closed"] != period.is_closed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use the close or reopen endpoints to close or reopen a period"
+        )
     for field, value in update_data.items():
         setattr(period, field, value)
     
     await db.commit()
+    period_cache.invalidate(period.company_id)
     await db.refresh(period)
     
     return period
 
-@router.post("/{period_id}/close", response_model=AccountingPeriodResponse)
+@router.post("/{period_id}/close", response_model=PeriodCloseJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def close_accounting_period(
     period_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     has_permission: bool = Depends(require_permission("system", "configure"))
 ) -> Any:
-    """Close an accounting period (REQ-SYS-PERIOD-002)"""
+    """Close an accounting period in the background (REQ-SYS-PERIOD-002)
+    
+    Returns the close job to poll; see PeriodCloseService for its steps.
+    """
     # Get period
     result = await db.execute(
         select(AccountingPeriod).where(AccountingPeriod.id == period_id)
@@ -272,30 +287,16 @@ async def close_accounting_period(
             detail="Access denied"
         )
     
-    # Check if already closed
-    if period.is_closed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Period is already closed"
-        )
-    
-    # TODO: Add additional checks here (e.g., unposted transactions)
-    
-    # Close the period
-    period.is_closed = True
-    await db.commit()
-    await db.refresh(period)
-    
-    return period
+    return await PeriodCloseService.submit(db, period, current_user.id, PeriodCloseService.CLOSE)
 
-@router.post("/{period_id}/reopen", response_model=AccountingPeriodResponse)
+@router.post("/{period_id}/reopen", response_model=PeriodCloseJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def reopen_accounting_period(
     period_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     has_permission: bool = Depends(require_permission("system", "configure"))
 ) -> Any:
-    """Reopen a closed accounting period"""
+    """Reopen a closed accounting period in the background, undoing the close steps"""
     # Get period
     result = await db.execute(
         select(AccountingPeriod).where(AccountingPeriod.id == period_id)
@@ -315,19 +316,68 @@ async def reopen_accounting_period(
             detail="Access denied"
         )
     
-    # Check if not closed
-    if not period.is_closed:
+    return await PeriodCloseService.submit(db, period, current_user.id, PeriodCloseService.REOPEN)
+
+@router.get("/{period_id}/close-jobs", response_model=List[PeriodCloseJobResponse])
+async def list_period_close_jobs(
+    period_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Recent close and reopen jobs of a period, latest first"""
+    period = await db.get(AccountingPeriod, period_id)
+    
+    if not period:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Period is not closed"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Accounting period not found"
         )
     
-    # Reopen the period
-    period.is_closed = False
-    await db.commit()
-    await db.refresh(period)
+    # Check if user has access to this period's company
+    if period.company_id != current_user.company_id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
     
-    return period
+    return await PeriodCloseService.list_jobs(db, period_id)
+
+@router.get("/close-jobs/{job_id}", response_model=PeriodCloseJobResponse)
+async def get_period_close_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Poll a period close or reopen job"""
+    job = await PeriodCloseService.get_job(db, job_id)
+    
+    # Check if user has access to this job's company
+    if job.company_id != current_user.company_id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return job
+
+@router.post("/close-jobs/{job_id}/resume", response_model=PeriodCloseJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_period_close_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    has_permission: bool = Depends(require_permission("system", "configure"))
+) -> Any:
+    """Resume a failed or interrupted close or reopen from the step that did not finish"""
+    job = await PeriodCloseService.get_job(db, job_id)
+    
+    # Check if user has access to this job's company
+    if job.company_id != current_user.company_id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return await PeriodCloseService.resume(db, job)
 
 @router.delete("/{period_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_accounting_period(
@@ -358,5 +408,7 @@ async def delete_accounting_period(
     
     # TODO: Add check for transactions in this period
     
+    company_id = period.company_id
     await db.delete(period)
-    await db.commit() 
\ No newline at end of file
+    await db.commit()
+    period_cache.invalidate(company_id) 
\ No newline at end of file
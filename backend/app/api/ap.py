@@ -1,26 +1,34 @@
 from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
+from app.core.period_cache import period_cache
+from app.core.result_cache import result_cache
 from app.dependencies import get_current_active_user, require_permission
 from app.models import (
     User, APTransaction, APTransactionType, APAllocation, 
-    Supplier, GLAccount, AccountingPeriod
+    Supplier, GLAccount
 )
 from app.schemas.ap_transaction_type import (
     APTransactionTypeCreate, APTransactionTypeUpdate, APTransactionTypeResponse
 )
 from app.schemas.ap_transaction import (
     APTransactionCreate, APTransactionUpdate, APTransactionResponse,
-    APTransactionPost, APAllocationCreate, APAllocationResponse,
+    APTransactionPost, APTransactionBatchPost, APTransactionBatchPostResponse,
+    APAllocationCreate, APAllocationResponse, APAutoAllocationRequest, APAutoAllocationResponse,
     SupplierAgeingItem
 )
+from app.services.ageing_service import AgeingService
+from app.services.allocation_service import AutoAllocationService
 from app.services.ap_service import APService
+from app.services.batch_posting_service import BatchPostingService
+from app.services.report_export_service import ReportExportService
 
 router = APIRouter()
 
@@ -143,8 +151,11 @@ async def update_ap_transaction_type(
 
 @router.get("/transactions", response_model=List[APTransactionResponse])
 async def list_ap_transactions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
     supplier_id: Optional[int] = None,
     transaction_type_id: Optional[int] = None,
     is_posted: Optional[bool] = None,
@@ -179,10 +190,12 @@ async def list_ap_transactions(
     if to_date:
         query = query.where(APTransaction.transaction_date <= to_date)
     
-    query = query.order_by(APTransaction.transaction_date.desc()).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    transactions = result.scalars().all()
+    page = await paginate(
+        db, query, [(APTransaction.transaction_date, True), (APTransaction.id, True)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
+    )
+    page.apply_headers(response)
+    transactions = page.items
     
     # Enrich response with related data
     response = []
@@ -221,16 +234,7 @@ async def create_ap_transaction(
     
     # Validate period
     if transaction.period_id:
-        period = await db.execute(
-            select(AccountingPeriod).where(
-                and_(
-                    AccountingPeriod.id == transaction.period_id,
-                    AccountingPeriod.company_id == current_user.company_id,
-                    AccountingPeriod.is_closed == False
-                )
-            )
-        )
-        if not period.scalar_one_or_none():
+        if not await period_cache.is_open(db, current_user.company_id, transaction.period_id):
             raise HTTPException(status_code=400, detail="Invalid or closed accounting period")
     
     # Generate transaction number
@@ -292,6 +296,23 @@ async def post_ap_transaction(
     )
 
 
+
+@router.post("/transactions/batch-post", response_model=APTransactionBatchPostResponse)
+async def batch_post_ap_transactions(
+    batch_in: APTransactionBatchPost,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    _: bool = Depends(require_permission("ap", "post"))
+):
+    """
+    Post many AP transactions to GL (month-end supplier invoice runs).
+    Takes transaction IDs or a filter over unposted transactions; commits every
+    chunk_size transactions and reports success or failure per transaction.
+    """
+    return await BatchPostingService.post_request(
+        db, BatchPostingService.AP, current_user.company_id, current_user.id, batch_in
+    )
+
 # ============= AP Allocations =============
 
 @router.post("/allocations", response_model=APAllocationResponse)
@@ -316,6 +337,24 @@ async def create_ap_allocation(
     return result
 
 
+@router.post("/allocations/auto", response_model=APAutoAllocationResponse)
+async def auto_allocate_ap(
+    request: APAutoAllocationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    _: bool = Depends(require_permission("ap", "allocate"))
+):
+    """
+    Allocate unallocated payments and credits to open invoices for one supplier
+    or every supplier, by reference, exact amount and then FIFO by due date.
+    With dry_run the proposed allocations are returned without being saved.
+    """
+    return await AutoAllocationService.run(
+        db, AutoAllocationService.AP, current_user.company_id, current_user.id,
+        party_id=request.supplier_id, rules=request.rules, dry_run=request.dry_run
+    )
+
+
 @router.get("/allocations")
 async def list_ap_allocations(
     supplier_id: Optional[int] = None,
@@ -356,7 +395,8 @@ async def list_ap_allocations(
 async def get_supplier_ageing_report(
     as_at_date: date = Query(..., description="Calculate ageing as at this date"),
     supplier_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    bucket_days: Optional[str] = Query(None, description="Comma-separated bucket boundaries in days, e.g. 30,60,90,120"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     _: bool = Depends(require_permission("ap", "view"))
 ):
@@ -368,8 +408,11 @@ async def get_supplier_ageing_report(
     """
     ap_service = APService()
     
-    ageing_data = await ap_service.calculate_supplier_ageing(
-        db, current_user.company_id, as_at_date, supplier_id
+    buckets = AgeingService.parse_bucket_days(bucket_days)
+    ageing_data = await result_cache.get_or_compute(
+        db, current_user.company_id, "ap.ageing",
+        {"as_at_date": as_at_date, "supplier_id": supplier_id, "buckets": buckets},
+        lambda: ap_service.calculate_supplier_ageing(db, current_user.company_id, as_at_date, supplier_id, buckets)
     )
     
     return [SupplierAgeingItem(**item) for item in ageing_data]
@@ -379,7 +422,7 @@ async def get_supplier_ageing_report(
 async def get_supplier_listing_report(
     is_active: Optional[bool] = None,
     with_balance: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     _: bool = Depends(require_permission("ap", "view"))
 ):
@@ -388,30 +431,36 @@ async def get_supplier_listing_report(
     
     REQ-AP-REPORT-002: Generate Supplier Listing report
     """
-    query = select(Supplier).where(Supplier.company_id == current_user.company_id)
-    
-    if is_active is not None:
-        query = query.where(Supplier.is_active == is_active)
-    
-    if with_balance is not None:
-        if with_balance:
-            query = query.where(Supplier.current_balance != 0)
-        else:
-            query = query.where(Supplier.current_balance == 0)
-    
-    query = query.order_by(Supplier.supplier_code)
-    
-    result = await db.execute(query)
-    suppliers = result.scalars().all()
-    
-    return [{
-        "supplier_code": s.supplier_code,
-        "name": s.name,
-        "payment_terms": s.payment_terms,
-        "current_balance": s.current_balance,
-        "is_active": s.is_active,
-        "contact_info": s.contact_info
-    } for s in suppliers]
+    async def build_listing():
+        query = select(Supplier).where(Supplier.company_id == current_user.company_id)
+        
+        if is_active is not None:
+            query = query.where(Supplier.is_active == is_active)
+        
+        if with_balance is not None:
+            if with_balance:
+                query = query.where(Supplier.current_balance != 0)
+            else:
+                query = query.where(Supplier.current_balance == 0)
+        
+        query = query.order_by(Supplier.supplier_code)
+        
+        result = await db.execute(query)
+        suppliers = result.scalars().all()
+        
+        return [{
+            "supplier_code": s.supplier_code,
+            "name": s.name,
+            "payment_terms": s.payment_terms,
+            "current_balance": s.current_balance,
+            "is_active": s.is_active,
+            "contact_info": s.contact_info
+        } for s in suppliers]
+    
+    return await result_cache.get_or_compute(
+        db, current_user.company_id, "ap.supplier_list",
+        {"is_active": is_active, "with_balance": with_balance}, build_listing
+    )
 
 
 @router.get("/reports/transactions")
@@ -421,7 +470,7 @@ async def get_ap_transaction_listing_report(
     to_date: Optional[date] = None,
     transaction_type_id: Optional[int] = None,
     is_posted: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     _: bool = Depends(require_permission("ap", "view"))
 ):
@@ -465,4 +514,30 @@ async def get_ap_transaction_listing_report(
         "outstanding": t.amount - t.allocated_amount,
         "is_posted": t.is_posted,
         "is_allocated": t.is_allocated
-    } for t in transactions] 
\ No newline at end of file
+    } for t in transactions]
+
+
+@router.get("/reports/transactions/export")
+async def export_ap_transaction_listing(
+    supplier_id: Optional[int] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    transaction_type_id: Optional[int] = None,
+    is_posted: Optional[bool] = None,
+    format: str = "csv",  # csv, ndjson or xlsx (excel)
+    current_user: User = Depends(get_current_active_user),
+    _: bool = Depends(require_permission("ap", "view"))
+):
+    """Stream the AP transaction listing from a server-side cursor"""
+    fmt = ReportExportService.resolve_format(format)
+    
+    query = APService.transaction_listing_query(
+        current_user.company_id, supplier_id, from_date, to_date, transaction_type_id, is_posted
+    )
+    
+    return ReportExportService.response(
+        ReportExportService.stream_rows(query),
+        APService.TRANSACTION_LISTING_COLUMNS,
+        fmt,
+        "ap_transactions"
+    )
@@ -1,21 +1,29 @@
 from typing import List, Optional
 from datetime import date
-from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
-from app.models import User, ARTransaction, ARTransactionType, ARAllocation, Customer, AccountingPeriod
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
+from app.core.period_cache import period_cache
+from app.core.result_cache import result_cache
+from app.models import User, ARTransaction, ARTransactionType, ARAllocation, Customer
 from app.schemas.ar_transaction_type import (
     ARTransactionTypeCreate, ARTransactionTypeUpdate, ARTransactionTypeResponse
 )
 from app.schemas.ar_transaction import (
     ARTransactionCreate, ARTransactionUpdate, ARTransactionResponse,
-    ARAllocationCreate, ARAllocationResponse, CustomerAgeingItem
+    ARTransactionBatchPost, ARTransactionBatchPostResponse,
+    ARAllocationCreate, ARAllocationResponse, ARAutoAllocationRequest, ARAutoAllocationResponse,
+    CustomerAgeingItem
 )
+from app.services.ageing_service import AgeingService
+from app.services.allocation_service import AutoAllocationService
 from app.services.ar_service import ARService
+from app.services.batch_posting_service import BatchPostingService
+from app.services.report_export_service import ReportExportService
 from app.dependencies import get_current_active_user, require_permission
 
 router = APIRouter()
@@ -100,8 +108,11 @@ async def create_ar_transaction_type(
 # Transactions endpoints
 @router.get("/transactions", response_model=List[ARTransactionResponse], dependencies=[Depends(require_permission("ar", "view"))])
 async def list_ar_transactions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
     customer_id: Optional[int] = None,
     transaction_type_id: Optional[int] = None,
     is_posted: Optional[bool] = None,
@@ -134,10 +145,12 @@ async def list_ar_transactions(
     if to_date:
         query = query.where(ARTransaction.transaction_date <= to_date)
     
-    query = query.order_by(ARTransaction.transaction_date.desc()).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    transactions = result.scalars().all()
+    page = await paginate(
+        db, query, [(ARTransaction.transaction_date, True), (ARTransaction.id, True)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
+    )
+    page.apply_headers(response)
+    transactions = page.items
     
     # Add related data
     for transaction in transactions:
@@ -167,16 +180,7 @@ async def create_ar_transaction(
     
     # Validate period if provided
     if transaction_data.period_id:
-        period = await db.execute(
-            select(AccountingPeriod).where(
-                and_(
-                    AccountingPeriod.id == transaction_data.period_id,
-                    AccountingPeriod.company_id == current_user.company_id,
-                    AccountingPeriod.is_closed == False
-                )
-            )
-        )
-        if not period.scalar_one_or_none():
+        if not await period_cache.is_open(db, current_user.company_id, transaction_data.period_id):
             raise HTTPException(status_code=400, detail="Invalid or closed accounting period")
     
     # Check if transaction number already exists
@@ -257,6 +261,22 @@ async def post_ar_transaction(
     return {"message": "Transaction posted successfully", "transaction_id": transaction.id}
 
 
+@router.post("/transactions/batch-post", response_model=ARTransactionBatchPostResponse, dependencies=[Depends(require_permission("ar", "post"))])
+async def batch_post_ar_transactions(
+    batch_in: ARTransactionBatchPost,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Post many AR transactions to GL (month-end invoice runs).
+    Takes transaction IDs or a filter over unposted transactions; commits every
+    chunk_size transactions and reports success or failure per transaction.
+    """
+    return await BatchPostingService.post_request(
+        db, BatchPostingService.AR, current_user.company_id, current_user.id, batch_in
+    )
+
+
 # Allocation endpoints
 @router.post("/allocations", response_model=ARAllocationResponse, dependencies=[Depends(require_permission("ar", "allocate"))])
 async def create_allocation(
@@ -275,6 +295,23 @@ async def create_allocation(
     return allocation
 
 
+@router.post("/allocations/auto", response_model=ARAutoAllocationResponse, dependencies=[Depends(require_permission("ar", "allocate"))])
+async def auto_allocate_ar(
+    request: ARAutoAllocationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Allocate unallocated payments and credits to open invoices for one customer
+    or every customer, by reference, exact amount and then FIFO by due date.
+    With dry_run the proposed allocations are returned without being saved.
+    """
+    return await AutoAllocationService.run(
+        db, AutoAllocationService.AR, current_user.company_id, current_user.id,
+        party_id=request.customer_id, rules=request.rules, dry_run=request.dry_run
+    )
+
+
 @router.get("/allocations", dependencies=[Depends(require_permission("ar", "view"))])
 async def list_allocations(
     customer_id: Optional[int] = None,
@@ -315,15 +352,19 @@ async def list_allocations(
 async def get_customer_ageing_report(
     as_at_date: date = Query(..., description="Date to calculate ageing as at"),
     customer_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    bucket_days: Optional[str] = Query(None, description="Comma-separated bucket boundaries in days, e.g. 30,60,90,120"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Generate customer ageing report.
     REQ-AR-AGE-001, REQ-AR-REPORT-001
     """
-    ageing_data = await ARService.calculate_customer_ageing(
-        db, current_user.company_id, as_at_date, customer_id
+    buckets = AgeingService.parse_bucket_days(bucket_days)
+    ageing_data = await result_cache.get_or_compute(
+        db, current_user.company_id, "ar.ageing",
+        {"as_at_date": as_at_date, "customer_id": customer_id, "buckets": buckets},
+        lambda: ARService.calculate_customer_ageing(db, current_user.company_id, as_at_date, customer_id, buckets)
     )
     
     return [CustomerAgeingItem(**item) for item in ageing_data]
@@ -334,7 +375,7 @@ async def get_customer_statement(
     customer_id: int,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -344,69 +385,89 @@ async def get_customer_statement(
     # Validate customer
     await ARService.validate_customer_exists(db, customer_id, current_user.company_id)
     
-    # Get transactions
-    query = select(ARTransaction).options(
-        selectinload(ARTransaction.transaction_type)
-    ).where(
-        and_(
-            ARTransaction.customer_id == customer_id,
-            ARTransaction.is_posted == True
-        )
+    return await result_cache.get_or_compute(
+        db, current_user.company_id, "ar.statement",
+        {"customer_id": customer_id, "from_date": from_date, "to_date": to_date},
+        lambda: ARService.get_customer_statement(db, current_user.company_id, customer_id, from_date, to_date)
     )
+
+
+@router.get("/reports/transactions/export", dependencies=[Depends(require_permission("ar", "view"))])
+async def export_ar_transaction_listing(
+    customer_id: Optional[int] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    transaction_type_id: Optional[int] = None,
+    is_posted: Optional[bool] = None,
+    format: str = "csv",  # csv, ndjson or xlsx (excel)
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream the AR transaction listing from a server-side cursor"""
+    fmt = ReportExportService.resolve_format(format)
+    
+    query = select(
+        ARTransaction.transaction_date,
+        ARTransaction.transaction_number,
+        Customer.customer_code,
+        Customer.name.label("customer_name"),
+        ARTransactionType.name.label("transaction_type"),
+        ARTransaction.reference,
+        ARTransaction.description,
+        ARTransaction.amount,
+        ARTransaction.allocated_amount,
+        (ARTransaction.amount - func.coalesce(ARTransaction.allocated_amount, 0)).label("outstanding"),
+        ARTransaction.is_posted,
+        ARTransaction.is_allocated
+    ).join(
+        Customer, Customer.id == ARTransaction.customer_id
+    ).join(
+        ARTransactionType, ARTransactionType.id == ARTransaction.transaction_type_id
+    ).where(ARTransaction.company_id == current_user.company_id)
     
+    if customer_id:
+        query = query.where(ARTransaction.customer_id == customer_id)
     if from_date:
         query = query.where(ARTransaction.transaction_date >= from_date)
     if to_date:
         query = query.where(ARTransaction.transaction_date <= to_date)
+    if transaction_type_id:
+        query = query.where(ARTransaction.transaction_type_id == transaction_type_id)
+    if is_posted is not None:
+        query = query.where(ARTransaction.is_posted == is_posted)
     
-    query = query.order_by(ARTransaction.transaction_date, ARTransaction.id)
-    
-    result = await db.execute(query)
-    transactions = result.scalars().all()
-    
-    # Build statement
-    statement = []
-    running_balance = Decimal('0')
-    
-    for transaction in transactions:
-        if transaction.transaction_type.affects_balance == 'debit':
-            debit = transaction.amount
-            credit = None
-            running_balance += transaction.amount
-        else:
-            debit = None
-            credit = transaction.amount
-            running_balance -= transaction.amount
-        
-        statement.append({
-            "transaction_date": transaction.transaction_date,
-            "transaction_number": transaction.transaction_number,
-            "transaction_type": transaction.transaction_type.name,
-            "reference": transaction.reference,
-            "description": transaction.description,
-            "debit": debit,
-            "credit": credit,
-            "balance": running_balance
-        })
-    
-    return {
-        "customer_id": customer_id,
-        "from_date": from_date,
-        "to_date": to_date,
-        "transactions": statement,
-        "closing_balance": running_balance
-    }
+    query = query.order_by(ARTransaction.transaction_date, ARTransaction.transaction_number)
+    
+    return ReportExportService.response(
+        ReportExportService.stream_rows(query),
+        [
+            ("transaction_date", "Date"),
+            ("transaction_number", "Number"),
+            ("customer_code", "Customer Code"),
+            ("customer_name", "Customer Name"),
+            ("transaction_type", "Type"),
+            ("reference", "Reference"),
+            ("description", "Description"),
+            ("amount", "Amount"),
+            ("allocated_amount", "Allocated"),
+            ("outstanding", "Outstanding"),
+            ("is_posted", "Posted"),
+            ("is_allocated", "Allocated In Full")
+        ],
+        fmt,
+        "ar_transactions"
+    )
 
 
 # Auto-generate transaction number
-@router.get("/transactions/next-number/{prefix}", dependencies=[Depends(require_permission("ar", "create"))])
-async def get_next_transaction_number(
-    prefix: str = "AR",
+@router.post("/transactions/next-number/{prefix}", dependencies=[Depends(require_permission("ar", "create"))])
+async def reserve_next_transaction_number(
+    prefix: str = Path(..., min_length=1, max_length=30, pattern=r"^[A-Za-z_-]+$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get the next available transaction number with the given prefix.
+    Reserve the next transaction number with the given prefix (letters, _ and -).
+    Each call uses up a number; an unused one leaves a gap.
     """
     next_number = await ARService.get_next_transaction_number(
         db, current_user.company_id, prefix
@@ -1,11 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models import User, Customer
+from app.services.balance_summary_service import BalanceSummaryService
+from app.services.search_service import SearchService
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 from app.dependencies import get_current_active_user, require_permission
 
@@ -14,9 +17,13 @@ router = APIRouter()
 
 @router.get("/", response_model=List[CustomerResponse], dependencies=[Depends(require_permission("ar", "view"))])
 async def list_customers(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
     search: Optional[str] = None,
+    search_mode: str = Query(SearchService.CONTAINS, description="contains, or ranked for typeahead (best matches first)"),
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -25,27 +32,26 @@ async def list_customers(
     List all customers for the current company with pagination and search.
     REQ-AR-CUST-001, REQ-AR-CUST-002
     """
+    search_mode = SearchService.resolve_mode(search_mode)
     query = select(Customer).where(Customer.company_id == current_user.company_id)
     
-    # Apply filters
-    if search:
-        query = query.where(
-            or_(
-                Customer.customer_code.ilike(f"%{search}%"),
-                Customer.name.ilike(f"%{search}%")
-            )
-        )
-    
     if is_active is not None:
         query = query.where(Customer.is_active == is_active)
     
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    customers = result.scalars().all()
+    # Apply search
+    if search and search_mode == SearchService.RANKED:
+        return await SearchService.ranked(
+            db, query, search, Customer.customer_code, [Customer.name], limit
+        )
+    if search:
+        query = query.where(SearchService.contains_filter(search, [Customer.customer_code, Customer.name]))
     
-    return customers
+    page = await paginate(
+        db, query, [(Customer.customer_code, False), (Customer.id, False)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
+    )
+    page.apply_headers(response)
+    return page.items
 
 
 @router.post("/", response_model=CustomerResponse, dependencies=[Depends(require_permission("ar", "create"))])
@@ -253,34 +259,8 @@ async def get_customer_balance(
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # Get transaction summary
-    from app.models import ARTransaction, ARTransactionType
-    summary = await db.execute(
-        select(
-            func.sum(
-                func.case(
-                    (ARTransactionType.affects_balance == 'debit', ARTransaction.amount),
-                    else_=0
-                )
-            ).label('total_debits'),
-            func.sum(
-                func.case(
-                    (ARTransactionType.affects_balance == 'credit', ARTransaction.amount),
-                    else_=0
-                )
-            ).label('total_credits'),
-            func.count(ARTransaction.id).label('transaction_count')
-        ).select_from(ARTransaction).join(
-            ARTransactionType
-        ).where(
-            and_(
-                ARTransaction.customer_id == customer_id,
-                ARTransaction.is_posted == True
-            )
-        )
-    )
-    
-    summary_data = summary.one()
+    # Maintained on posting and allocation (BalanceSummaryService)
+    summary = await BalanceSummaryService.get_summary(db, BalanceSummaryService.AR, customer.id)
     
     return {
         "customer_id": customer.id,
@@ -289,7 +269,5 @@ async def get_customer_balance(
         "current_balance": customer.current_balance,
         "credit_limit": customer.credit_limit,
         "available_credit": customer.credit_limit - customer.current_balance,
-        "total_debits": summary_data.total_debits or 0,
-        "total_credits": summary_data.total_credits or 0,
-        "transaction_count": summary_data.transaction_count or 0
+        **summary
     } 
\ No newline at end of file
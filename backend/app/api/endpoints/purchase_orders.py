@@ -1,6 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.dependencies import get_current_user
 from app.models import User
@@ -14,76 +14,82 @@ router = APIRouter()
 
 
 @router.post("/", response_model=PurchaseOrder)
-def create_purchase_order(
+async def create_purchase_order(
     order_data: PurchaseOrderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new purchase order"""
-    return PurchaseOrderService.create_purchase_order(db, order_data, current_user.id)
+    return await PurchaseOrderService.create_purchase_order(db, order_data, current_user.id)
 
 
 @router.get("/", response_model=List[PurchaseOrder])
-def get_purchase_orders(
+async def get_purchase_orders(
+    response: Response,
     supplier_id: Optional[int] = Query(None, description="Filter by supplier"),
     status: Optional[str] = Query(None, description="Filter by status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of purchase orders"""
-    return PurchaseOrderService.get_purchase_orders(
-        db, supplier_id, status, skip, limit
+    page = await PurchaseOrderService.get_purchase_orders(
+        db, supplier_id, status, skip, limit,
+        cursor=cursor, include_total=include_total
     )
+    page.apply_headers(response)
+    return page.items
 
 
 @router.get("/open-lines", response_model=List[PurchaseOrderLine])
-def get_open_purchase_order_lines(
+async def get_open_purchase_order_lines(
     supplier_id: Optional[int] = Query(None, description="Filter by supplier"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get purchase order lines that have not been fully received"""
-    return PurchaseOrderService.get_open_po_lines(db, supplier_id)
+    return await PurchaseOrderService.get_open_po_lines(db, supplier_id)
 
 
 @router.get("/{order_id}", response_model=PurchaseOrder)
-def get_purchase_order(
+async def get_purchase_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific purchase order"""
-    return PurchaseOrderService.get_purchase_order(db, order_id)
+    return await PurchaseOrderService.get_purchase_order(db, order_id)
 
 
 @router.put("/{order_id}", response_model=PurchaseOrder)
-def update_purchase_order(
+async def update_purchase_order(
     order_id: int,
     order_update: PurchaseOrderUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a purchase order"""
-    return PurchaseOrderService.update_purchase_order(db, order_id, order_update)
+    return await PurchaseOrderService.update_purchase_order(db, order_id, order_update)
 
 
 @router.post("/{order_id}/confirm", response_model=PurchaseOrder)
-def confirm_purchase_order(
+async def confirm_purchase_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Confirm a purchase order"""
-    return PurchaseOrderService.confirm_purchase_order(db, order_id)
+    return await PurchaseOrderService.confirm_purchase_order(db, order_id)
 
 
 @router.post("/{order_id}/cancel", response_model=PurchaseOrder)
-def cancel_purchase_order(
+async def cancel_purchase_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cancel a purchase order"""
-    return PurchaseOrderService.cancel_purchase_order(db, order_id) 
\ No newline at end of file
+    return await PurchaseOrderService.cancel_purchase_order(db, order_id) 
\ No newline at end of file
@@ -1,6 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.dependencies import get_current_user
 from app.models import User, ARTransaction
@@ -13,69 +13,74 @@ router = APIRouter()
 
 
 @router.post("/", response_model=SalesOrder)
-def create_sales_order(
+async def create_sales_order(
     order_data: SalesOrderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new sales order"""
-    return SalesOrderService.create_sales_order(db, order_data, current_user.id)
+    return await SalesOrderService.create_sales_order(db, order_data, current_user.id)
 
 
 @router.get("/", response_model=List[SalesOrder])
-def get_sales_orders(
+async def get_sales_orders(
+    response: Response,
     customer_id: Optional[int] = Query(None, description="Filter by customer"),
     status: Optional[str] = Query(None, description="Filter by status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of sales orders"""
-    return SalesOrderService.get_sales_orders(
-        db, customer_id, status, skip, limit
+    page = await SalesOrderService.get_sales_orders(
+        db, customer_id, status, skip, limit, cursor=cursor, include_total=include_total
     )
+    page.apply_headers(response)
+    return page.items
 
 
 @router.get("/{order_id}", response_model=SalesOrder)
-def get_sales_order(
+async def get_sales_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific sales order"""
-    return SalesOrderService.get_sales_order(db, order_id)
+    return await SalesOrderService.get_sales_order(db, order_id)
 
 
 @router.put("/{order_id}", response_model=SalesOrder)
-def update_sales_order(
+async def update_sales_order(
     order_id: int,
     order_update: SalesOrderUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a sales order"""
-    return SalesOrderService.update_sales_order(db, order_id, order_update)
+    return await SalesOrderService.update_sales_order(db, order_id, order_update)
 
 
 @router.post("/{order_id}/confirm", response_model=SalesOrder)
-def confirm_sales_order(
+async def confirm_sales_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Confirm a sales order"""
-    return SalesOrderService.confirm_sales_order(db, order_id)
+    return await SalesOrderService.confirm_sales_order(db, order_id)
 
 
 @router.post("/convert-to-invoice")
-def convert_to_invoice(
+async def convert_to_invoice(
     invoice_data: SalesOrderToInvoice,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Convert a sales order to an AR invoice"""
-    ar_transaction = SalesOrderService.convert_to_invoice(
+    ar_transaction = await SalesOrderService.convert_to_invoice(
         db, invoice_data, current_user.id
     )
     return {
@@ -86,10 +91,10 @@ def convert_to_invoice(
 
 
 @router.post("/{order_id}/cancel", response_model=SalesOrder)
-def cancel_sales_order(
+async def cancel_sales_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cancel a sales order"""
-    return SalesOrderService.cancel_sales_order(db, order_id) 
\ No newline at end of file
+    return await SalesOrderService.cancel_sales_order(db, order_id) 
\ No newline at end of file
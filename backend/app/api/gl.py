@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func # Added select and func
 from typing import List, Optional
 from datetime import date # Add this import
 from decimal import Decimal
 
-from app.core.database import get_db
-from app.models import GLAccount, GLTransaction, User, AccountingPeriod # Assuming AccountingPeriod model exists
-from app.schemas.gl import GLAccountSchema, GLAccountCreate, GLAccountUpdate, GLTransactionSchema, JournalEntryCreate, JournalEntryLineCreate
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
+from app.core.period_cache import period_cache
+from app.core.result_cache import result_cache
+from app.models import GLAccount, GLTransaction, User
+from app.schemas.gl import (
+    GLAccountSchema, GLAccountCreate, GLAccountUpdate, GLTransactionSchema, JournalEntryCreate, JournalEntryLineCreate,
+    JournalEntryBatchCreate, JournalEntryBatchResponse, GLDetailReport
+)
 from app.dependencies import get_current_active_user # Assuming this dependency provides the current user
-# from app.services.gl_service import validate_journal_entry # Example service for business logic
+from app.services.gl_service import GLService
+from app.services.report_export_service import ReportExportService
 
 router = APIRouter()
 
@@ -43,6 +51,11 @@ async def create_gl_account(
         company_id=current_user.company_id # Ensure company_id is set correctly
     )
     db.add(db_account)
+    if db_account.parent_account_id:
+        # Link the new account under its parent's ancestors in the closure table
+        await GLService.lock_account_hierarchy(db, current_user.company_id)
+        await db.flush()
+        await GLService.set_account_parent(db, current_user.company_id, db_account.id, db_account.parent_account_id)
     await db.commit()
     await db.refresh(db_account)
     return db_account
@@ -60,8 +73,11 @@ async def get_gl_account(
 
 @router.get("/accounts", response_model=List[GLAccountSchema])
 async def list_gl_accounts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
     is_active: Optional[bool] = None,
     account_type: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
@@ -74,11 +90,12 @@ async def list_gl_accounts(
         query = query.where(GLAccount.account_type == account_type)
     
     # Apply ordering, e.g., by account_code
-    query = query.order_by(GLAccount.account_code)
-    
-    result = await db.execute(query.offset(skip).limit(limit))
-    accounts = result.scalars().all()
-    return accounts
+    page = await paginate(
+        db, query, [(GLAccount.account_code, False), (GLAccount.id, False)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
+    )
+    page.apply_headers(response)
+    return page.items
 
 @router.put("/accounts/{account_id}", response_model=GLAccountSchema)
 async def update_gl_account(
@@ -92,9 +109,24 @@ async def update_gl_account(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GL Account not found")
 
     update_data = account_in.model_dump(exclude_unset=True)
+    parent_changed = (
+        "parent_account_id" in update_data
+        and update_data["parent_account_id"] != db_account.parent_account_id
+    )
+    if parent_changed:
+        await GLService.lock_account_hierarchy(db, current_user.company_id)
+        if update_data["parent_account_id"] is not None:
+            is_valid, error = await GLService.validate_parent_account(
+                db, current_user.company_id, update_data["parent_account_id"], account_id
+            )
+            if not is_valid:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    
     for key, value in update_data.items():
         setattr(db_account, key, value)
     
+    if parent_changed:
+        await GLService.set_account_parent(db, current_user.company_id, account_id, db_account.parent_account_id)
     await db.commit()
     await db.refresh(db_account)
     return db_account
@@ -118,14 +150,7 @@ async def create_journal_entry(
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Journal entry cannot be for zero amount")
 
     # Validate transaction date against open accounting periods (REQ-SYS-PERIOD-003)
-    period_stmt = select(AccountingPeriod).where(
-        AccountingPeriod.company_id == current_user.company_id,
-        AccountingPeriod.start_date <= journal_entry_in.transaction_date,
-        AccountingPeriod.end_date >= journal_entry_in.transaction_date,
-        AccountingPeriod.is_closed == False
-    )
-    active_period_result = await db.execute(period_stmt)
-    active_period = active_period_result.scalar_one_or_none()
+    active_period = await period_cache.find_open(db, current_user.company_id, journal_entry_in.transaction_date)
     if not active_period:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Transaction date is not in an open accounting period.")
     
@@ -155,19 +180,19 @@ async def create_journal_entry(
             posted_by_user_id=current_user.id
         )
         db.add(db_transaction)
-        
-        # Update GLAccount balance (REQ-GL-JE-003)
-        # This should ideally be handled carefully, possibly with optimistic locking or specific DB functions
-        # to prevent race conditions if many transactions hit the same account concurrently.
-        account.current_balance += line.debit_amount
-        account.current_balance -= line.credit_amount
-        db.add(account) # Mark account for update
-        
         created_transactions.append(db_transaction)
 
     if not created_transactions:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No valid transaction lines provided.")
 
+    posted_entries = [
+        {'account_id': t.account_id, 'debit_amount': t.debit_amount, 'credit_amount': t.credit_amount}
+        for t in created_transactions
+    ]
+    # Update GLAccount balances (REQ-GL-JE-003) with atomic in-database increments
+    await GLService.apply_account_balance_deltas(db, posted_entries)
+    await GLService.apply_period_balances(db, current_user.company_id, active_period.id, posted_entries)
+
     await db.commit()
     for trans in created_transactions:
         await db.refresh(trans)
@@ -176,6 +201,76 @@ async def create_journal_entry(
 
     return created_transactions
 
+# Batch journal entry import (month-end payroll, bank feeds)
+
+async def _post_journal_entry_batch(journal_entries: List[JournalEntryCreate], db: AsyncSession, current_user: User):
+    results = await GLService.post_journal_entry_batch(
+        db, current_user.company_id, current_user.id, journal_entries
+    )
+    await db.commit()
+    posted = sum(1 for r in results if r.success)
+    return {
+        "total": len(results),
+        "posted": posted,
+        "failed": len(results) - posted,
+        "results": results
+    }
+
+@router.post("/journal-entries/batch", response_model=JournalEntryBatchResponse)
+async def create_journal_entry_batch(
+    batch_in: JournalEntryBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Post many journal entries in one request; each entry succeeds or fails on its own"""
+    return await _post_journal_entry_batch(batch_in.entries, db, current_user)
+
+@router.post("/journal-entries/import", response_model=JournalEntryBatchResponse)
+async def import_journal_entries_csv(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Import journal entries from a CSV file, one line per row. Columns:
+    journal_entry_id, transaction_date, reference, description, account_id,
+    line_description, debit_amount, credit_amount
+    """
+    import csv
+    import io
+    
+    content = (await file.read()).decode("utf-8-sig")
+    entries: dict = {}
+    for row_number, row in enumerate(csv.DictReader(io.StringIO(content)), start=2):
+        try:
+            je_id = row["journal_entry_id"].strip()
+            header = {
+                "journal_entry_id": je_id,
+                "transaction_date": row["transaction_date"].strip(),
+                "reference": row.get("reference") or None,
+                "description": row.get("description") or None
+            }
+            entry = entries.setdefault(je_id, {**header, "lines": []})
+            # Header columns are repeated on every line of an entry and must agree
+            mismatched = [field for field, value in header.items() if entry[field] != value]
+            if mismatched:
+                raise ValueError(f"{', '.join(mismatched)} differs from earlier rows of journal entry {je_id}")
+            entry["lines"].append(JournalEntryLineCreate(
+                account_id=int(row["account_id"]),
+                description=row.get("line_description") or None,
+                debit_amount=Decimal(row.get("debit_amount") or "0.00"),
+                credit_amount=Decimal(row.get("credit_amount") or "0.00")
+            ))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV row {row_number}: {e}")
+    
+    try:
+        journal_entries = [JournalEntryCreate(**entry) for entry in entries.values()]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV content: {e}")
+    
+    return await _post_journal_entry_batch(journal_entries, db, current_user)
+
 # REQ-GL-REPORT-001: Trial Balance
 # REQ-GL-REPORT-002: GL Detail Report
 # These would typically be GET requests with query parameters for date ranges, periods, etc.
@@ -184,68 +279,80 @@ async def create_journal_entry(
 @router.get("/reports/trial-balance", response_model=List[dict]) # Define a Pydantic model for Trial Balance line
 async def get_trial_balance(
     report_date: date, # Or period_id e.g. period_id: Optional[int] = None
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    # This query calculates balances based on transactions up to the report_date
-    # It assumes GLAccount.current_balance is a snapshot and might not be used directly for historical reports
-    query = select(
-        GLAccount.id,
-        GLAccount.account_code, 
-        GLAccount.account_name,
-        GLAccount.account_type,
-        func.sum(GLTransaction.debit_amount).label("total_debit"),
-        func.sum(GLTransaction.credit_amount).label("total_credit")
-    ).select_from(GLAccount).join(
-        GLTransaction, GLAccount.id == GLTransaction.account_id, isouter=True 
-        # Use isouter=True to include accounts with no transactions
-    ).where(
-        GLAccount.company_id == current_user.company_id,
-        GLTransaction.transaction_date <= report_date, # Filter transactions by date
-        # GLTransaction.period_id == period_id # Alternative filtering if using period_id
-        GLAccount.is_active == True # Typically only active accounts
-    ).group_by(
-        GLAccount.id, GLAccount.account_code, GLAccount.account_name, GLAccount.account_type
-    ).order_by(GLAccount.account_code)
-    
-    result = await db.execute(query)
-    
-    trial_balance_lines = []
-    for row in result.all(): # Changed from result.fetchall() to result.all() for SQLAlchemy 2.0 style
-        total_debit = row.total_debit or Decimal("0.00")
-        total_credit = row.total_credit or Decimal("0.00")
-        balance = total_debit - total_credit
-        trial_balance_lines.append({
-            "account_id": row.id,
-            "account_code": row.account_code,
-            "account_name": row.account_name,
-            "account_type": row.account_type,
-            "debit": total_debit if balance >= 0 else Decimal("0.00"), # Simplified presentation
-            "credit": -balance if balance < 0 else Decimal("0.00"), # Simplified presentation
-            "balance": balance # Raw balance can also be useful
-        })
-    return trial_balance_lines
+    # Closed periods come from the closing and period balance snapshots, the rest from the ledger
+    return await result_cache.get_or_compute(
+        db, current_user.company_id, "gl.trial_balance", {"report_date": report_date},
+        lambda: GLService.get_trial_balance_lines(db, current_user.company_id, report_date)
+    )
+
+@router.get("/reports/trial-balance/rollup", response_model=List[dict])
+async def get_rollup_trial_balance(
+    report_date: date,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Trial balance with sub-account totals summed into their parent accounts"""
+    return await result_cache.get_or_compute(
+        db, current_user.company_id, "gl.trial_balance_rollup", {"report_date": report_date},
+        lambda: GLService.get_rollup_trial_balance_lines(db, current_user.company_id, report_date)
+    )
 
 @router.get("/reports/gl-detail", response_model=List[GLTransactionSchema])
 async def get_gl_detail_report(
     account_id: int,
     start_date: date,
     end_date: date,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     account = await db.get(GLAccount, account_id)
     if not account or account.company_id != current_user.company_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GL Account not found")
     
-    query = select(GLTransaction).where(
-        GLTransaction.company_id == current_user.company_id,
-        GLTransaction.account_id == account_id,
-        GLTransaction.transaction_date >= start_date,
-        GLTransaction.transaction_date <= end_date
-    ).order_by(GLTransaction.transaction_date, GLTransaction.id) # Added GLTransaction.id for deterministic order
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await GLService.get_gl_detail(db, current_user.company_id, account_id, start_date, end_date)
+
+@router.get("/reports/gl-detail/balances", response_model=GLDetailReport)
+async def get_gl_detail_balances_report(
+    start_date: date,
+    end_date: date,
+    account_ids: List[int] = Query(..., description="Repeat for each account"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """GL detail for one or more accounts with opening, running and closing balances"""
+    if start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be on or before end_date")
+    account_ids = list(dict.fromkeys(account_ids))
+    if len(account_ids) > settings.GL_DETAIL_MAX_ACCOUNTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.GL_DETAIL_MAX_ACCOUNTS} accounts per request"
+        )
+    
+    accounts_result = await db.execute(
+        select(GLAccount).where(
+            GLAccount.company_id == current_user.company_id,
+            GLAccount.id.in_(account_ids)
+        ).order_by(GLAccount.account_code)
+    )
+    accounts = accounts_result.scalars().all()
+    missing = set(account_ids) - {account.id for account in accounts}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"GL Account(s) not found: {', '.join(str(account_id) for account_id in sorted(missing))}"
+        )
+    
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "accounts": await GLService.get_gl_detail_with_balances(
+            db, current_user.company_id, accounts, start_date, end_date
+        )
+    }
 
 # TODO: Add endpoints for:
 # - Deleting GL Accounts (soft delete preferred: mark as inactive, check for transactions)
@@ -283,7 +390,8 @@ async def delete_gl_account(
         db_account.is_active = False
         await db.commit()
     else:
-        # Hard delete only if no transactions and no child accounts
+        # Hard delete only if no transactions and no child accounts; its
+        # closure rows (links to its ancestors) go with it by ON DELETE CASCADE
         await db.delete(db_account)
         await db.commit()
     
@@ -314,14 +422,7 @@ async def reverse_journal_entry(
         )
     
     # Validate reversal date against open periods
-    period_stmt = select(AccountingPeriod).where(
-        AccountingPeriod.company_id == current_user.company_id,
-        AccountingPeriod.start_date <= reversal_date,
-        AccountingPeriod.end_date >= reversal_date,
-        AccountingPeriod.is_closed == False
-    )
-    active_period_result = await db.execute(period_stmt)
-    active_period = active_period_result.scalar_one_or_none()
+    active_period = await period_cache.find_open(db, current_user.company_id, reversal_date)
     
     if not active_period:
         raise HTTPException(
@@ -334,11 +435,6 @@ async def reverse_journal_entry(
     reversal_je_id = f"REV-{journal_entry_id}"
     
     for orig_trans in original_transactions:
-        # Get the account to update balance
-        account = await db.get(GLAccount, orig_trans.account_id)
-        if not account:
-            continue
-            
         # Create reversal transaction with swapped debit/credit
         reversal_trans = GLTransaction(
             company_id=current_user.company_id,
@@ -356,15 +452,18 @@ async def reverse_journal_entry(
         )
         db.add(reversal_trans)
         
-        # Update account balance
-        account.current_balance -= orig_trans.debit_amount
-        account.current_balance += orig_trans.credit_amount
-        
         # Mark original transaction as reversed
         orig_trans.is_reversed = True
         
         reversal_transactions.append(reversal_trans)
     
+    reversal_entries = [
+        {'account_id': t.account_id, 'debit_amount': t.debit_amount, 'credit_amount': t.credit_amount}
+        for t in reversal_transactions
+    ]
+    await GLService.apply_account_balance_deltas(db, reversal_entries)
+    await GLService.apply_period_balances(db, current_user.company_id, active_period.id, reversal_entries)
+    
     await db.commit()
     for trans in reversal_transactions:
         await db.refresh(trans)
@@ -375,72 +474,107 @@ async def reverse_journal_entry(
 @router.get("/reports/trial-balance/export")
 async def export_trial_balance(
     report_date: date,
-    format: str = "csv",  # csv or excel
-    db: AsyncSession = Depends(get_db),
+    format: str = "csv",  # csv, ndjson or xlsx (excel)
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    from fastapi.responses import StreamingResponse
-    import csv
-    import io
-    
-    # Get trial balance data using existing logic
-    query = select(
-        GLAccount.id,
-        GLAccount.account_code, 
-        GLAccount.account_name,
-        GLAccount.account_type,
-        func.sum(GLTransaction.debit_amount).label("total_debit"),
-        func.sum(GLTransaction.credit_amount).label("total_credit")
-    ).select_from(GLAccount).join(
-        GLTransaction, GLAccount.id == GLTransaction.account_id, isouter=True 
-    ).where(
-        GLAccount.company_id == current_user.company_id,
-        GLTransaction.transaction_date <= report_date,
-        GLAccount.is_active == True
-    ).group_by(
-        GLAccount.id, GLAccount.account_code, GLAccount.account_name, GLAccount.account_type
-    ).order_by(GLAccount.account_code)
-    
-    result = await db.execute(query)
+    fmt = ReportExportService.resolve_format(format)
     
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    # Get trial balance data using existing logic (one row per account)
+    rows = await GLService.get_trial_balance(db, current_user.company_id, report_date)
     
-    # Write headers
-    writer.writerow(["Account Code", "Account Name", "Account Type", "Debit", "Credit", "Balance"])
-    
-    total_debit = Decimal("0.00")
-    total_credit = Decimal("0.00")
-    
-    for row in result.all():
-        debit = row.total_debit or Decimal("0.00")
-        credit = row.total_credit or Decimal("0.00")
-        balance = debit - credit
-        
-        display_debit = debit if balance >= 0 else Decimal("0.00")
-        display_credit = -balance if balance < 0 else Decimal("0.00")
+    def trial_balance_rows():
+        total_debit = Decimal("0.00")
+        total_credit = Decimal("0.00")
         
-        writer.writerow([
-            row.account_code,
-            row.account_name,
-            row.account_type,
-            str(display_debit),
-            str(display_credit),
-            str(balance)
-        ])
+        for row in rows:
+            debit = row.total_debit or Decimal("0.00")
+            credit = row.total_credit or Decimal("0.00")
+            balance = debit - credit
+            
+            display_debit = debit if balance >= 0 else Decimal("0.00")
+            display_credit = -balance if balance < 0 else Decimal("0.00")
+            
+            yield {
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "account_type": row.account_type,
+                "debit": display_debit,
+                "credit": display_credit,
+                "balance": balance
+            }
+            
+            total_debit += display_debit
+            total_credit += display_credit
         
-        total_debit += display_debit
-        total_credit += display_credit
+        # Totals
+        yield {"account_name": "TOTALS", "debit": total_debit, "credit": total_credit}
+    
+    return ReportExportService.response(
+        trial_balance_rows(),
+        [
+            ("account_code", "Account Code"),
+            ("account_name", "Account Name"),
+            ("account_type", "Account Type"),
+            ("debit", "Debit"),
+            ("credit", "Credit"),
+            ("balance", "Balance")
+        ],
+        fmt,
+        f"trial_balance_{report_date}"
+    )
+
+@router.get("/reports/gl-detail/export")
+async def export_gl_detail(
+    start_date: date,
+    end_date: date,
+    account_id: Optional[int] = None,  # all accounts when omitted
+    format: str = "csv",  # csv, ndjson or xlsx (excel)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream GL detail lines from a server-side cursor"""
+    fmt = ReportExportService.resolve_format(format)
     
-    # Write totals
-    writer.writerow([])
-    writer.writerow(["", "TOTALS", "", str(total_debit), str(total_credit), ""])
+    if account_id is not None:
+        account = await db.get(GLAccount, account_id)
+        if not account or account.company_id != current_user.company_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GL Account not found")
     
-    output.seek(0)
+    query = select(
+        GLTransaction.transaction_date,
+        GLTransaction.journal_entry_id,
+        GLAccount.account_code,
+        GLAccount.account_name,
+        GLTransaction.reference,
+        GLTransaction.description,
+        GLTransaction.debit_amount,
+        GLTransaction.credit_amount,
+        GLTransaction.source_module
+    ).join(
+        GLAccount, GLAccount.id == GLTransaction.account_id
+    ).where(
+        GLTransaction.company_id == current_user.company_id,
+        GLTransaction.transaction_date >= start_date,
+        GLTransaction.transaction_date <= end_date
+    )
+    if account_id is not None:
+        query = query.where(GLTransaction.account_id == account_id)
+    query = query.order_by(GLTransaction.transaction_date, GLTransaction.id)
     
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=trial_balance_{report_date}.csv"}
-    ) 
\ No newline at end of file
+    return ReportExportService.response(
+        ReportExportService.stream_rows(query),
+        [
+            ("transaction_date", "Date"),
+            ("journal_entry_id", "Journal Entry"),
+            ("account_code", "Account Code"),
+            ("account_name", "Account Name"),
+            ("reference", "Reference"),
+            ("description", "Description"),
+            ("debit_amount", "Debit"),
+            ("credit_amount", "Credit"),
+            ("source_module", "Source")
+        ],
+        fmt,
+        f"gl_detail_{start_date}_{end_date}"
+    )
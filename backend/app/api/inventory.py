@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
 from app.dependencies import get_current_active_user, require_permission
-from app.core.database import get_sync_db
+from app.core.database import get_db, get_read_db
+from app.core.result_cache import result_cache
 from app.models import User, InventoryItem, InventoryTransactionType, InventoryTransaction
 from app.schemas.inventory import (
     InventoryItemCreate, InventoryItemUpdate, InventoryItemResponse,
     InventoryTransactionTypeCreate, InventoryTransactionTypeUpdate, InventoryTransactionTypeResponse,
     InventoryAdjustmentRequest, InventoryTransactionResponse,
+    StockTakeRequest, StockTakeResponse,
     InventoryItemListingRequest, StockQuantityReportRequest
 )
 from app.services.inventory_service import InventoryService
+from app.services.report_export_service import ReportExportService
+from app.services.search_service import SearchService
 
 router = APIRouter()
 
@@ -20,45 +25,54 @@ router = APIRouter()
 @router.post("/items", response_model=InventoryItemResponse)
 async def create_inventory_item(
     item: InventoryItemCreate,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "create"))
 ) -> InventoryItem:
     """Create a new inventory item"""
     service = InventoryService(db)
-    return service.create_item(current_user.company_id, item)
+    return await service.create_item(current_user.company_id, item)
 
 
 @router.get("/items", response_model=List[InventoryItemResponse])
 async def list_inventory_items(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
     item_type: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_sync_db),
+    search_mode: str = Query(SearchService.CONTAINS, description="contains, or ranked for typeahead (best matches first)"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> List[InventoryItem]:
     """List inventory items with filtering"""
     service = InventoryService(db)
-    return service.list_items(
+    page = await service.list_items(
         current_user.company_id,
         skip=skip,
         limit=limit,
         item_type=item_type,
         is_active=is_active,
-        search=search
+        search=search,
+        cursor=cursor,
+        include_total=include_total,
+        search_mode=SearchService.resolve_mode(search_mode)
     )
+    page.apply_headers(response)
+    return page.items
 
 
 @router.get("/items/{item_id}", response_model=InventoryItemResponse)
 async def get_inventory_item(
     item_id: int,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> InventoryItem:
     """Get a single inventory item"""
     service = InventoryService(db)
-    item = service.get_item(current_user.company_id, item_id)
+    item = await service.get_item(current_user.company_id, item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -71,23 +85,23 @@ async def get_inventory_item(
 async def update_inventory_item(
     item_id: int,
     item_data: InventoryItemUpdate,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "edit"))
 ) -> InventoryItem:
     """Update an inventory item"""
     service = InventoryService(db)
-    return service.update_item(current_user.company_id, item_id, item_data)
+    return await service.update_item(current_user.company_id, item_id, item_data)
 
 
 @router.delete("/items/{item_id}")
 async def delete_inventory_item(
     item_id: int,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "delete"))
 ) -> dict:
     """Delete an inventory item (soft delete if has transactions)"""
     service = InventoryService(db)
-    service.delete_item(current_user.company_id, item_id)
+    await service.delete_item(current_user.company_id, item_id)
     return {"message": "Item deleted successfully"}
 
 
@@ -95,33 +109,33 @@ async def delete_inventory_item(
 @router.post("/transaction-types", response_model=InventoryTransactionTypeResponse)
 async def create_transaction_type(
     tt_data: InventoryTransactionTypeCreate,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "create"))
 ) -> InventoryTransactionType:
     """Create a new inventory transaction type"""
     service = InventoryService(db)
-    return service.create_transaction_type(current_user.company_id, tt_data)
+    return await service.create_transaction_type(current_user.company_id, tt_data)
 
 
 @router.get("/transaction-types", response_model=List[InventoryTransactionTypeResponse])
 async def list_transaction_types(
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> List[InventoryTransactionType]:
     """List all inventory transaction types"""
     service = InventoryService(db)
-    return service.list_transaction_types(current_user.company_id)
+    return await service.list_transaction_types(current_user.company_id)
 
 
 @router.get("/transaction-types/{tt_id}", response_model=InventoryTransactionTypeResponse)
 async def get_transaction_type(
     tt_id: int,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> InventoryTransactionType:
     """Get a single transaction type"""
     service = InventoryService(db)
-    tt = service.get_transaction_type(current_user.company_id, tt_id)
+    tt = await service.get_transaction_type(current_user.company_id, tt_id)
     if not tt:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -134,23 +148,23 @@ async def get_transaction_type(
 async def update_transaction_type(
     tt_id: int,
     tt_data: InventoryTransactionTypeUpdate,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "edit"))
 ) -> InventoryTransactionType:
     """Update a transaction type"""
     service = InventoryService(db)
-    return service.update_transaction_type(current_user.company_id, tt_id, tt_data)
+    return await service.update_transaction_type(current_user.company_id, tt_id, tt_data)
 
 
 @router.delete("/transaction-types/{tt_id}")
 async def delete_transaction_type(
     tt_id: int,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "delete"))
 ) -> dict:
     """Delete a transaction type"""
     service = InventoryService(db)
-    service.delete_transaction_type(current_user.company_id, tt_id)
+    await service.delete_transaction_type(current_user.company_id, tt_id)
     return {"message": "Transaction type deleted successfully"}
 
 
@@ -158,39 +172,58 @@ async def delete_transaction_type(
 @router.post("/adjustments", response_model=InventoryTransactionResponse)
 async def process_inventory_adjustment(
     adjustment: InventoryAdjustmentRequest,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "post"))
 ) -> InventoryTransaction:
     """Process an inventory adjustment with GL integration"""
     service = InventoryService(db)
-    return service.process_adjustment(
+    return await service.process_adjustment(
         current_user.company_id,
         current_user.id,
         adjustment
     )
 
 
+@router.post("/stock-takes", response_model=StockTakeResponse)
+async def process_stock_take(
+    stock_take: StockTakeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("inventory", "post"))
+):
+    """
+    Post a stock count: variances against quantity on hand become inventory
+    transactions and one consolidated GL journal. Use dry_run to review the
+    variances first.
+    """
+    service = InventoryService(db)
+    return await service.process_stock_take(
+        current_user.company_id,
+        current_user.id,
+        stock_take
+    )
+
+
 # Transaction History
 @router.get("/items/{item_id}/transactions", response_model=List[InventoryTransactionResponse])
 async def get_item_transactions(
     item_id: int,
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> List[InventoryTransaction]:
     """Get transaction history for an item"""
     service = InventoryService(db)
     
     # Verify item exists and belongs to user's company
-    item = service.get_item(current_user.company_id, item_id)
+    item = await service.get_item(current_user.company_id, item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found"
         )
     
-    return service.get_item_transactions(
+    return await service.get_item_transactions(
         current_user.company_id,
         item_id,
         date_from=date_from,
@@ -202,17 +235,18 @@ async def get_item_transactions(
 @router.post("/reports/stock-quantity")
 async def generate_stock_quantity_report(
     report_params: StockQuantityReportRequest,
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> dict:
     """Generate stock quantity report"""
     service = InventoryService(db)
-    return service.get_stock_quantity_report(
+    return await service.get_stock_quantity_report(
         current_user.company_id,
         item_type=report_params.item_type,
         show_zero_qty=report_params.show_zero_qty,
         item_code_from=report_params.item_code_from,
-        item_code_to=report_params.item_code_to
+        item_code_to=report_params.item_code_to,
+        as_at_date=report_params.as_at_date
     )
 
 
@@ -221,33 +255,40 @@ async def generate_item_listing_report(
     item_type: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_sync_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_permission("inventory", "view"))
 ) -> dict:
     """Generate inventory item listing report"""
-    service = InventoryService(db)
-    items = service.list_items(
-        current_user.company_id,
-        skip=0,
-        limit=10000,  # Get all items for report
-        item_type=item_type,
-        is_active=is_active,
-        search=search
-    )
+    async def build_listing():
+        service = InventoryService(db)
+        page = await service.list_items(
+            current_user.company_id,
+            skip=0,
+            limit=10000,  # Get all items for report
+            item_type=item_type,
+            is_active=is_active,
+            search=search
+        )
+        
+        report_data = []
+        for item in page.items:
+            report_data.append({
+                'item_code': item.item_code,
+                'description': item.description,
+                'item_type': item.item_type.value,
+                'unit_of_measure': item.unit_of_measure,
+                'quantity_on_hand': float(item.quantity_on_hand),
+                'cost_price': float(item.cost_price),
+                'selling_price': float(item.selling_price),
+                'total_value': float(item.quantity_on_hand * item.cost_price),
+                'is_active': item.is_active
+            })
+        return report_data
     
-    report_data = []
-    for item in items:
-        report_data.append({
-            'item_code': item.item_code,
-            'description': item.description,
-            'item_type': item.item_type.value,
-            'unit_of_measure': item.unit_of_measure,
-            'quantity_on_hand': float(item.quantity_on_hand),
-            'cost_price': float(item.cost_price),
-            'selling_price': float(item.selling_price),
-            'total_value': float(item.quantity_on_hand * item.cost_price),
-            'is_active': item.is_active
-        })
+    report_data = await result_cache.get_or_compute(
+        db, current_user.company_id, "inventory.item_listing",
+        {"item_type": item_type, "is_active": is_active, "search": search}, build_listing
+    )
     
     return {
         'report_name': 'Inventory Item Listing',
@@ -263,4 +304,59 @@ async def generate_item_listing_report(
             'total_items': len(report_data),
             'total_value': sum(item['total_value'] for item in report_data)
         }
-    } 
\ No newline at end of file
+    }
+
+
+@router.get("/reports/item-listing/export")
+async def export_item_listing_report(
+    item_type: Optional[str] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    search: Optional[str] = Query(None),
+    format: str = Query("csv"),  # csv, ndjson or xlsx (excel)
+    current_user: User = Depends(require_permission("inventory", "view"))
+):
+    """Stream the inventory item listing from a server-side cursor (no row limit)"""
+    fmt = ReportExportService.resolve_format(format)
+    
+    query = select(
+        InventoryItem.item_code,
+        InventoryItem.description,
+        InventoryItem.item_type,
+        InventoryItem.unit_of_measure,
+        InventoryItem.quantity_on_hand,
+        InventoryItem.cost_price,
+        InventoryItem.selling_price,
+        (InventoryItem.quantity_on_hand * InventoryItem.cost_price).label("total_value"),
+        InventoryItem.is_active
+    ).where(InventoryItem.company_id == current_user.company_id)
+    
+    if item_type:
+        query = query.where(InventoryItem.item_type == item_type)
+    if is_active is not None:
+        query = query.where(InventoryItem.is_active == is_active)
+    if search:
+        query = query.where(
+            SearchService.contains_filter(search, [InventoryItem.item_code, InventoryItem.description])
+        )
+    query = query.order_by(InventoryItem.item_code)
+    
+    async def item_rows():
+        async for row in ReportExportService.stream_rows(query):
+            yield {**row, "item_type": row["item_type"].value}
+    
+    return ReportExportService.response(
+        item_rows(),
+        [
+            ("item_code", "Item Code"),
+            ("description", "Description"),
+            ("item_type", "Item Type"),
+            ("unit_of_measure", "Unit"),
+            ("quantity_on_hand", "Quantity On Hand"),
+            ("cost_price", "Cost Price"),
+            ("selling_price", "Selling Price"),
+            ("total_value", "Total Value"),
+            ("is_active", "Active")
+        ],
+        fmt,
+        "inventory_item_listing"
+    )
@@ -0,0 +1,102 @@
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.pagination import paginate
+from app.dependencies import get_current_active_user, require_permission
+from app.models import ReportJob, User
+from app.schemas.report_job import ReportJobCreate, ReportJobResponse, ReportJobList
+from app.services.report_export_service import ReportExportService
+from app.services.report_job_service import ReportJobService
+
+router = APIRouter()
+
+
+@router.post("", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_report_job(
+    job_in: ReportJobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Queue a report to run in the background (NFR-PERF-003).
+    Returns immediately; poll the job until it is completed, then download it.
+    An identical report that is still running or finished recently is returned instead.
+    """
+    report = ReportJobService.get_definition(job_in.report_type)
+    if report.permission:
+        await require_permission(*report.permission)(current_user)
+
+    return await ReportJobService.submit(db, current_user.company_id, current_user.id, job_in)
+
+
+@router.get("", response_model=ReportJobList)
+async def list_report_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    report_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List the company's report jobs, newest first"""
+    query = select(ReportJob).where(ReportJob.company_id == current_user.company_id)
+    if status_filter:
+        query = query.where(ReportJob.status == status_filter)
+    if report_type:
+        query = query.where(ReportJob.report_type == report_type)
+
+    page = await paginate(db, query, [(ReportJob.id, True)], limit, cursor=cursor)
+    return {"items": page.items, "next_cursor": page.next_cursor}
+
+
+@router.get("/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Poll a report job's status and progress"""
+    return await ReportJobService.get_job(db, job_id, current_user.company_id)
+
+
+@router.post("/{job_id}/cancel", response_model=ReportJobResponse)
+async def cancel_report_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Cancel a queued or running report job"""
+    job = await ReportJobService.get_job(db, job_id, current_user.company_id)
+    return await ReportJobService.cancel(db, job)
+
+
+@router.get("/{job_id}/download")
+async def download_report_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download a completed report's result file"""
+    job = await ReportJobService.get_job(db, job_id, current_user.company_id)
+    if job.status != ReportJobService.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job is {job.status}"
+        )
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Report result is no longer available; submit the report again"
+        )
+
+    return FileResponse(
+        job.file_path,
+        media_type=ReportExportService.MEDIA_TYPES[job.format],
+        filename=f"{job.report_type}_{job.id}.{job.format}"
+    )
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Any, List
+from sqlalchemy import select
+from typing import Any, List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import paginate
+from app.core.principal_cache import principal_cache
 from app.models.role import Role
 from app.models.user import User
 from app.schemas.role import (
@@ -25,6 +27,8 @@ async def get_available_permissions(
 async def list_roles(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; replaces skip"),
+    include_total: bool = Query(True, description="Return total (estimated for large results)"),
     company_id: int = Query(None, description="Filter by company ID"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -39,19 +43,16 @@ async def list_roles(
     elif current_user.company_id:
         query = query.where(Role.company_id == current_user.company_id)
     
-    # Get total count
-    count_result = await db.execute(select(func.count()).select_from(query.subquery()))
-    total = count_result.scalar()
-    
-    # Get roles
-    result = await db.execute(
-        query.offset(skip).limit(limit).order_by(Role.created_at.desc())
+    page = await paginate(
+        db, query, [(Role.created_at, True), (Role.id, True)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
     )
-    roles = result.scalars().all()
     
     return {
-        "total": total,
-        "items": roles
+        "total": page.total,
+        "total_estimated": page.total_estimated,
+        "items": page.items,
+        "next_cursor": page.next_cursor
     }
 
 @router.post("/", response_model=RoleResponse, status_code=status.HTTP_201_CREATED)
@@ -183,6 +184,9 @@ async def update_role(
     await db.commit()
     await db.refresh(role)
     
+    # Role permissions feed every holder's cached principal
+    await principal_cache.clear()
+    
     return role
 
 @router.delete("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -228,6 +232,7 @@ async def delete_role(
     
     await db.delete(role)
     await db.commit()
+    await principal_cache.clear()
 
 @router.post("/{role_id}/assign-to-user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def assign_role_to_user(
@@ -268,6 +273,7 @@ async def assign_role_to_user(
     if role not in user.roles:
         user.roles.append(role)
         await db.commit()
+        await principal_cache.invalidate(user_id)
 
 @router.delete("/{role_id}/remove-from-user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_role_from_user(
@@ -300,4 +306,5 @@ async def remove_role_from_user(
     # Remove role if assigned
     if role in user.roles:
         user.roles.remove(role)
-        await db.commit() 
\ No newline at end of file
+        await db.commit()
+        await principal_cache.invalidate(user_id)
\ No newline at end of file
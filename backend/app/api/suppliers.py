@@ -1,10 +1,13 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.dependencies import get_current_active_user, require_permission
 from app.models import User, Supplier
+from app.services.balance_summary_service import BalanceSummaryService
+from app.services.search_service import SearchService
 from app.schemas.supplier import SupplierCreate, SupplierUpdate, SupplierResponse
 
 router = APIRouter()
@@ -12,9 +15,13 @@ router = APIRouter()
 
 @router.get("/", response_model=List[SupplierResponse])
 async def list_suppliers(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    include_total: bool = Query(False, description="Return X-Total-Count (estimated for large results)"),
     search: Optional[str] = None,
+    search_mode: str = Query(SearchService.CONTAINS, description="contains, or ranked for typeahead (best matches first)"),
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
@@ -25,26 +32,27 @@ async def list_suppliers(
     
     REQ-AP-SUPP-001: Allow viewing supplier records
     """
+    search_mode = SearchService.resolve_mode(search_mode)
     query = select(Supplier).where(Supplier.company_id == current_user.company_id)
     
     # Apply filters
-    if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_(
-                Supplier.supplier_code.ilike(search_term),
-                Supplier.name.ilike(search_term)
-            )
-        )
-    
     if is_active is not None:
         query = query.where(Supplier.is_active == is_active)
     
-    # Order by supplier code
-    query = query.order_by(Supplier.supplier_code).offset(skip).limit(limit)
+    if search and search_mode == SearchService.RANKED:
+        return await SearchService.ranked(
+            db, query, search, Supplier.supplier_code, [Supplier.name], limit
+        )
+    if search:
+        query = query.where(SearchService.contains_filter(search, [Supplier.supplier_code, Supplier.name]))
     
-    result = await db.execute(query)
-    return result.scalars().all()
+    # Order by supplier code
+    page = await paginate(
+        db, query, [(Supplier.supplier_code, False), (Supplier.id, False)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
+    )
+    page.apply_headers(response)
+    return page.items
 
 
 @router.post("/", response_model=SupplierResponse)
@@ -229,16 +237,8 @@ async def get_supplier_balance(
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     
-    # Get transaction count
-    from app.models import APTransaction
-    transaction_count = await db.execute(
-        select(func.count(APTransaction.id)).where(
-            and_(
-                APTransaction.supplier_id == supplier_id,
-                APTransaction.company_id == current_user.company_id
-            )
-        )
-    )
+    # Maintained on posting and allocation (BalanceSummaryService)
+    summary = await BalanceSummaryService.get_summary(db, BalanceSummaryService.AP, supplier.id)
     
     return {
         "supplier_id": supplier.id,
@@ -246,5 +246,5 @@ async def get_supplier_balance(
         "supplier_name": supplier.name,
         "current_balance": supplier.current_balance,
         "payment_terms": supplier.payment_terms,
-        "transaction_count": transaction_count.scalar()
+        **summary
     } 
\ No newline at end of file
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Any, List
+from sqlalchemy import select
+from typing import Any, List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserList
 from app.dependencies import get_current_active_user, require_permission
@@ -15,26 +17,22 @@ router = APIRouter()
 async def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; replaces skip"),
+    include_total: bool = Query(True, description="Return total (estimated for large results)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """List all users with pagination (REQ-SYS-UM-004)"""
-    # Get total count
-    count_result = await db.execute(select(func.count(User.id)))
-    total = count_result.scalar()
-    
-    # Get users
-    result = await db.execute(
-        select(User)
-        .offset(skip)
-        .limit(limit)
-        .order_by(User.created_at.desc())
+    page = await paginate(
+        db, select(User), [(User.created_at, True), (User.id, True)],
+        limit, skip=skip, cursor=cursor, include_total=include_total
     )
-    users = result.scalars().all()
     
     return {
-        "total": total,
-        "items": users
+        "total": page.total,
+        "total_estimated": page.total_estimated,
+        "items": page.items,
+        "next_cursor": page.next_cursor
     }
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -129,6 +127,7 @@ async def update_user(
     
     await db.commit()
     await db.refresh(user)
+    await principal_cache.invalidate(user_id)
     
     return user
 
@@ -161,3 +160,4 @@ async def delete_user(
     
     await db.delete(user)
     await db.commit()
+    await principal_cache.invalidate(user_id)
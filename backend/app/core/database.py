@@ -1,23 +1,74 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.pool_metrics import pool_metrics, timed_pool_class
+from app.core import ledger_version  # noqa: F401 - registers the session listeners that bump ledger versions
 
 # Use async PostgreSQL URL for async operations
 DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 # Use sync PostgreSQL URL for sync operations  
 SYNC_DATABASE_URL = settings.DATABASE_URL
 
+def _pool_options() -> dict:
+    """Pool and logging options shared by every engine"""
+    return {
+        "echo": settings.SQL_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _create_async_engine(url: str, name: str, **overrides):
+    async_engine = create_async_engine(
+        url,
+        poolclass=timed_pool_class(AsyncAdaptedQueuePool, name),
+        # asyncpg prepared statement cache; set to 0 behind pgbouncer in transaction mode
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+        **{**_pool_options(), **overrides}
+    )
+    pool_metrics.register(name, async_engine)
+    return async_engine
+
 # Async engine and session
-engine = create_async_engine(DATABASE_URL, echo=settings.DEBUG)
+engine = _create_async_engine(DATABASE_URL, "primary")
 AsyncSessionLocal = sessionmaker(
     engine, 
     class_=AsyncSession, 
     expire_on_commit=False
 )
 
+# Autocommitted FAST document number increments; a pool of their own so a
+# request holding a primary connection never waits on the primary pool again
+numbering_engine = _create_async_engine(
+    DATABASE_URL, "numbering",
+    pool_size=settings.DB_NUMBERING_POOL_SIZE,
+    max_overflow=settings.DB_NUMBERING_MAX_OVERFLOW
+)
+
+# Optional read replica for reports; falls back to the primary when not configured
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = _create_async_engine(
+        settings.DATABASE_REPLICA_URL.replace("postgresql://", "postgresql+asyncpg://"), "replica"
+    )
+else:
+    replica_engine = engine
+ReplicaSessionLocal = sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 # Sync engine and session
-sync_engine = create_engine(SYNC_DATABASE_URL, echo=settings.DEBUG)
+sync_engine = create_engine(
+    SYNC_DATABASE_URL,
+    poolclass=timed_pool_class(QueuePool, "sync"),
+    **_pool_options()
+)
+pool_metrics.register("sync", sync_engine)
 SessionLocal = sessionmaker(
     sync_engine,
     autocommit=False,
@@ -34,6 +85,14 @@ async def get_db():
         finally:
             await session.close()
 
+async def get_read_db():
+    """Dependency to get a read-only session for reports (replica when configured)"""
+    async with ReplicaSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 def get_sync_db():
     """Dependency to get sync database session"""
     db = SessionLocal()
@@ -0,0 +1,99 @@
+import random
+from itertools import chain
+from typing import Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Tables whose changes can alter a cached report result
+TRACKED_TABLES = frozenset({
+    "gl_accounts", "gl_transactions", "accounting_periods",
+    "ar_transactions", "ar_allocations", "customers",
+    "ap_transactions", "ap_allocations", "suppliers",
+    "inventory_items", "inventory_transactions",
+})
+
+ALL_COMPANIES = 0  # touch() marker for changes made across companies
+_INFO_KEY = "ledger_version_companies"
+
+_BUMP = text("""
+    INSERT INTO ledger_versions (company_id, slot, version)
+    SELECT id, :slot, 1 FROM companies WHERE id = :company_id
+    ON CONFLICT (company_id, slot) DO UPDATE SET version = ledger_versions.version + 1
+""")
+_BUMP_ALL = text("""
+    INSERT INTO ledger_versions (company_id, slot, version)
+    SELECT id, :slot, 1 FROM companies
+    ON CONFLICT (company_id, slot) DO UPDATE SET version = ledger_versions.version + 1
+""")
+_CURRENT = text("SELECT COALESCE(SUM(version), 0) FROM ledger_versions WHERE company_id = :company_id")
+
+
+def touch(db, company_id: Optional[int] = None) -> None:
+    """Bump the company's ledger version when the current transaction commits.
+
+    Flushed ORM changes and bulk inserts (with company_id values) of tracked
+    tables are picked up automatically; call this after UPDATE or DELETE
+    statements that are not accompanied by either. Without a company, every
+    company's version is bumped.
+    """
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info.setdefault(_INFO_KEY, set()).add(ALL_COMPANIES if company_id is None else company_id)
+
+
+async def current(db: AsyncSession, company_id: int) -> int:
+    """The company's version as seen by this session; read it before the data it versions"""
+    return (await db.execute(_CURRENT, {"company_id": company_id})).scalar()
+
+
+def _mark(session: Session, companies: Set[int]) -> None:
+    if companies:
+        session.info.setdefault(_INFO_KEY, set()).update(companies)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    _mark(session, {
+        obj.company_id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES and getattr(obj, "company_id", None) is not None
+    })
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_insert(orm_execute_state) -> None:
+    if not orm_execute_state.is_insert:
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) not in TRACKED_TABLES:
+        return
+    parameters = orm_execute_state.parameters
+    rows = parameters if isinstance(parameters, (list, tuple)) else [parameters] if parameters else []
+    _mark(orm_execute_state.session, {
+        row["company_id"] for row in rows if isinstance(row, dict) and row.get("company_id") is not None
+    })
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session: Session) -> None:
+    # Commit flushes after this hook; flush now so those changes are tracked too
+    session.flush()
+    companies = session.info.pop(_INFO_KEY, None)
+    if not companies:
+        return
+    # A random slot per commit spreads concurrent posts over several rows;
+    # the version is the sum of a company's slots
+    slot = random.randrange(settings.LEDGER_VERSION_SLOTS)
+    if ALL_COMPANIES in companies:
+        session.execute(_BUMP_ALL, {"slot": slot})
+        return
+    for company_id in sorted(companies):
+        session.execute(_BUMP, {"company_id": company_id, "slot": slot})
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
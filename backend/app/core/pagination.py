@@ -0,0 +1,190 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A cursor is an opaque, URL-safe token holding the sort-key values of the last
+row on a page. The next page is fetched with a WHERE clause on those values
+instead of OFFSET, so deep pages cost the same as the first one. Offset
+pagination (skip) is still accepted for existing clients.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, bindparam, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+# (model attribute, descending) - the last key must be unique, e.g. the id
+SortKeys = Sequence[Tuple[Any, bool]]
+
+# Totals are counted exactly up to this many rows; larger results fall back
+# to the planner's row estimate
+EXACT_COUNT_LIMIT = 10000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+
+@dataclass
+class Page:
+    """One page of results plus what the client needs to fetch the next"""
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+    def apply_headers(self, response: Response) -> None:
+        """Expose the cursor and total on endpoints that return a bare list"""
+        if self.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.total is not None:
+            response.headers[TOTAL_COUNT_HEADER] = str(self.total)
+            response.headers[TOTAL_ESTIMATED_HEADER] = "true" if self.total_estimated else "false"
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper so the planner's row estimate can be read"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _signature(sort_keys: SortKeys) -> str:
+    return ",".join(f"{column.key}:{'d' if descending else 'a'}" for column, descending in sort_keys)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "n" in value:
+            return Decimal(value["n"])
+    return value
+
+
+def encode_cursor(sort_keys: SortKeys, row: Any) -> str:
+    """Build the cursor pointing just after `row`"""
+    payload = {
+        "s": _signature(sort_keys),
+        "k": [_encode_value(getattr(row, column.key)) for column, _ in sort_keys]
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort_keys: SortKeys, cursor: str) -> list:
+    """Return the sort-key values stored in a cursor, or raise 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload["k"]]
+        valid = payload["s"] == _signature(sort_keys) and len(values) == len(sort_keys)
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return values
+
+
+def _after(sort_keys: SortKeys, values: list):
+    """WHERE clause selecting rows that sort after the cursor position"""
+    columns = [column for column, _ in sort_keys]
+    values = [bindparam(None, value, type_=column.type) for column, value in zip(columns, values)]
+    directions = {descending for _, descending in sort_keys}
+    if len(directions) == 1:
+        # Row-value comparison lets PostgreSQL use a composite index directly
+        if directions.pop():
+            return tuple_(*columns) < tuple_(*values)
+        return tuple_(*columns) > tuple_(*values)
+
+    clauses = []
+    for i, (column, descending) in enumerate(sort_keys):
+        bound = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], bound))
+    return or_(*clauses)
+
+
+async def count_rows(db: AsyncSession, query) -> Tuple[int, bool]:
+    """Count rows matching `query`, returning (total, is_estimate).
+
+    The count is capped at EXACT_COUNT_LIMIT so it never scans the whole
+    result; when the cap is reached the planner's estimate is used instead.
+    """
+    capped = select(func.count()).select_from(query.limit(EXACT_COUNT_LIMIT + 1).subquery())
+    total = (await db.execute(capped)).scalar() or 0
+    if total <= EXACT_COUNT_LIMIT:
+        return total, False
+
+    plan = (await db.execute(_Explain(query))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    return max(estimate, total), True
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    sort_keys: SortKeys,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> Page:
+    """Order `query` by `sort_keys` and fetch one page.
+
+    With a cursor the page starts after the cursor's row and `skip` is
+    ignored; otherwise `skip` is applied as an OFFSET. A next cursor is
+    returned in either mode whenever more rows exist.
+    """
+    total, estimated = (None, False)
+    if include_total:
+        total, estimated = await count_rows(db, query)
+
+    ordered = query.order_by(*[
+        column.desc() if descending else column.asc() for column, descending in sort_keys
+    ])
+    if cursor:
+        ordered = ordered.where(_after(sort_keys, decode_cursor(sort_keys, cursor)))
+    elif skip:
+        ordered = ordered.offset(skip)
+
+    result = await db.execute(ordered.limit(limit + 1))
+    rows = result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_keys, rows[-1])
+
+    return Page(items=list(rows), next_cursor=next_cursor, total=total, total_estimated=estimated)
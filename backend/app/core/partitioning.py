@@ -0,0 +1,169 @@
+"""
+Range partitioning of the ledger tables on transaction_date.
+
+Partitions cover calendar years (or months) and are named <table>_y2024 or
+<table>_m2024_03; a <table>_default partition catches rows outside them.
+Tables are converted by the alembic migration (GL and inventory) or by
+`python -m app.partition_ledgers` (AR/AP), and further partitions are added
+whenever an accounting period is created. Helpers skip tables that have not
+been converted, so they are safe to call on any schema.
+"""
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+PARTITION_COLUMN = "transaction_date"
+LEDGER_TABLES = ("gl_transactions", "inventory_transactions", "ar_transactions", "ap_transactions")
+
+YEAR = "year"
+MONTH = "month"
+
+IS_PARTITIONED = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"
+)
+_PARTITIONS = text(
+    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = to_regclass(:t)"
+)
+
+
+def _interval_start(day: date, interval: str) -> date:
+    return day.replace(month=1, day=1) if interval == YEAR else day.replace(day=1)
+
+
+def _next_start(start: date, interval: str) -> date:
+    if interval == YEAR:
+        return start.replace(year=start.year + 1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_ranges(start: date, end: date, interval: Optional[str] = None) -> List[Tuple[str, date, date]]:
+    """(name suffix, lower bound, exclusive upper bound) for each partition covering start..end"""
+    interval = interval or settings.LEDGER_PARTITION_INTERVAL
+    ranges = []
+    lower = _interval_start(start, interval)
+    while lower <= end:
+        upper = _next_start(lower, interval)
+        suffix = f"y{lower.year}" if interval == YEAR else f"m{lower.year}_{lower.month:02d}"
+        ranges.append((suffix, lower, upper))
+        lower = upper
+    return ranges
+
+
+def _bound(day: date) -> str:
+    # Explicit UTC so timestamptz bounds do not depend on the session time zone
+    return f"'{day.isoformat()} 00:00:00+00'"
+
+
+def _attach_partition_sql(table: str, name: str, lower: date, upper: date) -> List[str]:
+    """Create a partition, moving any rows the default partition already holds for its range"""
+    condition = f"{PARTITION_COLUMN} >= {_bound(lower)} AND {PARTITION_COLUMN} < {_bound(upper)}"
+    return [
+        f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {condition} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ({_bound(lower)}) TO ({_bound(upper)})",
+    ]
+
+
+async def ensure_partitions(db: AsyncSession, start: date, end: date) -> List[str]:
+    """Create any missing partitions covering start..end on every partitioned ledger table.
+
+    Runs inside the caller's transaction; returns the names of new partitions.
+    """
+    conn = await db.connection()
+    created = []
+    for table in LEDGER_TABLES:
+        if not (await conn.execute(IS_PARTITIONED, {"t": table})).scalar():
+            continue
+        # Serialise concurrent period creation per table
+        await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:t))"), {"t": table})
+        existing = set((await conn.execute(_PARTITIONS, {"t": table})).scalars())
+        for suffix, lower, upper in partition_ranges(start, end):
+            name = f"{table}_{suffix}"
+            if name in existing:
+                continue
+            for statement in _attach_partition_sql(table, name, lower, upper):
+                await conn.exec_driver_sql(statement)
+            created.append(name)
+    return created
+
+
+def convert_table(connection, table: str, partitioned: bool = True) -> List[str]:
+    """Rebuild `table` as a range-partitioned table, or back into a plain one.
+
+    Rows, indexes, check and foreign-key constraints and the id sequence are
+    carried over. A partitioned table's primary key becomes
+    (id, transaction_date), so foreign keys from other tables that reference
+    it by id alone (e.g. AR/AP allocations) are dropped; their names are
+    returned. Takes a synchronous connection (alembic, or run_sync).
+    """
+    legacy = f"{table}_legacy"
+    run = connection.exec_driver_sql
+
+    pk_name = connection.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:t) AND contype = 'p'"
+    ), {"t": table}).scalar()
+    indexes = connection.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = :t AND indexname <> :pk"
+    ), {"t": table, "pk": pk_name}).all()
+    foreign_keys = connection.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:t) AND contype = 'f'"
+    ), {"t": table}).all()
+    incoming = connection.execute(text(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE confrelid = to_regclass(:t) AND contype = 'f' AND conrelid <> confrelid"
+    ), {"t": table}).all()
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}).scalar()
+
+    # Move the old table aside, freeing its constraint and index names
+    for referencing_table, constraint in incoming:
+        run(f"ALTER TABLE {referencing_table} DROP CONSTRAINT {constraint}")
+    run(f"ALTER TABLE {table} RENAME TO {legacy}")
+    run(f"ALTER TABLE {legacy} RENAME CONSTRAINT {pk_name} TO {legacy}_pkey")
+    for index_name, _ in indexes:
+        run(f"DROP INDEX {index_name}")
+    if sequence:
+        run(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    partition_clause = f" PARTITION BY RANGE ({PARTITION_COLUMN})" if partitioned else ""
+    run(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}")
+    key = f"id, {PARTITION_COLUMN}" if partitioned else "id"
+    run(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({key})")
+    for _, definition in indexes:
+        run(definition.replace(" ON ONLY ", " ON "))
+    for constraint, definition in foreign_keys:
+        run(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} {definition}")
+
+    if partitioned:
+        # Cover existing rows and every defined accounting period
+        data = connection.execute(text(
+            f"SELECT min({PARTITION_COLUMN})::date, max({PARTITION_COLUMN})::date FROM {legacy}"
+        )).one()
+        periods = connection.execute(text(
+            "SELECT min(start_date), max(end_date) FROM accounting_periods"
+        )).one()
+        starts = [d for d in (data[0], periods[0]) if d] or [date.today()]
+        ends = [d for d in (data[1], periods[1]) if d] or [date.today()]
+        start, end = min(starts), max(ends)
+        run(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        for suffix, lower, upper in partition_ranges(start, end):
+            run(f"CREATE TABLE {table}_{suffix} PARTITION OF {table} "
+                f"FOR VALUES FROM ({_bound(lower)}) TO ({_bound(upper)})")
+
+    run(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    if sequence:
+        run(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    run(f"DROP TABLE {legacy}")
+    run(f"ANALYZE {table}")
+
+    return [f"{referencing_table}.{constraint}" for referencing_table, constraint in incoming]
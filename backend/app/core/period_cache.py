@@ -0,0 +1,161 @@
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.accounting_period import AccountingPeriod
+
+
+@dataclass(frozen=True)
+class CachedPeriod:
+    """Accounting period as seen by posting paths"""
+    id: int
+    company_id: int
+    period_name: str
+    start_date: date
+    end_date: date
+    is_closed: bool
+    financial_year: int
+
+
+class CompanyPeriods:
+    """Interval index over one company's periods, sorted by start date"""
+
+    def __init__(self, periods: List[CachedPeriod]):
+        self.periods = sorted(periods, key=lambda p: p.start_date)
+        self._starts = [p.start_date for p in self.periods]
+        self._by_id = {p.id: p for p in self.periods}
+
+    def find(self, day: date, open_only: bool = False) -> Optional[CachedPeriod]:
+        """Period containing `day` (periods do not overlap)"""
+        if isinstance(day, datetime):
+            day = day.date()
+        index = bisect_right(self._starts, day) - 1
+        if index < 0:
+            return None
+        period = self.periods[index]
+        if period.end_date < day or (open_only and period.is_closed):
+            return None
+        return period
+
+    def get(self, period_id: int) -> Optional[CachedPeriod]:
+        return self._by_id.get(period_id)
+
+
+class PeriodCache:
+    """Per-process cache of each company's accounting periods.
+
+    Entries are dropped by the accounting period endpoints after every change
+    and expire after PERIOD_CACHE_TTL_SECONDS, which bounds how long other
+    worker processes can see a stale period. Posting paths therefore confirm
+    that a period is open against the database (open_period_ids).
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    async def get_company_periods(self, db: AsyncSession, company_id: int) -> CompanyPeriods:
+        with self._lock:
+            entry = self._entries.get(company_id)
+            if entry is not None and entry[0] >= time.monotonic():
+                return entry[1]
+            generation = (self._epoch, self._generations.get(company_id, 0))
+
+        result = await db.execute(
+            select(
+                AccountingPeriod.id, AccountingPeriod.company_id, AccountingPeriod.period_name,
+                AccountingPeriod.start_date, AccountingPeriod.end_date,
+                AccountingPeriod.is_closed, AccountingPeriod.financial_year
+            ).where(AccountingPeriod.company_id == company_id).order_by(AccountingPeriod.start_date)
+        )
+        periods = CompanyPeriods([
+            CachedPeriod(
+                id=row.id,
+                company_id=row.company_id,
+                period_name=row.period_name,
+                start_date=row.start_date,
+                end_date=row.end_date,
+                is_closed=bool(row.is_closed),
+                financial_year=row.financial_year
+            )
+            for row in result.all()
+        ])
+
+        with self._lock:
+            # Don't store a load that raced with an invalidation
+            if (self._epoch, self._generations.get(company_id, 0)) == generation:
+                self._entries[company_id] = (time.monotonic() + self.ttl_seconds, periods)
+        return periods
+
+    async def find(
+        self, db: AsyncSession, company_id: int, day: date, open_only: bool = False
+    ) -> Optional[CachedPeriod]:
+        periods = await self.get_company_periods(db, company_id)
+        return periods.find(day, open_only=open_only)
+
+    async def get(self, db: AsyncSession, company_id: int, period_id: int) -> Optional[CachedPeriod]:
+        periods = await self.get_company_periods(db, company_id)
+        return periods.get(period_id)
+
+    async def open_period_ids(self, db: AsyncSession, company_id: int, period_ids: Iterable[int]) -> Set[int]:
+        """Which of the periods are open, read from the database rather than the cache.
+
+        Posting paths must decide with this: the rows are share-locked until the
+        caller's transaction ends, so a close committed by another worker is
+        seen and a close in flight waits for the posting.
+        """
+        period_ids = set(period_ids)
+        if not period_ids:
+            return set()
+        result = await db.execute(
+            select(AccountingPeriod.id, AccountingPeriod.is_closed).where(
+                AccountingPeriod.company_id == company_id,
+                AccountingPeriod.id.in_(sorted(period_ids))
+            ).order_by(AccountingPeriod.id).with_for_update(read=True)
+        )
+        current = {row.id: bool(row.is_closed) for row in result.all()}
+
+        cached = await self.get_company_periods(db, company_id)
+        if any(cached.get(period_id) is None or cached.get(period_id).is_closed != is_closed
+               for period_id, is_closed in current.items()) or current.keys() != period_ids:
+            self.invalidate(company_id)
+        return {period_id for period_id, is_closed in current.items() if not is_closed}
+
+    async def find_open(self, db: AsyncSession, company_id: int, day: date) -> Optional[CachedPeriod]:
+        """Open period containing `day` for posting; the cache only locates it (see open_period_ids)"""
+        period = await self.find(db, company_id, day)
+        if period is None:
+            # Possibly a period created by another worker; retry on a fresh load
+            self.invalidate(company_id)
+            period = await self.find(db, company_id, day)
+        if period is None or not await self.open_period_ids(db, company_id, [period.id]):
+            return None
+        return replace(period, is_closed=False)
+
+    async def is_open(self, db: AsyncSession, company_id: int, period_id: int) -> bool:
+        """Whether the company's period exists and is open, for posting (see open_period_ids)"""
+        return bool(await self.open_period_ids(db, company_id, [period_id]))
+
+    def invalidate(self, company_id: int) -> None:
+        """Call after the change is committed"""
+        with self._lock:
+            self._entries.pop(company_id, None)
+            self._generations[company_id] = self._generations.get(company_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+
+period_cache = PeriodCache(settings.PERIOD_CACHE_TTL_SECONDS)
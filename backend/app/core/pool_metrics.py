@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Dict
+
+
+class PoolMetrics:
+    """Checkout wait time and utilisation for each named connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, object] = {}
+        self._waits: Dict[str, Dict[str, float]] = {}
+
+    def register(self, name: str, engine) -> None:
+        """Track an engine; its current pool is read at snapshot time (dispose() replaces it)"""
+        with self._lock:
+            self._engines[name] = engine
+            self._waits.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+
+    def observe_wait(self, name: str, seconds: float) -> None:
+        with self._lock:
+            waits = self._waits.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            waits["count"] += 1
+            waits["total"] += seconds
+            waits["max"] = max(waits["max"], seconds)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            engines = dict(self._engines)
+            waits = {name: dict(values) for name, values in self._waits.items()}
+        
+        result = {}
+        for name, engine in engines.items():
+            pool = engine.pool
+            size = pool.size()
+            checked_out = pool.checkedout()
+            capacity = size + max(pool._max_overflow, 0)
+            wait = waits.get(name, {"count": 0, "total": 0.0, "max": 0.0})
+            result[name] = {
+                "pool_size": size,
+                "max_overflow": pool._max_overflow,
+                "checked_out": checked_out,
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "utilisation": round(checked_out / capacity, 4) if capacity else 0.0,
+                "checkouts": int(wait["count"]),
+                "checkout_wait_avg_ms": round(wait["total"] / wait["count"] * 1000, 3) if wait["count"] else 0.0,
+                "checkout_wait_max_ms": round(wait["max"] * 1000, 3)
+            }
+        return result
+
+
+pool_metrics = PoolMetrics()
+
+
+def timed_pool_class(base, name: str):
+    """Subclass a QueuePool so every checkout records how long it waited"""
+
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                pool_metrics.observe_wait(name, time.perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
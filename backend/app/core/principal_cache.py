@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request dependencies"""
+    id: int
+    username: str
+    company_id: Optional[int]
+    is_active: bool
+    is_superuser: bool
+    permissions: FrozenSet[str]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """Build from a User with roles loaded, flattening role permissions once"""
+        permissions = set()
+        for role in user.roles:
+            if role.permissions:
+                permissions.update(role.permissions)
+        return cls(
+            id=user.id,
+            username=user.username,
+            company_id=user.company_id,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+            permissions=frozenset(permissions)
+        )
+
+
+class InMemoryPrincipalCache:
+    """Per-process TTL + LRU cache of principals keyed by user id.
+
+    Loads take a generation first and only store if no invalidate() or
+    clear() happened meanwhile, so a load racing a role change can't cache
+    the old permissions.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple[float, Principal]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    async def generation(self, user_id: int) -> Tuple[int, int]:
+        """Take before loading the user; pass to set()"""
+        with self._lock:
+            return self._epoch, self._generations.get(user_id, 0)
+
+    async def set(self, principal: Principal, generation: Tuple[int, int]) -> None:
+        with self._lock:
+            if (self._epoch, self._generations.get(principal.id, 0)) != generation:
+                return
+            self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+
+class RedisPrincipalCache:
+    """Principal cache shared by all workers through Redis (optional dependency).
+
+    Generations live in Redis too, and set() checks them in the same
+    script that stores the entry.
+    """
+
+    KEY_PREFIX = "principal:"
+    GENERATION_PREFIX = "principal-generation:"
+    EPOCH_KEY = "principal-epoch"
+
+    # KEYS: entry, user generation, epoch; ARGV: value, ttl, generation, epoch
+    SET_IF_CURRENT = """
+        if (redis.call('GET', KEYS[2]) or '0') == ARGV[3] and (redis.call('GET', KEYS[3]) or '0') == ARGV[4] then
+            redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+        end
+    """
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self._set_if_current = self.client.register_script(self.SET_IF_CURRENT)
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        raw = await self.client.get(f"{self.KEY_PREFIX}{user_id}")
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        data["permissions"] = frozenset(data["permissions"])
+        return Principal(**data)
+
+    async def generation(self, user_id: int) -> Tuple[int, int]:
+        generation, epoch = await self.client.mget(f"{self.GENERATION_PREFIX}{user_id}", self.EPOCH_KEY)
+        return int(generation or 0), int(epoch or 0)
+
+    async def set(self, principal: Principal, generation: Tuple[int, int]) -> None:
+        data = asdict(principal)
+        data["permissions"] = sorted(principal.permissions)
+        await self._set_if_current(
+            keys=[f"{self.KEY_PREFIX}{principal.id}", f"{self.GENERATION_PREFIX}{principal.id}", self.EPOCH_KEY],
+            args=[json.dumps(data), self.ttl_seconds, *generation]
+        )
+
+    async def invalidate(self, user_id: int) -> None:
+        await self.client.incr(f"{self.GENERATION_PREFIX}{user_id}")
+        await self.client.delete(f"{self.KEY_PREFIX}{user_id}")
+
+    async def clear(self) -> None:
+        await self.client.incr(self.EPOCH_KEY)
+        keys = [key async for key in self.client.scan_iter(f"{self.KEY_PREFIX}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+def _build_principal_cache():
+    if settings.PRINCIPAL_CACHE_URL:
+        return RedisPrincipalCache(settings.PRINCIPAL_CACHE_URL, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return InMemoryPrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_SIZE)
+
+
+principal_cache = _build_principal_cache()
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import ledger_version
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _ResultEncoder(json.JSONEncoder):
+    """JSON that keeps Decimal and date values apart from strings and floats"""
+
+    def default(self, value):
+        if isinstance(value, Decimal):
+            return {"__decimal__": str(value)}
+        if isinstance(value, datetime):
+            return {"__datetime__": value.isoformat()}
+        if isinstance(value, date):
+            return {"__date__": value.isoformat()}
+        return super().default(value)
+
+
+def _decode_object(value: dict):
+    if len(value) == 1:
+        if "__decimal__" in value:
+            return Decimal(value["__decimal__"])
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+    return value
+
+
+def encode_result(value: Any) -> bytes:
+    return json.dumps(value, cls=_ResultEncoder, separators=(",", ":")).encode()
+
+
+def decode_result(raw: bytes) -> Any:
+    return json.loads(raw, object_hook=_decode_object)
+
+
+class InMemoryResultCache:
+    """Per-process TTL + LRU cache of encoded results, bounded by entries and bytes"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return raw
+
+    async def set(self, key: str, raw: bytes) -> None:
+        if len(raw) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, raw)
+            self._bytes += len(raw)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, raw = self._entries.pop(key)
+        self._bytes -= len(raw)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class RedisResultCache:
+    """Result cache shared by all workers through Redis (optional dependency)"""
+
+    KEY_PREFIX = "result:"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.KEY_PREFIX}{key}")
+
+    async def set(self, key: str, raw: bytes) -> None:
+        await self.client.set(f"{self.KEY_PREFIX}{key}", raw, ex=self.ttl_seconds)
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(f"{self.KEY_PREFIX}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+class ResultCache:
+    """Report results keyed by company, report, ledger version and parameters.
+
+    Entries are never invalidated: a commit that changes a company's ledgers
+    bumps its version (app.core.ledger_version), so later reads build new
+    keys and old entries age out. Results are stored as JSON (with Decimal
+    and date values tagged), which keeps cached values safe from callers
+    mutating what they get back and never executes anything read from the
+    shared backend. The in-process cache sits in front of the shared one
+    when RESULT_CACHE_URL is set.
+    """
+
+    def __init__(self, local: InMemoryResultCache, shared: Optional[RedisResultCache] = None, enabled: bool = True):
+        self.local = local
+        self.shared = shared
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self.shared_errors = 0
+
+    @staticmethod
+    def key(company_id: int, report: str, version: int, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{company_id}:{report}:{version}:{digest}"
+
+    async def get_or_compute(
+        self,
+        db: AsyncSession,
+        company_id: int,
+        report: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached result of `compute()`, which must read through `db`.
+
+        The version is read on the same session before the report runs, so a
+        result can be newer than its key but never older; on a replica the
+        key follows the replica's own view of the version.
+        """
+        if not self.enabled:
+            return await compute()
+
+        version = await ledger_version.current(db, company_id)
+        key = self.key(company_id, report, version, params)
+        raw = await self._get(key)
+        if raw is not None:
+            try:
+                value = decode_result(raw)
+            except ValueError:
+                logger.warning("Discarding undecodable cached %s result", report)
+            else:
+                self._count(report, "hits")
+                return value
+
+        self._count(report, "misses")
+        value = await compute()
+        try:
+            raw = encode_result(value)
+        except (TypeError, ValueError):
+            logger.warning("%s result is not JSON-encodable; not cached", report, exc_info=True)
+            return value
+        await self._set(key, raw)
+        self._count(report, "stores")
+        return value
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        raw = await self.local.get(key)
+        if raw is not None or self.shared is None:
+            return raw
+        try:
+            raw = await self.shared.get(key)
+        except Exception:
+            self._shared_failed("read")
+            return None
+        if raw is not None:
+            await self.local.set(key, raw)
+        return raw
+
+    async def _set(self, key: str, raw: bytes) -> None:
+        await self.local.set(key, raw)
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(key, raw)
+        except Exception:
+            self._shared_failed("write")
+
+    def _shared_failed(self, operation: str) -> None:
+        # A cache outage degrades to recomputing; the report itself still succeeds
+        logger.warning("Shared result cache %s failed", operation, exc_info=True)
+        with self._lock:
+            self.shared_errors += 1
+
+    def _count(self, report: str, counter: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(report, {"hits": 0, "misses": 0, "stores": 0})
+            counts[counter] += 1
+
+    async def clear(self) -> None:
+        await self.local.clear()
+        if self.shared is not None:
+            await self.shared.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reports = {report: dict(counts) for report, counts in self._counts.items()}
+            shared_errors = self.shared_errors
+        for counts in reports.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_ratio"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return {
+            "enabled": self.enabled,
+            "backend": "memory+redis" if self.shared is not None else "memory",
+            "local": self.local.stats(),
+            "shared_errors": shared_errors,
+            "reports": reports
+        }
+
+
+def _build_result_cache() -> ResultCache:
+    local = InMemoryResultCache(
+        settings.RESULT_CACHE_TTL_SECONDS, settings.RESULT_CACHE_MAX_ENTRIES, settings.RESULT_CACHE_MAX_BYTES
+    )
+    shared = RedisResultCache(settings.RESULT_CACHE_URL, settings.RESULT_CACHE_TTL_SECONDS) if settings.RESULT_CACHE_URL else None
+    return ResultCache(local, shared, settings.RESULT_CACHE_ENABLED)
+
+
+result_cache = _build_result_cache()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import selectinload
 from typing import Optional
 
 from app.core.database import get_db
+from app.core.principal_cache import Principal, principal_cache
 from app.core.security import verify_token
 from app.models.user import User
 
@@ -14,8 +15,8 @@ security = HTTPBearer()
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
+) -> Principal:
+    """Get current authenticated user (cached principal) from JWT token"""
     token = credentials.credentials
     
     try:
@@ -34,20 +35,26 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database with roles eagerly loaded
-    result = await db.execute(
-        select(User)
-        .options(selectinload(User.roles))
-        .where(User.id == int(user_id))
-    )
-    user = result.scalar_one_or_none()
-    
+    user = await principal_cache.get(int(user_id))
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+        generation = await principal_cache.generation(int(user_id))
+        # Cache miss: load user with roles eagerly loaded and flatten permissions once
+        result = await db.execute(
+            select(User)
+            .options(selectinload(User.roles))
+            .where(User.id == int(user_id))
         )
+        db_user = result.scalar_one_or_none()
+        
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        user = Principal.from_user(db_user)
+        await principal_cache.set(user, generation)
     
     if not user.is_active:
         raise HTTPException(
@@ -58,8 +65,8 @@ async def get_current_user(
     return user
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Ensure current user is active"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -68,23 +75,17 @@ async def get_current_active_user(
 def require_permission(module: str, action: str):
     """Permission checker decorator (REQ-SYS-RBAC-003)"""
     async def permission_checker(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: Principal = Depends(get_current_active_user)
+    ) -> Principal:
         # Build the permission string
         required_permission = f"{module}.{action}"
         
         # Check if user has a superuser attribute (optional)
-        if hasattr(current_user, 'is_superuser') and current_user.is_superuser:
+        if current_user.is_superuser:
             return current_user
         
-        # Collect all permissions from user's roles
-        user_permissions = []
-        for role in current_user.roles:
-            if role.permissions:
-                user_permissions.extend(role.permissions)
-        
-        # Check if user has the required permission
-        if required_permission not in user_permissions:
+        # Check against the permissions precomputed from the user's roles
+        if required_permission not in current_user.permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission denied. Required: {required_permission}"
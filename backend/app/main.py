@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api import auth, users, companies, roles, accounting_periods, gl, customers, ar, suppliers, ap, inventory, oe
+from app.core.database import engine, numbering_engine, AsyncSessionLocal, Base
+from app.core.pool_metrics import pool_metrics
+from app.core.result_cache import result_cache
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER
+from app.api import auth, users, companies, roles, accounting_periods, gl, customers, ar, suppliers, ap, inventory, oe, report_jobs
+from app.services.report_job_service import ReportJobService, report_job_runner
+from app.services.period_close_service import period_close_runner
 
 # Create tables on startup
 @asynccontextmanager
@@ -13,8 +20,13 @@ async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await ReportJobService.fail_stale(db)
     yield
     # Shutdown
+    await report_job_runner.shutdown()
+    await period_close_runner.shutdown()
+    await numbering_engine.dispose()
     await engine.dispose()
 
 # Create FastAPI app
@@ -32,8 +44,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER],
 )
 
+# Postings that race a period close are stopped by the gl_transactions
+# closed period trigger (check_violation) rather than the API's own checks
+CLOSED_PERIOD_SQLSTATE = "23514"
+
+@app.exception_handler(IntegrityError)
+async def closed_period_violation_handler(request: Request, exc: IntegrityError):
+    if (getattr(exc.orig, "sqlstate", None) != CLOSED_PERIOD_SQLSTATE
+            or "closed accounting period" not in str(exc.orig)):
+        raise exc
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Cannot post to a closed period"}
+    )
+
 # Include routers
 app.include_router(
     auth.router, 
@@ -95,6 +122,11 @@ app.include_router(
     prefix=f"{settings.API_PREFIX}/oe", 
     tags=["Order Entry"]
 )
+app.include_router(
+    report_jobs.router, 
+    prefix=f"{settings.API_PREFIX}/report-jobs", 
+    tags=["Report Jobs"]
+)
 
 # Root endpoint
 @app.get("/")
@@ -112,3 +144,13 @@ async def health_check():
         "status": "healthy",
         "version": settings.VERSION
     }
+
+# Connection pool metrics (checkout wait time and utilisation per engine)
+@app.get("/health/db-pool")
+async def db_pool_metrics():
+    return pool_metrics.snapshot()
+
+# Report result cache hit/miss counts per report and local cache size
+@app.get("/health/result-cache")
+async def result_cache_metrics():
+    return result_cache.snapshot()
@@ -2,8 +2,8 @@ from app.models.base import BaseModel
 from app.models.user import User
 from app.models.company import Company
 from app.models.role import Role
-from app.models.accounting_period import AccountingPeriod
-from app.models.gl import GLAccount, GLTransaction, TransactionType
+from app.models.accounting_period import AccountingPeriod, PeriodCloseJob
+from app.models.gl import GLAccount, GLAccountClosure, GLTransaction, TransactionType, GLPeriodBalance, GLClosingBalance
 from app.models.customer import Customer
 from app.models.ar_transaction_type import ARTransactionType
 from app.models.ar_transaction import ARTransaction
@@ -17,6 +17,11 @@ from app.models.oe_document_type import OEDocumentType
 from app.models.sales_order import SalesOrder, SalesOrderLine
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderLine
 from app.models.grv import GoodsReceivedVoucher, GRVLine
+from app.models.document_sequence import DocumentSequence
+from app.models.report_job import ReportJob
+from app.models.balance_summary import CustomerBalanceSummary, SupplierBalanceSummary
+from app.models.stock_valuation import StockValuationSnapshot
+from app.models.ledger_version import LedgerVersion
 
 __all__ = [
     "BaseModel",
@@ -24,9 +29,13 @@ __all__ = [
     "Company",
     "Role",
     "AccountingPeriod",
+    "PeriodCloseJob",
     "GLAccount",
+    "GLAccountClosure",
     "GLTransaction",
     "TransactionType",
+    "GLPeriodBalance",
+    "GLClosingBalance",
     "Customer",
     "ARTransactionType",
     "ARTransaction",
@@ -46,5 +55,11 @@ __all__ = [
     "PurchaseOrder",
     "PurchaseOrderLine",
     "GoodsReceivedVoucher",
-    "GRVLine"
+    "GRVLine",
+    "DocumentSequence",
+    "ReportJob",
+    "CustomerBalanceSummary",
+    "SupplierBalanceSummary",
+    "StockValuationSnapshot",
+    "LedgerVersion"
 ]
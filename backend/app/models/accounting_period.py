@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Date, Boolean, UniqueConstraint
+from sqlalchemy import Column, String, Integer, ForeignKey, Date, Boolean, UniqueConstraint, Text, JSON, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
@@ -18,3 +18,33 @@ class AccountingPeriod(BaseModel):
     
     # Relationships
     company = relationship("Company", back_populates="accounting_periods")
+
+
+class PeriodCloseJob(BaseModel):
+    """Close or reopen of a period, run step by step in the background.
+
+    Each step commits together with its entry in completed_steps, so a failed
+    or interrupted job resumes after the last step that finished.
+    """
+    __tablename__ = "period_close_jobs"
+    __table_args__ = (
+        # One close or reopen in progress per company
+        Index(
+            'ix_period_close_jobs_active_company', 'company_id', unique=True,
+            postgresql_where=text("status IN ('queued', 'running')")
+        ),
+        Index('ix_period_close_jobs_period', 'period_id'),
+    )
+
+    company_id = Column(Integer, ForeignKey('companies.id', ondelete='CASCADE'), nullable=False)
+    period_id = Column(Integer, ForeignKey('accounting_periods.id', ondelete='CASCADE'), nullable=False)
+    requested_by_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    action = Column(String(10), nullable=False)  # close, reopen
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    completed_steps = Column(JSON, nullable=False, default=list)
+    current_step = Column(String(30), nullable=True)
+    progress = Column(Integer, nullable=False, default=0)  # percent
+    result = Column(JSON, nullable=False, default=dict)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Boolean, Date, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Boolean, Date, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import BaseModel
@@ -45,4 +45,17 @@ class APTransaction(BaseModel):
     posted_by_user = relationship("User", foreign_keys=[posted_by])
     period = relationship("AccountingPeriod")
     allocations_from = relationship("APAllocation", foreign_keys="APAllocation.from_transaction_id", back_populates="from_transaction")
-    allocations_to = relationship("APAllocation", foreign_keys="APAllocation.to_transaction_id", back_populates="to_transaction") 
\ No newline at end of file
+    allocations_to = relationship("APAllocation", foreign_keys="APAllocation.to_transaction_id", back_populates="to_transaction")
+
+    __table_args__ = (
+        # Partial covering index over open posted items, used by the ageing query
+        Index(
+            'ix_ap_transactions_open_items', 'company_id', 'supplier_id',
+            postgresql_where=text('is_posted AND allocated_amount < amount'),
+            postgresql_include=['transaction_type_id', 'transaction_date', 'due_date', 'amount', 'allocated_amount']
+        ),
+        # Supplier statements and listings
+        Index('ix_ap_transactions_company_supplier_posted_date', 'company_id', 'supplier_id', 'is_posted', 'transaction_date'),
+        # Company-wide listings by date (keyset pagination on transaction_date, id)
+        Index('ix_ap_transactions_company_date', 'company_id', 'transaction_date', 'id'),
+    )
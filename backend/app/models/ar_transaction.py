@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Boolean, Date, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Boolean, Date, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import BaseModel
@@ -45,4 +45,17 @@ class ARTransaction(BaseModel):
     posted_by_user = relationship("User", foreign_keys=[posted_by])
     period = relationship("AccountingPeriod")
     allocations_from = relationship("ARAllocation", foreign_keys="ARAllocation.from_transaction_id", back_populates="from_transaction")
-    allocations_to = relationship("ARAllocation", foreign_keys="ARAllocation.to_transaction_id", back_populates="to_transaction") 
\ No newline at end of file
+    allocations_to = relationship("ARAllocation", foreign_keys="ARAllocation.to_transaction_id", back_populates="to_transaction")
+
+    __table_args__ = (
+        # Partial covering index over open posted items, used by the ageing query
+        Index(
+            'ix_ar_transactions_open_items', 'company_id', 'customer_id',
+            postgresql_where=text('is_posted AND allocated_amount < amount'),
+            postgresql_include=['transaction_type_id', 'transaction_date', 'due_date', 'amount', 'allocated_amount']
+        ),
+        # Customer statements and listings
+        Index('ix_ar_transactions_company_customer_posted_date', 'company_id', 'customer_id', 'is_posted', 'transaction_date'),
+        # Company-wide listings by date (keyset pagination on transaction_date, id)
+        Index('ix_ar_transactions_company_date', 'company_id', 'transaction_date', 'id'),
+    )
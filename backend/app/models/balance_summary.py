@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, Numeric, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+
+class CustomerBalanceSummary(BaseModel):
+    """Posted AR totals per customer.
+
+    Maintained in the posting and allocation transactions by
+    BalanceSummaryService and checked against the ledger by
+    `python -m app.reconcile_balances`.
+    """
+    __tablename__ = "customer_balance_summaries"
+    __table_args__ = (
+        UniqueConstraint('customer_id', name='_customer_balance_summary_uc'),
+    )
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="CASCADE"), nullable=False)
+    total_debits = Column(Numeric(15, 2), default=0, nullable=False)
+    total_credits = Column(Numeric(15, 2), default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    open_item_count = Column(Integer, default=0, nullable=False)
+    oldest_open_date = Column(Date, nullable=True)
+    last_activity_date = Column(Date, nullable=True)
+
+    customer = relationship("Customer")
+
+
+class SupplierBalanceSummary(BaseModel):
+    """Posted AP totals per supplier (see CustomerBalanceSummary)"""
+    __tablename__ = "supplier_balance_summaries"
+    __table_args__ = (
+        UniqueConstraint('supplier_id', name='_supplier_balance_summary_uc'),
+    )
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), nullable=False)
+    total_debits = Column(Numeric(15, 2), default=0, nullable=False)
+    total_credits = Column(Numeric(15, 2), default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    open_item_count = Column(Integer, default=0, nullable=False)
+    oldest_open_date = Column(Date, nullable=True)
+    last_activity_date = Column(Date, nullable=True)
+
+    supplier = relationship("Supplier")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, BigInteger, UniqueConstraint
+from app.models.base import BaseModel
+
+
+class DocumentSequence(BaseModel):
+    """Per-company, per-prefix document number counter"""
+    __tablename__ = "document_sequences"
+    __table_args__ = (
+        UniqueConstraint('company_id', 'prefix', name='_document_sequence_uc'),
+    )
+
+    # 0 is the shared scope for document numbers that are unique across companies (OE)
+    company_id = Column(Integer, nullable=False, default=0)
+    prefix = Column(String(30), nullable=False)
+    last_value = Column(BigInteger, nullable=False, default=0)
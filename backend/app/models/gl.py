@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, Date, Text, Boolean, func, CheckConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, Date, Text, Boolean, func, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import BaseModel
@@ -37,7 +37,29 @@ class GLAccount(BaseModel):
         CheckConstraint(account_type.in_(['ASSET', 'LIABILITY', 'EQUITY', 'INCOME', 'EXPENSE']), name='ck_gl_account_type'),
     )
 
+class GLAccountClosure(Base):
+    """Ancestor/descendant pairs of the chart-of-accounts tree (closure table).
+
+    One row for every account and each of its ancestors, depth 1 being the
+    direct parent; accounts are not paired with themselves. Maintained by
+    GLService.set_account_parent whenever parent_account_id changes, so
+    cycle checks and roll-ups need no walk up or down the tree.
+    """
+    __tablename__ = "gl_account_closure"
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    ancestor_id = Column(Integer, ForeignKey("gl_accounts.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("gl_accounts.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Ancestors of an account (moves, levels)
+        Index('ix_gl_account_closure_descendant', 'descendant_id', postgresql_include=['ancestor_id', 'depth']),
+    )
+
 class GLTransaction(BaseModel):
+    # Range-partitioned on transaction_date (see app.core.partitioning); the
+    # database primary key is (id, transaction_date), ids remain unique.
     __tablename__ = "gl_transactions"
 
     company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
@@ -65,4 +87,63 @@ class GLTransaction(BaseModel):
             (debit_amount > 0.00) & (credit_amount == 0.00),
             name='ck_gl_transaction_amounts'
         ),
-    ) 
\ No newline at end of file
+        # GL detail per account; covering so balances can be summed from the index
+        Index(
+            'ix_gl_transactions_company_account_date', 'company_id', 'account_id', 'transaction_date',
+            postgresql_include=['debit_amount', 'credit_amount']
+        ),
+        # Trial balance postings after the last sealed period
+        Index(
+            'ix_gl_transactions_company_date', 'company_id', 'transaction_date',
+            postgresql_include=['account_id', 'debit_amount', 'credit_amount']
+        ),
+        # Journal entry lookups and duplicate checks
+        Index('ix_gl_transactions_company_journal', 'company_id', 'journal_entry_id'),
+    )
+
+class GLPeriodBalance(BaseModel):
+    """Per-account, per-period debit/credit totals.
+
+    Kept up to date on every GL posting and sealed when the period closes, so
+    balance reports read closed-period totals instead of the full ledger.
+    """
+    __tablename__ = "gl_period_balances"
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(Integer, ForeignKey("gl_accounts.id"), nullable=False)
+    period_id = Column(Integer, ForeignKey("accounting_periods.id", ondelete="CASCADE"), nullable=False)
+    debit_total = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    credit_total = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    is_closed = Column(Boolean, default=False, nullable=False)
+
+    company = relationship("Company")
+    account = relationship("GLAccount")
+    accounting_period = relationship("AccountingPeriod")
+
+    __table_args__ = (
+        UniqueConstraint('account_id', 'period_id', name='_gl_period_balance_uc'),
+        # Trial balance reads sealed totals by period
+        Index(
+            'ix_gl_period_balances_period', 'period_id',
+            postgresql_include=['account_id', 'debit_total', 'credit_total']
+        ),
+    )
+
+class GLClosingBalance(BaseModel):
+    """Cumulative debit/credit totals of each account at the end of a closed period.
+
+    Written by the period close pipeline once every earlier period is closed,
+    so balance reports start from the latest one and add only the periods and
+    postings after it.
+    """
+    __tablename__ = "gl_closing_balances"
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(Integer, ForeignKey("gl_accounts.id"), nullable=False)
+    period_id = Column(Integer, ForeignKey("accounting_periods.id", ondelete="CASCADE"), nullable=False)
+    debit_total = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    credit_total = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('period_id', 'account_id', name='_gl_closing_balance_uc'),
+    )
@@ -38,6 +38,8 @@ class InventoryItem(Base):
     # Unique constraint for item_code per company
     __table_args__ = (
         UniqueConstraint('company_id', 'item_code', name='_company_item_code_uc'),
+        # Stock quantity report: company, type and code range in code order
+        Index('ix_inventory_items_company_type_code', 'company_id', 'item_type', 'item_code'),
     )
 
 
@@ -67,6 +69,8 @@ class InventoryTransactionType(Base):
 
 
 class InventoryTransaction(Base):
+    # Range-partitioned on transaction_date (see app.core.partitioning); the
+    # database primary key is (id, transaction_date), ids remain unique.
     __tablename__ = "inventory_transactions"
     
     id = Column(Integer, primary_key=True, index=True)
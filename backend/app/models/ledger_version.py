@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, UniqueConstraint
+from app.models.base import BaseModel
+
+
+class LedgerVersion(BaseModel):
+    """Change counter for a company's ledgers, keying cached report results.
+
+    Bumped at commit by app.core.ledger_version; a company's version is the
+    sum over its slots so concurrent commits rarely touch the same row.
+    """
+    __tablename__ = "ledger_versions"
+    __table_args__ = (
+        UniqueConstraint('company_id', 'slot', name='_ledger_version_uc'),
+    )
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    slot = Column(Integer, nullable=False)
+    version = Column(BigInteger, default=0, nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Text, JSON, DateTime, ForeignKey, Index
+from app.models.base import BaseModel
+
+
+class ReportJob(BaseModel):
+    """Report generated in the background and written to a result file"""
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        # Result cache lookups and per-company queue limits
+        Index('ix_report_jobs_company_hash', 'company_id', 'params_hash', 'status'),
+        Index('ix_report_jobs_company_status', 'company_id', 'status'),
+    )
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    requested_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    report_type = Column(String(50), nullable=False)
+    format = Column(String(10), nullable=False)
+    parameters = Column(JSON, nullable=False, default=dict)
+    params_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed, cancelled, expired
+    progress = Column(Integer, nullable=False, default=0)  # percent
+    rows_written = Column(Integer, nullable=False, default=0)
+    total_rows = Column(Integer, nullable=True)
+    file_path = Column(String(500), nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Numeric, Date, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+
+class StockValuationSnapshot(BaseModel):
+    """Closing quantity and value of an item at the end of a day.
+
+    One row per item for every date it had a movement, written by
+    StockValuationService from the costing engine. The stock quantity report
+    reads the latest row on or before an as-at date instead of replaying the
+    item's InventoryTransaction history.
+    """
+    __tablename__ = "stock_valuation_snapshots"
+    __table_args__ = (
+        UniqueConstraint('item_id', 'snapshot_date', name='_stock_valuation_snapshot_uc'),
+        Index('ix_stock_valuation_company_date', 'company_id', 'snapshot_date'),
+    )
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(Integer, ForeignKey("inventory_items.id", ondelete="CASCADE"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    quantity_on_hand = Column(Numeric(15, 4), default=0, nullable=False)
+    cost_price = Column(Numeric(15, 2), default=0, nullable=False)
+    total_value = Column(Numeric(15, 2), default=0, nullable=False)
+
+    item = relationship("InventoryItem")
@@ -0,0 +1,38 @@
+"""
+Convert ledger tables to (or back from) range partitioning on transaction_date.
+
+GL and inventory transactions are partitioned by the alembic migration; use
+this for the AR/AP ledgers. Partitioning a table drops foreign keys that
+reference it by id alone (the allocation tables), which is reported below.
+
+Usage: python -m app.partition_ledgers [--revert] ar_transactions ap_transactions
+"""
+
+import asyncio
+import sys
+
+from app.core.database import engine
+from app.core.partitioning import IS_PARTITIONED, LEDGER_TABLES, convert_table
+
+async def partition_ledgers(tables, partitioned: bool):
+    async with engine.begin() as conn:
+        for table in tables:
+            is_partitioned = (await conn.execute(IS_PARTITIONED, {"t": table})).scalar()
+            if is_partitioned == partitioned:
+                print(f"{table}: already {'partitioned' if partitioned else 'a plain table'}, skipped")
+                continue
+            dropped = await conn.run_sync(convert_table, table, partitioned)
+            print(f"{table}: {'partitioned' if partitioned else 'converted back to a plain table'}")
+            for constraint in dropped:
+                print(f"  dropped foreign key {constraint}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    revert = "--revert" in args
+    tables = [arg for arg in args if arg != "--revert"]
+    unknown = [table for table in tables if table not in LEDGER_TABLES]
+    if not tables or unknown:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(partition_ledgers(tables, partitioned=not revert))
@@ -0,0 +1,49 @@
+"""
+Check customer/supplier balance summaries and current_balance against the
+posted AR/AP ledgers, optionally rebuilding them from the ledgers.
+
+Usage: python -m app.reconcile_balances [--company ID] [--rebuild]
+
+Exits with status 1 when mismatches remain.
+"""
+
+import asyncio
+import sys
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.balance_summary_service import BalanceSummaryService
+
+LEDGERS = [("AR", BalanceSummaryService.AR), ("AP", BalanceSummaryService.AP)]
+
+async def reconcile_balances(company_id, rebuild: bool) -> int:
+    remaining = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            for name, ledger in LEDGERS:
+                mismatches = await BalanceSummaryService.reconcile(db, ledger, company_id)
+                print(f"{name}: {len(mismatches)} mismatches")
+                for m in mismatches:
+                    print(f"  {m['party_code']} (id {m['party_id']}) {m['field']}: "
+                          f"summary {m['summary']}, ledger {m['ledger']}")
+                
+                if rebuild and mismatches:
+                    rows = await BalanceSummaryService.rebuild(db, ledger, company_id)
+                    await db.commit()
+                    mismatches = await BalanceSummaryService.reconcile(db, ledger, company_id)
+                    print(f"{name}: rebuilt {rows} summaries, {len(mismatches)} mismatches remain")
+                remaining += len(mismatches)
+    finally:
+        await engine.dispose()
+    return remaining
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    company_id = None
+    if "--company" in args:
+        try:
+            company_id = int(args[args.index("--company") + 1])
+        except (IndexError, ValueError):
+            print(__doc__)
+            sys.exit(2)
+    remaining = asyncio.run(reconcile_balances(company_id, rebuild="--rebuild" in args))
+    sys.exit(1 if remaining else 0)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 
 class AccountingPeriodBase(BaseModel):
@@ -38,11 +38,31 @@ class AccountingPeriodResponse(AccountingPeriodBase):
 
 class AccountingPeriodList(BaseModel):
     """Accounting period list response schema"""
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = False
     items: List[AccountingPeriodResponse]
+    next_cursor: Optional[str] = None
 
 class PeriodValidation(BaseModel):
     """Period validation result schema"""
     is_valid: bool
     message: Optional[str] = None
-    overlapping_periods: List[AccountingPeriodResponse] = [] 
\ No newline at end of file
+    overlapping_periods: List[AccountingPeriodResponse] = [] 
+
+class PeriodCloseJobResponse(BaseModel):
+    """Period close or reopen job, polled until it completes"""
+    id: int
+    period_id: int
+    action: str
+    status: str
+    completed_steps: List[str]
+    current_step: Optional[str] = None
+    progress: int
+    result: Dict[str, Any] = {}
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -45,6 +45,31 @@ class APTransactionPost(BaseModel):
     pass
 
 
+class APTransactionBatchPost(BaseModel):
+    """Post listed transaction IDs, or every unposted transaction matching the filter"""
+    transaction_ids: Optional[List[int]] = None
+    supplier_id: Optional[int] = None
+    transaction_type_id: Optional[int] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    chunk_size: Optional[int] = None  # transactions per commit; defaults to BATCH_POST_CHUNK_SIZE
+
+
+class APTransactionPostResult(BaseModel):
+    transaction_id: int
+    transaction_number: Optional[str] = None
+    success: bool
+    journal_entry_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class APTransactionBatchPostResponse(BaseModel):
+    total: int
+    posted: int
+    failed: int
+    results: List[APTransactionPostResult]
+
+
 class APTransactionResponse(APTransactionBase):
     id: int
     company_id: int
@@ -92,6 +117,36 @@ class APAllocationResponse(APAllocationBase):
         from_attributes = True
 
 
+class APAutoAllocationRequest(BaseModel):
+    """Allocate open payments/credits to invoices for one supplier, or all suppliers if omitted"""
+    supplier_id: Optional[int] = None
+    rules: Optional[List[str]] = None  # subset of reference, exact, fifo, applied in order
+    dry_run: bool = False  # preview the allocations without saving them
+
+
+class APAutoAllocationItem(BaseModel):
+    supplier_id: int
+    from_transaction_id: int
+    from_transaction_number: str
+    to_transaction_id: int
+    to_transaction_number: str
+    allocated_amount: Decimal
+    rule: str
+
+
+class APAutoAllocationResponse(BaseModel):
+    dry_run: bool
+    supplier_count: int
+    allocation_count: int
+    total_allocated: Decimal
+    allocations: List[APAutoAllocationItem]
+
+
+class AgeingBucket(BaseModel):
+    label: str
+    amount: Decimal = Decimal("0.00")
+
+
 class SupplierAgeingItem(BaseModel):
     supplier_id: int
     supplier_code: str
@@ -102,6 +157,7 @@ class SupplierAgeingItem(BaseModel):
     days_90: Decimal = Decimal("0.00")
     over_90: Decimal = Decimal("0.00")
     total: Decimal = Decimal("0.00")
+    buckets: List[AgeingBucket] = []  # configurable bucket boundaries
 
 
 class SupplierStatementItem(BaseModel):
@@ -45,6 +45,31 @@ class ARTransactionPost(BaseModel):
     pass
 
 
+class ARTransactionBatchPost(BaseModel):
+    """Post listed transaction IDs, or every unposted transaction matching the filter"""
+    transaction_ids: Optional[List[int]] = None
+    customer_id: Optional[int] = None
+    transaction_type_id: Optional[int] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    chunk_size: Optional[int] = None  # transactions per commit; defaults to BATCH_POST_CHUNK_SIZE
+
+
+class ARTransactionPostResult(BaseModel):
+    transaction_id: int
+    transaction_number: Optional[str] = None
+    success: bool
+    journal_entry_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ARTransactionBatchPostResponse(BaseModel):
+    total: int
+    posted: int
+    failed: int
+    results: List[ARTransactionPostResult]
+
+
 class ARTransactionResponse(ARTransactionBase):
     id: int
     company_id: int
@@ -92,6 +117,36 @@ class ARAllocationResponse(ARAllocationBase):
         from_attributes = True
 
 
+class ARAutoAllocationRequest(BaseModel):
+    """Allocate open payments/credits to invoices for one customer, or all customers if omitted"""
+    customer_id: Optional[int] = None
+    rules: Optional[List[str]] = None  # subset of reference, exact, fifo, applied in order
+    dry_run: bool = False  # preview the allocations without saving them
+
+
+class ARAutoAllocationItem(BaseModel):
+    customer_id: int
+    from_transaction_id: int
+    from_transaction_number: str
+    to_transaction_id: int
+    to_transaction_number: str
+    allocated_amount: Decimal
+    rule: str
+
+
+class ARAutoAllocationResponse(BaseModel):
+    dry_run: bool
+    customer_count: int
+    allocation_count: int
+    total_allocated: Decimal
+    allocations: List[ARAutoAllocationItem]
+
+
+class AgeingBucket(BaseModel):
+    label: str
+    amount: Decimal = Decimal("0.00")
+
+
 class CustomerAgeingItem(BaseModel):
     customer_id: int
     customer_code: str
@@ -102,6 +157,7 @@ class CustomerAgeingItem(BaseModel):
     days_90: Decimal = Decimal("0.00")
     over_90: Decimal = Decimal("0.00")
     total: Decimal = Decimal("0.00")
+    buckets: List[AgeingBucket] = []  # configurable bucket boundaries
 
 
 class CustomerStatementItem(BaseModel):
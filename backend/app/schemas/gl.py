@@ -73,4 +73,50 @@ class JournalEntryCreate(BaseModel):
     journal_entry_id: Annotated[str, Field(max_length=50)] # User defined or system generated prefix + seq
     reference: Optional[Annotated[str, Field(max_length=100)]] = None
     description: Optional[Annotated[str, Field(max_length=1000)]] = None # Overall description for the JE
-    lines: List[JournalEntryLineCreate] 
\ No newline at end of file
+    lines: List[JournalEntryLineCreate] 
+
+# Batch journal entry import
+class JournalEntryBatchCreate(BaseModel):
+    entries: List[JournalEntryCreate]
+
+class JournalEntryBatchResult(BaseModel):
+    journal_entry_id: str
+    success: bool
+    lines_posted: int = 0
+    error: Optional[str] = None
+
+class JournalEntryBatchResponse(BaseModel):
+    total: int
+    posted: int
+    failed: int
+    results: List[JournalEntryBatchResult]
+
+# GL detail with opening and running balances
+class GLDetailLine(BaseModel):
+    id: int
+    transaction_date: date
+    journal_entry_id: str
+    reference: Optional[str] = None
+    description: Optional[str] = None
+    debit_amount: Decimal
+    credit_amount: Decimal
+    source_module: Optional[str] = None
+    source_document_id: Optional[int] = None
+    is_reversed: bool = False
+    running_balance: Decimal  # debit - credit, including the opening balance
+
+class GLDetailAccount(BaseModel):
+    account_id: int
+    account_code: str
+    account_name: str
+    account_type: str
+    opening_balance: Decimal  # at the end of the day before start_date
+    total_debit: Decimal
+    total_credit: Decimal
+    closing_balance: Decimal
+    lines: List[GLDetailLine]
+
+class GLDetailReport(BaseModel):
+    start_date: date
+    end_date: date
+    accounts: List[GLDetailAccount]
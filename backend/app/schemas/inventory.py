@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 from app.models.inventory import ItemType, CostingMethod
 
 
@@ -125,6 +125,7 @@ class InventoryAdjustmentRequest(BaseModel):
     transaction_type_id: int
     transaction_date: datetime
     quantity: Decimal = Field(...)
+    unit_cost: Optional[Decimal] = Field(None, ge=0)  # receipt cost for increases; defaults to the current average
     reference: Optional[str] = Field(None, max_length=100)
     description: Optional[str] = Field(None, max_length=255)
     
@@ -145,6 +146,55 @@ class InventoryAdjustmentRequest(BaseModel):
         return v.strip() if v else v
 
 
+class StockCountLine(BaseModel):
+    item_id: Optional[int] = None
+    item_code: Optional[str] = None  # used when item_id is not given
+    counted_quantity: Decimal = Field(..., ge=0)
+    
+    @validator('item_code', always=True)
+    def validate_item_code(cls, v, values):
+        if v is None and values.get('item_id') is None:
+            raise ValueError('item_id or item_code is required')
+        return v.strip().upper() if v else v
+
+
+class StockTakeRequest(BaseModel):
+    """Counted quantities; variances against quantity on hand are posted as adjustments"""
+    transaction_date: datetime
+    increase_type_id: int  # transaction type for count surpluses
+    decrease_type_id: int  # transaction type for count shortages
+    reference: Optional[str] = Field(None, max_length=100)
+    description: Optional[str] = Field(None, max_length=255)
+    dry_run: bool = False  # return the variances without posting them
+    lines: List[StockCountLine]
+    
+    @validator('lines')
+    def validate_lines(cls, v):
+        if not v:
+            raise ValueError('At least one count line is required')
+        return v
+
+
+class StockTakeVariance(BaseModel):
+    item_id: int
+    item_code: str
+    quantity_on_hand: Decimal
+    counted_quantity: Decimal
+    variance: Decimal
+    unit_cost: Decimal
+    variance_value: Decimal
+
+
+class StockTakeResponse(BaseModel):
+    dry_run: bool
+    journal_entry_id: Optional[str] = None
+    items_counted: int
+    items_adjusted: int
+    increase_value: Decimal
+    decrease_value: Decimal
+    variances: List[StockTakeVariance]  # items whose count differs from quantity on hand
+
+
 class InventoryTransactionResponse(BaseModel):
     id: int
     company_id: int
@@ -181,6 +231,7 @@ class StockQuantityReportRequest(BaseModel):
     show_zero_qty: bool = False
     item_code_from: Optional[str] = None
     item_code_to: Optional[str] = None
+    as_at_date: Optional[date] = None  # closing stock at the end of this date; current stock if omitted
 
 
 class InventoryItemReportRow(BaseModel):
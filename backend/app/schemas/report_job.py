@@ -0,0 +1,67 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime
+
+
+class ReportJobCreate(BaseModel):
+    """Submit a report to run in the background"""
+    report_type: str
+    format: str = "csv"  # csv, ndjson (json) or xlsx (excel)
+    parameters: Dict[str, Any] = {}
+    refresh: bool = False  # ignore a cached result for the same parameters
+
+
+class ReportJobResponse(BaseModel):
+    """Report job status, polled until the result can be downloaded"""
+    id: int
+    report_type: str
+    format: str
+    parameters: Dict[str, Any]
+    status: str
+    progress: int
+    rows_written: int
+    total_rows: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ReportJobList(BaseModel):
+    items: List[ReportJobResponse]
+    next_cursor: Optional[str] = None
+
+
+# Parameters for each report type (stock quantity uses StockQuantityReportRequest)
+
+class TrialBalanceReportParams(BaseModel):
+    report_date: date
+
+
+class CustomerAgeingReportParams(BaseModel):
+    as_at_date: date
+    customer_id: Optional[int] = None
+    bucket_days: Optional[str] = None  # e.g. "30,60,90,120"
+
+
+class SupplierAgeingReportParams(BaseModel):
+    as_at_date: date
+    supplier_id: Optional[int] = None
+    bucket_days: Optional[str] = None
+
+
+class CustomerStatementReportParams(BaseModel):
+    customer_id: int
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+
+
+class APTransactionListingReportParams(BaseModel):
+    supplier_id: Optional[int] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    transaction_type_id: Optional[int] = None
+    is_posted: Optional[bool] = None
@@ -38,8 +38,10 @@ class RoleResponse(RoleBase):
 
 class RoleList(BaseModel):
     """Role list response schema"""
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = False
     items: List[RoleResponse]
+    next_cursor: Optional[str] = None
 
 class PermissionGroup(BaseModel):
     """Permission group schema for organizing permissions"""
@@ -52,5 +52,7 @@ class UserResponse(UserBase):
 
 class UserList(BaseModel):
     """User list response schema"""
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = False
     items: List[UserResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,143 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func, case, literal, Date
+from typing import List, Optional, Sequence
+from datetime import date
+from decimal import Decimal
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+class AgeingService:
+    """SQL-side ageing shared by AR and AP.
+
+    Open items are bucketed by days past due (due date, else transaction date)
+    with CASE expressions and summed per party in one grouped query, so the
+    database returns one row per customer/supplier instead of every open item.
+    """
+
+    # Boundaries behind the fixed current/days_30/days_60/days_90/over_90 fields
+    STANDARD_BUCKET_DAYS = (30, 60, 90)
+
+    @staticmethod
+    def parse_bucket_days(value: Optional[str]) -> List[int]:
+        """Parse a "30,60,90" style parameter, falling back to settings"""
+        if not value:
+            return list(settings.AGEING_BUCKET_DAYS)
+        try:
+            days = [int(part) for part in value.split(",") if part.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Bucket days must be comma-separated integers")
+        if not days or any(d <= 0 for d in days) or days != sorted(set(days)):
+            raise HTTPException(status_code=400, detail="Bucket days must be positive and strictly increasing")
+        return days
+
+    @staticmethod
+    def bucket_labels(bucket_days: Sequence[int]) -> List[str]:
+        """Labels for Current, each bounded bucket and the open-ended last one"""
+        labels = ["Current"]
+        lower = 1
+        for upper in bucket_days:
+            labels.append(f"{lower}-{upper}")
+            lower = upper + 1
+        labels.append(f"Over {bucket_days[-1]}")
+        return labels
+
+    @staticmethod
+    def _bucket_sums(days_overdue, outstanding, bucket_days: Sequence[int], prefix: str) -> list:
+        """SUM(CASE ...) columns for Current, each bounded bucket and the remainder"""
+        columns = [func.sum(case((days_overdue <= 0, outstanding), else_=0)).label(f"{prefix}0")]
+        lower = 0
+        for i, upper in enumerate(bucket_days, start=1):
+            columns.append(func.sum(case(
+                (and_(days_overdue > lower, days_overdue <= upper), outstanding), else_=0
+            )).label(f"{prefix}{i}"))
+            lower = upper
+        columns.append(func.sum(case(
+            (days_overdue > lower, outstanding), else_=0
+        )).label(f"{prefix}{len(bucket_days) + 1}"))
+        return columns
+
+    @staticmethod
+    async def calculate(
+        db: AsyncSession,
+        transaction_model,
+        type_model,
+        party_model,
+        party_column: str,
+        party_code_column: str,
+        negative_side: str,
+        company_id: int,
+        as_at_date: date,
+        party_id: Optional[int] = None,
+        bucket_days: Optional[Sequence[int]] = None
+    ) -> list:
+        """Return one row per party with standard and configurable bucket totals.
+
+        `negative_side` is the affects_balance value whose open amounts reduce
+        the balance ('credit' for AR, 'debit' for AP).
+        """
+        bucket_days = list(bucket_days or settings.AGEING_BUCKET_DAYS)
+        t = transaction_model
+        party_fk = getattr(t, party_column)
+
+        outstanding = t.amount - t.allocated_amount
+        open_items = select(
+            party_fk.label("party_id"),
+            (literal(as_at_date, Date) - func.coalesce(t.due_date, t.transaction_date)).label("days_overdue"),
+            case(
+                (type_model.affects_balance == negative_side, -outstanding),
+                else_=outstanding
+            ).label("outstanding")
+        ).join(
+            type_model, type_model.id == t.transaction_type_id
+        ).where(
+            and_(
+                t.company_id == company_id,
+                t.is_posted == True,
+                t.transaction_date <= as_at_date,
+                t.allocated_amount < t.amount
+            )
+        )
+        if party_id:
+            open_items = open_items.where(party_fk == party_id)
+        open_items = open_items.subquery()
+
+        query = select(
+            party_model.id.label("party_id"),
+            getattr(party_model, party_code_column).label("party_code"),
+            party_model.name.label("party_name"),
+            func.sum(open_items.c.outstanding).label("total"),
+            *AgeingService._bucket_sums(
+                open_items.c.days_overdue, open_items.c.outstanding, AgeingService.STANDARD_BUCKET_DAYS, "std_"
+            ),
+            *AgeingService._bucket_sums(
+                open_items.c.days_overdue, open_items.c.outstanding, bucket_days, "bucket_"
+            )
+        ).join(
+            party_model, party_model.id == open_items.c.party_id
+        ).group_by(
+            party_model.id, getattr(party_model, party_code_column), party_model.name
+        ).order_by(getattr(party_model, party_code_column))
+
+        result = await db.execute(query)
+        labels = AgeingService.bucket_labels(bucket_days)
+
+        rows = []
+        for row in result.mappings():
+            rows.append({
+                "party_id": row["party_id"],
+                "party_code": row["party_code"],
+                "party_name": row["party_name"],
+                "current": row["std_0"] or Decimal("0"),
+                "days_30": row["std_1"] or Decimal("0"),
+                "days_60": row["std_2"] or Decimal("0"),
+                "days_90": row["std_3"] or Decimal("0"),
+                "over_90": row["std_4"] or Decimal("0"),
+                "total": row["total"] or Decimal("0"),
+                "buckets": [
+                    {"label": label, "amount": row[f"bucket_{i}"] or Decimal("0")}
+                    for i, label in enumerate(labels)
+                ]
+            })
+        return rows
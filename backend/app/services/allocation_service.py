@@ -0,0 +1,241 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update, insert, bindparam, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ARAllocation, APAllocation
+from app.services.balance_summary_service import BalanceLedger, BalanceSummaryService
+
+
+@dataclass(frozen=True)
+class AllocationLedger:
+    """The sub-ledger (AR or AP) and its allocation table"""
+    balance: BalanceLedger
+    allocation_model: Any
+
+
+@dataclass
+class _OpenItem:
+    id: int
+    party_id: int
+    transaction_number: str
+    reference: Optional[str]
+    transaction_date: date
+    due_date: Optional[date]
+    outstanding: Decimal
+
+
+class AutoAllocationService:
+    """Match unallocated payments and credits against open invoices.
+
+    All open items in scope are read with one query (locked unless previewing)
+    and matched in memory per party, using these rules in the order given:
+
+    - reference: a payment whose reference is an invoice's number or reference
+    - exact: a payment whose unallocated amount equals an invoice's outstanding
+      amount, oldest due date first
+    - fifo: remaining payment amounts, oldest first, against invoices by due date
+
+    Allocations are inserted with one multi-row INSERT and allocated amounts
+    incremented with one batched UPDATE, all in a single transaction.
+    """
+
+    AR = AllocationLedger(BalanceSummaryService.AR, ARAllocation)
+    AP = AllocationLedger(BalanceSummaryService.AP, APAllocation)
+
+    RULES = ["reference", "exact", "fifo"]
+
+    @staticmethod
+    async def run(
+        db: AsyncSession,
+        ledger: AllocationLedger,
+        company_id: int,
+        user_id: int,
+        party_id: Optional[int] = None,
+        rules: Optional[List[str]] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Allocate open items for one party or the whole company; preview only if dry_run"""
+        rules = rules or AutoAllocationService.RULES
+        unknown = [rule for rule in rules if rule not in AutoAllocationService.RULES]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown allocation rule(s): {', '.join(unknown)}. "
+                       f"Use {', '.join(AutoAllocationService.RULES)}"
+            )
+
+        invoices, payments = await AutoAllocationService._load_open_items(
+            db, ledger, company_id, party_id, lock=not dry_run
+        )
+
+        allocations: List[Dict[str, Any]] = []
+        for party, party_payments in payments.items():
+            party_invoices = invoices.get(party)
+            if party_invoices:
+                allocations.extend(
+                    AutoAllocationService.match(party_payments, party_invoices, rules)
+                )
+        party_ids = sorted({allocation["party_id"] for allocation in allocations})
+
+        if allocations and not dry_run:
+            await AutoAllocationService._apply(db, ledger, company_id, user_id, allocations, party_ids)
+            await db.commit()
+
+        # Name the party fields after the ledger, e.g. customer_id / customer_count
+        party_column = ledger.balance.party_column
+        for allocation in allocations:
+            allocation[party_column] = allocation.pop("party_id")
+        return {
+            "dry_run": dry_run,
+            f"{party_column[:-3]}_count": len(party_ids),
+            "allocation_count": len(allocations),
+            "total_allocated": sum((allocation["allocated_amount"] for allocation in allocations), Decimal("0")),
+            "allocations": allocations
+        }
+
+    @staticmethod
+    async def _load_open_items(
+        db: AsyncSession,
+        ledger: AllocationLedger,
+        company_id: int,
+        party_id: Optional[int],
+        lock: bool
+    ):
+        balance = ledger.balance
+        t = balance.transaction_model
+        tt = balance.type_model
+        party_fk = getattr(t, balance.party_column)
+
+        query = select(
+            t.id, party_fk.label("party_id"), t.transaction_number, t.reference,
+            t.transaction_date, t.due_date, (t.amount - t.allocated_amount).label("outstanding"),
+            tt.affects_balance
+        ).join(
+            tt, tt.id == t.transaction_type_id
+        ).where(
+            t.company_id == company_id,
+            t.is_posted == True,
+            t.allocated_amount < t.amount
+        ).order_by(t.id)
+        if party_id is not None:
+            query = query.where(party_fk == party_id)
+        if lock:
+            # Row locks in id order; a concurrent manual allocation waits for this run
+            query = query.with_for_update(of=t)
+
+        invoices: Dict[int, List[_OpenItem]] = {}
+        payments: Dict[int, List[_OpenItem]] = {}
+        for row in (await db.execute(query)).all():
+            item = _OpenItem(
+                row.id, row.party_id, row.transaction_number, row.reference,
+                row.transaction_date, row.due_date, row.outstanding
+            )
+            side = invoices if row.affects_balance == balance.increase_side else payments
+            side.setdefault(row.party_id, []).append(item)
+        return invoices, payments
+
+    @staticmethod
+    def match(payments: List[_OpenItem], invoices: List[_OpenItem], rules: List[str]) -> List[Dict[str, Any]]:
+        """Allocations for one party's payments and invoices; updates their outstanding amounts"""
+        payments = sorted(payments, key=lambda p: (p.transaction_date, p.id))
+        invoices = sorted(invoices, key=lambda i: (i.due_date or i.transaction_date, i.transaction_date, i.id))
+        allocations: List[Dict[str, Any]] = []
+
+        def allocate(payment: _OpenItem, invoice: _OpenItem, rule: str) -> None:
+            amount = min(payment.outstanding, invoice.outstanding)
+            if amount <= 0:
+                return
+            payment.outstanding -= amount
+            invoice.outstanding -= amount
+            allocations.append({
+                "party_id": payment.party_id,
+                "from_transaction_id": payment.id,
+                "from_transaction_number": payment.transaction_number,
+                "to_transaction_id": invoice.id,
+                "to_transaction_number": invoice.transaction_number,
+                "allocated_amount": amount,
+                "rule": rule
+            })
+
+        for rule in rules:
+            if rule == "reference":
+                by_reference: Dict[str, List[_OpenItem]] = {}
+                for invoice in invoices:
+                    for key in {invoice.transaction_number, invoice.reference} - {None, ""}:
+                        by_reference.setdefault(key.strip().upper(), []).append(invoice)
+                for payment in payments:
+                    if not payment.reference:
+                        continue
+                    for invoice in by_reference.get(payment.reference.strip().upper(), []):
+                        if payment.outstanding <= 0:
+                            break
+                        allocate(payment, invoice, rule)
+
+            elif rule == "exact":
+                by_amount: Dict[Decimal, List[_OpenItem]] = {}
+                for invoice in invoices:
+                    if invoice.outstanding > 0:
+                        by_amount.setdefault(invoice.outstanding, []).append(invoice)
+                for payment in payments:
+                    candidates = by_amount.get(payment.outstanding)
+                    if payment.outstanding > 0 and candidates:
+                        allocate(payment, candidates.pop(0), rule)
+
+            elif rule == "fifo":
+                open_invoices = iter([invoice for invoice in invoices if invoice.outstanding > 0])
+                invoice = next(open_invoices, None)
+                for payment in payments:
+                    while payment.outstanding > 0 and invoice is not None:
+                        allocate(payment, invoice, rule)
+                        if invoice.outstanding <= 0:
+                            invoice = next(open_invoices, None)
+
+        return allocations
+
+    @staticmethod
+    async def _apply(
+        db: AsyncSession,
+        ledger: AllocationLedger,
+        company_id: int,
+        user_id: int,
+        allocations: List[Dict[str, Any]],
+        party_ids: List[int]
+    ) -> None:
+        allocated_at = datetime.utcnow()
+        await db.execute(insert(ledger.allocation_model), [
+            {
+                "company_id": company_id,
+                "from_transaction_id": allocation["from_transaction_id"],
+                "to_transaction_id": allocation["to_transaction_id"],
+                "allocated_amount": allocation["allocated_amount"],
+                "allocated_by": user_id,
+                "allocated_at": allocated_at
+            }
+            for allocation in allocations
+        ])
+
+        totals: Dict[int, Decimal] = {}
+        for allocation in allocations:
+            for key in ("from_transaction_id", "to_transaction_id"):
+                transaction_id = allocation[key]
+                totals[transaction_id] = totals.get(transaction_id, Decimal("0")) + allocation["allocated_amount"]
+
+        transactions = ledger.balance.transaction_model.__table__
+        new_allocated = transactions.c.allocated_amount + bindparam("b_amount")
+        await db.execute(
+            update(transactions).where(transactions.c.id == bindparam("b_transaction_id")).values(
+                allocated_amount=new_allocated,
+                is_allocated=case((new_allocated >= transactions.c.amount, True), else_=False)
+            ),
+            [
+                {"b_transaction_id": transaction_id, "b_amount": amount}
+                for transaction_id, amount in sorted(totals.items())
+            ]
+        )
+
+        await BalanceSummaryService.record_allocations(db, ledger.balance, company_id, party_ids)
@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 from fastapi import HTTPException
@@ -11,7 +11,10 @@ from app.models import (
     GLTransaction, TransactionType, AccountingPeriod
 )
 from app.schemas.ap_transaction import APTransactionCreate, APAllocationCreate
+from app.services.ageing_service import AgeingService
+from app.services.balance_summary_service import BalanceSummaryService
 from app.services.gl_service import GLService
+from app.services.numbering_service import NumberingService
 
 
 class APService:
@@ -51,29 +54,39 @@ class APService:
     
     @staticmethod
     async def get_next_transaction_number(db: AsyncSession, company_id: int, prefix: str = "AP") -> str:
-        """Generate next transaction number"""
-        # Get the latest transaction number
-        result = await db.execute(
-            select(func.max(APTransaction.transaction_number)).where(
-                and_(
-                    APTransaction.company_id == company_id,
-                    APTransaction.transaction_number.like(f"{prefix}%")
-                )
-            )
-        )
-        last_number = result.scalar()
+        """Allocate the next transaction number in the caller's transaction (gap-free)"""
+        return await NumberingService.next_number(db, company_id, prefix, width=6)
+    
+    @staticmethod
+    def build_gl_entries(transaction, transaction_type, supplier_name: str) -> List[Dict[str, Any]]:
+        """GL lines for posting a transaction, based on its transaction type"""
+        gl_entries = []
         
-        if last_number:
-            # Extract numeric part and increment
-            numeric_part = last_number.replace(prefix, "")
-            try:
-                next_num = int(numeric_part) + 1
-            except:
-                next_num = 1
+        if transaction_type.affects_balance == 'credit':
+            # Invoice - Credit AP, Debit Expense
+            gl_entries.append({
+                'account_id': transaction_type.ap_control_account_id,
+                'debit_amount': Decimal('0'),
+                'credit_amount': transaction.amount,
+                'description': f"AP Invoice: {transaction.transaction_number} - {supplier_name}"
+            })
+            if transaction_type.expense_account_id:
+                gl_entries.append({
+                    'account_id': transaction_type.expense_account_id,
+                    'debit_amount': transaction.amount,
+                    'credit_amount': Decimal('0'),
+                    'description': f"Expense: {transaction.transaction_number} - {supplier_name}"
+                })
         else:
-            next_num = 1
-        
-        return f"{prefix}{next_num:06d}"
+            # Payment/Credit - Debit AP, Credit Bank/Other
+            gl_entries.append({
+                'account_id': transaction_type.ap_control_account_id,
+                'debit_amount': transaction.amount,
+                'credit_amount': Decimal('0'),
+                'description': f"AP Payment: {transaction.transaction_number} - {supplier_name}"
+            })
+            # Note: Bank account would be handled in a more complete implementation
+        return gl_entries
     
     @staticmethod
     async def post_ap_transaction(
@@ -83,7 +96,8 @@ class APService:
         company_id: int
     ):
         """Post an AP transaction and create GL entries"""
-        # Get transaction with related data
+        # Lock the row like batch posting does, so a concurrent post of the
+        # same document waits and then no longer finds it unposted
         result = await db.execute(
             select(APTransaction).options(
                 selectinload(APTransaction.transaction_type),
@@ -95,7 +109,7 @@ class APService:
                     APTransaction.company_id == company_id,
                     APTransaction.is_posted == False
                 )
-            )
+            ).with_for_update()
         )
         transaction = result.scalar_one_or_none()
         
@@ -106,33 +120,9 @@ class APService:
         if transaction.period and transaction.period.is_closed:
             raise HTTPException(status_code=400, detail="Cannot post to a closed period")
         
-        # Determine GL entries based on transaction type
-        gl_entries = []
-        
-        if transaction.transaction_type.affects_balance == 'credit':
-            # Invoice - Credit AP, Debit Expense
-            gl_entries.append({
-                'account_id': transaction.transaction_type.ap_control_account_id,
-                'debit_amount': Decimal('0'),
-                'credit_amount': transaction.amount,
-                'description': f"AP Invoice: {transaction.transaction_number} - {transaction.supplier.name}"
-            })
-            if transaction.transaction_type.expense_account_id:
-                gl_entries.append({
-                    'account_id': transaction.transaction_type.expense_account_id,
-                    'debit_amount': transaction.amount,
-                    'credit_amount': Decimal('0'),
-                    'description': f"Expense: {transaction.transaction_number} - {transaction.supplier.name}"
-                })
-        else:
-            # Payment/Credit - Debit AP, Credit Bank/Other
-            gl_entries.append({
-                'account_id': transaction.transaction_type.ap_control_account_id,
-                'debit_amount': transaction.amount,
-                'credit_amount': Decimal('0'),
-                'description': f"AP Payment: {transaction.transaction_number} - {transaction.supplier.name}"
-            })
-            # Note: Bank account would be handled in a more complete implementation
+        gl_entries = APService.build_gl_entries(
+            transaction, transaction.transaction_type, transaction.supplier.name
+        )
         
         # Create GL entries
         gl_service = GLService()
@@ -154,11 +144,10 @@ class APService:
         transaction.posted_by = user_id
         transaction.posted_at = datetime.utcnow()
         
-        # Update supplier balance
-        if transaction.transaction_type.affects_balance == 'credit':
-            transaction.supplier.current_balance += transaction.amount
-        else:
-            transaction.supplier.current_balance -= transaction.amount
+        # Update supplier balance and balance summary
+        await BalanceSummaryService.record_posting(
+            db, BalanceSummaryService.AP, transaction, transaction.transaction_type.affects_balance
+        )
         
         await db.commit()
         return transaction
@@ -179,7 +168,7 @@ class APService:
                     APTransaction.company_id == company_id,
                     APTransaction.is_posted == True
                 )
-            )
+            ).with_for_update()
         )
         from_transaction = from_result.scalar_one_or_none()
         
@@ -190,7 +179,7 @@ class APService:
                     APTransaction.company_id == company_id,
                     APTransaction.is_posted == True
                 )
-            )
+            ).with_for_update()
         )
         to_transaction = to_result.scalar_one_or_none()
         
@@ -232,6 +221,11 @@ class APService:
         if to_transaction.allocated_amount >= to_transaction.amount:
             to_transaction.is_allocated = True
         
+        # Open item count and oldest open item may have changed
+        await BalanceSummaryService.record_allocation(
+            db, BalanceSummaryService.AP, company_id, to_transaction.supplier_id
+        )
+        
         await db.commit()
         return allocation
     
@@ -240,67 +234,86 @@ class APService:
         db: AsyncSession,
         company_id: int,
         as_at_date: date,
-        supplier_id: Optional[int] = None
+        supplier_id: Optional[int] = None,
+        bucket_days: Optional[List[int]] = None
     ):
-        """Calculate supplier ageing report"""
-        # Base query for unallocated transactions
-        query = select(APTransaction).options(
-            selectinload(APTransaction.supplier),
-            selectinload(APTransaction.transaction_type)
-        ).where(
-            and_(
-                APTransaction.company_id == company_id,
-                APTransaction.is_posted == True,
-                APTransaction.transaction_date <= as_at_date,
-                APTransaction.allocated_amount < APTransaction.amount
-            )
+        """Calculate supplier ageing report (bucketed and summed in SQL)"""
+        rows = await AgeingService.calculate(
+            db,
+            APTransaction,
+            APTransactionType,
+            Supplier,
+            party_column="supplier_id",
+            party_code_column="supplier_code",
+            negative_side="debit",
+            company_id=company_id,
+            as_at_date=as_at_date,
+            party_id=supplier_id,
+            bucket_days=bucket_days
         )
         
+        return [{
+            'supplier_id': row.pop('party_id'),
+            'supplier_code': row.pop('party_code'),
+            'supplier_name': row.pop('party_name'),
+            **row
+        } for row in rows]
+    
+    # (row key, column header) for the transaction listing export
+    TRANSACTION_LISTING_COLUMNS = [
+        ("transaction_date", "Date"),
+        ("transaction_number", "Number"),
+        ("supplier_code", "Supplier Code"),
+        ("supplier_name", "Supplier Name"),
+        ("transaction_type", "Type"),
+        ("reference", "Reference"),
+        ("description", "Description"),
+        ("amount", "Amount"),
+        ("allocated_amount", "Allocated"),
+        ("outstanding", "Outstanding"),
+        ("is_posted", "Posted"),
+        ("is_allocated", "Allocated In Full")
+    ]
+    
+    @staticmethod
+    def transaction_listing_query(
+        company_id: int,
+        supplier_id: Optional[int] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        transaction_type_id: Optional[int] = None,
+        is_posted: Optional[bool] = None
+    ):
+        """Flat rows for the AP transaction listing, in date and number order"""
+        query = select(
+            APTransaction.transaction_date,
+            APTransaction.transaction_number,
+            Supplier.supplier_code,
+            Supplier.name.label("supplier_name"),
+            APTransactionType.name.label("transaction_type"),
+            APTransaction.reference,
+            APTransaction.description,
+            APTransaction.amount,
+            APTransaction.allocated_amount,
+            (APTransaction.amount - func.coalesce(APTransaction.allocated_amount, 0)).label("outstanding"),
+            APTransaction.is_posted,
+            APTransaction.is_allocated
+        ).join(
+            Supplier, Supplier.id == APTransaction.supplier_id
+        ).join(
+            APTransactionType, APTransactionType.id == APTransaction.transaction_type_id
+        ).where(APTransaction.company_id == company_id)
+        
+        # Apply filters
         if supplier_id:
             query = query.where(APTransaction.supplier_id == supplier_id)
+        if from_date:
+            query = query.where(APTransaction.transaction_date >= from_date)
+        if to_date:
+            query = query.where(APTransaction.transaction_date <= to_date)
+        if transaction_type_id:
+            query = query.where(APTransaction.transaction_type_id == transaction_type_id)
+        if is_posted is not None:
+            query = query.where(APTransaction.is_posted == is_posted)
         
-        result = await db.execute(query)
-        transactions = result.scalars().all()
-        
-        # Group by supplier and calculate ageing
-        ageing_data = {}
-        
-        for transaction in transactions:
-            supplier_id = transaction.supplier_id
-            if supplier_id not in ageing_data:
-                ageing_data[supplier_id] = {
-                    'supplier_id': supplier_id,
-                    'supplier_code': transaction.supplier.supplier_code,
-                    'supplier_name': transaction.supplier.name,
-                    'current': Decimal('0'),
-                    'days_30': Decimal('0'),
-                    'days_60': Decimal('0'),
-                    'days_90': Decimal('0'),
-                    'over_90': Decimal('0'),
-                    'total': Decimal('0')
-                }
-            
-            # Calculate outstanding amount
-            outstanding = transaction.amount - transaction.allocated_amount
-            if transaction.transaction_type.affects_balance == 'debit':
-                outstanding = -outstanding
-            
-            # Calculate days overdue
-            due_date = transaction.due_date or transaction.transaction_date
-            days_overdue = (as_at_date - due_date).days
-            
-            # Categorize by age
-            if days_overdue <= 0:
-                ageing_data[supplier_id]['current'] += outstanding
-            elif days_overdue <= 30:
-                ageing_data[supplier_id]['days_30'] += outstanding
-            elif days_overdue <= 60:
-                ageing_data[supplier_id]['days_60'] += outstanding
-            elif days_overdue <= 90:
-                ageing_data[supplier_id]['days_90'] += outstanding
-            else:
-                ageing_data[supplier_id]['over_90'] += outstanding
-            
-            ageing_data[supplier_id]['total'] += outstanding
-        
-        return list(ageing_data.values()) 
\ No newline at end of file
+        return query.order_by(APTransaction.transaction_date, APTransaction.transaction_number)
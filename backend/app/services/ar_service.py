@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 from fastapi import HTTPException
@@ -11,7 +11,10 @@ from app.models import (
     GLTransaction, TransactionType, AccountingPeriod
 )
 from app.schemas.ar_transaction import ARTransactionCreate, ARAllocationCreate
+from app.services.ageing_service import AgeingService
+from app.services.balance_summary_service import BalanceSummaryService
 from app.services.gl_service import GLService
+from app.services.numbering_service import NumberingService
 
 
 class ARService:
@@ -51,29 +54,43 @@ class ARService:
     
     @staticmethod
     async def get_next_transaction_number(db: AsyncSession, company_id: int, prefix: str = "AR") -> str:
-        """Generate next transaction number"""
-        # Get the latest transaction number
-        result = await db.execute(
-            select(func.max(ARTransaction.transaction_number)).where(
-                and_(
-                    ARTransaction.company_id == company_id,
-                    ARTransaction.transaction_number.like(f"{prefix}%")
-                )
-            )
+        """Reserve the next transaction number"""
+        # Numbers are handed out before the transaction exists, so they are
+        # reserved outright instead of holding the counter row lock
+        return await NumberingService.next_number(
+            db, company_id, prefix, width=6, mode=NumberingService.FAST
         )
-        last_number = result.scalar()
+    
+    @staticmethod
+    def build_gl_entries(transaction, transaction_type, customer_name: str) -> List[Dict[str, Any]]:
+        """GL lines for posting a transaction, based on its transaction type"""
+        gl_entries = []
         
-        if last_number:
-            # Extract numeric part and increment
-            numeric_part = last_number.replace(prefix, "")
-            try:
-                next_num = int(numeric_part) + 1
-            except:
-                next_num = 1
+        if transaction_type.affects_balance == 'debit':
+            # Invoice - Debit AR, Credit Revenue
+            gl_entries.append({
+                'account_id': transaction_type.ar_control_account_id,
+                'debit_amount': transaction.amount,
+                'credit_amount': Decimal('0'),
+                'description': f"AR Invoice: {transaction.transaction_number} - {customer_name}"
+            })
+            if transaction_type.revenue_account_id:
+                gl_entries.append({
+                    'account_id': transaction_type.revenue_account_id,
+                    'debit_amount': Decimal('0'),
+                    'credit_amount': transaction.amount,
+                    'description': f"Revenue: {transaction.transaction_number} - {customer_name}"
+                })
         else:
-            next_num = 1
-        
-        return f"{prefix}{next_num:06d}"
+            # Payment/Credit - Credit AR, Debit Bank/Other
+            gl_entries.append({
+                'account_id': transaction_type.ar_control_account_id,
+                'debit_amount': Decimal('0'),
+                'credit_amount': transaction.amount,
+                'description': f"AR Payment: {transaction.transaction_number} - {customer_name}"
+            })
+            # Note: Bank account would be handled in a more complete implementation
+        return gl_entries
     
     @staticmethod
     async def post_ar_transaction(
@@ -83,7 +100,8 @@ class ARService:
         company_id: int
     ):
         """Post an AR transaction and create GL entries"""
-        # Get transaction with related data
+        # Lock the row like batch posting does, so a concurrent post of the
+        # same document waits and then no longer finds it unposted
         result = await db.execute(
             select(ARTransaction).options(
                 selectinload(ARTransaction.transaction_type),
@@ -95,7 +113,7 @@ class ARService:
                     ARTransaction.company_id == company_id,
                     ARTransaction.is_posted == False
                 )
-            )
+            ).with_for_update()
         )
         transaction = result.scalar_one_or_none()
         
@@ -106,33 +124,9 @@ class ARService:
         if transaction.period and transaction.period.is_closed:
             raise HTTPException(status_code=400, detail="Cannot post to a closed period")
         
-        # Determine GL entries based on transaction type
-        gl_entries = []
-        
-        if transaction.transaction_type.affects_balance == 'debit':
-            # Invoice - Debit AR, Credit Revenue
-            gl_entries.append({
-                'account_id': transaction.transaction_type.ar_control_account_id,
-                'debit_amount': transaction.amount,
-                'credit_amount': Decimal('0'),
-                'description': f"AR Invoice: {transaction.transaction_number} - {transaction.customer.name}"
-            })
-            if transaction.transaction_type.revenue_account_id:
-                gl_entries.append({
-                    'account_id': transaction.transaction_type.revenue_account_id,
-                    'debit_amount': Decimal('0'),
-                    'credit_amount': transaction.amount,
-                    'description': f"Revenue: {transaction.transaction_number} - {transaction.customer.name}"
-                })
-        else:
-            # Payment/Credit - Credit AR, Debit Bank/Other
-            gl_entries.append({
-                'account_id': transaction.transaction_type.ar_control_account_id,
-                'debit_amount': Decimal('0'),
-                'credit_amount': transaction.amount,
-                'description': f"AR Payment: {transaction.transaction_number} - {transaction.customer.name}"
-            })
-            # Note: Bank account would be handled in a more complete implementation
+        gl_entries = ARService.build_gl_entries(
+            transaction, transaction.transaction_type, transaction.customer.name
+        )
         
         # Create GL entries
         gl_service = GLService()
@@ -154,11 +148,10 @@ class ARService:
         transaction.posted_by = user_id
         transaction.posted_at = datetime.utcnow()
         
-        # Update customer balance
-        if transaction.transaction_type.affects_balance == 'debit':
-            transaction.customer.current_balance += transaction.amount
-        else:
-            transaction.customer.current_balance -= transaction.amount
+        # Update customer balance and balance summary
+        await BalanceSummaryService.record_posting(
+            db, BalanceSummaryService.AR, transaction, transaction.transaction_type.affects_balance
+        )
         
         await db.commit()
         return transaction
@@ -179,7 +172,7 @@ class ARService:
                     ARTransaction.company_id == company_id,
                     ARTransaction.is_posted == True
                 )
-            )
+            ).with_for_update()
         )
         from_transaction = from_result.scalar_one_or_none()
         
@@ -190,7 +183,7 @@ class ARService:
                     ARTransaction.company_id == company_id,
                     ARTransaction.is_posted == True
                 )
-            )
+            ).with_for_update()
         )
         to_transaction = to_result.scalar_one_or_none()
         
@@ -232,6 +225,11 @@ class ARService:
         if to_transaction.allocated_amount >= to_transaction.amount:
             to_transaction.is_allocated = True
         
+        # Open item count and oldest open item may have changed
+        await BalanceSummaryService.record_allocation(
+            db, BalanceSummaryService.AR, company_id, to_transaction.customer_id
+        )
+        
         await db.commit()
         return allocation
     
@@ -240,67 +238,99 @@ class ARService:
         db: AsyncSession,
         company_id: int,
         as_at_date: date,
-        customer_id: Optional[int] = None
+        customer_id: Optional[int] = None,
+        bucket_days: Optional[List[int]] = None
     ):
-        """Calculate customer ageing report"""
-        # Base query for unallocated transactions
+        """Calculate customer ageing report (bucketed and summed in SQL)"""
+        rows = await AgeingService.calculate(
+            db,
+            ARTransaction,
+            ARTransactionType,
+            Customer,
+            party_column="customer_id",
+            party_code_column="customer_code",
+            negative_side="credit",
+            company_id=company_id,
+            as_at_date=as_at_date,
+            party_id=customer_id,
+            bucket_days=bucket_days
+        )
+        
+        return [{
+            'customer_id': row.pop('party_id'),
+            'customer_code': row.pop('party_code'),
+            'customer_name': row.pop('party_name'),
+            **row
+        } for row in rows]
+    
+    @staticmethod
+    async def get_statement_transactions(
+        db: AsyncSession,
+        company_id: int,
+        customer_id: int,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None
+    ) -> List[ARTransaction]:
+        """Posted transactions for a customer statement, oldest first"""
         query = select(ARTransaction).options(
-            selectinload(ARTransaction.customer),
             selectinload(ARTransaction.transaction_type)
         ).where(
             and_(
                 ARTransaction.company_id == company_id,
-                ARTransaction.is_posted == True,
-                ARTransaction.transaction_date <= as_at_date,
-                ARTransaction.allocated_amount < ARTransaction.amount
+                ARTransaction.customer_id == customer_id,
+                ARTransaction.is_posted == True
             )
         )
         
-        if customer_id:
-            query = query.where(ARTransaction.customer_id == customer_id)
+        if from_date:
+            query = query.where(ARTransaction.transaction_date >= from_date)
+        if to_date:
+            query = query.where(ARTransaction.transaction_date <= to_date)
         
-        result = await db.execute(query)
-        transactions = result.scalars().all()
+        result = await db.execute(query.order_by(ARTransaction.transaction_date, ARTransaction.id))
+        return result.scalars().all()
+    
+    @staticmethod
+    async def get_customer_statement(
+        db: AsyncSession,
+        company_id: int,
+        customer_id: int,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Customer statement lines with a running balance"""
+        transactions = await ARService.get_statement_transactions(
+            db, company_id, customer_id, from_date, to_date
+        )
         
-        # Group by customer and calculate ageing
-        ageing_data = {}
+        statement = []
+        running_balance = Decimal('0')
         
         for transaction in transactions:
-            customer_id = transaction.customer_id
-            if customer_id not in ageing_data:
-                ageing_data[customer_id] = {
-                    'customer_id': customer_id,
-                    'customer_code': transaction.customer.customer_code,
-                    'customer_name': transaction.customer.name,
-                    'current': Decimal('0'),
-                    'days_30': Decimal('0'),
-                    'days_60': Decimal('0'),
-                    'days_90': Decimal('0'),
-                    'over_90': Decimal('0'),
-                    'total': Decimal('0')
-                }
-            
-            # Calculate outstanding amount
-            outstanding = transaction.amount - transaction.allocated_amount
-            if transaction.transaction_type.affects_balance == 'credit':
-                outstanding = -outstanding
-            
-            # Calculate days overdue
-            due_date = transaction.due_date or transaction.transaction_date
-            days_overdue = (as_at_date - due_date).days
-            
-            # Categorize by age
-            if days_overdue <= 0:
-                ageing_data[customer_id]['current'] += outstanding
-            elif days_overdue <= 30:
-                ageing_data[customer_id]['days_30'] += outstanding
-            elif days_overdue <= 60:
-                ageing_data[customer_id]['days_60'] += outstanding
-            elif days_overdue <= 90:
-                ageing_data[customer_id]['days_90'] += outstanding
+            if transaction.transaction_type.affects_balance == 'debit':
+                debit = transaction.amount
+                credit = None
+                running_balance += transaction.amount
             else:
-                ageing_data[customer_id]['over_90'] += outstanding
+                debit = None
+                credit = transaction.amount
+                running_balance -= transaction.amount
             
-            ageing_data[customer_id]['total'] += outstanding
+            statement.append({
+                "transaction_date": transaction.transaction_date,
+                "transaction_number": transaction.transaction_number,
+                "transaction_type": transaction.transaction_type.name,
+                "reference": transaction.reference,
+                "description": transaction.description,
+                "debit": debit,
+                "credit": credit,
+                "balance": running_balance
+            })
         
-        return list(ageing_data.values()) 
\ No newline at end of file
+        return {
+            "customer_id": customer_id,
+            "from_date": from_date,
+            "to_date": to_date,
+            "transactions": statement,
+            "closing_balance": running_balance
+        }
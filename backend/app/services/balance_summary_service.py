@@ -0,0 +1,316 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, delete, insert, func, case, and_, literal, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import ledger_version
+from app.models import (
+    Customer, ARTransaction, ARTransactionType, CustomerBalanceSummary,
+    Supplier, APTransaction, APTransactionType, SupplierBalanceSummary
+)
+
+
+@dataclass(frozen=True)
+class BalanceLedger:
+    """The models and conventions of one sub-ledger (AR or AP)"""
+    transaction_model: Any
+    type_model: Any
+    party_model: Any
+    summary_model: Any
+    party_column: str
+    party_code_column: str
+    summary_constraint: str
+    increase_side: str  # affects_balance value that increases the party balance
+
+
+class BalanceSummaryService:
+    """Per-customer and per-supplier totals of posted transactions.
+
+    Debits, credits, counts and last activity are incremented by an upsert
+    in the posting transaction; open item count and oldest open date are
+    recomputed from the open-items index after posting or allocation. The
+    upsert takes the summary row lock first, so concurrent updates for the
+    same party apply one after the other.
+    """
+
+    AR = BalanceLedger(
+        ARTransaction, ARTransactionType, Customer, CustomerBalanceSummary,
+        "customer_id", "customer_code", "_customer_balance_summary_uc", "debit"
+    )
+    AP = BalanceLedger(
+        APTransaction, APTransactionType, Supplier, SupplierBalanceSummary,
+        "supplier_id", "supplier_code", "_supplier_balance_summary_uc", "credit"
+    )
+
+    # Summary columns compared by reconcile
+    FIELDS = [
+        "total_debits", "total_credits", "transaction_count",
+        "open_item_count", "oldest_open_date", "last_activity_date"
+    ]
+
+    @staticmethod
+    def balance(ledger: BalanceLedger, total_debits: Decimal, total_credits: Decimal) -> Decimal:
+        if ledger.increase_side == "debit":
+            return total_debits - total_credits
+        return total_credits - total_debits
+
+    @staticmethod
+    async def record_posting(db: AsyncSession, ledger: BalanceLedger, transaction, affects_balance: str) -> None:
+        """Add a newly posted transaction to its party's summary and current_balance"""
+        await BalanceSummaryService.record_postings(
+            db, ledger, transaction.company_id, [(transaction, affects_balance)]
+        )
+
+    @staticmethod
+    async def record_postings(
+        db: AsyncSession,
+        ledger: BalanceLedger,
+        company_id: int,
+        postings: List[Tuple[Any, str]]
+    ) -> None:
+        """Add newly posted (transaction, affects_balance) pairs to the summaries.
+
+        Amounts are aggregated per party and applied in party id order, so a
+        batch touches each summary and party row once and concurrent batches
+        can't deadlock on them.
+        """
+        totals: Dict[int, Dict[str, Any]] = {}
+        for transaction, affects_balance in postings:
+            party_total = totals.setdefault(getattr(transaction, ledger.party_column), {
+                "debits": Decimal("0"), "credits": Decimal("0"), "count": 0,
+                "activity_date": None, "delta": Decimal("0")
+            })
+            amount = transaction.amount
+            if affects_balance == "debit":
+                party_total["debits"] += amount
+            else:
+                party_total["credits"] += amount
+            party_total["count"] += 1
+            if party_total["activity_date"] is None or transaction.transaction_date > party_total["activity_date"]:
+                party_total["activity_date"] = transaction.transaction_date
+            party_total["delta"] += amount if affects_balance == ledger.increase_side else -amount
+
+        if not totals:
+            return
+        party_ids = sorted(totals)
+        for party_id in party_ids:
+            party_total = totals[party_id]
+            await BalanceSummaryService._upsert(
+                db, ledger, company_id, party_id,
+                debits=party_total["debits"],
+                credits=party_total["credits"],
+                count=party_total["count"],
+                activity_date=party_total["activity_date"]
+            )
+
+        # One statement for all parties; the summary upserts above already hold
+        # the per-party locks in id order
+        party = ledger.party_model
+        await db.execute(
+            update(party).where(party.id.in_(party_ids)).values(
+                current_balance=func.coalesce(party.current_balance, 0) + case(
+                    {party_id: totals[party_id]["delta"] for party_id in party_ids}, value=party.id
+                )
+            ).execution_options(synchronize_session="fetch")
+        )
+
+        await BalanceSummaryService._refresh_open_items(db, ledger, company_id, party_ids)
+
+    @staticmethod
+    async def record_allocation(db: AsyncSession, ledger: BalanceLedger, company_id: int, party_id: int) -> None:
+        """Refresh open items after allocated amounts changed for a party"""
+        await BalanceSummaryService.record_allocations(db, ledger, company_id, [party_id])
+
+    @staticmethod
+    async def record_allocations(db: AsyncSession, ledger: BalanceLedger, company_id: int, party_ids: List[int]) -> None:
+        """Refresh open items after allocated amounts changed for several parties"""
+        for party_id in sorted(party_ids):
+            await BalanceSummaryService._upsert(db, ledger, company_id, party_id)
+        await BalanceSummaryService._refresh_open_items(db, ledger, company_id, party_ids)
+
+    @staticmethod
+    async def _upsert(
+        db: AsyncSession,
+        ledger: BalanceLedger,
+        company_id: int,
+        party_id: int,
+        debits: Decimal = Decimal("0"),
+        credits: Decimal = Decimal("0"),
+        count: int = 0,
+        activity_date: Optional[date] = None
+    ) -> None:
+        summary = ledger.summary_model
+        stmt = pg_insert(summary).values({
+            "company_id": company_id,
+            ledger.party_column: party_id,
+            "total_debits": debits,
+            "total_credits": credits,
+            "transaction_count": count,
+            "open_item_count": 0,
+            "last_activity_date": activity_date
+        })
+        stmt = stmt.on_conflict_do_update(
+            constraint=ledger.summary_constraint,
+            set_={
+                "total_debits": summary.total_debits + stmt.excluded.total_debits,
+                "total_credits": summary.total_credits + stmt.excluded.total_credits,
+                "transaction_count": summary.transaction_count + stmt.excluded.transaction_count,
+                "last_activity_date": func.greatest(summary.last_activity_date, stmt.excluded.last_activity_date),
+                "updated_at": func.now()
+            }
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    def _open_condition(ledger: BalanceLedger):
+        # Same predicate as the ix_*_transactions_open_items partial indexes
+        t = ledger.transaction_model
+        return and_(t.is_posted == True, t.allocated_amount < t.amount)
+
+    @staticmethod
+    async def _refresh_open_items(db: AsyncSession, ledger: BalanceLedger, company_id: int, party_ids: List[int]) -> None:
+        # Flush first so the ORM's pending posting/allocation changes are counted
+        await db.flush()
+        t = ledger.transaction_model
+        summary = ledger.summary_model
+        summary_party = getattr(summary, ledger.party_column)
+        # Correlated per party, so each subquery is a scan of the open-items index
+        open_items = and_(
+            t.company_id == company_id,
+            getattr(t, ledger.party_column) == summary_party,
+            BalanceSummaryService._open_condition(ledger)
+        )
+        await db.execute(
+            update(summary).where(summary_party.in_(party_ids)).values(
+                open_item_count=select(func.count()).where(open_items).scalar_subquery(),
+                oldest_open_date=select(func.min(t.transaction_date)).where(open_items).scalar_subquery()
+            ).execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def get_summary(db: AsyncSession, ledger: BalanceLedger, party_id: int) -> Dict[str, Any]:
+        summary = ledger.summary_model
+        row = (await db.execute(
+            select(summary).where(getattr(summary, ledger.party_column) == party_id)
+        )).scalar_one_or_none()
+        if row is None:
+            return {
+                "total_debits": Decimal("0"), "total_credits": Decimal("0"), "transaction_count": 0,
+                "open_item_count": 0, "oldest_open_date": None, "last_activity_date": None
+            }
+        return {field: getattr(row, field) for field in BalanceSummaryService.FIELDS}
+
+    @staticmethod
+    def ledger_totals(ledger: BalanceLedger, company_id: Optional[int] = None):
+        """Summary values computed from the raw posted ledger, one row per party"""
+        t = ledger.transaction_model
+        tt = ledger.type_model
+        party_fk = getattr(t, ledger.party_column)
+        is_open = t.allocated_amount < t.amount
+        query = select(
+            t.company_id,
+            party_fk.label("party_id"),
+            func.coalesce(func.sum(case((tt.affects_balance == "debit", t.amount), else_=0)), 0).label("total_debits"),
+            func.coalesce(func.sum(case((tt.affects_balance == "credit", t.amount), else_=0)), 0).label("total_credits"),
+            func.count().label("transaction_count"),
+            func.count().filter(is_open).label("open_item_count"),
+            func.min(t.transaction_date).filter(is_open).label("oldest_open_date"),
+            func.max(t.transaction_date).label("last_activity_date")
+        ).join(
+            tt, tt.id == t.transaction_type_id
+        ).where(t.is_posted == True).group_by(t.company_id, party_fk)
+        if company_id is not None:
+            query = query.where(t.company_id == company_id)
+        return query
+
+    @staticmethod
+    async def reconcile(db: AsyncSession, ledger: BalanceLedger, company_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Compare summaries and party current_balance with the ledger; return mismatches"""
+        summary = ledger.summary_model
+        party = ledger.party_model
+        totals = BalanceSummaryService.ledger_totals(ledger, company_id).subquery()
+        summary_party = getattr(summary, ledger.party_column)
+
+        query = select(
+            party.id,
+            getattr(party, ledger.party_code_column).label("party_code"),
+            party.current_balance,
+            *[getattr(summary, field).label(f"summary_{field}") for field in BalanceSummaryService.FIELDS],
+            *[getattr(totals.c, field).label(f"ledger_{field}") for field in BalanceSummaryService.FIELDS]
+        ).select_from(party).outerjoin(
+            summary, summary_party == party.id
+        ).outerjoin(
+            totals, totals.c.party_id == party.id
+        ).order_by(party.id)
+        if company_id is not None:
+            query = query.where(party.company_id == company_id)
+
+        zero = {"total_debits": Decimal("0"), "total_credits": Decimal("0"),
+                "transaction_count": 0, "open_item_count": 0}
+        mismatches = []
+        for row in (await db.execute(query)).mappings():
+            ledger_values = {}
+            for field in BalanceSummaryService.FIELDS:
+                summary_value = row[f"summary_{field}"]
+                ledger_value = row[f"ledger_{field}"]
+                if ledger_value is None:
+                    ledger_value = zero.get(field)
+                if summary_value is None:
+                    summary_value = zero.get(field)
+                ledger_values[field] = ledger_value
+                if summary_value != ledger_value:
+                    mismatches.append({
+                        "party_id": row["id"], "party_code": row["party_code"], "field": field,
+                        "summary": summary_value, "ledger": ledger_value
+                    })
+            expected_balance = BalanceSummaryService.balance(
+                ledger, ledger_values["total_debits"], ledger_values["total_credits"]
+            )
+            if (row["current_balance"] or Decimal("0")) != expected_balance:
+                mismatches.append({
+                    "party_id": row["id"], "party_code": row["party_code"], "field": "current_balance",
+                    "summary": row["current_balance"], "ledger": expected_balance
+                })
+        return mismatches
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, ledger: BalanceLedger, company_id: Optional[int] = None) -> int:
+        """Replace summaries and party current_balance with values from the ledger.
+
+        Postings wait on the table lock until the rebuild commits, then apply
+        their increments on top of it.
+        """
+        summary = ledger.summary_model
+        party = ledger.party_model
+        await db.execute(text(f"LOCK TABLE {summary.__tablename__} IN EXCLUSIVE MODE"))
+
+        clear = delete(summary)
+        if company_id is not None:
+            clear = clear.where(summary.company_id == company_id)
+        await db.execute(clear)
+
+        totals = BalanceSummaryService.ledger_totals(ledger, company_id).subquery()
+        result = await db.execute(
+            insert(summary).from_select(
+                ["company_id", ledger.party_column, *BalanceSummaryService.FIELDS],
+                select(totals.c.company_id, totals.c.party_id,
+                       *[getattr(totals.c, field) for field in BalanceSummaryService.FIELDS])
+            )
+        )
+
+        summary_party = getattr(summary, ledger.party_column)
+        if ledger.increase_side == "debit":
+            net = summary.total_debits - summary.total_credits
+        else:
+            net = summary.total_credits - summary.total_debits
+        balance = select(net).where(summary_party == party.id).scalar_subquery()
+        reset = update(party).values(current_balance=func.coalesce(balance, literal(0)))
+        if company_id is not None:
+            reset = reset.where(party.company_id == company_id)
+        await db.execute(reset.execution_options(synchronize_session=False))
+        ledger_version.touch(db, company_id)
+        return result.rowcount
@@ -0,0 +1,310 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.period_cache import period_cache
+from app.models import GLAccount, GLTransaction
+from app.services.ap_service import APService
+from app.services.ar_service import ARService
+from app.services.balance_summary_service import BalanceLedger, BalanceSummaryService
+from app.services.gl_service import GLService
+
+
+@dataclass(frozen=True)
+class PostingLedger:
+    """How one sub-ledger (AR or AP) posts its transactions to the GL"""
+    balance: BalanceLedger
+    source_module: str
+    account_columns: tuple  # transaction type columns holding GL accounts
+    build_gl_entries: Callable[[Any, Any, str], List[Dict[str, Any]]]
+
+
+class BatchPostingService:
+    """Post many AR or AP transactions per request.
+
+    Transaction types, parties, GL accounts and periods are loaded once for
+    the batch. Each chunk locks its transactions, allocates its journal entry
+    IDs with one counter increment, inserts all GL lines with one multi-row
+    INSERT, applies one balance delta per account and party, and commits.
+    A chunk that fails in the database is rolled back and reported without
+    undoing the chunks already committed.
+    """
+
+    AR = PostingLedger(
+        BalanceSummaryService.AR, "AR",
+        ("ar_control_account_id", "revenue_account_id"),
+        ARService.build_gl_entries
+    )
+    AP = PostingLedger(
+        BalanceSummaryService.AP, "AP",
+        ("ap_control_account_id", "expense_account_id"),
+        APService.build_gl_entries
+    )
+
+    @staticmethod
+    async def select_unposted_ids(
+        db: AsyncSession,
+        ledger: PostingLedger,
+        company_id: int,
+        party_id: Optional[int] = None,
+        transaction_type_id: Optional[int] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """IDs of unposted transactions matching a filter, oldest first"""
+        t = ledger.balance.transaction_model
+        query = select(t.id).where(t.company_id == company_id, t.is_posted == False)
+        if party_id:
+            query = query.where(getattr(t, ledger.balance.party_column) == party_id)
+        if transaction_type_id:
+            query = query.where(t.transaction_type_id == transaction_type_id)
+        if from_date:
+            query = query.where(t.transaction_date >= from_date)
+        if to_date:
+            query = query.where(t.transaction_date <= to_date)
+        query = query.order_by(t.transaction_date, t.id)
+        if limit:
+            query = query.limit(limit)
+        return list((await db.execute(query)).scalars().all())
+
+    @staticmethod
+    async def post_request(
+        db: AsyncSession,
+        ledger: PostingLedger,
+        company_id: int,
+        user_id: int,
+        batch_in
+    ) -> Dict[str, Any]:
+        """Resolve a batch post request's IDs or filter, post them and summarise the results"""
+        max_transactions = settings.BATCH_POST_MAX_TRANSACTIONS
+        party_id = getattr(batch_in, ledger.balance.party_column)
+        if batch_in.transaction_ids is not None:
+            transaction_ids = batch_in.transaction_ids
+        elif any([party_id, batch_in.transaction_type_id, batch_in.from_date, batch_in.to_date]):
+            transaction_ids = await BatchPostingService.select_unposted_ids(
+                db, ledger, company_id, party_id, batch_in.transaction_type_id,
+                batch_in.from_date, batch_in.to_date, limit=max_transactions + 1
+            )
+        else:
+            raise HTTPException(status_code=400, detail="Provide transaction_ids or at least one filter")
+
+        if len(transaction_ids) > max_transactions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A batch can post at most {max_transactions} transactions; narrow the filter"
+            )
+        chunk_size = batch_in.chunk_size or settings.BATCH_POST_CHUNK_SIZE
+        if chunk_size < 1:
+            raise HTTPException(status_code=400, detail="chunk_size must be at least 1")
+
+        results = await BatchPostingService.post_batch(
+            db, ledger, company_id, user_id, transaction_ids, chunk_size
+        )
+        posted = sum(1 for r in results if r["success"])
+        return {
+            "total": len(results),
+            "posted": posted,
+            "failed": len(results) - posted,
+            "results": results
+        }
+
+    @staticmethod
+    async def post_batch(
+        db: AsyncSession,
+        ledger: PostingLedger,
+        company_id: int,
+        user_id: int,
+        transaction_ids: List[int],
+        chunk_size: int
+    ) -> List[Dict[str, Any]]:
+        """Post the transactions in chunks; return one result per transaction ID"""
+        transaction_ids = list(dict.fromkeys(transaction_ids))
+        if not transaction_ids:
+            return []
+
+        balance = ledger.balance
+        # Plain rows rather than ORM objects, which a failed chunk's rollback would expire
+        tt = balance.type_model
+        types_result = await db.execute(
+            select(tt.id, tt.affects_balance, *[getattr(tt, column) for column in ledger.account_columns])
+            .where(tt.company_id == company_id)
+        )
+        types = {row.id: row for row in types_result.all()}
+
+        account_ids = {
+            getattr(row, column) for row in types.values() for column in ledger.account_columns
+        } - {None}
+        accounts_result = await db.execute(
+            select(GLAccount.id, GLAccount.account_code, GLAccount.is_active).where(
+                GLAccount.company_id == company_id,
+                GLAccount.id.in_(account_ids)
+            )
+        )
+        accounts = {row.id: row for row in accounts_result.all()}
+
+        party_names: Dict[int, str] = {}
+
+        results: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(transaction_ids), chunk_size):
+            chunk = transaction_ids[start:start + chunk_size]
+            chunk_results = await BatchPostingService._post_chunk(
+                db, ledger, company_id, user_id, chunk, types, accounts, party_names
+            )
+            results.update(chunk_results)
+
+        return [results[transaction_id] for transaction_id in transaction_ids]
+
+    @staticmethod
+    async def _post_chunk(
+        db: AsyncSession,
+        ledger: PostingLedger,
+        company_id: int,
+        user_id: int,
+        chunk: List[int],
+        types: Dict[int, Any],
+        accounts: Dict[int, Any],
+        party_names: Dict[int, str]
+    ) -> Dict[int, Dict[str, Any]]:
+        balance = ledger.balance
+        t = balance.transaction_model
+        party = balance.party_model
+
+        # Lock the chunk in id order; single posts lock the row too, so a
+        # concurrent post of the same document waits and then sees is_posted
+        transactions_result = await db.execute(
+            select(t).where(t.company_id == company_id, t.id.in_(chunk)).order_by(t.id).with_for_update()
+        )
+        transactions = {transaction.id: transaction for transaction in transactions_result.scalars().all()}
+
+        missing_parties = {
+            getattr(transaction, balance.party_column) for transaction in transactions.values()
+        } - party_names.keys()
+        if missing_parties:
+            parties_result = await db.execute(select(party.id, party.name).where(party.id.in_(missing_parties)))
+            party_names.update({row.id: row.name for row in parties_result.all()})
+
+        periods = await period_cache.get_company_periods(db, company_id)
+        transaction_periods = {
+            transaction.id: periods.get(transaction.period_id) if transaction.period_id
+            else periods.find(transaction.transaction_date)
+            for transaction in transactions.values()
+        }
+        open_period_ids = await period_cache.open_period_ids(
+            db, company_id, {period.id for period in transaction_periods.values() if period}
+        )
+
+        results: Dict[int, Dict[str, Any]] = {}
+        to_post = []
+        for transaction_id in chunk:
+            transaction = transactions.get(transaction_id)
+            result = {
+                "transaction_id": transaction_id,
+                "transaction_number": transaction.transaction_number if transaction else None,
+                "success": False,
+                "journal_entry_id": None,
+                "error": None
+            }
+            results[transaction_id] = result
+
+            if not transaction:
+                result["error"] = "Transaction not found"
+                continue
+            if transaction.is_posted:
+                result["error"] = "Transaction already posted"
+                continue
+            transaction_type = types.get(transaction.transaction_type_id)
+            if not transaction_type:
+                result["error"] = "Transaction type not found"
+                continue
+            period = transaction_periods[transaction_id]
+            if period and period.id not in open_period_ids:
+                result["error"] = "Cannot post to a closed period"
+                continue
+
+            entries = ledger.build_gl_entries(
+                transaction, transaction_type, party_names.get(getattr(transaction, balance.party_column), "")
+            )
+            for entry in entries:
+                account = accounts.get(entry['account_id'])
+                if not account:
+                    result["error"] = f"Invalid GL Account ID: {entry['account_id']}"
+                    break
+                if not account.is_active:
+                    result["error"] = f"GL Account {account.account_code} is not active."
+                    break
+            if result["error"]:
+                continue
+
+            to_post.append((transaction, transaction_type, period.id if period else None, entries))
+
+        if not to_post:
+            # Release the row locks
+            await db.rollback()
+            return results
+
+        # Rollback expires the ORM objects, so keep the IDs aside
+        posted_ids = [transaction.id for transaction, _, _, _ in to_post]
+        try:
+            journal_entry_ids = await GLService.generate_journal_entry_ids(
+                db, company_id, len(to_post), prefix=f"JE-{ledger.source_module}"
+            )
+
+            rows = []
+            period_entries: Dict[Optional[int], List[Dict[str, Any]]] = {}
+            posted_at = datetime.utcnow()
+            for (transaction, transaction_type, period_id, entries), journal_entry_id in zip(to_post, journal_entry_ids):
+                description = f"{ledger.source_module}: {transaction.description or transaction.transaction_number}"
+                for entry in entries:
+                    rows.append({
+                        'company_id': company_id,
+                        'journal_entry_id': journal_entry_id,
+                        'account_id': entry['account_id'],
+                        'transaction_date': transaction.transaction_date,
+                        'period_id': period_id,
+                        'description': entry.get('description', description),
+                        'debit_amount': entry['debit_amount'],
+                        'credit_amount': entry['credit_amount'],
+                        'reference': transaction.transaction_number,
+                        'source_module': ledger.source_module,
+                        'source_document_id': transaction.id,
+                        'posted_by_user_id': user_id,
+                        'is_reversed': False
+                    })
+                period_entries.setdefault(period_id, []).extend(entries)
+
+                transaction.is_posted = True
+                transaction.posted_by = user_id
+                transaction.posted_at = posted_at
+                results[transaction.id]["journal_entry_id"] = journal_entry_id
+
+            await db.execute(insert(GLTransaction), rows)
+            await GLService.apply_account_balance_deltas(
+                db, [entry for entries in period_entries.values() for entry in entries]
+            )
+            for period_id, entries in period_entries.items():
+                if period_id is not None:
+                    await GLService.apply_period_balances(db, company_id, period_id, entries)
+
+            await BalanceSummaryService.record_postings(
+                db, balance, company_id,
+                [(transaction, transaction_type.affects_balance) for transaction, transaction_type, _, _ in to_post]
+            )
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            for transaction_id in posted_ids:
+                result = results[transaction_id]
+                result["journal_entry_id"] = None
+                result["error"] = f"Database error: {e.__class__.__name__}"
+            return results
+
+        for transaction_id in posted_ids:
+            results[transaction_id]["success"] = True
+        return results
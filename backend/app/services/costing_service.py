@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import InventoryItem
+from app.services.stock_valuation_service import StockValuationChange, StockValuationService
+
+# cost_price and total_cost are stored with 2 decimal places
+CENT = Decimal("0.01")
+
+
+@dataclass
+class StockMovement:
+    """A quantity moving into (is_increase) or out of stock"""
+    item_id: int
+    quantity: Decimal  # always positive
+    is_increase: bool
+    transaction_date: date  # day the stock valuation snapshot is kept for
+    unit_cost: Optional[Decimal] = None  # receipt cost; None uses the current average
+
+
+@dataclass
+class CostedMovement:
+    """A movement after costing, with the item's quantity and cost before and after"""
+    movement: StockMovement
+    item: InventoryItem
+    unit_cost: Decimal
+    total_cost: Decimal  # positive for increases and decreases
+    quantity_before: Decimal
+    quantity_after: Decimal
+    cost_price_before: Decimal
+    cost_price_after: Decimal
+
+
+class CostingService:
+    """Weighted-average costing for stock movements.
+
+    Every caller that changes quantity_on_hand or cost_price goes through
+    apply_movements, which locks the affected items with SELECT ... FOR UPDATE
+    in item id order before reading them. Concurrent receipts and issues on the
+    same item therefore apply one after the other against current values, and
+    two batches touching overlapping items can't deadlock. The items' stock
+    valuation snapshots are updated under the same locks.
+    """
+
+    # Items locked per statement; keeps bind parameters under the driver limit
+    LOCK_CHUNK_SIZE = 10000
+
+    @staticmethod
+    async def lock_items(
+        db: AsyncSession,
+        item_ids: Iterable[int],
+        company_id: Optional[int] = None,
+        for_update: bool = True
+    ) -> Dict[int, InventoryItem]:
+        """Lock items in id order and load their current values (for_update=False only reads)"""
+        item_ids = sorted(set(item_ids))
+        items: Dict[int, InventoryItem] = {}
+        for start in range(0, len(item_ids), CostingService.LOCK_CHUNK_SIZE):
+            query = select(InventoryItem).where(
+                InventoryItem.id.in_(item_ids[start:start + CostingService.LOCK_CHUNK_SIZE])
+            ).order_by(InventoryItem.id).execution_options(populate_existing=True)
+            if for_update:
+                query = query.with_for_update()
+            if company_id is not None:
+                query = query.where(InventoryItem.company_id == company_id)
+            result = await db.execute(query)
+            items.update({item.id: item for item in result.scalars().all()})
+        return items
+
+    @staticmethod
+    async def apply_movements(
+        db: AsyncSession,
+        movements: List[StockMovement],
+        company_id: Optional[int] = None,
+        items: Optional[Dict[int, InventoryItem]] = None
+    ) -> List[CostedMovement]:
+        """Apply movements in order to the locked items; the caller commits.
+
+        Receipts blend their cost into the weighted average, issues go out at
+        the current average. Raises 404 for an unknown item and 400 if an
+        issue exceeds the quantity on hand at that point in the batch. Pass
+        `items` from lock_items when the caller already holds the locks.
+        """
+        if items is None:
+            items = await CostingService.lock_items(db, [m.item_id for m in movements], company_id)
+
+        costed = []
+        changes = []
+        for movement in movements:
+            item = items.get(movement.item_id)
+            if not item:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Inventory item {movement.item_id} not found"
+                )
+
+            quantity_before = item.quantity_on_hand or Decimal("0")
+            cost_price_before = item.cost_price or Decimal("0")
+
+            if movement.is_increase:
+                unit_cost = cost_price_before if movement.unit_cost is None else movement.unit_cost
+                total_cost = (unit_cost * movement.quantity).quantize(CENT, ROUND_HALF_UP)
+                quantity_after = quantity_before + movement.quantity
+                cost_price_after = cost_price_before
+                if quantity_after > 0:
+                    cost_price_after = (
+                        (quantity_before * cost_price_before + total_cost) / quantity_after
+                    ).quantize(CENT, ROUND_HALF_UP)
+            else:
+                if movement.quantity > quantity_before:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Insufficient quantity for {item.item_code}. Available: {quantity_before}"
+                    )
+                unit_cost = cost_price_before
+                total_cost = (unit_cost * movement.quantity).quantize(CENT, ROUND_HALF_UP)
+                quantity_after = quantity_before - movement.quantity
+                cost_price_after = cost_price_before
+
+            item.quantity_on_hand = quantity_after
+            item.cost_price = cost_price_after
+            costed.append(CostedMovement(
+                movement, item, unit_cost, total_cost,
+                quantity_before, quantity_after, cost_price_before, cost_price_after
+            ))
+            sign = 1 if movement.is_increase else -1
+            changes.append(StockValuationChange(
+                item.id, movement.transaction_date, sign * movement.quantity, sign * total_cost
+            ))
+
+        await StockValuationService.record(db, changes, items)
+        return costed
@@ -1,11 +1,15 @@
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import date, datetime
+from sqlalchemy import select, func, delete, update, insert, union_all, literal, bindparam, text, and_, or_, false
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import date, datetime, timedelta
 
-from app.models import GLAccount, GLTransaction, AccountingPeriod
-from app.schemas.gl import JournalEntryCreate, JournalEntryLineCreate
+from app.core.period_cache import CachedPeriod, period_cache
+from app.models import GLAccount, GLAccountClosure, GLTransaction, GLPeriodBalance, GLClosingBalance, AccountingPeriod
+from app.schemas.gl import JournalEntryCreate, JournalEntryLineCreate, JournalEntryBatchResult
+from app.services.numbering_service import NumberingService
 
 class GLService:
     """Service layer for General Ledger business logic"""
@@ -38,10 +42,69 @@ class GLService:
         if account_id and account_id == parent_id:
             return False, "Account cannot be its own parent"
         
-        # TODO: Check for circular hierarchy (parent's parent is current account, etc.)
+        # The new parent must not be one of the account's own sub-accounts
+        if account_id:
+            depth = await db.scalar(
+                select(GLAccountClosure.depth).where(
+                    GLAccountClosure.ancestor_id == account_id,
+                    GLAccountClosure.descendant_id == parent_id
+                )
+            )
+            if depth is not None:
+                return False, "Parent account cannot be a sub-account of this account"
         
         return True, ""
     
+    @staticmethod
+    async def lock_account_hierarchy(db: AsyncSession, company_id: int) -> None:
+        """Serialise changes to the company's account tree until the transaction ends.
+        
+        Taken before validate_parent_account so two concurrent moves can't
+        each pass the cycle check and together form a loop.
+        """
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext('gl_account_hierarchy'), :company_id)"),
+            {"company_id": company_id}
+        )
+    
+    @staticmethod
+    async def set_account_parent(db: AsyncSession, company_id: int, account_id: int, parent_id: Optional[int]) -> None:
+        """Move an account and its sub-accounts under parent_id (None for top level) in the closure table"""
+        closure = GLAccountClosure
+        below = aliased(GLAccountClosure)
+        above = aliased(GLAccountClosure)
+        subtree = union_all(
+            select(literal(account_id).label("descendant_id"), literal(0).label("depth")),
+            select(below.descendant_id, below.depth).where(below.ancestor_id == account_id)
+        ).subquery("subtree")
+        
+        # Unlink the subtree from the account's current ancestors
+        await db.execute(
+            delete(closure).where(
+                closure.descendant_id.in_(select(subtree.c.descendant_id)),
+                closure.ancestor_id.in_(select(above.ancestor_id).where(above.descendant_id == account_id))
+            )
+        )
+        if parent_id is None:
+            return
+        
+        # Pair every node of the subtree with the new parent and its ancestors
+        supertree = union_all(
+            select(literal(parent_id).label("ancestor_id"), literal(0).label("depth")),
+            select(above.ancestor_id, above.depth).where(above.descendant_id == parent_id)
+        ).subquery("supertree")
+        await db.execute(
+            insert(closure).from_select(
+                ["company_id", "ancestor_id", "descendant_id", "depth"],
+                select(
+                    literal(company_id),
+                    supertree.c.ancestor_id,
+                    subtree.c.descendant_id,
+                    supertree.c.depth + subtree.c.depth + 1
+                )
+            )
+        )
+    
     @staticmethod
     async def validate_journal_entry(db: AsyncSession, company_id: int, journal_entry: JournalEntryCreate) -> tuple[bool, str]:
         """Validate journal entry before posting"""
@@ -84,28 +147,120 @@ class GLService:
     @staticmethod
     async def get_account_balance_at_date(db: AsyncSession, account_id: int, as_of_date: date) -> Decimal:
         """Calculate account balance as of a specific date"""
-        query = select(
-            func.sum(GLTransaction.debit_amount - GLTransaction.credit_amount)
-        ).where(
-            GLTransaction.account_id == account_id,
-            GLTransaction.transaction_date <= as_of_date,
-            GLTransaction.is_reversed == False
-        )
+        company_id = await db.scalar(select(GLAccount.company_id).where(GLAccount.id == account_id))
+        if company_id is None:
+            return Decimal("0.00")
+        balances = await GLService.get_account_balances_at_date(db, company_id, [account_id], as_of_date)
+        return balances.get(account_id, Decimal("0.00"))
+    
+    @staticmethod
+    async def get_account_balances_at_date(
+        db: AsyncSession,
+        company_id: int,
+        account_ids: List[int],
+        as_of_date: date
+    ) -> Dict[int, Decimal]:
+        """Net (debit - credit) balance of each account at the end of as_of_date.
         
-        result = await db.execute(query)
-        balance = result.scalar()
-        return balance or Decimal("0.00")
+        Like the trial balance, closed periods are read from the closing and
+        period balance snapshots and only later postings are summed from
+        gl_transactions. Accounts without postings are left out.
+        """
+        balances = await GLService._trial_balance_rows(db, company_id, as_of_date, account_ids)
+        result = await db.execute(
+            select(balances.c.account_id, func.sum(balances.c.debit - balances.c.credit)).group_by(balances.c.account_id)
+        )
+        return {account_id: amount for account_id, amount in result.all()}
     
     @staticmethod
-    async def get_period_for_date(db: AsyncSession, company_id: int, transaction_date: date) -> Optional[AccountingPeriod]:
+    async def get_period_for_date(db: AsyncSession, company_id: int, transaction_date: date) -> Optional[CachedPeriod]:
         """Get the accounting period for a given date"""
-        period_stmt = select(AccountingPeriod).where(
-            AccountingPeriod.company_id == company_id,
-            AccountingPeriod.start_date <= transaction_date,
-            AccountingPeriod.end_date >= transaction_date
+        return await period_cache.find(db, company_id, transaction_date)
+    
+    @staticmethod
+    async def get_gl_detail(
+        db: AsyncSession,
+        company_id: int,
+        account_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[GLTransaction]:
+        """Transactions posted to an account within a date range, in posting order"""
+        query = select(GLTransaction).where(
+            GLTransaction.company_id == company_id,
+            GLTransaction.account_id == account_id,
+            GLTransaction.transaction_date >= start_date,
+            GLTransaction.transaction_date <= end_date
+        ).order_by(GLTransaction.transaction_date, GLTransaction.id)
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    @staticmethod
+    async def get_gl_detail_with_balances(
+        db: AsyncSession,
+        company_id: int,
+        accounts: List[GLAccount],
+        start_date: date,
+        end_date: date
+    ) -> List[Dict[str, Any]]:
+        """GL detail for several accounts with opening, running and closing balances.
+        
+        Opening balances come from get_account_balances_at_date for the day
+        before start_date; running balances are a window sum over the lines
+        in posting order, so the ledger before start_date is never read line
+        by line.
+        """
+        account_ids = [account.id for account in accounts]
+        opening = await GLService.get_account_balances_at_date(
+            db, company_id, account_ids, start_date - timedelta(days=1)
         )
-        result = await db.execute(period_stmt)
-        return result.scalar_one_or_none()
+        
+        query = select(
+            GLTransaction.id,
+            GLTransaction.account_id,
+            GLTransaction.transaction_date,
+            GLTransaction.journal_entry_id,
+            GLTransaction.reference,
+            GLTransaction.description,
+            GLTransaction.debit_amount,
+            GLTransaction.credit_amount,
+            GLTransaction.source_module,
+            GLTransaction.source_document_id,
+            GLTransaction.is_reversed,
+            func.sum(GLTransaction.debit_amount - GLTransaction.credit_amount).over(
+                partition_by=GLTransaction.account_id,
+                order_by=(GLTransaction.transaction_date, GLTransaction.id),
+                rows=(None, 0)
+            ).label("movement_to_date")
+        ).where(
+            GLTransaction.company_id == company_id,
+            GLTransaction.account_id.in_(account_ids),
+            GLTransaction.transaction_date >= start_date,
+            GLTransaction.transaction_date <= end_date
+        ).order_by(GLTransaction.account_id, GLTransaction.transaction_date, GLTransaction.id)
+        
+        lines: Dict[int, List[Dict[str, Any]]] = {account_id: [] for account_id in account_ids}
+        for row in (await db.execute(query)).mappings():
+            line = dict(row)
+            line["running_balance"] = opening.get(row["account_id"], Decimal("0.00")) + line.pop("movement_to_date")
+            lines[row["account_id"]].append(line)
+        
+        report = []
+        for account in accounts:
+            opening_balance = opening.get(account.id, Decimal("0.00"))
+            account_lines = lines[account.id]
+            report.append({
+                "account_id": account.id,
+                "account_code": account.account_code,
+                "account_name": account.account_name,
+                "account_type": account.account_type,
+                "opening_balance": opening_balance,
+                "total_debit": sum((line["debit_amount"] for line in account_lines), Decimal("0.00")),
+                "total_credit": sum((line["credit_amount"] for line in account_lines), Decimal("0.00")),
+                "closing_balance": account_lines[-1]["running_balance"] if account_lines else opening_balance,
+                "lines": account_lines
+            })
+        return report
     
     @staticmethod
     async def can_delete_account(db: AsyncSession, account_id: int) -> tuple[bool, str]:
@@ -133,11 +288,19 @@ class GLService:
         return True, ""
     
     @staticmethod
-    def generate_journal_entry_id(prefix: str = "JE") -> str:
-        """Generate a unique journal entry ID"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"{prefix}-{timestamp}"
+    async def generate_journal_entry_id(db: AsyncSession, company_id: int, prefix: str = "JE") -> str:
+        """Allocate a unique journal entry ID from the company's counter for the prefix"""
+        return await NumberingService.next_number(
+            db, company_id, f"{prefix}-", width=8, mode=NumberingService.FAST
+        )
+    
+    @staticmethod
+    async def generate_journal_entry_ids(db: AsyncSession, company_id: int, count: int, prefix: str = "JE") -> List[str]:
+        """Allocate `count` journal entry IDs with a single counter increment"""
+        values = await NumberingService.next_values(
+            db, company_id, f"{prefix}-", count, mode=NumberingService.FAST
+        )
+        return [f"{prefix}-{value:08d}" for value in values]
     
     @staticmethod
     async def create_journal_entry(
@@ -154,10 +317,15 @@ class GLService:
     ) -> str:
         """Create GL journal entries from other modules"""
         # Generate journal entry ID
-        journal_entry_id = GLService.generate_journal_entry_id(
-            prefix=f"JE-{source_module}" if source_module else "JE"
+        journal_entry_id = await GLService.generate_journal_entry_id(
+            db, company_id, prefix=f"JE-{source_module}" if source_module else "JE"
         )
         
+        # Resolve the period so the balance snapshot can be maintained
+        if period_id is None:
+            period = await GLService.get_period_for_date(db, company_id, transaction_date)
+            period_id = period.id if period else None
+        
         # Create GL transactions for each entry
         for entry in entries:
             gl_transaction = GLTransaction(
@@ -176,12 +344,469 @@ class GLService:
                 is_reversed=False
             )
             db.add(gl_transaction)
-            
-            # Update account balance
-            account = await db.get(GLAccount, entry['account_id'])
-            if account:
-                balance_change = entry.get('debit_amount', Decimal('0')) - entry.get('credit_amount', Decimal('0'))
-                account.current_balance += balance_change
+        
+        # Update account balances in the database, not via read-modify-write
+        await GLService.apply_account_balance_deltas(db, entries)
+        
+        if period_id is not None:
+            await GLService.apply_period_balances(db, company_id, period_id, entries)
         
         # Don't commit here - let the calling function handle the transaction
-        return journal_entry_id 
\ No newline at end of file
+        return journal_entry_id 
+    
+    @staticmethod
+    async def apply_account_balance_deltas(db: AsyncSession, entries: List[Dict[str, Any]]) -> None:
+        """Increment GLAccount.current_balance atomically in the database.
+        
+        Deltas are summed per account and applied as `current_balance + :delta`
+        in account id order, so concurrent posts to the same control account
+        neither lose updates nor deadlock.
+        """
+        deltas: Dict[int, Decimal] = {}
+        for entry in entries:
+            deltas[entry['account_id']] = (
+                deltas.get(entry['account_id'], Decimal('0'))
+                + entry.get('debit_amount', Decimal('0'))
+                - entry.get('credit_amount', Decimal('0'))
+            )
+        
+        params = [
+            {'b_account_id': account_id, 'b_delta': delta}
+            for account_id, delta in sorted(deltas.items())
+            if delta != 0
+        ]
+        if not params:
+            return
+        
+        accounts = GLAccount.__table__
+        await db.execute(
+            update(accounts)
+            .where(accounts.c.id == bindparam('b_account_id'))
+            .values(current_balance=accounts.c.current_balance + bindparam('b_delta')),
+            params
+        )
+    
+    @staticmethod
+    async def apply_period_balances(
+        db: AsyncSession,
+        company_id: int,
+        period_id: int,
+        entries: List[Dict[str, Any]]
+    ) -> None:
+        """Add posted debit/credit amounts to the per-period balance snapshot"""
+        totals: Dict[int, List[Decimal]] = {}
+        for entry in entries:
+            account_totals = totals.setdefault(entry['account_id'], [Decimal('0'), Decimal('0')])
+            account_totals[0] += entry.get('debit_amount', Decimal('0'))
+            account_totals[1] += entry.get('credit_amount', Decimal('0'))
+        
+        # One upsert per account, in a fixed order so concurrent posts can't deadlock
+        for account_id in sorted(totals):
+            debit_total, credit_total = totals[account_id]
+            stmt = pg_insert(GLPeriodBalance).values(
+                company_id=company_id,
+                account_id=account_id,
+                period_id=period_id,
+                debit_total=debit_total,
+                credit_total=credit_total,
+                is_closed=False
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint='_gl_period_balance_uc',
+                set_={
+                    'debit_total': GLPeriodBalance.debit_total + stmt.excluded.debit_total,
+                    'credit_total': GLPeriodBalance.credit_total + stmt.excluded.credit_total,
+                    'updated_at': func.now()
+                }
+            )
+            await db.execute(stmt)
+    
+    @staticmethod
+    async def seal_period_balances(db: AsyncSession, period: AccountingPeriod) -> None:
+        """Rebuild the period's balance snapshot from the ledger and mark it closed"""
+        await db.execute(
+            delete(GLPeriodBalance).where(GLPeriodBalance.period_id == period.id)
+        )
+        ledger_totals = select(
+            literal(period.company_id),
+            GLTransaction.account_id,
+            literal(period.id),
+            func.sum(GLTransaction.debit_amount),
+            func.sum(GLTransaction.credit_amount),
+            literal(True)
+        ).where(
+            GLTransaction.company_id == period.company_id,
+            GLTransaction.transaction_date >= period.start_date,
+            GLTransaction.transaction_date <= period.end_date
+        ).group_by(GLTransaction.account_id)
+        await db.execute(
+            GLPeriodBalance.__table__.insert().from_select(
+                ['company_id', 'account_id', 'period_id', 'debit_total', 'credit_total', 'is_closed'],
+                ledger_totals
+            )
+        )
+    
+    @staticmethod
+    async def unseal_period_balances(db: AsyncSession, period: AccountingPeriod) -> None:
+        """Mark a reopened period's balance snapshot as open again"""
+        await db.execute(
+            update(GLPeriodBalance)
+            .where(GLPeriodBalance.period_id == period.id)
+            .values(is_closed=False)
+        )
+    
+    @staticmethod
+    async def _sealed_period_ranges(db: AsyncSession, company_id: int, report_date: date) -> List[Any]:
+        """(id, start_date, end_date) of the contiguous closed periods ending by report_date"""
+        periods_result = await db.execute(
+            select(AccountingPeriod.id, AccountingPeriod.start_date, AccountingPeriod.end_date, AccountingPeriod.is_closed).where(
+                AccountingPeriod.company_id == company_id,
+                AccountingPeriod.end_date <= report_date
+            ).order_by(AccountingPeriod.start_date)
+        )
+        sealed = []
+        for period in periods_result.all():
+            if not period.is_closed:
+                break
+            sealed.append(period)
+        return sealed
+    
+    @staticmethod
+    async def _sealed_periods(db: AsyncSession, company_id: int, report_date: date) -> Tuple[List[int], Optional[date]]:
+        """Ids of the contiguous closed periods ending by report_date, and the last one's end date"""
+        sealed = await GLService._sealed_period_ranges(db, company_id, report_date)
+        return [period.id for period in sealed], (sealed[-1].end_date if sealed else None)
+    
+    @staticmethod
+    async def write_closing_balances(db: AsyncSession, period: AccountingPeriod) -> None:
+        """Store each account's cumulative period totals at the end of a closed period.
+        
+        Only valid once the period and every earlier one are closed; built from
+        the previous period's closing balances plus this period's snapshot.
+        Lines dated outside every period are not included: they can still be
+        posted, so the trial balance always reads them from the ledger.
+        """
+        await db.execute(
+            delete(GLClosingBalance).where(GLClosingBalance.period_id == period.id)
+        )
+        balances = await GLService._trial_balance_rows(db, period.company_id, period.end_date, periods_only=True)
+        totals = select(
+            literal(period.company_id),
+            balances.c.account_id,
+            literal(period.id),
+            func.sum(balances.c.debit),
+            func.sum(balances.c.credit)
+        ).group_by(balances.c.account_id)
+        await db.execute(
+            GLClosingBalance.__table__.insert().from_select(
+                ['company_id', 'account_id', 'period_id', 'debit_total', 'credit_total'],
+                totals
+            )
+        )
+    
+    @staticmethod
+    async def drop_closing_balances(db: AsyncSession, company_id: int, from_date: date) -> None:
+        """Delete closing balances of periods ending on or after from_date (they include its postings)"""
+        later_periods = select(AccountingPeriod.id).where(
+            AccountingPeriod.company_id == company_id,
+            AccountingPeriod.end_date >= from_date
+        )
+        await db.execute(
+            delete(GLClosingBalance).where(GLClosingBalance.period_id.in_(later_periods))
+        )
+    
+    @staticmethod
+    async def _trial_balance_rows(
+        db: AsyncSession,
+        company_id: int,
+        report_date: date,
+        account_ids: Optional[List[int]] = None,
+        periods_only: bool = False
+    ):
+        """Subquery of (account_id, debit, credit) that sums to the balances at report_date.
+        
+        Starts from the latest closing balances within the contiguous closed
+        periods and adds the sealed totals of closed periods after it. Ledger
+        lines are summed for every date those periods don't cover: after the
+        last of them, before the first and in calendar gaps between them
+        (lines posted without a period). periods_only leaves the ledger out.
+        """
+        sealed = await GLService._sealed_period_ranges(db, company_id, report_date)
+        sealed_period_ids = [period.id for period in sealed]
+        
+        def accounts(query, column):
+            return query.where(column.in_(account_ids)) if account_ids is not None else query
+        
+        balance_rows = accounts(select(
+            GLTransaction.account_id,
+            GLTransaction.debit_amount.label("debit"),
+            GLTransaction.credit_amount.label("credit")
+        ).where(
+            GLTransaction.company_id == company_id,
+            GLTransaction.transaction_date <= report_date
+        ), GLTransaction.account_id)
+        if not sealed_period_ids:
+            return balance_rows.where(false()).subquery() if periods_only else balance_rows.subquery()
+        
+        parts = []
+        closing_period_id = await db.scalar(
+            select(AccountingPeriod.id).where(
+                AccountingPeriod.id.in_(sealed_period_ids),
+                select(GLClosingBalance.id).where(GLClosingBalance.period_id == AccountingPeriod.id).exists()
+            ).order_by(AccountingPeriod.end_date.desc()).limit(1)
+        )
+        if closing_period_id is not None:
+            parts.append(accounts(select(
+                GLClosingBalance.account_id,
+                GLClosingBalance.debit_total.label("debit"),
+                GLClosingBalance.credit_total.label("credit")
+            ).where(GLClosingBalance.period_id == closing_period_id), GLClosingBalance.account_id))
+            sealed_period_ids = sealed_period_ids[sealed_period_ids.index(closing_period_id) + 1:]
+        if sealed_period_ids:
+            parts.append(accounts(select(
+                GLPeriodBalance.account_id,
+                GLPeriodBalance.debit_total.label("debit"),
+                GLPeriodBalance.credit_total.label("credit")
+            ).where(GLPeriodBalance.period_id.in_(sealed_period_ids)), GLPeriodBalance.account_id))
+        if not periods_only:
+            # Date ranges outside the sealed periods, each an index range scan
+            uncovered = [GLTransaction.transaction_date < sealed[0].start_date]
+            for previous, following in zip(sealed, sealed[1:]):
+                if following.start_date > previous.end_date + timedelta(days=1):
+                    uncovered.append(and_(
+                        GLTransaction.transaction_date > previous.end_date,
+                        GLTransaction.transaction_date < following.start_date
+                    ))
+            uncovered.append(GLTransaction.transaction_date > sealed[-1].end_date)
+            parts.append(balance_rows.where(or_(*uncovered)))
+        return union_all(*parts).subquery()
+    
+    @staticmethod
+    async def get_trial_balance(db: AsyncSession, company_id: int, report_date: date):
+        """Per-account debit/credit totals up to report_date.
+        
+        Closed periods are read from the closing and period balance snapshots;
+        only postings after the last contiguous closed period are aggregated
+        from gl_transactions.
+        """
+        balances = await GLService._trial_balance_rows(db, company_id, report_date)
+        
+        query = select(
+            GLAccount.id,
+            GLAccount.account_code,
+            GLAccount.account_name,
+            GLAccount.account_type,
+            func.sum(balances.c.debit).label("total_debit"),
+            func.sum(balances.c.credit).label("total_credit")
+        ).select_from(GLAccount).join(
+            balances, GLAccount.id == balances.c.account_id
+        ).where(
+            GLAccount.company_id == company_id,
+            GLAccount.is_active == True
+        ).group_by(
+            GLAccount.id, GLAccount.account_code, GLAccount.account_name, GLAccount.account_type
+        ).order_by(GLAccount.account_code)
+        
+        result = await db.execute(query)
+        return result.all()
+    
+    @staticmethod
+    async def get_trial_balance_lines(db: AsyncSession, company_id: int, report_date: date) -> List[Dict[str, Any]]:
+        """Trial balance presentation: net balance shown as a debit or a credit"""
+        rows = await GLService.get_trial_balance(db, company_id, report_date)
+        
+        trial_balance_lines = []
+        for row in rows:
+            total_debit = row.total_debit or Decimal("0.00")
+            total_credit = row.total_credit or Decimal("0.00")
+            balance = total_debit - total_credit
+            trial_balance_lines.append({
+                "account_id": row.id,
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "account_type": row.account_type,
+                "debit": total_debit if balance >= 0 else Decimal("0.00"), # Simplified presentation
+                "credit": -balance if balance < 0 else Decimal("0.00"), # Simplified presentation
+                "balance": balance # Raw balance can also be useful
+            })
+        return trial_balance_lines
+    
+    @staticmethod
+    async def get_rollup_trial_balance_lines(db: AsyncSession, company_id: int, report_date: date) -> List[Dict[str, Any]]:
+        """Trial balance with each account's totals including all of its sub-accounts.
+        
+        Account totals are added once to the account itself and once to each
+        ancestor in the closure table, then grouped per account, so the whole
+        tree is rolled up by one query. Lines are in account code order with
+        their level in the tree (0 for top-level accounts).
+        """
+        balances = await GLService._trial_balance_rows(db, company_id, report_date)
+        own = select(
+            balances.c.account_id,
+            func.sum(balances.c.debit).label("debit"),
+            func.sum(balances.c.credit).label("credit")
+        ).group_by(balances.c.account_id).cte("own")
+        rolled = union_all(
+            select(own.c.account_id.label("rollup_id"), own.c.account_id, own.c.debit, own.c.credit),
+            select(GLAccountClosure.ancestor_id, own.c.account_id, own.c.debit, own.c.credit).join(
+                GLAccountClosure, GLAccountClosure.descendant_id == own.c.account_id
+            )
+        ).subquery("rolled")
+        
+        level = select(func.count()).where(
+            GLAccountClosure.descendant_id == GLAccount.id
+        ).correlate(GLAccount).scalar_subquery()
+        is_own = rolled.c.account_id == rolled.c.rollup_id
+        query = select(
+            GLAccount.id,
+            GLAccount.account_code,
+            GLAccount.account_name,
+            GLAccount.account_type,
+            GLAccount.parent_account_id,
+            level.label("level"),
+            func.sum(rolled.c.debit).label("total_debit"),
+            func.sum(rolled.c.credit).label("total_credit"),
+            func.coalesce(func.sum(rolled.c.debit - rolled.c.credit).filter(is_own), 0).label("own_balance")
+        ).select_from(GLAccount).join(
+            rolled, GLAccount.id == rolled.c.rollup_id
+        ).where(
+            GLAccount.company_id == company_id,
+            GLAccount.is_active == True
+        ).group_by(
+            GLAccount.id, GLAccount.account_code, GLAccount.account_name,
+            GLAccount.account_type, GLAccount.parent_account_id
+        ).order_by(GLAccount.account_code)
+        
+        lines = []
+        for row in (await db.execute(query)).all():
+            total_debit = row.total_debit or Decimal("0.00")
+            total_credit = row.total_credit or Decimal("0.00")
+            balance = total_debit - total_credit
+            lines.append({
+                "account_id": row.id,
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "account_type": row.account_type,
+                "parent_account_id": row.parent_account_id,
+                "level": row.level,
+                "debit": balance if balance >= 0 else Decimal("0.00"),
+                "credit": -balance if balance < 0 else Decimal("0.00"),
+                "balance": balance,
+                "own_balance": row.own_balance
+            })
+        return lines
+    
+    @staticmethod
+    async def post_journal_entry_batch(
+        db: AsyncSession,
+        company_id: int,
+        user_id: int,
+        journal_entries: List[JournalEntryCreate]
+    ) -> List[JournalEntryBatchResult]:
+        """Validate and post many journal entries with set-based queries.
+        
+        Invalid entries are reported and skipped; valid entries are inserted in
+        bulk and account balances are updated once per account.
+        """
+        if not journal_entries:
+            return []
+        
+        # Load every referenced account, open period and existing JE id up front
+        account_ids = {line.account_id for je in journal_entries for line in je.lines}
+        accounts_result = await db.execute(
+            select(GLAccount.id, GLAccount.account_code, GLAccount.is_active).where(
+                GLAccount.company_id == company_id,
+                GLAccount.id.in_(account_ids)
+            )
+        )
+        accounts = {row.id: row for row in accounts_result.all()}
+        
+        periods = await period_cache.get_company_periods(db, company_id)
+        entry_periods = {je.transaction_date: periods.find(je.transaction_date, open_only=True) for je in journal_entries}
+        open_period_ids = await period_cache.open_period_ids(
+            db, company_id, {period.id for period in entry_periods.values() if period}
+        )
+        
+        existing_result = await db.execute(
+            select(GLTransaction.journal_entry_id).distinct().where(
+                GLTransaction.company_id == company_id,
+                GLTransaction.journal_entry_id.in_({je.journal_entry_id for je in journal_entries})
+            )
+        )
+        seen_ids = set(existing_result.scalars().all())
+        
+        results = []
+        rows = []
+        period_entries: Dict[int, List[Dict[str, Any]]] = {}
+        
+        for je in journal_entries:
+            lines = [
+                line for line in je.lines
+                if line.debit_amount != Decimal("0.00") or line.credit_amount != Decimal("0.00")
+            ]
+            total_debit = sum(line.debit_amount for line in lines)
+            total_credit = sum(line.credit_amount for line in lines)
+            period = entry_periods[je.transaction_date]
+            period_id = period.id if period and period.id in open_period_ids else None
+            
+            error = None
+            if je.journal_entry_id in seen_ids:
+                error = "Journal entry ID already exists"
+            elif not lines:
+                error = "No valid transaction lines provided."
+            elif total_debit != total_credit:
+                error = "Debits must equal credits"
+            elif total_debit == Decimal("0.00"):
+                error = "Journal entry cannot be for zero amount"
+            elif period_id is None:
+                error = "Transaction date is not in an open accounting period."
+            else:
+                for line in lines:
+                    account = accounts.get(line.account_id)
+                    if not account:
+                        error = f"Invalid GL Account ID: {line.account_id}"
+                        break
+                    if not account.is_active:
+                        error = f"GL Account {account.account_code} is not active."
+                        break
+            
+            seen_ids.add(je.journal_entry_id)
+            if error:
+                results.append(JournalEntryBatchResult(journal_entry_id=je.journal_entry_id, success=False, error=error))
+                continue
+            
+            for line in lines:
+                rows.append({
+                    'company_id': company_id,
+                    'journal_entry_id': je.journal_entry_id,
+                    'account_id': line.account_id,
+                    'transaction_date': je.transaction_date,
+                    'period_id': period_id,
+                    'description': line.description or je.description,
+                    'debit_amount': line.debit_amount,
+                    'credit_amount': line.credit_amount,
+                    'reference': je.reference,
+                    'source_module': "GL",
+                    'posted_by_user_id': user_id,
+                    'is_reversed': False
+                })
+                period_entries.setdefault(period_id, []).append({
+                    'account_id': line.account_id,
+                    'debit_amount': line.debit_amount,
+                    'credit_amount': line.credit_amount
+                })
+            results.append(JournalEntryBatchResult(journal_entry_id=je.journal_entry_id, success=True, lines_posted=len(lines)))
+        
+        if rows:
+            # Multi-row INSERT instead of one ORM object per line
+            await db.execute(insert(GLTransaction), rows)
+            
+            # One aggregated increment per touched account
+            await GLService.apply_account_balance_deltas(
+                db, [entry for entries in period_entries.values() for entry in entries]
+            )
+            
+            for period_id, entries in period_entries.items():
+                await GLService.apply_period_balances(db, company_id, period_id, entries)
+        
+        return results
@@ -1,46 +1,40 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
 from fastapi import HTTPException, status
 from datetime import datetime
 from decimal import Decimal
+from app.core.pagination import Page, paginate
 from app.models import (
     GoodsReceivedVoucher, GRVLine, PurchaseOrder, PurchaseOrderLine,
     OEDocumentType, InventoryTransaction, APTransaction
 )
 from app.schemas.grv import GRVCreate, GRVUpdate, GRVToInvoice
+from app.services.costing_service import CostingService, StockMovement
+from app.services.numbering_service import NumberingService
 
 
 class GRVService:
     
     @staticmethod
-    def generate_grv_number(db: Session) -> str:
+    async def generate_grv_number(db: AsyncSession) -> str:
         """Generate unique GRV number"""
         current_date = datetime.now()
         prefix = f"GRV{current_date.strftime('%y%m')}"
         
-        # Get the last GRV number for this month
-        last_grv = db.query(GoodsReceivedVoucher).filter(
-            GoodsReceivedVoucher.grv_number.like(f"{prefix}%")
-        ).order_by(GoodsReceivedVoucher.grv_number.desc()).first()
-        
-        if last_grv:
-            last_sequence = int(last_grv.grv_number[-4:])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        
-        return f"{prefix}{new_sequence:04d}"
+        return await NumberingService.next_number(
+            db, NumberingService.SHARED_SCOPE, prefix, width=4, mode=NumberingService.FAST
+        )
     
     @staticmethod
-    def create_grv(
-        db: Session,
+    async def create_grv(
+        db: AsyncSession,
         grv_data: GRVCreate,
         received_by: int
     ) -> GoodsReceivedVoucher:
         # Validate purchase order
-        po = db.query(PurchaseOrder).filter(
-            PurchaseOrder.id == grv_data.purchase_order_id
-        ).first()
+        po = await db.get(PurchaseOrder, grv_data.purchase_order_id)
         if not po:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -54,9 +48,7 @@ class GRVService:
             )
         
         # Validate document type
-        doc_type = db.query(OEDocumentType).filter(
-            OEDocumentType.id == grv_data.document_type_id
-        ).first()
+        doc_type = await db.get(OEDocumentType, grv_data.document_type_id)
         if not doc_type or doc_type.document_class != 'PURCHASE' or doc_type.transaction_type != 'GRV':
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -67,7 +59,7 @@ class GRVService:
         grv_dict = grv_data.dict(exclude={'line_items'})
         grv = GoodsReceivedVoucher(
             **grv_dict,
-            grv_number=GRVService.generate_grv_number(db),
+            grv_number=await GRVService.generate_grv_number(db),
             supplier_id=po.supplier_id,
             supplier_name=po.supplier_name,
             received_by=received_by,
@@ -77,10 +69,13 @@ class GRVService:
         # Process line items
         for idx, line_data in enumerate(grv_data.line_items):
             # Validate PO line
-            po_line = db.query(PurchaseOrderLine).filter(
-                PurchaseOrderLine.id == line_data.po_line_id,
-                PurchaseOrderLine.purchase_order_id == po.id
-            ).first()
+            result = await db.execute(
+                select(PurchaseOrderLine).where(
+                    PurchaseOrderLine.id == line_data.po_line_id,
+                    PurchaseOrderLine.purchase_order_id == po.id
+                )
+            )
+            po_line = result.scalar_one_or_none()
             if not po_line:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -113,15 +108,18 @@ class GRVService:
             grv.line_items.append(grv_line)
         
         db.add(grv)
-        db.commit()
-        db.refresh(grv)
-        return grv
+        await db.commit()
+        return await GRVService.get_grv(db, grv.id)
     
     @staticmethod
-    def get_grv(db: Session, grv_id: int) -> GoodsReceivedVoucher:
-        grv = db.query(GoodsReceivedVoucher).filter(
-            GoodsReceivedVoucher.id == grv_id
-        ).first()
+    async def get_grv(db: AsyncSession, grv_id: int) -> GoodsReceivedVoucher:
+        result = await db.execute(
+            select(GoodsReceivedVoucher)
+            .options(selectinload(GoodsReceivedVoucher.line_items))
+            .where(GoodsReceivedVoucher.id == grv_id)
+            .execution_options(populate_existing=True)
+        )
+        grv = result.scalar_one_or_none()
         if not grv:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -130,35 +128,50 @@ class GRVService:
         return grv
     
     @staticmethod
-    def get_grvs(
-        db: Session,
+    async def _get_purchase_order_with(db: AsyncSession, order_id: int, relationship) -> PurchaseOrder:
+        """Load a GRV's purchase order with one collection eagerly loaded"""
+        result = await db.execute(
+            select(PurchaseOrder)
+            .options(selectinload(relationship))
+            .where(PurchaseOrder.id == order_id)
+        )
+        return result.scalar_one()
+    
+    @staticmethod
+    async def get_grvs(
+        db: AsyncSession,
         purchase_order_id: Optional[int] = None,
         supplier_id: Optional[int] = None,
         status: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[GoodsReceivedVoucher]:
-        query = db.query(GoodsReceivedVoucher)
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        query = select(GoodsReceivedVoucher).options(selectinload(GoodsReceivedVoucher.line_items))
         
         if purchase_order_id:
-            query = query.filter(GoodsReceivedVoucher.purchase_order_id == purchase_order_id)
+            query = query.where(GoodsReceivedVoucher.purchase_order_id == purchase_order_id)
         
         if supplier_id:
-            query = query.filter(GoodsReceivedVoucher.supplier_id == supplier_id)
+            query = query.where(GoodsReceivedVoucher.supplier_id == supplier_id)
         
         if status:
-            query = query.filter(GoodsReceivedVoucher.status == status)
+            query = query.where(GoodsReceivedVoucher.status == status)
         
-        return query.order_by(GoodsReceivedVoucher.grv_date.desc()).offset(skip).limit(limit).all()
+        return await paginate(
+            db, query, [(GoodsReceivedVoucher.grv_date, True), (GoodsReceivedVoucher.id, True)],
+            limit, skip=skip, cursor=cursor, include_total=include_total
+        )
     
     @staticmethod
-    def post_grv_to_inventory(
-        db: Session,
+    async def post_grv_to_inventory(
+        db: AsyncSession,
         grv_id: int,
         posted_by: int
     ) -> GoodsReceivedVoucher:
         """Post GRV to inventory - updates stock quantities"""
-        grv = GRVService.get_grv(db, grv_id)
+        grv = await GRVService.get_grv(db, grv_id)
         
         if grv.status != 'DRAFT':
             raise HTTPException(
@@ -176,41 +189,27 @@ class GRVService:
         # In a real system, this would be configured properly
         receipt_type_id = 1
         
-        # Process each line item
-        for line in grv.line_items:
-            if line.quality_status == 'FAILED':
-                continue  # Skip failed items
-            
-            # Get inventory item
-            from app.models import InventoryItem
-            item = db.query(InventoryItem).filter(
-                InventoryItem.id == line.item_id
-            ).first()
-            
-            if not item:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Inventory item {line.item_id} not found"
-                )
-            
-            # Update inventory quantity and weighted average cost
-            old_qty = item.quantity_on_hand
-            old_value = old_qty * item.cost_price
-            new_qty = old_qty + line.received_quantity
-            new_value = old_value + (line.received_quantity * line.unit_price)
-            
-            if new_qty > 0:
-                item.cost_price = new_value / new_qty
-            item.quantity_on_hand = new_qty
-            
+        # Load the PO with its lines up front; GRV lines reference them by id
+        po = await GRVService._get_purchase_order_with(db, grv.purchase_order_id, PurchaseOrder.line_items)
+        po_lines = {po_line.id: po_line for po_line in po.line_items}
+        
+        # Lock every received item once (in id order) and cost all lines in one pass
+        lines = [line for line in grv.line_items if line.quality_status != 'FAILED']
+        costed = await CostingService.apply_movements(db, [
+            StockMovement(line.item_id, line.received_quantity, True, grv.grv_date.date(), unit_cost=line.unit_price)
+            for line in lines
+        ])
+        
+        for line, movement in zip(lines, costed):
             # Create inventory transaction
             inv_trans = InventoryTransaction(
+                company_id=movement.item.company_id,
                 item_id=line.item_id,
                 transaction_type_id=receipt_type_id,
                 transaction_date=grv.grv_date,
                 quantity=line.received_quantity,
-                unit_cost=line.unit_price,
-                total_cost=line.received_quantity * line.unit_price,
+                unit_cost=movement.unit_cost,
+                total_cost=movement.total_cost,
                 reference=grv.grv_number,
                 description=f"Receipt from GRV {grv.grv_number}",
                 source_module='OE',
@@ -220,7 +219,7 @@ class GRVService:
             db.add(inv_trans)
             
             # Update PO line received quantity
-            po_line = line.po_line
+            po_line = po_lines[line.po_line_id]
             po_line.received_quantity += line.received_quantity
         
         # Update GRV status
@@ -229,7 +228,6 @@ class GRVService:
         grv.inventory_posted_at = datetime.utcnow()
         
         # Check if PO is fully received
-        po = grv.purchase_order
         fully_received = True
         for po_line in po.line_items:
             if po_line.received_quantity < po_line.quantity:
@@ -239,18 +237,17 @@ class GRVService:
         if fully_received:
             po.status = 'RECEIVED'
         
-        db.commit()
-        db.refresh(grv)
-        return grv
+        await db.commit()
+        return await GRVService.get_grv(db, grv_id)
     
     @staticmethod
-    def convert_to_invoice(
-        db: Session,
+    async def convert_to_invoice(
+        db: AsyncSession,
         invoice_data: GRVToInvoice,
         posted_by: int
     ) -> APTransaction:
         """Convert GRV to AP supplier invoice"""
-        grv = GRVService.get_grv(db, invoice_data.grv_id)
+        grv = await GRVService.get_grv(db, invoice_data.grv_id)
         
         # Check if GRV can be invoiced
         if grv.status != 'POSTED':
@@ -260,9 +257,7 @@ class GRVService:
             )
         
         # Get invoice document type
-        doc_type = db.query(OEDocumentType).filter(
-            OEDocumentType.id == grv.document_type_id
-        ).first()
+        doc_type = await db.get(OEDocumentType, grv.document_type_id)
         
         if not doc_type or not doc_type.ap_transaction_type_id:
             raise HTTPException(
@@ -281,18 +276,10 @@ class GRVService:
         current_date = datetime.now()
         prefix = f"SINV{current_date.strftime('%y%m')}"
         
-        # Get the last invoice number for this month
-        last_invoice = db.query(APTransaction).filter(
-            APTransaction.transaction_number.like(f"{prefix}%")
-        ).order_by(APTransaction.transaction_number.desc()).first()
-        
-        if last_invoice:
-            last_sequence = int(last_invoice.transaction_number[-4:])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        
-        invoice_number = f"{prefix}{new_sequence:04d}"
+        # Invoice numbers are gap-free: allocated in this transaction
+        invoice_number = await NumberingService.next_number(
+            db, NumberingService.SHARED_SCOPE, prefix, width=4
+        )
         
         # Create AP transaction directly
         ap_transaction = APTransaction(
@@ -315,7 +302,7 @@ class GRVService:
         grv.status = 'INVOICED'
         
         # Update PO status if all GRVs are invoiced
-        po = grv.purchase_order
+        po = await GRVService._get_purchase_order_with(db, grv.purchase_order_id, PurchaseOrder.grvs)
         all_invoiced = True
         for po_grv in po.grvs:
             if po_grv.status != 'INVOICED':
@@ -325,18 +312,18 @@ class GRVService:
         if all_invoiced and po.status == 'RECEIVED':
             po.status = 'INVOICED'
         
-        db.commit()
-        db.refresh(ap_transaction)
+        await db.commit()
+        await db.refresh(ap_transaction)
         
         return ap_transaction
     
     @staticmethod
-    def update_grv(
-        db: Session,
+    async def update_grv(
+        db: AsyncSession,
         grv_id: int,
         grv_update: GRVUpdate
     ) -> GoodsReceivedVoucher:
-        grv = GRVService.get_grv(db, grv_id)
+        grv = await GRVService.get_grv(db, grv_id)
         
         # Check if GRV can be updated
         if grv.status != 'DRAFT':
@@ -349,13 +336,12 @@ class GRVService:
         for field, value in update_data.items():
             setattr(grv, field, value)
         
-        db.commit()
-        db.refresh(grv)
-        return grv
+        await db.commit()
+        return await GRVService.get_grv(db, grv_id)
     
     @staticmethod
-    def cancel_grv(db: Session, grv_id: int) -> GoodsReceivedVoucher:
-        grv = GRVService.get_grv(db, grv_id)
+    async def cancel_grv(db: AsyncSession, grv_id: int) -> GoodsReceivedVoucher:
+        grv = await GRVService.get_grv(db, grv_id)
         
         if grv.status != 'DRAFT':
             raise HTTPException(
@@ -364,6 +350,5 @@ class GRVService:
             )
         
         grv.status = 'CANCELLED'
-        db.commit()
-        db.refresh(grv)
-        return grv 
\ No newline at end of file
+        await db.commit()
+        return await GRVService.get_grv(db, grv_id) 
\ No newline at end of file
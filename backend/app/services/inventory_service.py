@@ -1,39 +1,47 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, and_, func, case, true
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict
-from datetime import datetime
-from decimal import Decimal
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 from fastapi import HTTPException, status
 
+from app.core.pagination import Page, paginate
+from app.core.period_cache import period_cache
 from app.models import (
     InventoryItem, InventoryTransactionType, InventoryTransaction,
-    GLTransaction, AccountingPeriod
+    ItemType, StockValuationSnapshot
 )
 from app.schemas.inventory import (
     InventoryItemCreate, InventoryItemUpdate,
     InventoryTransactionTypeCreate, InventoryTransactionTypeUpdate,
-    InventoryAdjustmentRequest
+    InventoryAdjustmentRequest, StockTakeRequest
 )
+from app.services.costing_service import CENT, CostingService, StockMovement
 from app.services.gl_service import GLService
+from app.services.search_service import SearchService
 
 
 class InventoryService:
     """Service for handling inventory operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     # Inventory Item Management
-    def create_item(self, company_id: int, item_data: InventoryItemCreate) -> InventoryItem:
+    async def create_item(self, company_id: int, item_data: InventoryItemCreate) -> InventoryItem:
         """Create a new inventory item"""
         # Check if item code already exists for this company
-        existing = self.db.query(InventoryItem).filter(
-            and_(
-                InventoryItem.company_id == company_id,
-                InventoryItem.item_code == item_data.item_code
+        result = await self.db.execute(
+            select(InventoryItem).where(
+                and_(
+                    InventoryItem.company_id == company_id,
+                    InventoryItem.item_code == item_data.item_code
+                )
             )
-        ).first()
+        )
+        existing = result.scalars().first()
         
         if existing:
             raise HTTPException(
@@ -47,68 +55,84 @@ class InventoryService:
         )
         
         self.db.add(item)
-        self.db.commit()
-        self.db.refresh(item)
+        await self.db.commit()
+        await self.db.refresh(item)
         
         return item
     
-    def get_item(self, company_id: int, item_id: int) -> Optional[InventoryItem]:
+    async def get_item(self, company_id: int, item_id: int) -> Optional[InventoryItem]:
         """Get a single inventory item"""
-        return self.db.query(InventoryItem).filter(
-            and_(
-                InventoryItem.company_id == company_id,
-                InventoryItem.id == item_id
+        result = await self.db.execute(
+            select(InventoryItem).where(
+                and_(
+                    InventoryItem.company_id == company_id,
+                    InventoryItem.id == item_id
+                )
             )
-        ).first()
+        )
+        return result.scalars().first()
     
-    def get_item_by_code(self, company_id: int, item_code: str) -> Optional[InventoryItem]:
+    async def get_item_by_code(self, company_id: int, item_code: str) -> Optional[InventoryItem]:
         """Get an inventory item by code"""
-        return self.db.query(InventoryItem).filter(
-            and_(
-                InventoryItem.company_id == company_id,
-                InventoryItem.item_code == item_code.upper()
+        result = await self.db.execute(
+            select(InventoryItem).where(
+                and_(
+                    InventoryItem.company_id == company_id,
+                    InventoryItem.item_code == item_code.upper()
+                )
             )
-        ).first()
+        )
+        return result.scalars().first()
     
-    def list_items(
+    async def list_items(
         self, 
         company_id: int, 
         skip: int = 0, 
         limit: int = 100,
         item_type: Optional[str] = None,
         is_active: Optional[bool] = None,
-        search: Optional[str] = None
-    ) -> List[InventoryItem]:
-        """List inventory items with filtering"""
-        query = self.db.query(InventoryItem).filter(
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        search_mode: str = SearchService.CONTAINS
+    ) -> Page:
+        """List inventory items with filtering, by offset or keyset cursor.
+
+        Ranked search returns a single page of best matches without a cursor.
+        """
+        query = select(InventoryItem).where(
             InventoryItem.company_id == company_id
         )
         
         if item_type:
-            query = query.filter(InventoryItem.item_type == item_type)
+            query = query.where(InventoryItem.item_type == item_type)
         
         if is_active is not None:
-            query = query.filter(InventoryItem.is_active == is_active)
+            query = query.where(InventoryItem.is_active == is_active)
+        
+        if search and search_mode == SearchService.RANKED:
+            return Page(items=await SearchService.ranked(
+                self.db, query, search, InventoryItem.item_code, [InventoryItem.description], limit
+            ))
         
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    InventoryItem.item_code.ilike(search_pattern),
-                    InventoryItem.description.ilike(search_pattern)
-                )
+            query = query.where(
+                SearchService.contains_filter(search, [InventoryItem.item_code, InventoryItem.description])
             )
         
-        return query.order_by(InventoryItem.item_code).offset(skip).limit(limit).all()
+        return await paginate(
+            self.db, query, [(InventoryItem.item_code, False), (InventoryItem.id, False)],
+            limit, skip=skip, cursor=cursor, include_total=include_total
+        )
     
-    def update_item(
+    async def update_item(
         self, 
         company_id: int, 
         item_id: int, 
         item_data: InventoryItemUpdate
     ) -> InventoryItem:
         """Update an inventory item"""
-        item = self.get_item(company_id, item_id)
+        item = await self.get_item(company_id, item_id)
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -120,14 +144,14 @@ class InventoryService:
         for field, value in update_data.items():
             setattr(item, field, value)
         
-        self.db.commit()
-        self.db.refresh(item)
+        await self.db.commit()
+        await self.db.refresh(item)
         
         return item
     
-    def delete_item(self, company_id: int, item_id: int) -> bool:
+    async def delete_item(self, company_id: int, item_id: int) -> bool:
         """Delete an inventory item (soft delete by deactivating)"""
-        item = self.get_item(company_id, item_id)
+        item = await self.get_item(company_id, item_id)
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -135,35 +159,41 @@ class InventoryService:
             )
         
         # Check if item has transactions
-        has_transactions = self.db.query(InventoryTransaction).filter(
-            InventoryTransaction.item_id == item_id
-        ).first()
+        result = await self.db.execute(
+            select(InventoryTransaction.id).where(
+                InventoryTransaction.item_id == item_id
+            ).limit(1)
+        )
+        has_transactions = result.first()
         
         if has_transactions:
             # Soft delete - just deactivate
             item.is_active = False
-            self.db.commit()
+            await self.db.commit()
         else:
             # Hard delete if no transactions
-            self.db.delete(item)
-            self.db.commit()
+            await self.db.delete(item)
+            await self.db.commit()
         
         return True
     
     # Transaction Type Management
-    def create_transaction_type(
+    async def create_transaction_type(
         self, 
         company_id: int, 
         tt_data: InventoryTransactionTypeCreate
     ) -> InventoryTransactionType:
         """Create a new inventory transaction type"""
         # Check if code already exists
-        existing = self.db.query(InventoryTransactionType).filter(
-            and_(
-                InventoryTransactionType.company_id == company_id,
-                InventoryTransactionType.code == tt_data.code
+        result = await self.db.execute(
+            select(InventoryTransactionType).where(
+                and_(
+                    InventoryTransactionType.company_id == company_id,
+                    InventoryTransactionType.code == tt_data.code
+                )
             )
-        ).first()
+        )
+        existing = result.scalars().first()
         
         if existing:
             raise HTTPException(
@@ -177,41 +207,47 @@ class InventoryService:
         )
         
         self.db.add(tt)
-        self.db.commit()
-        self.db.refresh(tt)
+        await self.db.commit()
+        await self.db.refresh(tt)
         
         return tt
     
-    def get_transaction_type(
+    async def get_transaction_type(
         self, 
         company_id: int, 
         tt_id: int
     ) -> Optional[InventoryTransactionType]:
         """Get a single transaction type"""
-        return self.db.query(InventoryTransactionType).filter(
-            and_(
-                InventoryTransactionType.company_id == company_id,
-                InventoryTransactionType.id == tt_id
+        result = await self.db.execute(
+            select(InventoryTransactionType).where(
+                and_(
+                    InventoryTransactionType.company_id == company_id,
+                    InventoryTransactionType.id == tt_id
+                )
             )
-        ).first()
+        )
+        return result.scalars().first()
     
-    def list_transaction_types(
+    async def list_transaction_types(
         self, 
         company_id: int
     ) -> List[InventoryTransactionType]:
         """List all inventory transaction types"""
-        return self.db.query(InventoryTransactionType).filter(
-            InventoryTransactionType.company_id == company_id
-        ).order_by(InventoryTransactionType.code).all()
+        result = await self.db.execute(
+            select(InventoryTransactionType).where(
+                InventoryTransactionType.company_id == company_id
+            ).order_by(InventoryTransactionType.code)
+        )
+        return result.scalars().all()
     
-    def update_transaction_type(
+    async def update_transaction_type(
         self, 
         company_id: int, 
         tt_id: int, 
         tt_data: InventoryTransactionTypeUpdate
     ) -> InventoryTransactionType:
         """Update a transaction type"""
-        tt = self.get_transaction_type(company_id, tt_id)
+        tt = await self.get_transaction_type(company_id, tt_id)
         if not tt:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -229,14 +265,14 @@ class InventoryService:
         for field, value in update_data.items():
             setattr(tt, field, value)
         
-        self.db.commit()
-        self.db.refresh(tt)
+        await self.db.commit()
+        await self.db.refresh(tt)
         
         return tt
     
-    def delete_transaction_type(self, company_id: int, tt_id: int) -> bool:
+    async def delete_transaction_type(self, company_id: int, tt_id: int) -> bool:
         """Delete a transaction type"""
-        tt = self.get_transaction_type(company_id, tt_id)
+        tt = await self.get_transaction_type(company_id, tt_id)
         if not tt:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -250,9 +286,12 @@ class InventoryService:
             )
         
         # Check if used in transactions
-        has_transactions = self.db.query(InventoryTransaction).filter(
-            InventoryTransaction.transaction_type_id == tt_id
-        ).first()
+        result = await self.db.execute(
+            select(InventoryTransaction.id).where(
+                InventoryTransaction.transaction_type_id == tt_id
+            ).limit(1)
+        )
+        has_transactions = result.first()
         
         if has_transactions:
             raise HTTPException(
@@ -260,13 +299,13 @@ class InventoryService:
                 detail="Cannot delete transaction type that has been used"
             )
         
-        self.db.delete(tt)
-        self.db.commit()
+        await self.db.delete(tt)
+        await self.db.commit()
         
         return True
     
     # Inventory Adjustment Processing
-    def process_adjustment(
+    async def process_adjustment(
         self, 
         company_id: int, 
         user_id: int,
@@ -274,7 +313,7 @@ class InventoryService:
     ) -> InventoryTransaction:
         """Process an inventory adjustment with GL integration"""
         # Validate item
-        item = self.get_item(company_id, adjustment.item_id)
+        item = await self.get_item(company_id, adjustment.item_id)
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -288,7 +327,7 @@ class InventoryService:
             )
         
         # Validate transaction type
-        tt = self.get_transaction_type(company_id, adjustment.transaction_type_id)
+        tt = await self.get_transaction_type(company_id, adjustment.transaction_type_id)
         if not tt:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -296,14 +335,7 @@ class InventoryService:
             )
         
         # Check accounting period
-        period = self.db.query(AccountingPeriod).filter(
-            and_(
-                AccountingPeriod.company_id == company_id,
-                AccountingPeriod.start_date <= adjustment.transaction_date,
-                AccountingPeriod.end_date >= adjustment.transaction_date,
-                AccountingPeriod.is_closed == False
-            )
-        ).first()
+        period = await period_cache.find_open(self.db, company_id, adjustment.transaction_date)
         
         if not period:
             raise HTTPException(
@@ -311,31 +343,17 @@ class InventoryService:
                 detail="No open accounting period for the transaction date"
             )
         
-        # Calculate costs based on weighted average
-        if tt.is_increase:
-            # For increases, use the provided cost or current cost
-            unit_cost = item.cost_price
-            total_cost = unit_cost * adjustment.quantity
-            
-            # Update weighted average cost
-            new_qty = item.quantity_on_hand + adjustment.quantity
-            if new_qty > 0:
-                current_value = item.quantity_on_hand * item.cost_price
-                new_value = current_value + total_cost
-                item.cost_price = new_value / new_qty
-            
-            item.quantity_on_hand = new_qty
-        else:
-            # For decreases, use current weighted average
-            if adjustment.quantity > item.quantity_on_hand:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient quantity. Available: {item.quantity_on_hand}"
-                )
-            
-            unit_cost = item.cost_price
-            total_cost = unit_cost * adjustment.quantity
-            item.quantity_on_hand -= adjustment.quantity
+        # Lock the item and apply the weighted average cost
+        costed = (await CostingService.apply_movements(
+            self.db,
+            [StockMovement(
+                item.id, adjustment.quantity, tt.is_increase, adjustment.transaction_date.date(),
+                unit_cost=adjustment.unit_cost if tt.is_increase else None
+            )],
+            company_id
+        ))[0]
+        unit_cost = costed.unit_cost
+        total_cost = costed.total_cost
         
         # Create inventory transaction
         inv_trans = InventoryTransaction(
@@ -353,6 +371,7 @@ class InventoryService:
         )
         
         self.db.add(inv_trans)
+        await self.db.flush()
         
         # Create GL entries
         gl_entries = []
@@ -390,105 +409,334 @@ class InventoryService:
                 'description': f"Inventory decrease: {item.item_code}"
             })
         
-        # Post to GL
+        # Post to GL (journal entry, account balances and period snapshot)
         try:
-            # Generate journal entry ID
-            from datetime import datetime as dt
-            timestamp = dt.now().strftime("%Y%m%d%H%M%S")
-            journal_entry_id = f"JE-INV-{timestamp}"
-            
-            # Create GL transactions for each entry
-            for entry in gl_entries:
-                gl_transaction = GLTransaction(
-                    company_id=company_id,
-                    journal_entry_id=journal_entry_id,
-                    account_id=entry['account_id'],
-                    transaction_date=adjustment.transaction_date,
-                    period_id=period.id,
-                    description=entry.get('description', ''),
-                    debit_amount=entry.get('debit_amount', Decimal('0')),
-                    credit_amount=entry.get('credit_amount', Decimal('0')),
-                    reference=adjustment.reference or f"INV-ADJ-{inv_trans.id}",
-                    source_module="INV",
-                    source_document_id=inv_trans.id,
-                    posted_by_id=user_id,
-                    is_reversed=False
-                )
-                self.db.add(gl_transaction)
+            await GLService.create_journal_entry(
+                self.db,
+                company_id,
+                transaction_date=adjustment.transaction_date,
+                reference=adjustment.reference or f"INV-ADJ-{inv_trans.id}",
+                description=inv_trans.description,
+                entries=gl_entries,
+                source_module="INV",
+                source_document_id=inv_trans.id,
+                period_id=period.id,
+                posted_by=user_id
+            )
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"GL posting failed: {str(e)}"
             )
         
-        self.db.commit()
-        self.db.refresh(inv_trans)
+        await self.db.commit()
+        
+        return await self.get_item_transaction(company_id, inv_trans.id)
+    
+    async def process_stock_take(
+        self,
+        company_id: int,
+        user_id: int,
+        stock_take: StockTakeRequest
+    ) -> Dict:
+        """Post the variances between counted quantities and quantity on hand.
+        
+        Items are locked and costed in bulk, inventory transactions are written
+        with one multi-row INSERT and the GL receives a single journal entry
+        with one line per account.
+        """
+        increase_tt = await self.get_transaction_type(company_id, stock_take.increase_type_id)
+        decrease_tt = await self.get_transaction_type(company_id, stock_take.decrease_type_id)
+        if not increase_tt or not decrease_tt:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transaction type not found"
+            )
+        if not increase_tt.is_increase or decrease_tt.is_increase:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="increase_type_id must be an increase type and decrease_type_id a decrease type"
+            )
+        
+        period = await period_cache.find_open(self.db, company_id, stock_take.transaction_date)
+        if not period:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No open accounting period for the transaction date"
+            )
+        
+        # Resolve item codes to ids in bulk
+        codes = {line.item_code for line in stock_take.lines if line.item_id is None}
+        code_ids: Dict[str, int] = {}
+        codes_list = sorted(codes)
+        for start in range(0, len(codes_list), CostingService.LOCK_CHUNK_SIZE):
+            result = await self.db.execute(
+                select(InventoryItem.item_code, InventoryItem.id).where(
+                    InventoryItem.company_id == company_id,
+                    InventoryItem.item_code.in_(codes_list[start:start + CostingService.LOCK_CHUNK_SIZE])
+                )
+            )
+            code_ids.update({row.item_code: row.id for row in result.all()})
+        
+        counts: Dict[int, Decimal] = {}
+        errors = []
+        for number, line in enumerate(stock_take.lines, start=1):
+            item_id = line.item_id if line.item_id is not None else code_ids.get(line.item_code)
+            if item_id is None:
+                errors.append(f"Line {number}: item {line.item_code} not found")
+            elif item_id in counts:
+                errors.append(f"Line {number}: item {line.item_code or item_id} counted more than once")
+            else:
+                counts[item_id] = line.counted_quantity
+        
+        # Previews read without locking; postings lock every counted item in id order
+        items = await CostingService.lock_items(
+            self.db, counts, company_id, for_update=not stock_take.dry_run
+        )
+        
+        for item_id in counts:
+            item = items.get(item_id)
+            if not item:
+                errors.append(f"Item {item_id} not found")
+            elif not item.is_active:
+                errors.append(f"Item {item.item_code} is inactive")
+        if errors:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=errors[:100]
+            )
+        
+        # Variances in item id order (the lock order)
+        movements = []
+        variances = []
+        for item_id in sorted(counts):
+            item = items[item_id]
+            variance = counts[item_id] - item.quantity_on_hand
+            if variance == 0:
+                continue
+            movements.append(StockMovement(item_id, abs(variance), variance > 0, stock_take.transaction_date.date()))
+            variances.append({
+                "item_id": item_id,
+                "item_code": item.item_code,
+                "quantity_on_hand": item.quantity_on_hand,
+                "counted_quantity": counts[item_id],
+                "variance": variance,
+                "unit_cost": item.cost_price,
+                "variance_value": (item.cost_price * variance).quantize(CENT, ROUND_HALF_UP)
+            })
+        
+        response = {
+            "dry_run": stock_take.dry_run,
+            "journal_entry_id": None,
+            "items_counted": len(counts),
+            "items_adjusted": len(variances),
+            "increase_value": sum((v["variance_value"] for v in variances if v["variance"] > 0), Decimal("0.00")),
+            "decrease_value": -sum((v["variance_value"] for v in variances if v["variance"] < 0), Decimal("0.00")),
+            "variances": variances
+        }
+        if stock_take.dry_run or not movements:
+            await self.db.rollback()
+            return response
+        
+        costed = await CostingService.apply_movements(self.db, movements, company_id, items=items)
+        
+        description = stock_take.description or f"Stock take {stock_take.reference or ''}".strip()
+        rows = []
+        account_totals: Dict[int, Decimal] = {}
+        for movement in costed:
+            tt = increase_tt if movement.movement.is_increase else decrease_tt
+            sign = 1 if movement.movement.is_increase else -1
+            rows.append({
+                "company_id": company_id,
+                "transaction_type_id": tt.id,
+                "item_id": movement.item.id,
+                "transaction_date": stock_take.transaction_date,
+                "reference": stock_take.reference,
+                "description": description,
+                "quantity": sign * movement.movement.quantity,
+                "unit_cost": movement.unit_cost,
+                "total_cost": sign * movement.total_cost,
+                "source_module": "INV",
+                "posted_by_id": user_id
+            })
+            # Inventory account moves with the stock, the contra account against it
+            contra_account = tt.contra_gl_account_id or tt.gl_account_id
+            account_totals[tt.gl_account_id] = account_totals.get(tt.gl_account_id, Decimal("0")) + sign * movement.total_cost
+            account_totals[contra_account] = account_totals.get(contra_account, Decimal("0")) - sign * movement.total_cost
+        
+        await self.db.execute(insert(InventoryTransaction), rows)
+        
+        # One line per GL account, net of surpluses and shortages
+        gl_entries = [
+            {
+                'account_id': account_id,
+                'debit_amount': amount if amount > 0 else Decimal('0.00'),
+                'credit_amount': -amount if amount < 0 else Decimal('0.00'),
+                'description': description
+            }
+            for account_id, amount in sorted(account_totals.items())
+            if amount != 0
+        ]
+        if gl_entries:
+            response["journal_entry_id"] = await GLService.create_journal_entry(
+                self.db,
+                company_id,
+                transaction_date=stock_take.transaction_date,
+                reference=stock_take.reference or "STOCK-TAKE",
+                description=description,
+                entries=gl_entries,
+                source_module="INV",
+                period_id=period.id,
+                posted_by=user_id
+            )
+        
+        await self.db.commit()
         
-        return inv_trans
+        # Report the values actually posted
+        for variance, movement in zip(variances, costed):
+            sign = 1 if movement.movement.is_increase else -1
+            variance["variance_value"] = sign * movement.total_cost
+        response["increase_value"] = sum((m.total_cost for m in costed if m.movement.is_increase), Decimal("0.00"))
+        response["decrease_value"] = sum((m.total_cost for m in costed if not m.movement.is_increase), Decimal("0.00"))
+        return response
+    
+    async def get_item_transaction(
+        self,
+        company_id: int,
+        transaction_id: int
+    ) -> Optional[InventoryTransaction]:
+        """Get a single inventory transaction with its item and type loaded"""
+        result = await self.db.execute(
+            select(InventoryTransaction)
+            .options(
+                selectinload(InventoryTransaction.item),
+                selectinload(InventoryTransaction.transaction_type)
+            )
+            .where(
+                and_(
+                    InventoryTransaction.company_id == company_id,
+                    InventoryTransaction.id == transaction_id
+                )
+            )
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
     
     # Reporting
-    def get_stock_quantity_report(
+    async def get_stock_quantity_report(
         self,
         company_id: int,
         item_type: Optional[str] = None,
         show_zero_qty: bool = False,
         item_code_from: Optional[str] = None,
-        item_code_to: Optional[str] = None
-    ) -> List[Dict]:
-        """Generate stock quantity report"""
-        query = self.db.query(InventoryItem).filter(
-            and_(
-                InventoryItem.company_id == company_id,
-                InventoryItem.is_active == True
+        item_code_to: Optional[str] = None,
+        as_at_date: Optional[date] = None
+    ) -> Dict:
+        """Generate stock quantity report, optionally as at the end of a past date.
+
+        One query returns the rows with the item count and total value worked
+        out by window functions. Current stock comes from the items; as-at
+        stock is each item's latest valuation snapshot on or before the date
+        plus any InventoryTransaction rows after that snapshot up to the date.
+        """
+        item = InventoryItem
+        if as_at_date is None:
+            quantity = item.quantity_on_hand
+            cost_price = item.cost_price
+            total_value = func.round(item.quantity_on_hand * item.cost_price, 2)
+        else:
+            snapshot = select(
+                StockValuationSnapshot.snapshot_date,
+                StockValuationSnapshot.quantity_on_hand,
+                StockValuationSnapshot.cost_price,
+                StockValuationSnapshot.total_value
+            ).where(
+                StockValuationSnapshot.item_id == item.id,
+                StockValuationSnapshot.snapshot_date <= as_at_date
+            ).order_by(StockValuationSnapshot.snapshot_date.desc()).limit(1).lateral("snapshot")
+            
+            # Transactions after the snapshot's day (all of them if the item has none)
+            since = func.coalesce(snapshot.c.snapshot_date + 1, date.min)
+            movements = select(
+                func.coalesce(func.sum(InventoryTransaction.quantity), 0).label("quantity"),
+                func.coalesce(func.sum(InventoryTransaction.total_cost), 0).label("value")
+            ).where(
+                InventoryTransaction.item_id == item.id,
+                InventoryTransaction.transaction_date >= since,
+                InventoryTransaction.transaction_date < as_at_date + timedelta(days=1)
+            ).lateral("movements")
+            
+            quantity = func.coalesce(snapshot.c.quantity_on_hand, 0) + movements.c.quantity
+            total_value = func.coalesce(snapshot.c.total_value, 0) + movements.c.value
+            cost_price = case(
+                (quantity > 0, func.round(total_value / quantity, 2)),
+                else_=func.coalesce(snapshot.c.cost_price, 0)
             )
-        )
         
-        if item_type:
-            query = query.filter(InventoryItem.item_type == item_type)
-        else:
+        stock = select(
+            item.item_code,
+            item.description,
+            item.item_type,
+            item.unit_of_measure,
+            quantity.label("quantity_on_hand"),
+            cost_price.label("cost_price"),
+            item.selling_price,
+            total_value.label("total_value"),
+            item.is_active
+        ).where(
+            item.company_id == company_id,
+            item.is_active == True,
             # Default to stock items only
-            query = query.filter(InventoryItem.item_type == "Stock")
-        
-        if not show_zero_qty:
-            query = query.filter(InventoryItem.quantity_on_hand > 0)
+            item.item_type == (item_type or ItemType.STOCK)
+        )
+        if as_at_date is not None:
+            stock = stock.select_from(item).join(snapshot, true(), isouter=True).join(movements, true())
         
         if item_code_from:
-            query = query.filter(InventoryItem.item_code >= item_code_from.upper())
+            stock = stock.where(item.item_code >= item_code_from.upper())
         
         if item_code_to:
-            query = query.filter(InventoryItem.item_code <= item_code_to.upper())
-        
-        items = query.order_by(InventoryItem.item_code).all()
+            stock = stock.where(item.item_code <= item_code_to.upper())
+        
+        stock = stock.subquery()
+        query = select(
+            stock,
+            func.count().over().label("item_count"),
+            func.sum(stock.c.total_value).over().label("value_sum")
+        ).order_by(stock.c.item_code)
+        if not show_zero_qty:
+            query = query.where(stock.c.quantity_on_hand > 0)
         
         report_data = []
-        total_value = Decimal('0.00')
-        
-        for item in items:
-            item_value = item.quantity_on_hand * item.cost_price
-            total_value += item_value
-            
+        total_items = 0
+        total_value_sum = Decimal('0.00')
+        for row in (await self.db.execute(query)).all():
+            total_items = row.item_count
+            total_value_sum = row.value_sum
             report_data.append({
-                'item_code': item.item_code,
-                'description': item.description,
-                'item_type': item.item_type.value,
-                'unit_of_measure': item.unit_of_measure,
-                'quantity_on_hand': float(item.quantity_on_hand),
-                'cost_price': float(item.cost_price),
-                'selling_price': float(item.selling_price),
-                'total_value': float(item_value),
-                'is_active': item.is_active
+                'item_code': row.item_code,
+                'description': row.description,
+                'item_type': row.item_type.value,
+                'unit_of_measure': row.unit_of_measure,
+                'quantity_on_hand': row.quantity_on_hand,
+                'cost_price': row.cost_price,
+                'selling_price': row.selling_price,
+                'total_value': row.total_value,
+                'is_active': row.is_active
             })
         
         return {
             'items': report_data,
             'summary': {
-                'total_items': len(report_data),
-                'total_value': float(total_value)
+                'as_at_date': as_at_date,
+                'total_items': total_items,
+                'total_value': total_value_sum
             }
         }
     
-    def get_item_transactions(
+    async def get_item_transactions(
         self,
         company_id: int,
         item_id: int,
@@ -496,7 +744,10 @@ class InventoryService:
         date_to: Optional[datetime] = None
     ) -> List[InventoryTransaction]:
         """Get transaction history for an item"""
-        query = self.db.query(InventoryTransaction).filter(
+        query = select(InventoryTransaction).options(
+            selectinload(InventoryTransaction.item),
+            selectinload(InventoryTransaction.transaction_type)
+        ).where(
             and_(
                 InventoryTransaction.company_id == company_id,
                 InventoryTransaction.item_id == item_id
@@ -504,9 +755,12 @@ class InventoryService:
         )
         
         if date_from:
-            query = query.filter(InventoryTransaction.transaction_date >= date_from)
+            query = query.where(InventoryTransaction.transaction_date >= date_from)
         
         if date_to:
-            query = query.filter(InventoryTransaction.transaction_date <= date_to)
+            query = query.where(InventoryTransaction.transaction_date <= date_to)
         
-        return query.order_by(InventoryTransaction.transaction_date.desc()).all() 
\ No newline at end of file
+        result = await self.db.execute(
+            query.order_by(InventoryTransaction.transaction_date.desc())
+        )
+        return result.scalars().all() 
\ No newline at end of file
@@ -0,0 +1,72 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import numbering_engine
+from app.models import DocumentSequence
+
+
+class NumberingService:
+    """Document number allocation backed by the document_sequences counter table.
+    
+    Each allocation is a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+    against the (company_id, prefix) unique index.
+    
+    - GAP_FREE runs in the caller's transaction: the counter row stays locked
+      until the caller commits, and a rollback gives the number back.
+    - FAST commits the increment straight away on a connection from the
+      separate numbering pool, so concurrent callers never wait on each
+      other or on the primary pool; a rolled back document leaves a gap.
+    """
+    
+    GAP_FREE = "gap_free"
+    FAST = "fast"
+    
+    # Scope for numbers that must be unique across all companies (OE documents)
+    SHARED_SCOPE = 0
+    
+    @staticmethod
+    def _increment_statement(company_id: int, prefix: str, count: int = 1):
+        sequences = DocumentSequence.__table__
+        stmt = pg_insert(sequences).values(company_id=company_id, prefix=prefix, last_value=count)
+        return stmt.on_conflict_do_update(
+            constraint='_document_sequence_uc',
+            set_={
+                'last_value': sequences.c.last_value + count,
+                'updated_at': func.now()
+            }
+        ).returning(sequences.c.last_value)
+    
+    @staticmethod
+    async def next_value(db: AsyncSession, company_id: int, prefix: str, mode: str = GAP_FREE) -> int:
+        """Allocate the next counter value for a prefix"""
+        stmt = NumberingService._increment_statement(company_id, prefix)
+        if mode == NumberingService.FAST:
+            async with numbering_engine.begin() as conn:
+                result = await conn.execute(stmt)
+                return result.scalar_one()
+        result = await db.execute(stmt)
+        return result.scalar_one()
+    
+    @staticmethod
+    async def next_values(db: AsyncSession, company_id: int, prefix: str, count: int, mode: str = GAP_FREE) -> range:
+        """Allocate a block of consecutive counter values with one increment"""
+        stmt = NumberingService._increment_statement(company_id, prefix, count)
+        if mode == NumberingService.FAST:
+            async with numbering_engine.begin() as conn:
+                last_value = (await conn.execute(stmt)).scalar_one()
+        else:
+            last_value = (await db.execute(stmt)).scalar_one()
+        return range(last_value - count + 1, last_value + 1)
+    
+    @staticmethod
+    async def next_number(
+        db: AsyncSession,
+        company_id: int,
+        prefix: str,
+        width: int = 6,
+        mode: str = GAP_FREE
+    ) -> str:
+        """Allocate the next document number, e.g. AR000042"""
+        value = await NumberingService.next_value(db, company_id, prefix, mode)
+        return f"{prefix}{value:0{width}d}"
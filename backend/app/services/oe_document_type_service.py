@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from fastapi import HTTPException, status
 from app.models import OEDocumentType
@@ -8,11 +9,12 @@ from app.schemas.oe_document_type import OEDocumentTypeCreate, OEDocumentTypeUpd
 class OEDocumentTypeService:
     
     @staticmethod
-    def create_document_type(db: Session, doc_type_data: OEDocumentTypeCreate) -> OEDocumentType:
+    async def create_document_type(db: AsyncSession, doc_type_data: OEDocumentTypeCreate) -> OEDocumentType:
         # Check if code already exists
-        existing = db.query(OEDocumentType).filter(
-            OEDocumentType.code == doc_type_data.code
-        ).first()
+        result = await db.execute(
+            select(OEDocumentType).where(OEDocumentType.code == doc_type_data.code)
+        )
+        existing = result.scalars().first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,13 +40,13 @@ class OEDocumentTypeService:
         # Create document type
         doc_type = OEDocumentType(**doc_type_data.dict())
         db.add(doc_type)
-        db.commit()
-        db.refresh(doc_type)
+        await db.commit()
+        await db.refresh(doc_type)
         return doc_type
     
     @staticmethod
-    def get_document_type(db: Session, doc_type_id: int) -> OEDocumentType:
-        doc_type = db.query(OEDocumentType).filter(OEDocumentType.id == doc_type_id).first()
+    async def get_document_type(db: AsyncSession, doc_type_id: int) -> OEDocumentType:
+        doc_type = await db.get(OEDocumentType, doc_type_id)
         if not doc_type:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -53,8 +55,11 @@ class OEDocumentTypeService:
         return doc_type
     
     @staticmethod
-    def get_document_type_by_code(db: Session, code: str) -> OEDocumentType:
-        doc_type = db.query(OEDocumentType).filter(OEDocumentType.code == code).first()
+    async def get_document_type_by_code(db: AsyncSession, code: str) -> OEDocumentType:
+        result = await db.execute(
+            select(OEDocumentType).where(OEDocumentType.code == code)
+        )
+        doc_type = result.scalars().first()
         if not doc_type:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -63,45 +68,46 @@ class OEDocumentTypeService:
         return doc_type
     
     @staticmethod
-    def get_document_types(
-        db: Session,
+    async def get_document_types(
+        db: AsyncSession,
         document_class: Optional[str] = None,
         transaction_type: Optional[str] = None,
         skip: int = 0,
         limit: int = 100
     ) -> List[OEDocumentType]:
-        query = db.query(OEDocumentType)
+        query = select(OEDocumentType)
         
         if document_class:
-            query = query.filter(OEDocumentType.document_class == document_class)
+            query = query.where(OEDocumentType.document_class == document_class)
         
         if transaction_type:
-            query = query.filter(OEDocumentType.transaction_type == transaction_type)
+            query = query.where(OEDocumentType.transaction_type == transaction_type)
         
-        return query.offset(skip).limit(limit).all()
+        result = await db.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
     
     @staticmethod
-    def update_document_type(
-        db: Session,
+    async def update_document_type(
+        db: AsyncSession,
         doc_type_id: int,
         doc_type_update: OEDocumentTypeUpdate
     ) -> OEDocumentType:
-        doc_type = OEDocumentTypeService.get_document_type(db, doc_type_id)
+        doc_type = await OEDocumentTypeService.get_document_type(db, doc_type_id)
         
         update_data = doc_type_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(doc_type, field, value)
         
-        db.commit()
-        db.refresh(doc_type)
+        await db.commit()
+        await db.refresh(doc_type)
         return doc_type
     
     @staticmethod
-    def delete_document_type(db: Session, doc_type_id: int) -> None:
-        doc_type = OEDocumentTypeService.get_document_type(db, doc_type_id)
+    async def delete_document_type(db: AsyncSession, doc_type_id: int) -> None:
+        doc_type = await OEDocumentTypeService.get_document_type(db, doc_type_id)
         
         # Check if document type is in use
         # TODO: Add checks for sales orders, purchase orders, etc.
         
-        db.delete(doc_type)
-        db.commit() 
\ No newline at end of file
+        await db.delete(doc_type)
+        await db.commit() 
\ No newline at end of file
@@ -0,0 +1,534 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine, AsyncSessionLocal
+from app.core.period_cache import period_cache
+from app.models import (
+    AccountingPeriod, PeriodCloseJob, Company, GLAccount, GLTransaction, ARTransaction, APTransaction
+)
+from app.services.gl_service import GLService
+from app.services.report_job_service import ReportJobService
+
+
+class PeriodCloseError(Exception):
+    """A step cannot run until something is fixed; the job fails with this message"""
+
+
+Step = Callable[[AsyncSession, PeriodCloseJob, AccountingPeriod], Awaitable[None]]
+
+
+def _record(job: PeriodCloseJob, **values) -> None:
+    job.result = {**(job.result or {}), **values}
+
+
+async def _is_year_end(db: AsyncSession, period: AccountingPeriod) -> bool:
+    """Whether the period is the last of its financial year"""
+    last_end = await db.scalar(
+        select(func.max(AccountingPeriod.end_date)).where(
+            AccountingPeriod.company_id == period.company_id,
+            AccountingPeriod.financial_year == period.financial_year
+        )
+    )
+    return last_end == period.end_date
+
+
+async def _year_end_journal(db: AsyncSession, period: AccountingPeriod) -> Optional[str]:
+    """The retained earnings journal posted by closing the period, unless reversed"""
+    return await db.scalar(
+        select(GLTransaction.journal_entry_id).where(
+            GLTransaction.company_id == period.company_id,
+            GLTransaction.source_module == PeriodCloseService.YEAR_END_SOURCE,
+            GLTransaction.source_document_id == period.id,
+            GLTransaction.is_reversed == False,
+            ~GLTransaction.journal_entry_id.startswith("REV-")
+        ).limit(1)
+    )
+
+
+async def _retained_earnings_account(db: AsyncSession, company_id: int) -> GLAccount:
+    company = await db.get(Company, company_id)
+    account_id = (company.settings or {}).get("retained_earnings_account_id")
+    account = None
+    if account_id:
+        account = await db.get(GLAccount, account_id)
+    elif settings.RETAINED_EARNINGS_ACCOUNT_CODE:
+        account = await db.scalar(
+            select(GLAccount).where(
+                GLAccount.company_id == company_id,
+                GLAccount.account_code == settings.RETAINED_EARNINGS_ACCOUNT_CODE
+            )
+        )
+    if (account is None or account.company_id != company_id
+            or account.account_type != "EQUITY" or not account.is_active):
+        raise PeriodCloseError(
+            "No retained earnings account: set the company's retained_earnings_account_id setting "
+            "(or RETAINED_EARNINGS_ACCOUNT_CODE) to an active EQUITY account"
+        )
+    return account
+
+
+async def _validate(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    if period.is_closed:
+        raise PeriodCloseError("Period is already closed")
+
+    if await _is_year_end(db, period):
+        open_earlier = await db.scalar(
+            select(func.count(AccountingPeriod.id)).where(
+                AccountingPeriod.company_id == period.company_id,
+                AccountingPeriod.financial_year == period.financial_year,
+                AccountingPeriod.start_date < period.start_date,
+                AccountingPeriod.is_closed == False
+            )
+        )
+        if open_earlier:
+            raise PeriodCloseError(
+                f"Close the {open_earlier} earlier open period(s) of financial year {period.financial_year} first"
+            )
+
+    unposted = []
+    for model, label in ((ARTransaction, "AR"), (APTransaction, "AP")):
+        count = await db.scalar(
+            select(func.count(model.id)).where(
+                model.company_id == period.company_id,
+                model.is_posted == False,
+                model.transaction_date >= period.start_date,
+                model.transaction_date <= period.end_date
+            )
+        )
+        if count:
+            unposted.append(f"{count} {label}")
+    if unposted:
+        raise PeriodCloseError(
+            f"Post or delete the unposted transactions dated in this period first ({' and '.join(unposted)})"
+        )
+
+
+async def _post_retained_earnings(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    """At year end, move the year's income and expense balances to retained earnings"""
+    if not await _is_year_end(db, period):
+        return
+    journal_id = await _year_end_journal(db, period)
+    if journal_id is not None:
+        _record(job, retained_earnings_journal_id=journal_id)
+        return
+
+    year_start = await db.scalar(
+        select(func.min(AccountingPeriod.start_date)).where(
+            AccountingPeriod.company_id == period.company_id,
+            AccountingPeriod.financial_year == period.financial_year
+        )
+    )
+    net = func.sum(GLTransaction.debit_amount - GLTransaction.credit_amount)
+    result = await db.execute(
+        select(GLTransaction.account_id, net).join(
+            GLAccount, GLAccount.id == GLTransaction.account_id
+        ).where(
+            GLTransaction.company_id == period.company_id,
+            GLTransaction.transaction_date >= year_start,
+            GLTransaction.transaction_date <= period.end_date,
+            GLAccount.account_type.in_(["INCOME", "EXPENSE"])
+        ).group_by(GLTransaction.account_id).having(net != 0).order_by(GLTransaction.account_id)
+    )
+    balances = result.all()
+    if not balances:
+        return
+
+    entries = [
+        {"account_id": account_id, "debit_amount": Decimal("0.00"), "credit_amount": amount}
+        if amount > 0 else
+        {"account_id": account_id, "debit_amount": -amount, "credit_amount": Decimal("0.00")}
+        for account_id, amount in balances
+    ]
+    profit_or_loss = sum(amount for _, amount in balances)
+    if profit_or_loss != 0:
+        retained_earnings = await _retained_earnings_account(db, period.company_id)
+        entries.append({
+            "account_id": retained_earnings.id,
+            "debit_amount": profit_or_loss if profit_or_loss > 0 else Decimal("0.00"),
+            "credit_amount": -profit_or_loss if profit_or_loss < 0 else Decimal("0.00")
+        })
+
+    journal_id = await GLService.create_journal_entry(
+        db, period.company_id, period.end_date,
+        reference=f"YE-{period.financial_year}",
+        description=f"Close financial year {period.financial_year} income and expense to retained earnings",
+        entries=entries,
+        source_module=PeriodCloseService.YEAR_END_SOURCE,
+        source_document_id=period.id,
+        period_id=period.id,
+        posted_by=job.requested_by_id
+    )
+    _record(job, retained_earnings_journal_id=journal_id)
+
+
+async def _reverse_retained_earnings(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    """Reverse the year-end journal in the reopened period, as the journal reversal endpoint does"""
+    journal_id = await _year_end_journal(db, period)
+    if journal_id is None:
+        return
+    result = await db.execute(
+        select(GLTransaction).where(
+            GLTransaction.company_id == period.company_id,
+            GLTransaction.journal_entry_id == journal_id,
+            GLTransaction.is_reversed == False
+        )
+    )
+    reversal_entries = []
+    for original in result.scalars().all():
+        db.add(GLTransaction(
+            company_id=period.company_id,
+            journal_entry_id=f"REV-{journal_id}",
+            account_id=original.account_id,
+            transaction_date=period.end_date,
+            period_id=period.id,
+            description=f"Reversal of: {original.description or ''}",
+            debit_amount=original.credit_amount,
+            credit_amount=original.debit_amount,
+            reference=f"Reversal of {journal_id}",
+            source_module=PeriodCloseService.YEAR_END_SOURCE,
+            source_document_id=period.id,
+            posted_by_user_id=job.requested_by_id,
+            is_reversed=False
+        ))
+        original.is_reversed = True
+        reversal_entries.append({
+            "account_id": original.account_id,
+            "debit_amount": original.credit_amount,
+            "credit_amount": original.debit_amount
+        })
+    await GLService.apply_account_balance_deltas(db, reversal_entries)
+    await GLService.apply_period_balances(db, period.company_id, period.id, reversal_entries)
+    _record(job, reversed_journal_id=journal_id)
+
+
+async def _lock(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    """Close the period and seal its balance snapshot.
+
+    The gl_transactions guard trigger rejects ledger changes dated in a closed
+    period, and share-locks the period row while checking, so flushing the
+    update first waits for postings already in flight; the seal then sees them.
+    """
+    period.is_closed = True
+    await db.flush()
+    await GLService.seal_period_balances(db, period)
+
+
+async def _unlock(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    if period.is_closed:
+        period.is_closed = False
+        await db.flush()
+        await GLService.unseal_period_balances(db, period)
+
+
+async def _write_closing_balances(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    """Closing balances for the period and the closed periods after it.
+
+    They build on the previous period's, so they wait until every earlier
+    period is closed; closing the last gap rolls them forward through the
+    later closed periods.
+    """
+    sealed_period_ids, _ = await GLService._sealed_periods(db, period.company_id, date.max)
+    if period.id not in sealed_period_ids:
+        _record(job, closing_balance_periods=0)
+        return
+    roll_forward = sealed_period_ids[sealed_period_ids.index(period.id):]
+    result = await db.execute(
+        select(AccountingPeriod).where(AccountingPeriod.id.in_(roll_forward)).order_by(AccountingPeriod.start_date)
+    )
+    for closed_period in result.scalars().all():
+        await GLService.write_closing_balances(db, closed_period)
+    _record(job, closing_balance_periods=len(roll_forward))
+
+
+async def _drop_closing_balances(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    """This period's closing balances and every later one's include its postings"""
+    await GLService.drop_closing_balances(db, period.company_id, period.end_date)
+
+
+async def _expire_report_results(db: AsyncSession, job: PeriodCloseJob, period: AccountingPeriod) -> None:
+    expired = await ReportJobService.expire_results(db, period.company_id)
+    _record(job, report_results_expired=expired)
+
+
+class PeriodCloseService:
+    """Close and reopen accounting periods as resumable background jobs.
+
+    Closing checks the period, posts the retained earnings journal at year
+    end, closes the period (locking its ledger rows) and seals its balance
+    snapshot, writes closing balances and drops cached report results.
+    Reopening undoes the same steps in reverse. Each step commits together
+    with its name in completed_steps, so a failed or interrupted job is
+    resumed from the step that did not finish. The executor holds a
+    session-level advisory lock on the job for its whole run; Postgres
+    drops it with the connection of a process that died, which is how
+    resume tells a lost RUNNING job from one busy with a long step.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    ACTIVE = (QUEUED, RUNNING)
+
+    CLOSE = "close"
+    REOPEN = "reopen"
+
+    YEAR_END_SOURCE = "YE"
+
+    STEPS: Dict[str, List[Tuple[str, Step]]] = {
+        CLOSE: [
+            ("validate", _validate),
+            ("retained_earnings", _post_retained_earnings),
+            ("lock", _lock),
+            ("closing_balances", _write_closing_balances),
+            ("report_caches", _expire_report_results),
+        ],
+        REOPEN: [
+            ("closing_balances", _drop_closing_balances),
+            ("unlock", _unlock),
+            ("retained_earnings", _reverse_retained_earnings),
+            ("report_caches", _expire_report_results),
+        ],
+    }
+
+    @staticmethod
+    async def latest_job(db: AsyncSession, period_id: int) -> Optional[PeriodCloseJob]:
+        result = await db.execute(
+            select(PeriodCloseJob).where(PeriodCloseJob.period_id == period_id)
+            .order_by(PeriodCloseJob.id.desc()).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def list_jobs(db: AsyncSession, period_id: int, limit: int = 20) -> List[PeriodCloseJob]:
+        result = await db.execute(
+            select(PeriodCloseJob).where(PeriodCloseJob.period_id == period_id)
+            .order_by(PeriodCloseJob.id.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: int) -> PeriodCloseJob:
+        job = await db.get(PeriodCloseJob, job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Period close job not found")
+        return job
+
+    @staticmethod
+    async def submit(db: AsyncSession, period: AccountingPeriod, user_id: int, action: str) -> PeriodCloseJob:
+        """Queue a close or reopen; asking again after a failure resumes the failed job"""
+        latest = await PeriodCloseService.latest_job(db, period.id)
+        if latest is not None and latest.status in PeriodCloseService.ACTIVE:
+            if latest.action == action:
+                return latest
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A {latest.action} of this period is already in progress"
+            )
+        if latest is not None and latest.status == PeriodCloseService.FAILED and latest.action == action:
+            return await PeriodCloseService.resume(db, latest)
+
+        # A failed close may have done some of its steps before the period was closed
+        partly_closed = (
+            latest is not None and latest.action == PeriodCloseService.CLOSE
+            and latest.status == PeriodCloseService.FAILED and latest.completed_steps
+        )
+        if action == PeriodCloseService.CLOSE and period.is_closed:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Period is already closed")
+        if action == PeriodCloseService.REOPEN and not period.is_closed and not partly_closed:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Period is not closed")
+
+        job = PeriodCloseJob(
+            company_id=period.company_id,
+            period_id=period.id,
+            requested_by_id=user_id,
+            action=action,
+            status=PeriodCloseService.QUEUED,
+            completed_steps=[],
+            progress=0,
+            result={}
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise PeriodCloseService._busy()
+        await db.refresh(job)
+
+        period_close_runner.start(job.id)
+        return job
+
+    @staticmethod
+    async def resume(db: AsyncSession, job: PeriodCloseJob) -> PeriodCloseJob:
+        """Requeue a failed job, or a running one whose executor is gone, from its next step"""
+        latest = await PeriodCloseService.latest_job(db, job.period_id)
+        if latest is None or latest.id != job.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A later close or reopen of this period has replaced this job"
+            )
+        # Held until the job is requeued, so no executor can start in between
+        async with PeriodCloseService._job_lock(job.id, wait=False) as idle:
+            if not idle:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Period close job is still running"
+                )
+            try:
+                result = await db.execute(
+                    update(PeriodCloseJob).where(
+                        PeriodCloseJob.id == job.id,
+                        PeriodCloseJob.status.in_((PeriodCloseService.FAILED, PeriodCloseService.RUNNING))
+                    ).values(status=PeriodCloseService.QUEUED, error=None, completed_at=None)
+                )
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                raise PeriodCloseService._busy()
+        if result.rowcount == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Period close job is {job.status} and cannot be resumed"
+            )
+        await db.refresh(job)
+
+        period_close_runner.start(job.id)
+        return job
+
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another period close or reopen is in progress for this company"
+        )
+
+    @staticmethod
+    @asynccontextmanager
+    async def _job_lock(job_id: int, wait: bool = True) -> AsyncIterator[bool]:
+        """Hold the job's session-level advisory lock; yields whether it was taken"""
+        async with engine.connect() as conn:
+            # Autocommit so the connection does not sit idle in a transaction for the whole run
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            params = {"job_id": job_id}
+            if wait:
+                await conn.execute(text("SELECT pg_advisory_lock(hashtext('period_close_job'), :job_id)"), params)
+                acquired = True
+            else:
+                acquired = await conn.scalar(
+                    text("SELECT pg_try_advisory_lock(hashtext('period_close_job'), :job_id)"), params
+                )
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    await conn.execute(text("SELECT pg_advisory_unlock(hashtext('period_close_job'), :job_id)"), params)
+
+    @staticmethod
+    async def execute(job_id: int) -> None:
+        """Run a queued job's remaining steps (called by the runner)"""
+        async with PeriodCloseService._job_lock(job_id):
+            await PeriodCloseService._run_steps(job_id)
+
+    @staticmethod
+    async def _run_steps(job_id: int) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(PeriodCloseJob).where(
+                    PeriodCloseJob.id == job_id,
+                    PeriodCloseJob.status == PeriodCloseService.QUEUED
+                ).values(
+                    status=PeriodCloseService.RUNNING,
+                    started_at=func.coalesce(PeriodCloseJob.started_at, func.now())
+                ).returning(PeriodCloseJob)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+            if job is None:
+                return
+
+            steps = PeriodCloseService.STEPS[job.action]
+            try:
+                for index, (name, run_step) in enumerate(steps):
+                    if name in job.completed_steps:
+                        continue
+                    job.current_step = name
+                    job.progress = index * 100 // len(steps)
+                    await db.commit()
+
+                    period = await db.get(AccountingPeriod, job.period_id, populate_existing=True)
+                    await run_step(db, job, period)
+                    job.completed_steps = [*job.completed_steps, name]
+                    await db.commit()
+                    period_cache.invalidate(job.company_id)
+
+                job.status = PeriodCloseService.COMPLETED
+                job.current_step = None
+                job.progress = 100
+                job.completed_at = func.now()
+                await db.commit()
+            except PeriodCloseError as exc:
+                await db.rollback()
+                await PeriodCloseService._fail(job_id, str(exc))
+            except HTTPException as exc:
+                await db.rollback()
+                await PeriodCloseService._fail(job_id, str(exc.detail))
+            except Exception as exc:
+                await db.rollback()
+                await PeriodCloseService._fail(job_id, f"{type(exc).__name__}: {exc}")
+
+    @staticmethod
+    async def _fail(job_id: int, error: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(PeriodCloseJob).where(
+                    PeriodCloseJob.id == job_id,
+                    PeriodCloseJob.status.in_(PeriodCloseService.ACTIVE)
+                ).values(status=PeriodCloseService.FAILED, error=error, completed_at=func.now())
+            )
+            await db.commit()
+
+
+class PeriodCloseRunner:
+    """Runs period close jobs as asyncio tasks in this process.
+
+    The database allows one queued or running job per company, so closes
+    and reopens of a company's periods never overlap, even across processes.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+
+    def start(self, job_id: int) -> None:
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs, marking them failed so they can be resumed"""
+        self._stopping = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job_id: int) -> None:
+        try:
+            await PeriodCloseService.execute(job_id)
+        except asyncio.CancelledError:
+            if self._stopping:
+                await PeriodCloseService._fail(job_id, "Interrupted by server shutdown; resume to continue")
+            raise
+
+
+period_close_runner = PeriodCloseRunner()
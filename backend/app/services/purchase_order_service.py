@@ -1,35 +1,30 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from fastapi import HTTPException, status
 from datetime import datetime
 from decimal import Decimal
+from app.core.pagination import Page, paginate
 from app.models import (
     PurchaseOrder, PurchaseOrderLine, Supplier, InventoryItem, 
     OEDocumentType
 )
 from app.schemas.purchase_order import PurchaseOrderCreate, PurchaseOrderUpdate
+from app.services.numbering_service import NumberingService
 
 
 class PurchaseOrderService:
     
     @staticmethod
-    def generate_order_number(db: Session) -> str:
+    async def generate_order_number(db: AsyncSession) -> str:
         """Generate unique purchase order number"""
         current_date = datetime.now()
         prefix = f"PO{current_date.strftime('%y%m')}"
         
-        # Get the last order number for this month
-        last_order = db.query(PurchaseOrder).filter(
-            PurchaseOrder.order_number.like(f"{prefix}%")
-        ).order_by(PurchaseOrder.order_number.desc()).first()
-        
-        if last_order:
-            last_sequence = int(last_order.order_number[-4:])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        
-        return f"{prefix}{new_sequence:04d}"
+        return await NumberingService.next_number(
+            db, NumberingService.SHARED_SCOPE, prefix, width=4, mode=NumberingService.FAST
+        )
     
     @staticmethod
     def calculate_line_totals(
@@ -53,13 +48,13 @@ class PurchaseOrderService:
         }
     
     @staticmethod
-    def create_purchase_order(
-        db: Session,
+    async def create_purchase_order(
+        db: AsyncSession,
         order_data: PurchaseOrderCreate,
         created_by: int
     ) -> PurchaseOrder:
         # Validate supplier
-        supplier = db.query(Supplier).filter(Supplier.id == order_data.supplier_id).first()
+        supplier = await db.get(Supplier, order_data.supplier_id)
         if not supplier:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -67,9 +62,7 @@ class PurchaseOrderService:
             )
         
         # Validate document type
-        doc_type = db.query(OEDocumentType).filter(
-            OEDocumentType.id == order_data.document_type_id
-        ).first()
+        doc_type = await db.get(OEDocumentType, order_data.document_type_id)
         if not doc_type or doc_type.document_class != 'PURCHASE' or doc_type.transaction_type != 'ORDER':
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -80,7 +73,7 @@ class PurchaseOrderService:
         order_dict = order_data.dict(exclude={'line_items'})
         order = PurchaseOrder(
             **order_dict,
-            order_number=PurchaseOrderService.generate_order_number(db),
+            order_number=await PurchaseOrderService.generate_order_number(db),
             supplier_name=supplier.name,
             supplier_address=supplier.address,
             created_by=created_by,
@@ -94,9 +87,7 @@ class PurchaseOrderService:
         
         for idx, line_data in enumerate(order_data.line_items):
             # Validate item
-            item = db.query(InventoryItem).filter(
-                InventoryItem.id == line_data.item_id
-            ).first()
+            item = await db.get(InventoryItem, line_data.item_id)
             if not item:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -139,13 +130,18 @@ class PurchaseOrderService:
         order.net_amount = total_amount - total_discount + total_tax
         
         db.add(order)
-        db.commit()
-        db.refresh(order)
-        return order
+        await db.commit()
+        return await PurchaseOrderService.get_purchase_order(db, order.id)
     
     @staticmethod
-    def get_purchase_order(db: Session, order_id: int) -> PurchaseOrder:
-        order = db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).first()
+    async def get_purchase_order(db: AsyncSession, order_id: int) -> PurchaseOrder:
+        result = await db.execute(
+            select(PurchaseOrder)
+            .options(selectinload(PurchaseOrder.line_items))
+            .where(PurchaseOrder.id == order_id)
+            .execution_options(populate_existing=True)
+        )
+        order = result.scalar_one_or_none()
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -154,30 +150,35 @@ class PurchaseOrderService:
         return order
     
     @staticmethod
-    def get_purchase_orders(
-        db: Session,
+    async def get_purchase_orders(
+        db: AsyncSession,
         supplier_id: Optional[int] = None,
         status: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[PurchaseOrder]:
-        query = db.query(PurchaseOrder)
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        query = select(PurchaseOrder).options(selectinload(PurchaseOrder.line_items))
         
         if supplier_id:
-            query = query.filter(PurchaseOrder.supplier_id == supplier_id)
+            query = query.where(PurchaseOrder.supplier_id == supplier_id)
         
         if status:
-            query = query.filter(PurchaseOrder.status == status)
+            query = query.where(PurchaseOrder.status == status)
         
-        return query.order_by(PurchaseOrder.order_date.desc()).offset(skip).limit(limit).all()
+        return await paginate(
+            db, query, [(PurchaseOrder.order_date, True), (PurchaseOrder.id, True)],
+            limit, skip=skip, cursor=cursor, include_total=include_total
+        )
     
     @staticmethod
-    def update_purchase_order(
-        db: Session,
+    async def update_purchase_order(
+        db: AsyncSession,
         order_id: int,
         order_update: PurchaseOrderUpdate
     ) -> PurchaseOrder:
-        order = PurchaseOrderService.get_purchase_order(db, order_id)
+        order = await PurchaseOrderService.get_purchase_order(db, order_id)
         
         # Check if order can be updated
         if order.status not in ['DRAFT', 'CONFIRMED']:
@@ -190,13 +191,12 @@ class PurchaseOrderService:
         for field, value in update_data.items():
             setattr(order, field, value)
         
-        db.commit()
-        db.refresh(order)
-        return order
+        await db.commit()
+        return await PurchaseOrderService.get_purchase_order(db, order_id)
     
     @staticmethod
-    def confirm_purchase_order(db: Session, order_id: int) -> PurchaseOrder:
-        order = PurchaseOrderService.get_purchase_order(db, order_id)
+    async def confirm_purchase_order(db: AsyncSession, order_id: int) -> PurchaseOrder:
+        order = await PurchaseOrderService.get_purchase_order(db, order_id)
         
         if order.status != 'DRAFT':
             raise HTTPException(
@@ -205,34 +205,29 @@ class PurchaseOrderService:
             )
         
         order.status = 'CONFIRMED'
-        db.commit()
-        db.refresh(order)
-        return order
+        await db.commit()
+        return await PurchaseOrderService.get_purchase_order(db, order_id)
     
     @staticmethod
-    def get_open_po_lines(db: Session, supplier_id: Optional[int] = None) -> List[PurchaseOrderLine]:
+    async def get_open_po_lines(db: AsyncSession, supplier_id: Optional[int] = None) -> List[PurchaseOrderLine]:
         """Get purchase order lines that have not been fully received"""
-        query = db.query(PurchaseOrderLine).join(PurchaseOrder)
+        query = select(PurchaseOrderLine).join(PurchaseOrder)
         
         # Only confirmed orders
-        query = query.filter(PurchaseOrder.status == 'CONFIRMED')
+        query = query.where(PurchaseOrder.status == 'CONFIRMED')
         
         if supplier_id:
-            query = query.filter(PurchaseOrder.supplier_id == supplier_id)
+            query = query.where(PurchaseOrder.supplier_id == supplier_id)
         
         # Get lines where received quantity is less than ordered quantity
-        lines = query.all()
-        open_lines = []
-        
-        for line in lines:
-            if line.received_quantity < line.quantity:
-                open_lines.append(line)
+        query = query.where(PurchaseOrderLine.received_quantity < PurchaseOrderLine.quantity)
         
-        return open_lines
+        result = await db.execute(query)
+        return result.scalars().all()
     
     @staticmethod
-    def cancel_purchase_order(db: Session, order_id: int) -> PurchaseOrder:
-        order = PurchaseOrderService.get_purchase_order(db, order_id)
+    async def cancel_purchase_order(db: AsyncSession, order_id: int) -> PurchaseOrder:
+        order = await PurchaseOrderService.get_purchase_order(db, order_id)
         
         if order.status in ['RECEIVED', 'INVOICED']:
             raise HTTPException(
@@ -241,6 +236,5 @@ class PurchaseOrderService:
             )
         
         order.status = 'CANCELLED'
-        db.commit()
-        db.refresh(order)
-        return order 
\ No newline at end of file
+        await db.commit()
+        return await PurchaseOrderService.get_purchase_order(db, order_id) 
\ No newline at end of file
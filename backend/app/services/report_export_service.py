@@ -0,0 +1,241 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple, Union
+from xml.sax.saxutils import escape
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.database import ReplicaSessionLocal
+
+# (row key, column header)
+ExportColumns = List[Tuple[str, str]]
+
+# Characters XML 1.0 does not allow in a worksheet
+_XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands back what was written"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ReportExportService:
+    """Streams report rows as CSV, NDJSON or XLSX without holding the result set.
+
+    Rows are read through a server-side cursor (AsyncSession.stream with
+    yield_per) and encoded in batches, so memory stays bounded by the batch
+    size however many rows the report has.
+    """
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    XLSX = "xlsx"
+
+    MEDIA_TYPES = {
+        CSV: "text/csv",
+        NDJSON: "application/x-ndjson",
+        XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    }
+
+    # Accepted aliases for the format query parameter
+    ALIASES = {"excel": XLSX, "json": NDJSON, "jsonl": NDJSON}
+
+    BATCH_SIZE = 2000
+
+    @staticmethod
+    def resolve_format(fmt: str) -> str:
+        """Normalise a format query parameter or raise 400"""
+        fmt = (fmt or ReportExportService.CSV).lower()
+        fmt = ReportExportService.ALIASES.get(fmt, fmt)
+        if fmt not in ReportExportService.MEDIA_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported export format. Must be one of: {sorted(ReportExportService.MEDIA_TYPES)}"
+            )
+        return fmt
+
+    @staticmethod
+    async def stream_rows(stmt, batch_size: int = BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """Yield result rows as mappings from a server-side cursor.
+
+        Opens its own read session so the cursor outlives the request handler
+        that returned the StreamingResponse.
+        """
+        async with ReplicaSessionLocal() as db:
+            result = await db.stream(stmt.execution_options(yield_per=batch_size))
+            async for row in result.mappings():
+                yield row
+
+    @staticmethod
+    def response(
+        rows: Union[AsyncIterator[Dict[str, Any]], Iterable[Dict[str, Any]]],
+        columns: ExportColumns,
+        fmt: str,
+        filename: str
+    ) -> StreamingResponse:
+        """Build a StreamingResponse that encodes rows in the requested format"""
+        fmt = ReportExportService.resolve_format(fmt)
+        return StreamingResponse(
+            ReportExportService.encode(rows, columns, fmt),
+            media_type=ReportExportService.MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"}
+        )
+
+    @staticmethod
+    def encode(
+        rows: Union[AsyncIterator[Dict[str, Any]], Iterable[Dict[str, Any]]],
+        columns: ExportColumns,
+        fmt: str
+    ) -> AsyncIterator[bytes]:
+        """Encode rows as chunks of a file in a resolved format"""
+        encoders = {
+            ReportExportService.CSV: ReportExportService._encode_csv,
+            ReportExportService.NDJSON: ReportExportService._encode_ndjson,
+            ReportExportService.XLSX: ReportExportService._encode_xlsx,
+        }
+        return encoders[fmt](ReportExportService._aiter(rows), columns)
+
+    @staticmethod
+    async def _aiter(rows) -> AsyncIterator[Dict[str, Any]]:
+        if hasattr(rows, "__aiter__"):
+            async for row in rows:
+                yield row
+        else:
+            for row in rows:
+                yield row
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    async def _encode_csv(rows: AsyncIterator[Dict[str, Any]], columns: ExportColumns) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([header for _, header in columns])
+        pending = 1
+        async for row in rows:
+            writer.writerow([ReportExportService._text(row.get(key)) for key, _ in columns])
+            pending += 1
+            if pending >= ReportExportService.BATCH_SIZE:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    async def _encode_ndjson(rows: AsyncIterator[Dict[str, Any]], columns: ExportColumns) -> AsyncIterator[bytes]:
+        lines = []
+        async for row in rows:
+            lines.append(json.dumps(
+                {key: ReportExportService._json_value(row.get(key)) for key, _ in columns}
+            ))
+            if len(lines) >= ReportExportService.BATCH_SIZE:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+    @staticmethod
+    def _json_value(value: Any) -> Any:
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    # XLSX: a minimal SpreadsheetML package written straight into a zip stream
+    _CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    )
+    _ROOT_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    _WORKBOOK = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+    _WORKBOOK_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    )
+
+    @staticmethod
+    def _xlsx_cell(value: Any) -> str:
+        if value is None:
+            return "<c/>"
+        if isinstance(value, bool):
+            return f'<c t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, (int, float, Decimal)):
+            return f"<c><v>{value}</v></c>"
+        text = _XML_ILLEGAL.sub("", ReportExportService._text(value))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+    @staticmethod
+    async def _encode_xlsx(rows: AsyncIterator[Dict[str, Any]], columns: ExportColumns) -> AsyncIterator[bytes]:
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as package:
+            package.writestr("[Content_Types].xml", ReportExportService._CONTENT_TYPES)
+            package.writestr("_rels/.rels", ReportExportService._ROOT_RELS)
+            package.writestr("xl/workbook.xml", ReportExportService._WORKBOOK)
+            package.writestr("xl/_rels/workbook.xml.rels", ReportExportService._WORKBOOK_RELS)
+
+            with package.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+                header = "".join(ReportExportService._xlsx_cell(h) for _, h in columns)
+                sheet.write((
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    f'<sheetData><row>{header}</row>'
+                ).encode())
+                pending = 0
+                async for row in rows:
+                    cells = "".join(ReportExportService._xlsx_cell(row.get(key)) for key, _ in columns)
+                    sheet.write(f"<row>{cells}</row>".encode())
+                    pending += 1
+                    if pending >= ReportExportService.BATCH_SIZE:
+                        pending = 0
+                        chunk = sink.drain()
+                        if chunk:
+                            yield chunk
+                sheet.write(b"</sheetData></worksheet>")
+        yield sink.drain()
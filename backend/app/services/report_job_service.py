@@ -0,0 +1,520 @@
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReplicaSessionLocal
+from app.core.pagination import count_rows
+from app.models import ReportJob
+from app.schemas.inventory import StockQuantityReportRequest
+from app.schemas.report_job import (
+    ReportJobCreate, TrialBalanceReportParams, CustomerAgeingReportParams,
+    SupplierAgeingReportParams, CustomerStatementReportParams, APTransactionListingReportParams
+)
+from app.services.ageing_service import AgeingService
+from app.services.ap_service import APService
+from app.services.ar_service import ARService
+from app.services.gl_service import GLService
+from app.services.inventory_service import InventoryService
+from app.services.report_export_service import ExportColumns, ReportExportService
+
+Rows = Union[AsyncIterator[Dict[str, Any]], Iterable[Dict[str, Any]]]
+# (columns, total rows if known, rows)
+ReportOutput = Tuple[ExportColumns, Optional[int], Rows]
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    params_model: Type[BaseModel]
+    permission: Optional[Tuple[str, str]]  # (module, action) required to submit
+    build: Callable[[AsyncSession, int, Any], Awaitable[ReportOutput]]
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled"""
+
+
+async def _trial_balance(db: AsyncSession, company_id: int, params: TrialBalanceReportParams) -> ReportOutput:
+    lines = await GLService.get_trial_balance_lines(db, company_id, params.report_date)
+    columns = [
+        ("account_code", "Account Code"),
+        ("account_name", "Account Name"),
+        ("account_type", "Account Type"),
+        ("debit", "Debit"),
+        ("credit", "Credit"),
+        ("balance", "Balance")
+    ]
+    return columns, len(lines), lines
+
+
+def _ageing_output(rows: list, party: str, bucket_days: list) -> ReportOutput:
+    labels = AgeingService.bucket_labels(bucket_days)
+    for row in rows:
+        for i, bucket in enumerate(row.pop("buckets")):
+            row[f"bucket_{i}"] = bucket["amount"]
+    columns = [
+        (f"{party}_code", "Code"),
+        (f"{party}_name", "Name"),
+        *[(f"bucket_{i}", label) for i, label in enumerate(labels)],
+        ("total", "Total")
+    ]
+    return columns, len(rows), rows
+
+
+async def _customer_ageing(db: AsyncSession, company_id: int, params: CustomerAgeingReportParams) -> ReportOutput:
+    bucket_days = AgeingService.parse_bucket_days(params.bucket_days)
+    rows = await ARService.calculate_customer_ageing(
+        db, company_id, params.as_at_date, params.customer_id, bucket_days
+    )
+    return _ageing_output(rows, "customer", bucket_days)
+
+
+async def _supplier_ageing(db: AsyncSession, company_id: int, params: SupplierAgeingReportParams) -> ReportOutput:
+    bucket_days = AgeingService.parse_bucket_days(params.bucket_days)
+    rows = await APService.calculate_supplier_ageing(
+        db, company_id, params.as_at_date, params.supplier_id, bucket_days
+    )
+    return _ageing_output(rows, "supplier", bucket_days)
+
+
+async def _customer_statement(db: AsyncSession, company_id: int, params: CustomerStatementReportParams) -> ReportOutput:
+    await ARService.validate_customer_exists(db, params.customer_id, company_id)
+    statement = await ARService.get_customer_statement(
+        db, company_id, params.customer_id, params.from_date, params.to_date
+    )
+    columns = [
+        ("transaction_date", "Date"),
+        ("transaction_number", "Number"),
+        ("transaction_type", "Type"),
+        ("reference", "Reference"),
+        ("description", "Description"),
+        ("debit", "Debit"),
+        ("credit", "Credit"),
+        ("balance", "Balance")
+    ]
+    return columns, len(statement["transactions"]), statement["transactions"]
+
+
+async def _stock_quantity(db: AsyncSession, company_id: int, params: StockQuantityReportRequest) -> ReportOutput:
+    report = await InventoryService(db).get_stock_quantity_report(
+        company_id,
+        item_type=params.item_type,
+        show_zero_qty=params.show_zero_qty,
+        item_code_from=params.item_code_from,
+        item_code_to=params.item_code_to,
+        as_at_date=params.as_at_date
+    )
+    columns = [
+        ("item_code", "Item Code"),
+        ("description", "Description"),
+        ("item_type", "Type"),
+        ("unit_of_measure", "Unit"),
+        ("quantity_on_hand", "Quantity On Hand"),
+        ("cost_price", "Cost Price"),
+        ("total_value", "Total Value")
+    ]
+    return columns, len(report["items"]), report["items"]
+
+
+async def _ap_transactions(db: AsyncSession, company_id: int, params: APTransactionListingReportParams) -> ReportOutput:
+    query = APService.transaction_listing_query(
+        company_id, params.supplier_id, params.from_date, params.to_date,
+        params.transaction_type_id, params.is_posted
+    )
+    total, _ = await count_rows(db, query)
+
+    async def rows():
+        result = await db.stream(query.execution_options(yield_per=ReportExportService.BATCH_SIZE))
+        async for row in result.mappings():
+            yield row
+
+    return APService.TRANSACTION_LISTING_COLUMNS, total, rows()
+
+
+class ReportJobService:
+    """Reports run as background jobs and written to files on local disk.
+
+    Submitting returns a job to poll; a finished result is reused for
+    identical parameters for REPORT_JOB_CACHE_SECONDS. Jobs run as asyncio
+    tasks in the process that accepted them (see ReportJobRunner), reading
+    through the replica session like the streaming exports. The runner keeps
+    updated_at fresh for as long as a job's task is alive, queued or
+    building; one untouched for REPORT_JOB_STALE_SECONDS died with its
+    process and is neither reused nor counted against the queue limit.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+    ACTIVE = (QUEUED, RUNNING)
+
+    REPORTS: Dict[str, ReportDefinition] = {
+        "trial_balance": ReportDefinition(TrialBalanceReportParams, None, _trial_balance),
+        "ar_ageing": ReportDefinition(CustomerAgeingReportParams, ("ar", "view"), _customer_ageing),
+        "ap_ageing": ReportDefinition(SupplierAgeingReportParams, ("ap", "view"), _supplier_ageing),
+        "customer_statement": ReportDefinition(CustomerStatementReportParams, ("ar", "view"), _customer_statement),
+        "stock_quantity": ReportDefinition(StockQuantityReportRequest, ("inventory", "view"), _stock_quantity),
+        "ap_transactions": ReportDefinition(APTransactionListingReportParams, ("ap", "view"), _ap_transactions),
+    }
+
+    @staticmethod
+    def get_definition(report_type: str) -> ReportDefinition:
+        report = ReportJobService.REPORTS.get(report_type)
+        if report is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown report type. Must be one of: {sorted(ReportJobService.REPORTS)}"
+            )
+        return report
+
+    @staticmethod
+    def params_hash(report_type: str, fmt: str, parameters: Dict[str, Any]) -> str:
+        key = json.dumps({"report_type": report_type, "format": fmt, "parameters": parameters}, sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def result_path(job: ReportJob) -> str:
+        return os.path.join(settings.REPORT_JOB_DIR, str(job.company_id), f"{job.id}.{job.format}")
+
+    @staticmethod
+    async def submit(db: AsyncSession, company_id: int, user_id: int, job_in: ReportJobCreate) -> ReportJob:
+        """Queue a report, or return a cached or in-flight job with the same parameters"""
+        report = ReportJobService.get_definition(job_in.report_type)
+        fmt = ReportExportService.resolve_format(job_in.format)
+        try:
+            parameters = report.params_model(**job_in.parameters).model_dump(mode="json")
+        except ValidationError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=exc.errors(include_url=False, include_context=False)
+            )
+        params_hash = ReportJobService.params_hash(job_in.report_type, fmt, parameters)
+
+        await ReportJobService.purge_expired(db, company_id)
+
+        if not job_in.refresh:
+            existing = await ReportJobService._find_reusable(db, company_id, params_hash)
+            if existing is not None:
+                return existing
+
+        queued = (await db.execute(
+            select(func.count(ReportJob.id)).where(
+                ReportJob.company_id == company_id,
+                ReportJobService._live()
+            )
+        )).scalar()
+        if queued >= settings.REPORT_JOB_MAX_QUEUED_PER_COMPANY:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many report jobs in progress for this company; try again when some have finished"
+            )
+
+        job = ReportJob(
+            company_id=company_id,
+            requested_by_id=user_id,
+            report_type=job_in.report_type,
+            format=fmt,
+            parameters=parameters,
+            params_hash=params_hash,
+            status=ReportJobService.QUEUED,
+            progress=0,
+            rows_written=0
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+
+        report_job_runner.start(job.id, company_id)
+        return job
+
+    @staticmethod
+    def _live():
+        """Condition for active jobs that are still making progress"""
+        return and_(
+            ReportJob.status.in_(ReportJobService.ACTIVE),
+            ReportJob.updated_at >= func.now() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+        )
+
+    @staticmethod
+    async def fail_stale(db: AsyncSession) -> int:
+        """Mark active jobs whose process died as failed (called at startup)"""
+        result = await db.execute(
+            update(ReportJob).where(
+                ReportJob.status.in_(ReportJobService.ACTIVE),
+                ReportJob.updated_at < func.now() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+            ).values(status=ReportJobService.FAILED, error="Interrupted: the server running it stopped", completed_at=func.now())
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def _touch(job_id: int) -> None:
+        """Mark an active job as still alive"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ReportJob).where(
+                    ReportJob.id == job_id,
+                    ReportJob.status.in_(ReportJobService.ACTIVE)
+                ).values(updated_at=func.now())
+            )
+            await db.commit()
+
+    @staticmethod
+    async def heartbeat(job_id: int) -> None:
+        """Touch the job every third of REPORT_JOB_STALE_SECONDS until cancelled"""
+        while True:
+            await asyncio.sleep(settings.REPORT_JOB_STALE_SECONDS / 3)
+            try:
+                await ReportJobService._touch(job_id)
+            except Exception:
+                pass  # a missed beat is retried on the next one, well before the job looks stale
+
+    @staticmethod
+    async def _find_reusable(db: AsyncSession, company_id: int, params_hash: str) -> Optional[ReportJob]:
+        """A job still running for these parameters, else a recent result whose file exists"""
+        result = await db.execute(
+            select(ReportJob).where(
+                ReportJob.company_id == company_id,
+                ReportJob.params_hash == params_hash,
+                ReportJobService._live()
+            ).order_by(ReportJob.id.desc()).limit(1)
+        )
+        job = result.scalar_one_or_none()
+        if job is not None:
+            return job
+
+        result = await db.execute(
+            select(ReportJob).where(
+                ReportJob.company_id == company_id,
+                ReportJob.params_hash == params_hash,
+                ReportJob.status == ReportJobService.COMPLETED,
+                ReportJob.completed_at >= func.now() - timedelta(seconds=settings.REPORT_JOB_CACHE_SECONDS)
+            ).order_by(ReportJob.id.desc()).limit(1)
+        )
+        job = result.scalar_one_or_none()
+        if job is not None and job.file_path and os.path.exists(job.file_path):
+            return job
+        return None
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession, company_id: int) -> None:
+        """Delete result files older than REPORT_JOB_RETENTION_HOURS"""
+        result = await db.execute(
+            select(ReportJob).where(
+                ReportJob.company_id == company_id,
+                ReportJob.status == ReportJobService.COMPLETED,
+                ReportJob.completed_at < func.now() - timedelta(hours=settings.REPORT_JOB_RETENTION_HOURS)
+            )
+        )
+        await ReportJobService._expire(db, result.scalars().all())
+
+    @staticmethod
+    async def expire_results(db: AsyncSession, company_id: int) -> int:
+        """Drop every cached result of the company, e.g. once a period close changed its balances"""
+        result = await db.execute(
+            select(ReportJob).where(
+                ReportJob.company_id == company_id,
+                ReportJob.status == ReportJobService.COMPLETED
+            )
+        )
+        expired = result.scalars().all()
+        await ReportJobService._expire(db, expired)
+        return len(expired)
+
+    @staticmethod
+    async def _expire(db: AsyncSession, jobs) -> None:
+        for job in jobs:
+            if job.file_path and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+            job.file_path = None
+            job.status = ReportJobService.EXPIRED
+        if jobs:
+            await db.commit()
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: int, company_id: int) -> ReportJob:
+        job = await db.get(ReportJob, job_id)
+        if not job or job.company_id != company_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+        return job
+
+    @staticmethod
+    async def cancel(db: AsyncSession, job: ReportJob) -> ReportJob:
+        """Cancel a queued or running job; a running job stops at its next progress update"""
+        if job.status not in ReportJobService.ACTIVE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Report job is already {job.status}"
+            )
+        job.status = ReportJobService.CANCELLED
+        job.completed_at = func.now()
+        await db.commit()
+        await db.refresh(job)
+        report_job_runner.cancel(job.id)
+        return job
+
+    @staticmethod
+    async def execute(job_id: int) -> None:
+        """Produce a queued job's result file (called by the runner)"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(ReportJob).where(
+                    ReportJob.id == job_id,
+                    ReportJob.status == ReportJobService.QUEUED
+                ).values(status=ReportJobService.RUNNING, started_at=func.now()).returning(ReportJob)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+        if job is None:
+            return  # cancelled while queued
+
+        report = ReportJobService.REPORTS[job.report_type]
+        params = report.params_model(**job.parameters)
+        path = ReportJobService.result_path(job)
+        partial = f"{path}.part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tracker = _ProgressTracker(job_id)
+        try:
+            async with ReplicaSessionLocal() as db:
+                columns, total, rows = await report.build(db, job.company_id, params)
+                tracker.total = total
+                with open(partial, "wb") as output:
+                    async for chunk in ReportExportService.encode(tracker.wrap(rows), columns, job.format):
+                        await asyncio.to_thread(output.write, chunk)
+            os.replace(partial, path)
+            await ReportJobService._finish(
+                job_id, ReportJobService.COMPLETED,
+                progress=100, rows_written=tracker.rows, total_rows=tracker.rows, file_path=path
+            )
+        except JobCancelled:
+            pass
+        except HTTPException as exc:
+            await ReportJobService._finish(job_id, ReportJobService.FAILED, error=str(exc.detail))
+        except Exception as exc:
+            await ReportJobService._finish(job_id, ReportJobService.FAILED, error=f"{type(exc).__name__}: {exc}")
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    @staticmethod
+    async def _finish(job_id: int, job_status: str, **values) -> None:
+        # Never overwrite a cancellation that arrived while the job was finishing
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ReportJob).where(
+                    ReportJob.id == job_id,
+                    ReportJob.status.in_(ReportJobService.ACTIVE)
+                ).values(status=job_status, completed_at=func.now(), **values)
+            )
+            await db.commit()
+
+    @staticmethod
+    async def _progress(job_id: int, rows: int, total: Optional[int]) -> str:
+        """Record progress and return the job's current status"""
+        progress = min(99, rows * 100 // total) if total else 0
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(ReportJob).where(ReportJob.id == job_id).values(
+                    progress=progress, rows_written=rows, total_rows=total
+                ).returning(ReportJob.status)
+            )
+            await db.commit()
+            return result.scalar_one()
+
+
+class _ProgressTracker:
+    """Counts rows as they are encoded, reporting progress every batch"""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.total: Optional[int] = None
+        self.rows = 0
+
+    async def wrap(self, rows: Rows) -> AsyncIterator[Dict[str, Any]]:
+        if not hasattr(rows, "__aiter__"):
+            rows = _aiter(rows)
+        await self._report()
+        async for row in rows:
+            yield row
+            self.rows += 1
+            if self.rows % ReportExportService.BATCH_SIZE == 0:
+                await self._report()
+
+    async def _report(self) -> None:
+        job_status = await ReportJobService._progress(self.job_id, self.rows, self.total)
+        if job_status == ReportJobService.CANCELLED:
+            raise JobCancelled()
+
+
+async def _aiter(rows: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for row in rows:
+        yield row
+
+
+class ReportJobRunner:
+    """Runs report jobs as asyncio tasks in this process.
+
+    A job first takes one of its company's REPORT_JOB_MAX_CONCURRENT_PER_COMPANY
+    slots, then one of REPORT_JOB_MAX_WORKERS, so one company's backlog cannot
+    hold every worker. Limits apply per process.
+    """
+
+    def __init__(self, max_workers: int, per_company: int):
+        self.per_company = per_company
+        self._workers = asyncio.Semaphore(max_workers)
+        self._company_slots: Dict[int, asyncio.Semaphore] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+
+    def start(self, job_id: int, company_id: int) -> None:
+        task = asyncio.create_task(self._run(job_id, company_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def cancel(self, job_id: int) -> None:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs, marking them failed so they can be resubmitted"""
+        self._stopping = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job_id: int, company_id: int) -> None:
+        slots = self._company_slots.setdefault(company_id, asyncio.Semaphore(self.per_company))
+        # Beats while the job waits for slots and through the whole build, so
+        # a slow report is never taken for one lost with its process
+        heartbeat = asyncio.create_task(ReportJobService.heartbeat(job_id))
+        try:
+            async with slots, self._workers:
+                await ReportJobService.execute(job_id)
+        except asyncio.CancelledError:
+            if self._stopping:
+                await ReportJobService._finish(
+                    job_id, ReportJobService.FAILED, error="Interrupted by server shutdown"
+                )
+            raise
+        finally:
+            heartbeat.cancel()
+
+
+report_job_runner = ReportJobRunner(
+    settings.REPORT_JOB_MAX_WORKERS, settings.REPORT_JOB_MAX_CONCURRENT_PER_COMPANY
+)
@@ -1,35 +1,30 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
 from fastapi import HTTPException, status
 from datetime import datetime
 from decimal import Decimal
+from app.core.pagination import Page, paginate
 from app.models import (
     SalesOrder, SalesOrderLine, Customer, InventoryItem, 
     OEDocumentType, ARTransaction, ARTransactionType
 )
 from app.schemas.sales_order import SalesOrderCreate, SalesOrderUpdate, SalesOrderToInvoice
+from app.services.numbering_service import NumberingService
 
 
 class SalesOrderService:
     
     @staticmethod
-    def generate_order_number(db: Session) -> str:
+    async def generate_order_number(db: AsyncSession) -> str:
         """Generate unique sales order number"""
         current_date = datetime.now()
         prefix = f"SO{current_date.strftime('%y%m')}"
         
-        # Get the last order number for this month
-        last_order = db.query(SalesOrder).filter(
-            SalesOrder.order_number.like(f"{prefix}%")
-        ).order_by(SalesOrder.order_number.desc()).first()
-        
-        if last_order:
-            last_sequence = int(last_order.order_number[-4:])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        
-        return f"{prefix}{new_sequence:04d}"
+        return await NumberingService.next_number(
+            db, NumberingService.SHARED_SCOPE, prefix, width=4, mode=NumberingService.FAST
+        )
     
     @staticmethod
     def calculate_line_totals(
@@ -53,13 +48,13 @@ class SalesOrderService:
         }
     
     @staticmethod
-    def create_sales_order(
-        db: Session,
+    async def create_sales_order(
+        db: AsyncSession,
         order_data: SalesOrderCreate,
         created_by: int
     ) -> SalesOrder:
         # Validate customer
-        customer = db.query(Customer).filter(Customer.id == order_data.customer_id).first()
+        customer = await db.get(Customer, order_data.customer_id)
         if not customer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -67,9 +62,7 @@ class SalesOrderService:
             )
         
         # Validate document type
-        doc_type = db.query(OEDocumentType).filter(
-            OEDocumentType.id == order_data.document_type_id
-        ).first()
+        doc_type = await db.get(OEDocumentType, order_data.document_type_id)
         if not doc_type or doc_type.document_class != 'SALES' or doc_type.transaction_type != 'ORDER':
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -80,7 +73,7 @@ class SalesOrderService:
         order_dict = order_data.dict(exclude={'line_items'})
         order = SalesOrder(
             **order_dict,
-            order_number=SalesOrderService.generate_order_number(db),
+            order_number=await SalesOrderService.generate_order_number(db),
             customer_name=customer.name,
             customer_address=customer.address,
             created_by=created_by,
@@ -94,9 +87,7 @@ class SalesOrderService:
         
         for idx, line_data in enumerate(order_data.line_items):
             # Validate item
-            item = db.query(InventoryItem).filter(
-                InventoryItem.id == line_data.item_id
-            ).first()
+            item = await db.get(InventoryItem, line_data.item_id)
             if not item:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -139,13 +130,18 @@ class SalesOrderService:
         order.net_amount = total_amount - total_discount + total_tax
         
         db.add(order)
-        db.commit()
-        db.refresh(order)
-        return order
+        await db.commit()
+        return await SalesOrderService.get_sales_order(db, order.id)
     
     @staticmethod
-    def get_sales_order(db: Session, order_id: int) -> SalesOrder:
-        order = db.query(SalesOrder).filter(SalesOrder.id == order_id).first()
+    async def get_sales_order(db: AsyncSession, order_id: int) -> SalesOrder:
+        result = await db.execute(
+            select(SalesOrder)
+            .options(selectinload(SalesOrder.line_items))
+            .where(SalesOrder.id == order_id)
+            .execution_options(populate_existing=True)
+        )
+        order = result.scalar_one_or_none()
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -154,30 +150,35 @@ class SalesOrderService:
         return order
     
     @staticmethod
-    def get_sales_orders(
-        db: Session,
+    async def get_sales_orders(
+        db: AsyncSession,
         customer_id: Optional[int] = None,
         status: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[SalesOrder]:
-        query = db.query(SalesOrder)
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        query = select(SalesOrder).options(selectinload(SalesOrder.line_items))
         
         if customer_id:
-            query = query.filter(SalesOrder.customer_id == customer_id)
+            query = query.where(SalesOrder.customer_id == customer_id)
         
         if status:
-            query = query.filter(SalesOrder.status == status)
+            query = query.where(SalesOrder.status == status)
         
-        return query.order_by(SalesOrder.order_date.desc()).offset(skip).limit(limit).all()
+        return await paginate(
+            db, query, [(SalesOrder.order_date, True), (SalesOrder.id, True)],
+            limit, skip=skip, cursor=cursor, include_total=include_total
+        )
     
     @staticmethod
-    def update_sales_order(
-        db: Session,
+    async def update_sales_order(
+        db: AsyncSession,
         order_id: int,
         order_update: SalesOrderUpdate
     ) -> SalesOrder:
-        order = SalesOrderService.get_sales_order(db, order_id)
+        order = await SalesOrderService.get_sales_order(db, order_id)
         
         # Check if order can be updated
         if order.status not in ['DRAFT', 'CONFIRMED']:
@@ -190,13 +191,12 @@ class SalesOrderService:
         for field, value in update_data.items():
             setattr(order, field, value)
         
-        db.commit()
-        db.refresh(order)
-        return order
+        await db.commit()
+        return await SalesOrderService.get_sales_order(db, order_id)
     
     @staticmethod
-    def confirm_sales_order(db: Session, order_id: int) -> SalesOrder:
-        order = SalesOrderService.get_sales_order(db, order_id)
+    async def confirm_sales_order(db: AsyncSession, order_id: int) -> SalesOrder:
+        order = await SalesOrderService.get_sales_order(db, order_id)
         
         if order.status != 'DRAFT':
             raise HTTPException(
@@ -205,18 +205,17 @@ class SalesOrderService:
             )
         
         order.status = 'CONFIRMED'
-        db.commit()
-        db.refresh(order)
-        return order
+        await db.commit()
+        return await SalesOrderService.get_sales_order(db, order_id)
     
     @staticmethod
-    def convert_to_invoice(
-        db: Session,
+    async def convert_to_invoice(
+        db: AsyncSession,
         invoice_data: SalesOrderToInvoice,
         posted_by: int
     ) -> ARTransaction:
         """Convert sales order to AR invoice"""
-        order = SalesOrderService.get_sales_order(db, invoice_data.sales_order_id)
+        order = await SalesOrderService.get_sales_order(db, invoice_data.sales_order_id)
         
         # Check if order can be invoiced
         if order.status != 'CONFIRMED':
@@ -226,9 +225,7 @@ class SalesOrderService:
             )
         
         # Get invoice document type
-        doc_type = db.query(OEDocumentType).filter(
-            OEDocumentType.id == order.document_type_id
-        ).first()
+        doc_type = await db.get(OEDocumentType, order.document_type_id)
         
         if not doc_type or not doc_type.ar_transaction_type_id:
             raise HTTPException(
@@ -240,18 +237,10 @@ class SalesOrderService:
         current_date = datetime.now()
         prefix = f"INV{current_date.strftime('%y%m')}"
         
-        # Get the last invoice number for this month
-        last_invoice = db.query(ARTransaction).filter(
-            ARTransaction.transaction_number.like(f"{prefix}%")
-        ).order_by(ARTransaction.transaction_number.desc()).first()
-        
-        if last_invoice:
-            last_sequence = int(last_invoice.transaction_number[-4:])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        
-        invoice_number = f"{prefix}{new_sequence:04d}"
+        # Invoice numbers are gap-free: allocated in this transaction
+        invoice_number = await NumberingService.next_number(
+            db, NumberingService.SHARED_SCOPE, prefix, width=4
+        )
         
         # Create AR transaction directly
         ar_transaction = ARTransaction(
@@ -272,14 +261,14 @@ class SalesOrderService:
         
         # Update order status
         order.status = 'INVOICED'
-        db.commit()
-        db.refresh(ar_transaction)
+        await db.commit()
+        await db.refresh(ar_transaction)
         
         return ar_transaction
     
     @staticmethod
-    def cancel_sales_order(db: Session, order_id: int) -> SalesOrder:
-        order = SalesOrderService.get_sales_order(db, order_id)
+    async def cancel_sales_order(db: AsyncSession, order_id: int) -> SalesOrder:
+        order = await SalesOrderService.get_sales_order(db, order_id)
         
         if order.status == 'INVOICED':
             raise HTTPException(
@@ -288,6 +277,5 @@ class SalesOrderService:
             )
         
         order.status = 'CANCELLED'
-        db.commit()
-        db.refresh(order)
-        return order 
\ No newline at end of file
+        await db.commit()
+        return await SalesOrderService.get_sales_order(db, order_id) 
\ No newline at end of file
@@ -0,0 +1,115 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, case, func
+from typing import List, Sequence
+from fastapi import HTTPException, status
+
+
+class SearchService:
+    """Typeahead search over code/name columns.
+
+    Both modes are written so PostgreSQL can answer them from the pg_trgm GIN
+    indexes (ILIKE '%term%', similarity) and the lower(column) COLLATE "C"
+    btree indexes (prefix LIKE, prefix order) instead of scanning the table.
+    """
+
+    CONTAINS = "contains"
+    RANKED = "ranked"
+    MODES = (CONTAINS, RANKED)
+
+    # Trigram indexes cannot serve terms shorter than one trigram
+    MIN_TRIGRAM_LENGTH = 3
+
+    @staticmethod
+    def resolve_mode(mode: str) -> str:
+        """Validate a search_mode query parameter or raise 400"""
+        mode = (mode or SearchService.CONTAINS).lower()
+        if mode not in SearchService.MODES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Search mode must be one of: {list(SearchService.MODES)}"
+            )
+        return mode
+
+    @staticmethod
+    def escape_like(term: str) -> str:
+        """Escape LIKE wildcards so user input matches literally"""
+        return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @staticmethod
+    def contains_filter(term: str, columns: Sequence):
+        """Case-insensitive substring match on any of the columns"""
+        pattern = f"%{SearchService.escape_like(term)}%"
+        return or_(*[column.ilike(pattern, escape="\\") for column in columns])
+
+    @staticmethod
+    def prefix_key(column):
+        """lower(column) COLLATE "C", the expression the prefix indexes are built on"""
+        return func.lower(column).collate("C")
+
+    @staticmethod
+    def prefix_filter(term: str, columns: Sequence):
+        """Case-insensitive prefix match on any of the columns"""
+        pattern = f"{SearchService.escape_like(term.lower())}%"
+        return or_(*[SearchService.prefix_key(column).like(pattern, escape="\\") for column in columns])
+
+    @staticmethod
+    async def ranked(
+        db: AsyncSession,
+        query,
+        term: str,
+        code_column,
+        text_columns: Sequence,
+        limit: int
+    ) -> List:
+        """Return the best `limit` matches for a typeahead.
+
+        Order: exact code, code prefix, name/description prefix, then other
+        substring or fuzzy (trigram similarity) matches by closeness. Terms
+        shorter than a trigram only match on prefixes.
+        """
+        term = term.strip()
+        columns = [code_column, *text_columns]
+
+        if len(term) < SearchService.MIN_TRIGRAM_LENGTH:
+            return await SearchService._prefix_matches(db, query, term, columns, limit)
+
+        match = or_(
+            SearchService.contains_filter(term, columns),
+            *[column.op("%")(term) for column in text_columns]
+        )
+
+        rank = case(
+            (func.lower(code_column) == term.lower(), 0),
+            (SearchService.prefix_filter(term, [code_column]), 1),
+            (SearchService.prefix_filter(term, text_columns), 2),
+            else_=3
+        )
+        closeness = func.greatest(*[func.similarity(column, term) for column in columns])
+
+        result = await db.execute(
+            query.where(match).order_by(rank, closeness.desc(), code_column).limit(limit)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def _prefix_matches(db: AsyncSession, query, term: str, columns: Sequence, limit: int) -> List:
+        """Prefix matches column by column, each read in index order up to `limit`.
+
+        A short prefix can match a large share of the table, so rather than
+        ranking every match the first `limit` rows are taken from each
+        column's prefix index in turn (code first).
+        """
+        matches = []
+        seen = set()
+        for column in columns:
+            key = SearchService.prefix_key(column)
+            result = await db.execute(
+                query.where(SearchService.prefix_filter(term, [column])).order_by(key, column).limit(limit)
+            )
+            for row in result.scalars():
+                if row.id not in seen:
+                    seen.add(row.id)
+                    matches.append(row)
+            if len(matches) >= limit:
+                break
+        return matches[:limit]
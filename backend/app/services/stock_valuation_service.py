@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List
+
+from sqlalchemy import select, update, func, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import InventoryItem, StockValuationSnapshot
+
+CENT = Decimal("0.01")
+
+
+@dataclass
+class StockValuationChange:
+    """The signed quantity and value a movement adds to an item on a day"""
+    item_id: int
+    snapshot_date: date
+    quantity: Decimal
+    value: Decimal
+
+
+def _average(quantity, value, fallback):
+    """Average cost of a snapshot row; keeps the last cost while nothing is on hand"""
+    return case((quantity > 0, func.round(value / quantity, 2)), else_=fallback)
+
+
+class StockValuationService:
+    """Per-item, per-day closing stock maintained alongside the costing engine.
+
+    An item's latest snapshot always holds its current quantity and cost, so
+    a movement dated on or after it costs one bulk upsert. A back-dated
+    movement adds its quantity and value to the snapshot for its date (built
+    from the previous snapshot if missing) and to every snapshot after it.
+    Callers hold the item locks from CostingService, so writes for one item
+    never interleave.
+    """
+
+    # Rows per multi-row upsert; keeps bind parameters under the driver limit
+    CHUNK_SIZE = 4000
+
+    @staticmethod
+    async def record(
+        db: AsyncSession,
+        changes: List[StockValuationChange],
+        items: Dict[int, InventoryItem]
+    ) -> None:
+        """Update the snapshots of the changed items; `items` hold their values after the changes"""
+        days: Dict[int, Dict[date, List[Decimal]]] = {}
+        for change in changes:
+            totals = days.setdefault(change.item_id, {}).setdefault(
+                change.snapshot_date, [Decimal("0"), Decimal("0")]
+            )
+            totals[0] += change.quantity
+            totals[1] += change.value
+        if not days:
+            return
+
+        snapshot = StockValuationSnapshot
+        item_ids = sorted(days)
+        latest: Dict[int, date] = {}
+        for start in range(0, len(item_ids), StockValuationService.CHUNK_SIZE):
+            result = await db.execute(
+                select(snapshot.item_id, func.max(snapshot.snapshot_date)).where(
+                    snapshot.item_id.in_(item_ids[start:start + StockValuationService.CHUNK_SIZE])
+                ).group_by(snapshot.item_id)
+            )
+            latest.update(dict(result.all()))
+
+        closing_rows = []
+        for item_id in item_ids:
+            item = items[item_id]
+            closing_date = max(days[item_id])
+            if item_id in latest:
+                closing_date = max(closing_date, latest[item_id])
+            for day in sorted(days[item_id]):
+                if day < closing_date:
+                    quantity, value = days[item_id][day]
+                    await StockValuationService._add_back_dated(
+                        db, item.company_id, item_id, day, closing_date, quantity, value
+                    )
+            # Everything is dated on or before the closing date, so it matches the item
+            closing_rows.append({
+                "company_id": item.company_id,
+                "item_id": item_id,
+                "snapshot_date": closing_date,
+                "quantity_on_hand": item.quantity_on_hand,
+                "cost_price": item.cost_price,
+                "total_value": (item.quantity_on_hand * item.cost_price).quantize(CENT, ROUND_HALF_UP)
+            })
+
+        for start in range(0, len(closing_rows), StockValuationService.CHUNK_SIZE):
+            stmt = pg_insert(snapshot).values(closing_rows[start:start + StockValuationService.CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                constraint="_stock_valuation_snapshot_uc",
+                set_={
+                    "quantity_on_hand": stmt.excluded.quantity_on_hand,
+                    "cost_price": stmt.excluded.cost_price,
+                    "total_value": stmt.excluded.total_value,
+                    "updated_at": func.now()
+                }
+            )
+            await db.execute(stmt)
+
+    @staticmethod
+    async def _add_back_dated(
+        db: AsyncSession,
+        company_id: int,
+        item_id: int,
+        day: date,
+        closing_date: date,
+        quantity: Decimal,
+        value: Decimal
+    ) -> None:
+        snapshot = StockValuationSnapshot
+        previous = (await db.execute(
+            select(snapshot.quantity_on_hand, snapshot.cost_price, snapshot.total_value).where(
+                snapshot.item_id == item_id,
+                snapshot.snapshot_date < day
+            ).order_by(snapshot.snapshot_date.desc()).limit(1)
+        )).first()
+
+        opening_quantity = previous.quantity_on_hand if previous else Decimal("0")
+        opening_value = previous.total_value if previous else Decimal("0")
+        opening_cost = previous.cost_price if previous else Decimal("0")
+        new_quantity = opening_quantity + quantity
+        new_value = opening_value + value
+        stmt = pg_insert(snapshot).values(
+            company_id=company_id,
+            item_id=item_id,
+            snapshot_date=day,
+            quantity_on_hand=new_quantity,
+            cost_price=(new_value / new_quantity).quantize(CENT, ROUND_HALF_UP) if new_quantity > 0 else opening_cost,
+            total_value=new_value
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="_stock_valuation_snapshot_uc",
+            set_={
+                "quantity_on_hand": snapshot.quantity_on_hand + quantity,
+                "total_value": snapshot.total_value + value,
+                "cost_price": _average(
+                    snapshot.quantity_on_hand + quantity, snapshot.total_value + value, snapshot.cost_price
+                ),
+                "updated_at": func.now()
+            }
+        )
+        await db.execute(stmt)
+
+        # Later days up to (not including) the closing row, which is rewritten from the item
+        await db.execute(
+            update(snapshot).where(
+                snapshot.item_id == item_id,
+                snapshot.snapshot_date > day,
+                snapshot.snapshot_date < closing_date
+            ).values(
+                quantity_on_hand=snapshot.quantity_on_hand + quantity,
+                total_value=snapshot.total_value + value,
+                cost_price=_average(snapshot.quantity_on_hand + quantity, snapshot.total_value + value, snapshot.cost_price)
+            ).execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Chart-of-Accounts Hierarchy Test Script
+Builds a three-level account tree, checks that moves which would create a
+cycle are rejected and that the roll-up trial balance sums sub-accounts
+into their parents.
+"""
+
+import asyncio
+import httpx
+from datetime import date, datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class AccountHierarchyTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str, parent_id=None):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "parent_account_id": parent_id,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _set_parent(self, account_id: int, parent_id) -> int:
+        response = await self.client.put(f"/gl/accounts/{account_id}", json={"parent_account_id": parent_id})
+        return response.status_code
+
+    async def _post(self, journal_id: str, debit_account: int, credit_account: int, amount: str) -> int:
+        response = await self.client.post("/gl/journal-entries", json={
+            "transaction_date": date.today().isoformat(),
+            "journal_entry_id": journal_id,
+            "reference": "HIERARCHY-TEST",
+            "lines": [
+                {"account_id": debit_account, "debit_amount": amount, "credit_amount": "0.00"},
+                {"account_id": credit_account, "debit_amount": "0.00", "credit_amount": amount}
+            ]
+        })
+        return response.status_code
+
+    async def test_hierarchy(self):
+        """Cycle detection and roll-up balances"""
+        print(f"\n{Colors.BLUE}=== Account Hierarchy ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        top = await self._create_account(f"1A{timestamp}", "Current assets (hierarchy)", "ASSET")
+        middle = await self._create_account(f"1B{timestamp}", "Bank accounts (hierarchy)", "ASSET", top)
+        leaf = await self._create_account(f"1C{timestamp}", "Main bank (hierarchy)", "ASSET", middle)
+        other = await self._create_account(f"1D{timestamp}", "Petty cash (hierarchy)", "ASSET")
+        equity = await self._create_account(f"3A{timestamp}", "Capital (hierarchy)", "EQUITY")
+        if not all([top, middle, leaf, other, equity]):
+            self.print_result("Setup", False, "Could not create accounts")
+            return
+
+        status = await self._set_parent(top, leaf)
+        self.print_result("Moving an account under its grandchild is rejected", status == 400, f"status {status}")
+        status = await self._set_parent(top, top)
+        self.print_result("Moving an account under itself is rejected", status == 400, f"status {status}")
+        status = await self._set_parent(other, middle)
+        self.print_result("Moving a top-level account into the tree", status == 200, f"status {status}")
+
+        statuses = [
+            await self._post(f"HT-{timestamp}-1", leaf, equity, "100.00"),
+            await self._post(f"HT-{timestamp}-2", middle, equity, "40.00"),
+            await self._post(f"HT-{timestamp}-3", other, equity, "5.00")
+        ]
+        if any(s != 201 for s in statuses):
+            self.print_result("Journal entries", False, f"statuses {statuses} (is today's period open?)")
+            return
+
+        response = await self.client.get("/gl/reports/trial-balance/rollup", params={"report_date": date.today().isoformat()})
+        lines = {line["account_id"]: line for line in response.json()} if response.status_code == 200 else {}
+        balances = {account_id: Decimal(str(lines[account_id]["balance"])) for account_id in (top, middle, leaf) if account_id in lines}
+        self.print_result("Roll-up balances", balances == {top: Decimal("145.00"), middle: Decimal("145.00"), leaf: Decimal("100.00")},
+                         str(balances))
+        self.print_result("Levels", [lines.get(a, {}).get("level") for a in (top, middle, leaf)] == [0, 1, 2],
+                         str([lines.get(a, {}).get("level") for a in (top, middle, leaf)]))
+
+        status = await self._set_parent(other, None)
+        response = await self.client.get("/gl/reports/trial-balance/rollup", params={"report_date": date.today().isoformat()})
+        lines = {line["account_id"]: line for line in response.json()} if response.status_code == 200 else {}
+        self.print_result("Moving an account out drops it from the roll-up",
+                         status == 200 and Decimal(str(lines.get(top, {}).get("balance", 0))) == Decimal("140.00"),
+                         f"top balance {lines.get(top, {}).get('balance')}")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Account Hierarchy Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_hierarchy()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with AccountHierarchyTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
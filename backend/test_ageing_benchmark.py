@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+AR Ageing Benchmark
+Seeds open AR items in a throwaway transaction and compares the previous
+ORM + Python bucketing path with the grouped SQL query. Everything is
+rolled back at the end.
+
+Usage: python test_ageing_benchmark.py [open_items] [customers]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select, and_, text
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import ARTransaction
+from app.services.ar_service import ARService
+
+OPEN_ITEMS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+CUSTOMERS = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+AS_AT = date.today()
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+async def seed(db) -> int:
+    """Insert a company, customers, two transaction types and the open items"""
+    company_id = (await db.execute(text(
+        "INSERT INTO companies (name) VALUES ('Ageing benchmark') RETURNING id"
+    ))).scalar_one()
+    await db.execute(text("""
+        INSERT INTO ar_transaction_types (company_id, code, name, affects_balance, is_payment, is_active)
+        VALUES (:c, 'BINV', 'Benchmark invoice', 'debit', false, true),
+               (:c, 'BCRN', 'Benchmark credit note', 'credit', false, true)
+    """), {"c": company_id})
+    await db.execute(text("""
+        INSERT INTO customers (company_id, customer_code, name, is_active)
+        SELECT :c, 'B' || lpad(g::text, 7, '0'), 'Benchmark customer ' || g, true
+        FROM generate_series(1, :n) AS g
+    """), {"c": company_id, "n": CUSTOMERS})
+    await db.execute(text("""
+        INSERT INTO ar_transactions (
+            company_id, customer_id, transaction_type_id, transaction_number,
+            transaction_date, due_date, amount, allocated_amount, is_posted, is_allocated
+        )
+        SELECT :c,
+               c.ids[1 + (g % array_length(c.ids, 1))],
+               t.ids[1 + (g % 10 = 0)::int],
+               'BAR' || g,
+               CAST(:as_at AS date) - (g % 400),
+               CAST(:as_at AS date) - (g % 400) + 30,
+               100 + (g % 900),
+               CASE WHEN g % 3 = 0 THEN 50 ELSE 0 END,
+               true, false
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id ORDER BY id) AS ids FROM customers WHERE company_id = :c) AS c,
+             (SELECT array_agg(id ORDER BY affects_balance DESC) AS ids FROM ar_transaction_types WHERE company_id = :c) AS t
+    """), {"c": company_id, "n": OPEN_ITEMS, "as_at": AS_AT})
+    await db.execute(text("ANALYZE ar_transactions"))
+    return company_id
+
+async def legacy_customer_ageing(db, company_id: int, as_at_date: date):
+    """The previous implementation: load every open item and bucket in Python"""
+    query = select(ARTransaction).options(
+        selectinload(ARTransaction.customer),
+        selectinload(ARTransaction.transaction_type)
+    ).where(
+        and_(
+            ARTransaction.company_id == company_id,
+            ARTransaction.is_posted == True,
+            ARTransaction.transaction_date <= as_at_date,
+            ARTransaction.allocated_amount < ARTransaction.amount
+        )
+    )
+    transactions = (await db.execute(query)).scalars().all()
+
+    ageing_data = {}
+    for transaction in transactions:
+        row = ageing_data.setdefault(transaction.customer_id, {
+            'customer_id': transaction.customer_id,
+            'current': Decimal('0'), 'days_30': Decimal('0'), 'days_60': Decimal('0'),
+            'days_90': Decimal('0'), 'over_90': Decimal('0'), 'total': Decimal('0')
+        })
+        outstanding = transaction.amount - transaction.allocated_amount
+        if transaction.transaction_type.affects_balance == 'credit':
+            outstanding = -outstanding
+        days_overdue = (as_at_date - (transaction.due_date or transaction.transaction_date)).days
+        if days_overdue <= 0:
+            row['current'] += outstanding
+        elif days_overdue <= 30:
+            row['days_30'] += outstanding
+        elif days_overdue <= 60:
+            row['days_60'] += outstanding
+        elif days_overdue <= 90:
+            row['days_90'] += outstanding
+        else:
+            row['over_90'] += outstanding
+        row['total'] += outstanding
+    return list(ageing_data.values())
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}AR Ageing Benchmark ({OPEN_ITEMS:,} open items){Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            company_id = await seed(db)
+            print_result("Seed", True, f"{time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            new_rows = await ARService.calculate_customer_ageing(db, company_id, AS_AT)
+            sql_elapsed = time.perf_counter() - started
+            print_result("SQL ageing", True, f"{sql_elapsed:.2f}s, {len(new_rows)} customers")
+
+            db.expunge_all()
+            started = time.perf_counter()
+            old_rows = await legacy_customer_ageing(db, company_id, AS_AT)
+            legacy_elapsed = time.perf_counter() - started
+            print_result("Legacy ageing", True, f"{legacy_elapsed:.2f}s, {len(old_rows)} customers")
+
+            keys = ['current', 'days_30', 'days_60', 'days_90', 'over_90', 'total']
+            new_by_customer = {r['customer_id']: [r[k] for k in keys] for r in new_rows}
+            old_by_customer = {r['customer_id']: [r[k] for k in keys] for r in old_rows}
+            print_result("Results match", new_by_customer == old_by_customer)
+            print_result("Speed-up", sql_elapsed < legacy_elapsed,
+                         f"{legacy_elapsed / sql_elapsed:.1f}x faster")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for AR/AP auto-allocation
+Previews and then runs auto-allocation for every customer and supplier, and
+checks the preview matches what was saved. Run test_phase4_ar.py first.
+"""
+
+import asyncio
+import httpx
+
+BASE_URL = "http://localhost:8000/api"
+
+# Test credentials
+USERNAME = "admin"
+PASSWORD = "admin123"
+
+auth_token = None
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+
+async def login(client: httpx.AsyncClient) -> bool:
+    """Login and get authentication token"""
+    global auth_token
+    response = await client.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": USERNAME, "password": PASSWORD}
+    )
+    if response.status_code == 200:
+        auth_token = response.json()["access_token"]
+        return True
+    print(f"✗ Login failed: {response.text}")
+    return False
+
+
+def headers():
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+async def check_ledger(client: httpx.AsyncClient, module: str, party: str):
+    print(f"\n{Colors.BLUE}=== {module.upper()} auto-allocation ==={Colors.RESET}")
+    url = f"{BASE_URL}/{module}/allocations/auto"
+
+    preview = await client.post(url, json={"dry_run": True}, headers=headers())
+    print_result("Dry run succeeds", preview.status_code == 200, preview.text[:200])
+    if preview.status_code != 200:
+        return
+    preview = preview.json()
+    print(f"  {preview['allocation_count']} allocations for {preview[party + '_count']} {party}s, "
+          f"total {preview['total_allocated']}")
+
+    again = (await client.post(url, json={"dry_run": True}, headers=headers())).json()
+    print_result("Dry run saves nothing", again["allocation_count"] == preview["allocation_count"])
+
+    run = await client.post(url, json={}, headers=headers())
+    result = run.json()
+    print_result("Run matches the preview", run.status_code == 200
+                 and result["total_allocated"] == preview["total_allocated"],
+                 f"{result.get('total_allocated')} vs {preview['total_allocated']}")
+
+    rerun = (await client.post(url, json={"dry_run": True}, headers=headers())).json()
+    print_result("Nothing left to allocate", rerun["allocation_count"] == 0, str(rerun["allocation_count"]))
+
+    response = await client.post(url, json={"rules": ["nearest"], "dry_run": True}, headers=headers())
+    print_result("Unknown rule is rejected", response.status_code == 400, response.text)
+
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}Auto-allocation Tests{Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    async with httpx.AsyncClient(timeout=120) as client:
+        if not await login(client):
+            return
+        await check_ledger(client, "ar", "customer")
+        await check_ledger(client, "ap", "supplier")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for AR/AP batch posting
+Creates a run of unposted invoices, posts them with one batch request and
+compares the time against posting the same number one at a time. Run
+test_phase4_ar.py first so a customer and an invoice type exist.
+"""
+
+import asyncio
+import time
+import httpx
+from datetime import date
+from decimal import Decimal
+
+BASE_URL = "http://localhost:8000/api"
+
+# Test credentials
+USERNAME = "admin"
+PASSWORD = "admin123"
+
+INVOICE_COUNT = 200
+CHUNK_SIZE = 50
+
+auth_token = None
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+
+async def login(client: httpx.AsyncClient) -> bool:
+    """Login and get authentication token"""
+    global auth_token
+    response = await client.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": USERNAME, "password": PASSWORD}
+    )
+    if response.status_code == 200:
+        auth_token = response.json()["access_token"]
+        return True
+    print(f"✗ Login failed: {response.text}")
+    return False
+
+
+def headers():
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+async def create_invoices(client: httpx.AsyncClient, customer_id: int, type_id: int, count: int, tag: str) -> list:
+    ids = []
+    for i in range(count):
+        response = await client.post(f"{BASE_URL}/ar/transactions", json={
+            "customer_id": customer_id,
+            "transaction_type_id": type_id,
+            "transaction_number": f"BP{tag}{i:05d}",
+            "transaction_date": date.today().isoformat(),
+            "description": "Batch posting test",
+            "amount": "10.00"
+        }, headers=headers())
+        if response.status_code == 200:
+            ids.append(response.json()["id"])
+    return ids
+
+
+async def customer_balance(client: httpx.AsyncClient, customer_id: int) -> Decimal:
+    response = await client.get(f"{BASE_URL}/customers/{customer_id}/balance", headers=headers())
+    return Decimal(str(response.json()["current_balance"]))
+
+
+async def test_batch_post(client: httpx.AsyncClient):
+    print(f"\n{Colors.BLUE}=== AR batch posting ==={Colors.RESET}")
+    customers = (await client.get(f"{BASE_URL}/customers", headers=headers())).json()
+    types = (await client.get(f"{BASE_URL}/ar/transaction-types", headers=headers())).json()
+    invoice_types = [t for t in types if t["affects_balance"] == "debit"]
+    if not customers or not invoice_types:
+        print_result("Setup", False, "Run test_phase4_ar.py first")
+        return
+    customer_id = customers[0]["id"]
+    type_id = invoice_types[0]["id"]
+    tag = str(int(time.time()))[-5:]
+
+    single_ids = await create_invoices(client, customer_id, type_id, INVOICE_COUNT, f"S{tag}")
+    batch_ids = await create_invoices(client, customer_id, type_id, INVOICE_COUNT, f"B{tag}")
+    print_result("Invoices created", len(single_ids) == len(batch_ids) == INVOICE_COUNT,
+                 f"{len(single_ids)} + {len(batch_ids)}")
+
+    start = time.perf_counter()
+    for transaction_id in single_ids:
+        await client.post(f"{BASE_URL}/ar/transactions/{transaction_id}/post", headers=headers())
+    single_seconds = time.perf_counter() - start
+
+    balance_before = await customer_balance(client, customer_id)
+    start = time.perf_counter()
+    response = await client.post(f"{BASE_URL}/ar/transactions/batch-post", json={
+        "transaction_ids": batch_ids + [single_ids[0], 999999999],
+        "chunk_size": CHUNK_SIZE
+    }, headers=headers())
+    batch_seconds = time.perf_counter() - start
+    result = response.json()
+
+    print_result("Batch post succeeds for new invoices", response.status_code == 200 and result["posted"] == INVOICE_COUNT,
+                 f"posted={result.get('posted')} failed={result.get('failed')}")
+    errors = {r["transaction_id"]: r["error"] for r in result.get("results", []) if not r["success"]}
+    print_result("Already posted and unknown IDs are reported", errors == {
+        single_ids[0]: "Transaction already posted",
+        999999999: "Transaction not found"
+    }, str(errors))
+
+    balance_after = await customer_balance(client, customer_id)
+    print_result("Customer balance includes the batch", balance_after - balance_before == Decimal("10.00") * INVOICE_COUNT,
+                 f"{balance_before} -> {balance_after}")
+    print_result("Batch is faster than single posts", batch_seconds < single_seconds,
+                 f"single {single_seconds:.2f}s, batch {batch_seconds:.2f}s")
+
+    response = await client.post(f"{BASE_URL}/ar/transactions/batch-post", json={}, headers=headers())
+    print_result("Empty request is rejected", response.status_code == 400, response.text)
+
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}Batch Posting Tests{Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    async with httpx.AsyncClient(timeout=120) as client:
+        if not await login(client):
+            return
+        await test_batch_post(client)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Inventory Costing Concurrency Test Script
+Posts receipts at different costs and issues in parallel against one SKU and
+checks that no quantity is lost and the weighted average cost matches the
+value of the item's transactions.
+"""
+
+import asyncio
+import httpx
+import time
+from datetime import datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+OPENING_QUANTITY = Decimal("1000")
+OPENING_COST = Decimal("10.00")
+PARALLEL_RECEIPTS = 100
+PARALLEL_ISSUES = 100
+RECEIPT_QUANTITY = Decimal("10")
+RECEIPT_COSTS = [Decimal("8.00"), Decimal("9.50"), Decimal("12.25"), Decimal("14.00")]
+ISSUE_QUANTITY = Decimal("5")
+CONCURRENCY = 20
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class CostingConcurrencyTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _create_type(self, code: str, is_increase: bool, inventory_id: int, contra_id: int):
+        response = await self.client.post("/inventory/transaction-types", json={
+            "code": code,
+            "description": f"Costing test {'receipt' if is_increase else 'issue'}",
+            "is_increase": is_increase,
+            "gl_account_id": inventory_id,
+            "contra_gl_account_id": contra_id
+        })
+        return response.json()["id"] if response.status_code == 200 else None
+
+    async def _adjust(self, item_id: int, type_id: int, quantity: Decimal, unit_cost=None) -> int:
+        payload = {
+            "item_id": item_id,
+            "transaction_type_id": type_id,
+            "transaction_date": datetime.now().isoformat(),
+            "quantity": str(quantity),
+            "reference": "COSTING-TEST"
+        }
+        if unit_cost is not None:
+            payload["unit_cost"] = str(unit_cost)
+        response = await self.client.post("/inventory/adjustments", json=payload)
+        return response.status_code
+
+    async def test_parallel_receipts_and_issues(self):
+        """Receive and issue one SKU concurrently"""
+        print(f"\n{Colors.BLUE}=== Parallel Receipts and Issues on One SKU ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        inventory_id = await self._create_account(f"1300-{timestamp}", "Inventory (costing)", "ASSET")
+        contra_id = await self._create_account(f"5100-{timestamp}", "Stock adjustments (costing)", "EXPENSE")
+        receipt_type = await self._create_type(f"RC{timestamp}", True, inventory_id, contra_id)
+        issue_type = await self._create_type(f"IS{timestamp}", False, inventory_id, contra_id)
+        response = await self.client.post("/inventory/items", json={
+            "item_code": f"COST{timestamp}",
+            "description": "Costing concurrency SKU"
+        })
+        item_id = response.json()["id"] if response.status_code == 200 else None
+        if not all([inventory_id, contra_id, receipt_type, issue_type, item_id]):
+            self.print_result("Setup", False, "Could not create accounts, types or item")
+            return
+
+        status = await self._adjust(item_id, receipt_type, OPENING_QUANTITY, OPENING_COST)
+        self.print_result("Opening receipt", status == 200, f"status {status}")
+
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def receipt(i: int) -> int:
+            async with semaphore:
+                return await self._adjust(item_id, receipt_type, RECEIPT_QUANTITY, RECEIPT_COSTS[i % len(RECEIPT_COSTS)])
+
+        async def issue(i: int) -> int:
+            async with semaphore:
+                return await self._adjust(item_id, issue_type, ISSUE_QUANTITY)
+
+        jobs = [receipt(i) for i in range(PARALLEL_RECEIPTS)] + [issue(i) for i in range(PARALLEL_ISSUES)]
+        # Interleave receipts and issues
+        jobs = [job for pair in zip(jobs[:PARALLEL_RECEIPTS], jobs[PARALLEL_RECEIPTS:]) for job in pair]
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*jobs)
+        elapsed = time.perf_counter() - started
+
+        accepted = sum(1 for s in statuses if s == 200)
+        self.print_result("All movements accepted", accepted == len(statuses),
+                         f"{accepted}/{len(statuses)}, statuses: {sorted(set(statuses))}")
+        self.print_result("Throughput", accepted > 0,
+                         f"{accepted / elapsed:.1f} movements/sec at concurrency {CONCURRENCY}")
+
+        item = (await self.client.get(f"/inventory/items/{item_id}")).json()
+        quantity = Decimal(str(item["quantity_on_hand"]))
+        cost_price = Decimal(str(item["cost_price"]))
+        expected_quantity = OPENING_QUANTITY + RECEIPT_QUANTITY * PARALLEL_RECEIPTS - ISSUE_QUANTITY * PARALLEL_ISSUES
+        self.print_result("No lost quantity updates", quantity == expected_quantity,
+                         f"Expected {expected_quantity}, got {quantity}")
+
+        transactions = (await self.client.get(f"/inventory/items/{item_id}/transactions")).json()
+        ledger_quantity = sum(Decimal(str(t["quantity"])) for t in transactions)
+        ledger_value = sum(Decimal(str(t["total_cost"])) for t in transactions)
+        self.print_result("Transactions add up to quantity on hand", ledger_quantity == quantity,
+                         f"{ledger_quantity} vs {quantity}")
+
+        # The average is rounded to cents after every receipt
+        tolerance = Decimal("0.005") * quantity * (PARALLEL_RECEIPTS + 1) + Decimal("0.01") * len(transactions)
+        self.print_result("Average cost matches transaction value", abs(quantity * cost_price - ledger_value) <= tolerance,
+                         f"on hand {quantity} x {cost_price} = {quantity * cost_price}, transactions {ledger_value}")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Inventory Costing Concurrency Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_parallel_receipts_and_issues()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with CostingConcurrencyTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Event Loop Load Test Script
+Measures GL/AR request latency on its own and again while inventory reports
+run concurrently. Inventory endpoints share the async session, so the probe
+latency should stay close to the idle baseline.
+"""
+
+import asyncio
+import httpx
+import statistics
+import time
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+PROBE_REQUESTS = 100
+PROBE_CONCURRENCY = 10
+REPORT_WORKERS = 8
+# Allowed p95 slowdown under report load before the test fails
+MAX_P95_RATIO = 3.0
+
+PROBE_PATHS = ["/gl/accounts", "/ar/transactions"]
+REPORT_PATHS = [
+    ("POST", "/inventory/reports/stock-quantity", {"show_zero_qty": True}),
+    ("GET", "/inventory/reports/item-listing", None),
+]
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class EventLoopLoadTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=120.0,
+            limits=httpx.Limits(max_connections=PROBE_CONCURRENCY + REPORT_WORKERS + 5)
+        )
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _probe(self) -> list:
+        """Issue GL/AR reads and return their latencies in milliseconds"""
+        semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+        async def one(i: int) -> float:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await self.client.get(PROBE_PATHS[i % len(PROBE_PATHS)])
+                response.raise_for_status()
+                return (time.perf_counter() - started) * 1000
+
+        return await asyncio.gather(*(one(i) for i in range(PROBE_REQUESTS)))
+
+    async def _run_reports(self, stop: asyncio.Event) -> int:
+        """Keep inventory reports running until told to stop"""
+        completed = 0
+        i = 0
+        while not stop.is_set():
+            method, path, body = REPORT_PATHS[i % len(REPORT_PATHS)]
+            response = await self.client.request(method, path, json=body)
+            response.raise_for_status()
+            completed += 1
+            i += 1
+        return completed
+
+    @staticmethod
+    def _p95(latencies: list) -> float:
+        return statistics.quantiles(latencies, n=20)[-1]
+
+    async def test_latency_under_report_load(self):
+        """GL/AR latency must not degrade while inventory reports run"""
+        print(f"\n{Colors.BLUE}=== GL/AR Latency Under Inventory Report Load ==={Colors.RESET}")
+
+        # Warm up connections and caches
+        await self._probe()
+
+        baseline = await self._probe()
+        self.print_result("Baseline", True,
+                         f"p50 {statistics.median(baseline):.1f} ms, p95 {self._p95(baseline):.1f} ms")
+
+        stop = asyncio.Event()
+        workers = [asyncio.create_task(self._run_reports(stop)) for _ in range(REPORT_WORKERS)]
+        await asyncio.sleep(0.5)
+        try:
+            loaded = await self._probe()
+        finally:
+            stop.set()
+            reports = sum(await asyncio.gather(*workers))
+
+        ratio = self._p95(loaded) / self._p95(baseline)
+        self.print_result("Under report load", ratio <= MAX_P95_RATIO,
+                         f"p50 {statistics.median(loaded):.1f} ms, p95 {self._p95(loaded):.1f} ms "
+                         f"({ratio:.1f}x baseline, {reports} reports completed)")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Event Loop Load Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_latency_under_report_load()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with EventLoopLoadTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
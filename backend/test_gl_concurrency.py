@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+GL Concurrency Test Script
+Posts journal entries in parallel against one control account and checks
+throughput and that the final account balance has no lost updates.
+"""
+
+import asyncio
+import httpx
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+PARALLEL_POSTS = 200
+CONCURRENCY = 20
+LINE_AMOUNT = Decimal("12.34")
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class GLConcurrencyTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _get_balance(self, account_id: int) -> Decimal:
+        response = await self.client.get(f"/gl/accounts/{account_id}")
+        return Decimal(str(response.json()["current_balance"]))
+
+    async def test_parallel_posting(self):
+        """Post many journal entries concurrently to one hot account"""
+        print(f"\n{Colors.BLUE}=== Parallel Posting to One Account ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        control_id = await self._create_account(f"1100-{timestamp}", "AR Control (concurrency)", "ASSET")
+        income_ids = [
+            await self._create_account(f"40{i:02d}-{timestamp}", f"Revenue {i}", "INCOME")
+            for i in range(4)
+        ]
+        if not control_id or not all(income_ids):
+            self.print_result("Create accounts", False)
+            return
+
+        opening_balance = await self._get_balance(control_id)
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def post(i: int) -> int:
+            async with semaphore:
+                response = await self.client.post("/gl/journal-entries", json={
+                    "transaction_date": date.today().isoformat(),
+                    "journal_entry_id": f"CONC-{timestamp}-{i:05d}",
+                    "description": "Concurrency test",
+                    "lines": [
+                        {"account_id": control_id, "debit_amount": str(LINE_AMOUNT), "credit_amount": "0.00"},
+                        {"account_id": income_ids[i % len(income_ids)], "debit_amount": "0.00", "credit_amount": str(LINE_AMOUNT)}
+                    ]
+                })
+                return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(post(i) for i in range(PARALLEL_POSTS)))
+        elapsed = time.perf_counter() - started
+
+        posted = sum(1 for s in statuses if s == 201)
+        self.print_result("All posts accepted", posted == PARALLEL_POSTS,
+                         f"{posted}/{PARALLEL_POSTS} posted, statuses: {sorted(set(statuses))}")
+        self.print_result("Throughput", posted > 0,
+                         f"{posted / elapsed:.1f} journal entries/sec at concurrency {CONCURRENCY}")
+
+        closing_balance = await self._get_balance(control_id)
+        expected = opening_balance + LINE_AMOUNT * posted
+        self.print_result("No lost balance updates", closing_balance == expected,
+                         f"Expected {expected}, got {closing_balance}")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}GL Concurrency Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_parallel_posting()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with GLConcurrencyTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
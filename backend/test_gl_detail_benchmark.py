@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+GL Detail Benchmark
+Seeds a ledger in a throwaway transaction, closes all but the last period
+and compares the previous per-account path (full SUM for the opening
+balance, raw lines, running balance in Python) with the snapshot opening
+balance and window-function running balances for many accounts in one call.
+Everything is rolled back at the end.
+
+Usage: python test_gl_detail_benchmark.py [gl_lines] [accounts] [report_accounts]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, func, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import AccountingPeriod, GLAccount, GLTransaction
+from app.services.gl_service import GLService
+
+GL_LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+ACCOUNTS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+REPORT_ACCOUNTS = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+PERIODS = 13
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+def month_start(day: date, months_back: int) -> date:
+    month = day.year * 12 + day.month - 1 - months_back
+    return date(month // 12, month % 12 + 1, 1)
+
+async def seed(db):
+    """Insert a company, accounts, monthly periods and the GL lines; seal all but the last period"""
+    company_id = (await db.execute(text(
+        "INSERT INTO companies (name) VALUES ('GL detail benchmark') RETURNING id"
+    ))).scalar_one()
+    await db.execute(text("""
+        INSERT INTO gl_accounts (company_id, account_code, account_name, account_type, is_active, is_system_account, current_balance)
+        SELECT :c, 'B' || lpad(g::text, 6, '0'), 'Benchmark account ' || g, 'ASSET', true, false, 0
+        FROM generate_series(1, :n) AS g
+    """), {"c": company_id, "n": ACCOUNTS})
+
+    first_start = month_start(date.today(), PERIODS - 1)
+    for i in range(PERIODS):
+        start = month_start(date.today(), PERIODS - 1 - i)
+        end = month_start(date.today(), PERIODS - 2 - i) - timedelta(days=1)
+        await db.execute(text("""
+            INSERT INTO accounting_periods (company_id, period_name, start_date, end_date, is_closed, financial_year)
+            VALUES (:c, :name, :start, :end, false, :year)
+        """), {"c": company_id, "name": f"Benchmark {start:%Y-%m}", "start": start, "end": end, "year": start.year})
+    last_end = month_start(date.today(), -1) - timedelta(days=1)
+
+    await db.execute(text("""
+        INSERT INTO gl_transactions (company_id, journal_entry_id, account_id, transaction_date,
+                                     debit_amount, credit_amount, source_module, is_reversed)
+        SELECT :c, 'BJE-' || (g / 2),
+               a.ids[1 + (g % array_length(a.ids, 1))],
+               CAST(:first AS date) + (g % (CAST(:last AS date) - CAST(:first AS date) + 1)),
+               CASE WHEN g % 2 = 0 THEN 10 + (g % 900) ELSE 0 END,
+               CASE WHEN g % 2 = 1 THEN 10 + (g % 700) ELSE 0 END,
+               'GL', false
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id ORDER BY id) AS ids FROM gl_accounts WHERE company_id = :c) AS a
+    """), {"c": company_id, "n": GL_LINES, "first": first_start, "last": last_end})
+    await db.execute(text("ANALYZE gl_transactions"))
+
+    periods = (await db.execute(
+        select(AccountingPeriod).where(AccountingPeriod.company_id == company_id).order_by(AccountingPeriod.start_date)
+    )).scalars().all()
+    for period in periods[:-1]:
+        period.is_closed = True
+        await GLService.seal_period_balances(db, period)
+    await db.flush()
+    await db.execute(text("ANALYZE gl_period_balances"))
+    return company_id, periods[-1].start_date, periods[-1].end_date
+
+async def legacy_gl_detail(db, company_id: int, account_id: int, start_date: date, end_date: date):
+    """The previous path: full SUM for the opening balance, then raw lines summed in Python"""
+    opening = (await db.execute(
+        select(func.sum(GLTransaction.debit_amount - GLTransaction.credit_amount)).where(
+            GLTransaction.account_id == account_id,
+            GLTransaction.transaction_date <= start_date - timedelta(days=1)
+        )
+    )).scalar() or Decimal("0.00")
+    lines = await GLService.get_gl_detail(db, company_id, account_id, start_date, end_date)
+    running = opening
+    balances = []
+    for line in lines:
+        running += line.debit_amount - line.credit_amount
+        balances.append(running)
+    return opening, balances
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}GL Detail Benchmark ({GL_LINES:,} lines, {REPORT_ACCOUNTS} of {ACCOUNTS} accounts){Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            company_id, start_date, end_date = await seed(db)
+            print_result("Seed", True, f"{time.perf_counter() - started:.1f}s")
+
+            accounts = (await db.execute(
+                select(GLAccount).where(GLAccount.company_id == company_id).order_by(GLAccount.account_code).limit(REPORT_ACCOUNTS)
+            )).scalars().all()
+
+            started = time.perf_counter()
+            report = await GLService.get_gl_detail_with_balances(db, company_id, accounts, start_date, end_date)
+            new_elapsed = time.perf_counter() - started
+            line_count = sum(len(account["lines"]) for account in report)
+            print_result("Snapshot + window detail", True, f"{new_elapsed:.2f}s, {line_count:,} lines in one call")
+
+            started = time.perf_counter()
+            legacy = {}
+            for account in accounts:
+                legacy[account.id] = await legacy_gl_detail(db, company_id, account.id, start_date, end_date)
+            legacy_elapsed = time.perf_counter() - started
+            db.expunge_all()
+            print_result("Legacy per-account detail", True, f"{legacy_elapsed:.2f}s, {len(accounts)} calls")
+
+            matches = all(
+                (account["opening_balance"], [line["running_balance"] for line in account["lines"]]) == legacy[account["account_id"]]
+                for account in report
+            )
+            print_result("Opening and running balances match", matches)
+            print_result("Speed-up", new_elapsed < legacy_elapsed, f"{legacy_elapsed / new_elapsed:.1f}x faster")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Index Usage Regression Test
+Seeds ledger data for a target company alongside a larger noise company in a
+throwaway transaction, runs the trial balance, GL detail, ageing, statement
+and period lookups through their services, and checks EXPLAIN shows each one
+reading the index it was built for. Everything is rolled back at the end.
+"""
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.ar_service import ARService
+from app.services.gl_service import GLService
+
+TARGET_GL_ROWS = 20_000
+NOISE_GL_ROWS = 300_000
+TARGET_AR_ROWS = 30_000
+NOISE_AR_ROWS = 300_000
+START = date(2023, 1, 1)
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+class CapturingSession:
+    """Session proxy that records every statement a service executes"""
+
+    def __init__(self, db):
+        self.db = db
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return await self.db.execute(statement, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+def _index_names(plan: dict) -> set:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+async def indexes_used(db, statements) -> set:
+    """EXPLAIN each captured statement and collect the indexes in its plan"""
+    conn = await db.connection()
+    names = set()
+    for statement in statements:
+        sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        names |= _index_names(plan[0]["Plan"])
+    return names
+
+async def seed_company(db, name: str, gl_rows: int, ar_rows: int, daily_periods: bool) -> dict:
+    company_id = (await db.execute(text(
+        "INSERT INTO companies (name) VALUES (:name) RETURNING id"
+    ), {"name": name})).scalar_one()
+    params = {"c": company_id, "start": START}
+
+    await db.execute(text("""
+        INSERT INTO gl_accounts (company_id, account_code, account_name, account_type,
+                                 current_balance, is_active, is_system_account)
+        SELECT :c, 'A' || lpad(g::text, 4, '0'), 'Account ' || g,
+               (ARRAY['ASSET','LIABILITY','EQUITY','INCOME','EXPENSE'])[1 + g % 5], 0, true, false
+        FROM generate_series(1, 50) AS g
+    """), params)
+    if daily_periods:
+        await db.execute(text("""
+            INSERT INTO accounting_periods (company_id, period_name, start_date, end_date, is_closed, financial_year)
+            SELECT :c, 'D' || g, CAST(:start AS date) + g, CAST(:start AS date) + g, false, 2023
+            FROM generate_series(0, 1999) AS g
+        """), params)
+    else:
+        # 24 monthly periods, the first 18 closed
+        await db.execute(text("""
+            INSERT INTO accounting_periods (company_id, period_name, start_date, end_date, is_closed, financial_year)
+            SELECT :c, 'P' || g, m, (m + interval '1 month - 1 day')::date, g < 18,
+                   extract(year FROM m)::int
+            FROM generate_series(0, 23) AS g,
+                 LATERAL (SELECT (CAST(:start AS date) + g * interval '1 month')::date AS m) AS month
+        """), params)
+    await db.execute(text("""
+        INSERT INTO gl_transactions (company_id, journal_entry_id, account_id, transaction_date,
+                                     debit_amount, credit_amount, is_reversed)
+        SELECT :c, 'JE' || (g / 2), a.ids[1 + g % 50], CAST(:start AS date) + (g % 720),
+               CASE WHEN g % 2 = 0 THEN 100 ELSE 0 END, CASE WHEN g % 2 = 1 THEN 100 ELSE 0 END, false
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id ORDER BY id) AS ids FROM gl_accounts WHERE company_id = :c) AS a
+    """), {**params, "n": gl_rows})
+
+    await db.execute(text("""
+        INSERT INTO ar_transaction_types (company_id, code, name, affects_balance, is_payment, is_active)
+        VALUES (:c, 'INV', 'Invoice', 'debit', false, true), (:c, 'PMT', 'Payment', 'credit', true, true)
+    """), params)
+    await db.execute(text("""
+        INSERT INTO customers (company_id, customer_code, name, is_active)
+        SELECT :c, 'C' || lpad(g::text, 5, '0'), 'Customer ' || g, true
+        FROM generate_series(1, 500) AS g
+    """), params)
+    # Most items are fully allocated, as in a live ledger
+    await db.execute(text("""
+        INSERT INTO ar_transactions (company_id, customer_id, transaction_type_id, transaction_number,
+                                     transaction_date, due_date, amount, allocated_amount, is_posted, is_allocated)
+        SELECT :c, cu.ids[1 + g % 500], t.ids[1 + (g % 5 = 0)::int], 'AR' || g,
+               CAST(:start AS date) + (g % 720), CAST(:start AS date) + (g % 720) + 30,
+               100, CASE WHEN g % 7 = 0 THEN 0 ELSE 100 END, true, g % 7 <> 0
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id ORDER BY id) AS ids FROM customers WHERE company_id = :c) AS cu,
+             (SELECT array_agg(id ORDER BY affects_balance DESC) AS ids FROM ar_transaction_types WHERE company_id = :c) AS t
+    """), {**params, "n": ar_rows})
+
+    ids = (await db.execute(text("""
+        SELECT (SELECT min(id) FROM gl_accounts WHERE company_id = :c) AS account_id,
+               (SELECT min(id) FROM customers WHERE company_id = :c) AS customer_id
+    """), params)).one()
+    return {"company_id": company_id, "account_id": ids.account_id, "customer_id": ids.customer_id}
+
+async def check(db, label: str, expected: str, call):
+    capture = CapturingSession(db)
+    await call(capture)
+    used = await indexes_used(db, capture.statements)
+    print_result(f"{label} uses {expected}", expected in used,
+                 f"indexes in plan: {', '.join(sorted(used)) or 'none'}")
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}Index Usage Regression Test{Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    try:
+        async with AsyncSessionLocal() as db:
+            await seed_company(db, "Index noise", NOISE_GL_ROWS, NOISE_AR_ROWS, daily_periods=True)
+            target = await seed_company(db, "Index target", TARGET_GL_ROWS, TARGET_AR_ROWS, daily_periods=False)
+            for table in ("gl_accounts", "accounting_periods", "gl_transactions",
+                          "customers", "ar_transaction_types", "ar_transactions"):
+                await db.execute(text(f"ANALYZE {table}"))
+
+            company_id = target["company_id"]
+            report_date = START + timedelta(days=719)
+
+            await check(db, "Trial balance", "ix_gl_transactions_company_date",
+                        lambda s: GLService.get_trial_balance(s, company_id, report_date))
+            await check(db, "GL detail", "ix_gl_transactions_company_account_date",
+                        lambda s: GLService.get_gl_detail(
+                            s, company_id, target["account_id"], date(2024, 3, 1), date(2024, 3, 31)))
+            await check(db, "Customer ageing", "ix_ar_transactions_open_items",
+                        lambda s: ARService.calculate_customer_ageing(s, company_id, report_date))
+            await check(db, "Customer statement", "ix_ar_transactions_company_customer_posted_date",
+                        lambda s: ARService.get_statement_transactions(s, company_id, target["customer_id"]))
+            await check(db, "Period lookup", "_period_dates_uc",
+                        lambda s: GLService.get_period_for_date(s, company_id, date(2024, 6, 15)))
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
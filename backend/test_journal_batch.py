@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Journal Entry Batch Test Script
+Posts a batch with a balanced and an unbalanced entry, imports a CSV and
+checks that a CSV whose rows disagree on an entry's header columns is
+rejected with the offending row.
+"""
+
+import asyncio
+import httpx
+from datetime import date, datetime
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+CSV_HEADER = "journal_entry_id,transaction_date,reference,description,account_id,line_description,debit_amount,credit_amount\n"
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class JournalBatchTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _import(self, content: str):
+        return await self.client.post("/gl/journal-entries/import", files={
+            "file": ("journals.csv", content.encode("utf-8"), "text/csv")
+        })
+
+    async def test_batch(self):
+        """Balanced and unbalanced entries in one batch"""
+        print(f"\n{Colors.BLUE}=== Journal Entry Batch ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        today = date.today().isoformat()
+        bank = await self._create_account(f"1JB{timestamp}", "Bank (batch test)", "ASSET")
+        capital = await self._create_account(f"3JB{timestamp}", "Capital (batch test)", "EQUITY")
+        if not all([bank, capital]):
+            self.print_result("Setup", False, "Could not create accounts")
+            return
+
+        response = await self.client.post("/gl/journal-entries/batch", json={"entries": [
+            {
+                "transaction_date": today,
+                "journal_entry_id": f"JB-{timestamp}-1",
+                "lines": [
+                    {"account_id": bank, "debit_amount": "10.00", "credit_amount": "0.00"},
+                    {"account_id": capital, "debit_amount": "0.00", "credit_amount": "10.00"}
+                ]
+            },
+            {
+                "transaction_date": today,
+                "journal_entry_id": f"JB-{timestamp}-2",
+                "lines": [
+                    {"account_id": bank, "debit_amount": "10.00", "credit_amount": "0.00"},
+                    {"account_id": capital, "debit_amount": "0.00", "credit_amount": "9.00"}
+                ]
+            }
+        ]})
+        body = response.json() if response.status_code == 200 else {}
+        results = {r["journal_entry_id"]: r for r in body.get("results", [])}
+        self.print_result("Balanced entry posted", results.get(f"JB-{timestamp}-1", {}).get("success") is True,
+                         f"status {response.status_code}, posted {body.get('posted')} (is today's period open?)")
+        self.print_result("Unbalanced entry rejected on its own",
+                         body.get("failed") == 1 and results.get(f"JB-{timestamp}-2", {}).get("error") == "Debits must equal credits",
+                         str(results.get(f"JB-{timestamp}-2")))
+
+        response = await self._import(
+            CSV_HEADER
+            + f"JB-{timestamp}-3,{today},CSV,Import,{bank},,25.00,0.00\n"
+            + f"JB-{timestamp}-3,{today},CSV,Import,{capital},,0.00,25.00\n"
+        )
+        posted = response.json().get("posted") if response.status_code == 200 else None
+        self.print_result("CSV import", posted == 1, f"status {response.status_code}, posted {posted}")
+
+        response = await self._import(
+            CSV_HEADER
+            + f"JB-{timestamp}-4,{today},CSV,Import,{bank},,25.00,0.00\n"
+            + f"JB-{timestamp}-4,{today},OTHER,Import,{capital},,0.00,25.00\n"
+        )
+        detail = response.json().get("detail", "")
+        self.print_result("CSV with mixed entry headers rejected", response.status_code == 400 and "row 3" in detail, detail)
+
+        response = await self.client.get("/gl/reports/gl-detail", params={
+            "account_id": bank, "start_date": today, "end_date": today
+        })
+        journal_ids = sorted(l["journal_entry_id"] for l in response.json()) if response.status_code == 200 else []
+        self.print_result("Only the valid entries reached the ledger",
+                         journal_ids == [f"JB-{timestamp}-1", f"JB-{timestamp}-3"], str(journal_ids))
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Journal Entry Batch Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_batch()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with JournalBatchTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
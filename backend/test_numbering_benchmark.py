@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Document Numbering Benchmark
+Allocates document numbers from many concurrent sessions in both modes and
+checks that every number is unique (and contiguous for gap-free mode).
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.numbering_service import NumberingService
+
+WORKERS = 32
+NUMBERS_PER_WORKER = 100
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+async def issue_numbers(prefix: str, mode: str) -> list:
+    """One worker: allocate numbers, each in its own committed transaction"""
+    numbers = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(NUMBERS_PER_WORKER):
+            numbers.append(await NumberingService.next_value(
+                db, NumberingService.SHARED_SCOPE, prefix, mode
+            ))
+            await db.commit()
+    return numbers
+
+async def benchmark(mode: str):
+    prefix = f"BENCH-{mode}-{datetime.now().strftime('%H%M%S')}-"
+    started = time.perf_counter()
+    results = await asyncio.gather(*(issue_numbers(prefix, mode) for _ in range(WORKERS)))
+    elapsed = time.perf_counter() - started
+
+    issued = [n for worker in results for n in worker]
+    expected = WORKERS * NUMBERS_PER_WORKER
+    print_result(f"{mode}: unique numbers", len(set(issued)) == expected,
+                 f"{len(set(issued))}/{expected} unique")
+    print_result(f"{mode}: contiguous", sorted(issued) == list(range(1, expected + 1)))
+    print_result(f"{mode}: throughput", True,
+                 f"{expected / elapsed:.0f} numbers/sec with {WORKERS} concurrent sessions")
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}Document Numbering Benchmark{Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    try:
+        await benchmark(NumberingService.GAP_FREE)
+        await benchmark(NumberingService.FAST)
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Period Close Pipeline Test Script
+Creates a two-period financial year, closes both periods through the
+background close job (the second with the retained earnings roll-forward),
+checks postings into a closed period are refused and that reopening undoes
+the year-end journal.
+"""
+
+import asyncio
+import httpx
+from datetime import datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+JOB_TIMEOUT_SECONDS = 120
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class PeriodCloseTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _create_year(self):
+        """Two half-year periods in the first far-future financial year that is still free"""
+        for year in range(2060, 2100):
+            first = await self.client.post("/accounting-periods/", json={
+                "period_name": f"H1 {year} (close test)",
+                "start_date": f"{year}-01-01",
+                "end_date": f"{year}-06-30",
+                "financial_year": year
+            })
+            if first.status_code != 201:
+                continue
+            second = await self.client.post("/accounting-periods/", json={
+                "period_name": f"H2 {year} (close test)",
+                "start_date": f"{year}-07-01",
+                "end_date": f"{year}-12-31",
+                "financial_year": year
+            })
+            if second.status_code == 201:
+                return year, first.json()["id"], second.json()["id"]
+        return None, None, None
+
+    async def _post(self, journal_id: str, day: str, debit_account: int, credit_account: int, amount: str) -> int:
+        response = await self.client.post("/gl/journal-entries", json={
+            "transaction_date": day,
+            "journal_entry_id": journal_id,
+            "reference": "CLOSE-TEST",
+            "lines": [
+                {"account_id": debit_account, "debit_amount": amount, "credit_amount": "0.00"},
+                {"account_id": credit_account, "debit_amount": "0.00", "credit_amount": amount}
+            ]
+        })
+        return response.status_code
+
+    async def _run_job(self, period_id: int, action: str) -> dict:
+        """Submit a close or reopen and poll the job until it finishes"""
+        response = await self.client.post(f"/accounting-periods/{period_id}/{action}")
+        if response.status_code != 202:
+            return {"status": f"HTTP {response.status_code}", "error": response.text}
+        job = response.json()
+        for _ in range(JOB_TIMEOUT_SECONDS * 2):
+            if job["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.5)
+            job = (await self.client.get(f"/accounting-periods/close-jobs/{job['id']}")).json()
+        return job
+
+    async def _balances(self, report_date: str, *account_ids: int):
+        response = await self.client.get("/gl/reports/trial-balance", params={"report_date": report_date})
+        lines = response.json() if response.status_code == 200 else []
+        balances = {line["account_id"]: Decimal(str(line["balance"])) for line in lines}
+        return [balances.get(account_id, Decimal("0.00")) for account_id in account_ids]
+
+    async def test_close_pipeline(self):
+        """Close, year-end roll-forward and reopen"""
+        print(f"\n{Colors.BLUE}=== Period Close Pipeline ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        bank = await self._create_account(f"1PC{timestamp}", "Bank (close test)", "ASSET")
+        sales = await self._create_account(f"4PC{timestamp}", "Sales (close test)", "INCOME")
+        retained = await self._create_account(f"3PC{timestamp}", "Retained earnings (close test)", "EQUITY")
+        year, first, second = await self._create_year()
+        if not all([bank, sales, retained, year]):
+            self.print_result("Setup", False, "Could not create accounts or periods")
+            return
+
+        me = (await self.client.get("/auth/me")).json()
+        company = (await self.client.get(f"/companies/{me['company_id']}")).json()
+        response = await self.client.put(f"/companies/{me['company_id']}", json={
+            "settings": {**(company.get("settings") or {}), "retained_earnings_account_id": retained}
+        })
+        self.print_result("Retained earnings account configured", response.status_code == 200, f"status {response.status_code}")
+
+        statuses = [
+            await self._post(f"PC-{timestamp}-1", f"{year}-03-15", bank, sales, "100.00"),
+            await self._post(f"PC-{timestamp}-2", f"{year}-09-15", bank, sales, "50.00")
+        ]
+        self.print_result("Journal entries", statuses == [201, 201], f"statuses {statuses}")
+
+        job = await self._run_job(second, "close")
+        self.print_result("Year end waits for earlier periods", job["status"] == "failed", job.get("error") or job["status"])
+
+        job = await self._run_job(first, "close")
+        self.print_result("Close first period", job["status"] == "completed",
+                         f"{job['status']}, steps {job.get('completed_steps')}")
+        status = await self._post(f"PC-{timestamp}-3", f"{year}-04-01", bank, sales, "1.00")
+        self.print_result("Posting into the closed period is refused", status == 400, f"status {status}")
+
+        job = await self._run_job(second, "close")
+        self.print_result("Closing again resumes the failed year-end job", job["status"] == "completed",
+                         f"{job['status']}, result {job.get('result')}")
+        self.print_result("Year-end journal posted", bool(job.get("result", {}).get("retained_earnings_journal_id")))
+
+        sales_balance, retained_balance, bank_balance = await self._balances(f"{year}-12-31", sales, retained, bank)
+        self.print_result("Income rolled into retained earnings",
+                         (sales_balance, retained_balance, bank_balance) == (Decimal("0.00"), Decimal("-150.00"), Decimal("150.00")),
+                         f"sales {sales_balance}, retained {retained_balance}, bank {bank_balance}")
+
+        job = await self._run_job(second, "reopen")
+        self.print_result("Reopen year-end period", job["status"] == "completed",
+                         f"{job['status']}, result {job.get('result')}")
+        sales_balance, retained_balance = await self._balances(f"{year}-12-31", sales, retained)
+        self.print_result("Reopen reverses the year-end journal",
+                         (sales_balance, retained_balance) == (Decimal("-150.00"), Decimal("0.00")),
+                         f"sales {sales_balance}, retained {retained_balance}")
+
+        job = await self._run_job(first, "reopen")
+        self.print_result("Reopen first period", job["status"] == "completed", job["status"])
+        status = await self._post(f"PC-{timestamp}-4", f"{year}-04-01", bank, sales, "1.00")
+        self.print_result("Posting allowed again after reopen", status == 201, f"status {status}")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Period Close Pipeline Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_close_pipeline()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with PeriodCloseTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -234,8 +234,8 @@ async def test_ar_transactions():
     async with httpx.AsyncClient() as client:
         headers = await get_headers()
         
-        # Get next transaction number
-        response = await client.get(
+        # Reserve next transaction number
+        response = await client.post(
             f"{BASE_URL}/ar/transactions/next-number/INV",
             headers=headers
         )
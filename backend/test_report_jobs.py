@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for background report jobs
+Submits reports, polls them to completion, downloads the results, and checks
+result caching, cancellation and validation.
+"""
+
+import asyncio
+import httpx
+from datetime import date
+
+BASE_URL = "http://localhost:8000/api"
+
+# Test credentials
+USERNAME = "admin"
+PASSWORD = "admin123"
+
+POLL_INTERVAL = 0.5
+POLL_TIMEOUT = 120
+
+auth_token = None
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+
+async def login(client: httpx.AsyncClient) -> bool:
+    """Login and get authentication token"""
+    global auth_token
+    response = await client.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": USERNAME, "password": PASSWORD}
+    )
+    if response.status_code == 200:
+        auth_token = response.json()["access_token"]
+        return True
+    print(f"✗ Login failed: {response.text}")
+    return False
+
+
+def headers():
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+async def submit(client: httpx.AsyncClient, report_type: str, parameters: dict, fmt: str = "csv", refresh: bool = False):
+    return await client.post(
+        f"{BASE_URL}/report-jobs",
+        json={"report_type": report_type, "format": fmt, "parameters": parameters, "refresh": refresh},
+        headers=headers()
+    )
+
+
+async def wait_for(client: httpx.AsyncClient, job_id: int) -> dict:
+    """Poll a job until it leaves the queued/running states"""
+    elapsed = 0.0
+    while elapsed < POLL_TIMEOUT:
+        job = (await client.get(f"{BASE_URL}/report-jobs/{job_id}", headers=headers())).json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(POLL_INTERVAL)
+        elapsed += POLL_INTERVAL
+    return job
+
+
+async def test_trial_balance_job(client: httpx.AsyncClient):
+    print(f"\n{Colors.BLUE}=== Trial balance job ==={Colors.RESET}")
+    params = {"report_date": date.today().isoformat()}
+
+    response = await submit(client, "trial_balance", params, refresh=True)
+    print_result("Submit returns 202", response.status_code == 202, response.text[:200])
+    if response.status_code != 202:
+        return
+    job = await wait_for(client, response.json()["id"])
+    print_result("Job completes", job["status"] == "completed",
+                 f"status={job['status']} rows={job['rows_written']} error={job['error']}")
+
+    download = await client.get(f"{BASE_URL}/report-jobs/{job['id']}/download", headers=headers())
+    first_line = download.text.splitlines()[0] if download.text else ""
+    print_result("Download returns the CSV", download.status_code == 200 and first_line.startswith("Account Code"),
+                 first_line)
+
+    again = await submit(client, "trial_balance", params)
+    print_result("Identical submission reuses the cached result", again.json()["id"] == job["id"],
+                 f"job {again.json()['id']} vs {job['id']}")
+
+
+async def test_cancel(client: httpx.AsyncClient):
+    print(f"\n{Colors.BLUE}=== Cancellation ==={Colors.RESET}")
+    response = await submit(client, "ap_transactions", {}, fmt="xlsx", refresh=True)
+    job = response.json()
+    cancel = await client.post(f"{BASE_URL}/report-jobs/{job['id']}/cancel", headers=headers())
+    if cancel.status_code == 400:
+        # Small ledgers can finish before the cancel arrives
+        print_result("Cancel after completion is rejected", "already" in cancel.text, cancel.text)
+        return
+    print_result("Cancel accepted", cancel.status_code == 200 and cancel.json()["status"] == "cancelled", cancel.text[:200])
+    download = await client.get(f"{BASE_URL}/report-jobs/{job['id']}/download", headers=headers())
+    print_result("Cancelled job has no download", download.status_code == 409, download.text)
+
+
+async def test_validation(client: httpx.AsyncClient):
+    print(f"\n{Colors.BLUE}=== Validation ==={Colors.RESET}")
+    response = await submit(client, "no_such_report", {})
+    print_result("Unknown report type is rejected", response.status_code == 400, response.text)
+    response = await submit(client, "ar_ageing", {})
+    print_result("Missing parameters are rejected", response.status_code == 422, response.text[:200])
+    response = await submit(client, "trial_balance", {"report_date": "2024-01-31"}, fmt="pdf")
+    print_result("Unsupported format is rejected", response.status_code == 400, response.text)
+
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}Report Job Tests{Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    async with httpx.AsyncClient(timeout=30) as client:
+        if not await login(client):
+            return
+        await test_trial_balance_job(client)
+        await test_cancel(client)
+        await test_validation(client)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Report Result Cache Test Script
+Repeats a trial balance request to check it is served from the result
+cache, then posts a journal and checks the next request reflects it
+straight away (the post bumps the company's ledger version).
+"""
+
+import asyncio
+import httpx
+from datetime import date, datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+HEALTH_URL = "http://localhost:8000/health/result-cache"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+REPORT = "gl.trial_balance"
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class ResultCacheTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _counts(self) -> dict:
+        """Hit and miss counters of the trial balance (the metrics are per process)"""
+        response = await self.client.get(HEALTH_URL)
+        reports = response.json().get("reports", {}) if response.status_code == 200 else {}
+        return reports.get(REPORT, {"hits": 0, "misses": 0})
+
+    async def _balance(self, account_id: int) -> Decimal:
+        response = await self.client.get("/gl/reports/trial-balance", params={"report_date": date.today().isoformat()})
+        lines = response.json() if response.status_code == 200 else []
+        balances = {line["account_id"]: Decimal(str(line["balance"])) for line in lines}
+        return balances.get(account_id, Decimal("0.00"))
+
+    async def _post(self, journal_id: str, debit_account: int, credit_account: int, amount: str) -> int:
+        response = await self.client.post("/gl/journal-entries", json={
+            "transaction_date": date.today().isoformat(),
+            "journal_entry_id": journal_id,
+            "reference": "CACHE-TEST",
+            "lines": [
+                {"account_id": debit_account, "debit_amount": amount, "credit_amount": "0.00"},
+                {"account_id": credit_account, "debit_amount": "0.00", "credit_amount": amount}
+            ]
+        })
+        return response.status_code
+
+    async def test_result_cache(self):
+        """Cache hits on repeat and fresh results after a post"""
+        print(f"\n{Colors.BLUE}=== Report Result Cache ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        bank = await self._create_account(f"1RC{timestamp}", "Bank (cache test)", "ASSET")
+        capital = await self._create_account(f"3RC{timestamp}", "Capital (cache test)", "EQUITY")
+        if not all([bank, capital]):
+            self.print_result("Setup", False, "Could not create accounts")
+            return
+
+        status = await self._post(f"RC-{timestamp}-1", bank, capital, "100.00")
+        if status != 201:
+            self.print_result("Journal entry", False, f"status {status} (is today's period open?)")
+            return
+
+        first = await self._balance(bank)
+        before = await self._counts()
+        second = await self._balance(bank)
+        after = await self._counts()
+        self.print_result("Repeat request is a cache hit",
+                         first == second == Decimal("100.00") and after["hits"] == before["hits"] + 1,
+                         f"balances {first}/{second}, hits {before['hits']} -> {after['hits']}")
+
+        status = await self._post(f"RC-{timestamp}-2", bank, capital, "25.00")
+        before = await self._counts()
+        third = await self._balance(bank)
+        after = await self._counts()
+        self.print_result("Request after a post is recomputed",
+                         status == 201 and third == Decimal("125.00") and after["misses"] == before["misses"] + 1,
+                         f"balance {third}, misses {before['misses']} -> {after['misses']}")
+
+        response = await self.client.get(HEALTH_URL)
+        self.print_result("Cache metrics", response.status_code == 200, str(response.json().get("local")))
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Report Result Cache Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_result_cache()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with ResultCacheTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Typeahead Search Benchmark
+Seeds customers and inventory items in a throwaway transaction and times
+ranked SearchService lookups against them. Requires the pg_trgm search
+indexes (alembic revision e2a94f6c3b18). Everything is rolled back at the end.
+
+Usage: python test_search_benchmark.py [rows_per_table]
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import select, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Customer, InventoryItem
+from app.services.search_service import SearchService
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+LOOKUPS = 300
+PAGE_SIZE = 20
+# Required p95 latency per lookup
+MAX_P95_MS = 10.0
+
+WORDS = "ARRAY['Acme','Global','Northern','Summit','Coastal','Pioneer','Atlas','Harbour','Valley','Crown']"
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+def print_result(test_name: str, success: bool, details: str = ""):
+    status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+    print(f"{status} {test_name}")
+    if details:
+        print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+async def seed(db) -> int:
+    """Insert a company with ROWS customers and ROWS stock items"""
+    company_id = (await db.execute(text(
+        "INSERT INTO companies (name) VALUES ('Search benchmark') RETURNING id"
+    ))).scalar_one()
+    await db.execute(text(f"""
+        INSERT INTO customers (company_id, customer_code, name, is_active)
+        SELECT :c, 'C' || lpad(g::text, 8, '0'),
+               ({WORDS})[1 + g % 10] || ' ' || substr(md5(g::text), 1, 10) || ' Ltd', true
+        FROM generate_series(1, :n) AS g
+    """), {"c": company_id, "n": ROWS})
+    await db.execute(text(f"""
+        INSERT INTO inventory_items (
+            company_id, item_code, description, item_type, unit_of_measure,
+            cost_price, selling_price, quantity_on_hand, costing_method, is_active
+        )
+        SELECT :c, 'I' || lpad(g::text, 8, '0'),
+               ({WORDS})[1 + g % 10] || ' part ' || substr(md5('i' || g), 1, 10),
+               'STOCK', 'EACH', 1, 2, 0, 'WEIGHTED_AVERAGE', true
+        FROM generate_series(1, :n) AS g
+    """), {"c": company_id, "n": ROWS})
+    await db.execute(text("ANALYZE customers"))
+    await db.execute(text("ANALYZE inventory_items"))
+    return company_id
+
+def sample_terms(codes_and_names: list) -> list:
+    """Typeahead terms: code prefixes, exact codes, name fragments and short prefixes"""
+    terms = []
+    for i, (code, name) in enumerate(codes_and_names):
+        kind = i % 4
+        if kind == 0:
+            terms.append(code[:6])
+        elif kind == 1:
+            terms.append(code)
+        elif kind == 2:
+            word = max(name.split(), key=len)
+            start = random.randint(0, max(len(word) - 6, 0))
+            terms.append(word[start:start + 6])
+        else:
+            terms.append(name[:2])
+    return terms
+
+async def benchmark(db, company_id: int, model, code_column, text_column, label: str):
+    sample = (await db.execute(
+        select(code_column, text_column)
+        .where(model.company_id == company_id)
+        .order_by(code_column)
+        .offset(random.randint(0, ROWS - LOOKUPS))
+        .limit(LOOKUPS)
+    )).all()
+    terms = sample_terms(sample)
+    query = select(model).where(model.company_id == company_id)
+
+    # Warm up the cache and prepared statements
+    for term in terms[:20]:
+        await SearchService.ranked(db, query, term, code_column, [text_column], PAGE_SIZE)
+
+    latencies = []
+    misses = 0
+    for term, (code, _) in zip(terms, sample):
+        started = time.perf_counter()
+        rows = await SearchService.ranked(db, query, term, code_column, [text_column], PAGE_SIZE)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if term == code and (not rows or getattr(rows[0], code_column.key) != code):
+            misses += 1
+        db.expunge_all()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print_result(f"{label}: p95 under {MAX_P95_MS:.0f} ms", p95 < MAX_P95_MS,
+                 f"p50 {statistics.median(latencies):.2f} ms, p95 {p95:.2f} ms over {len(latencies)} lookups")
+    print_result(f"{label}: exact code ranked first", misses == 0, f"{misses} misses")
+
+async def main():
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    print(f"{Colors.BLUE}Typeahead Search Benchmark ({ROWS:,} rows per table){Colors.RESET}")
+    print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+    random.seed(7)
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            company_id = await seed(db)
+            print_result("Seed", True, f"{time.perf_counter() - started:.1f}s")
+
+            await benchmark(db, company_id, Customer, Customer.customer_code, Customer.name, "Customers")
+            await benchmark(db, company_id, InventoryItem, InventoryItem.item_code,
+                            InventoryItem.description, "Inventory items")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
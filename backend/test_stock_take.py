@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Stock Take Test Script
+Creates a set of items with stock, previews a stock count with dry_run, posts
+it and checks quantities on hand and the consolidated journal.
+"""
+
+import asyncio
+import httpx
+import time
+from datetime import datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+ITEM_COUNT = 200
+OPENING_QUANTITY = Decimal("50")
+UNIT_COST = Decimal("4.00")
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class StockTakeTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _create_type(self, code: str, is_increase: bool, inventory_id: int, contra_id: int):
+        response = await self.client.post("/inventory/transaction-types", json={
+            "code": code,
+            "description": f"Stock take test {'receipt' if is_increase else 'issue'}",
+            "is_increase": is_increase,
+            "gl_account_id": inventory_id,
+            "contra_gl_account_id": contra_id
+        })
+        return response.json()["id"] if response.status_code == 200 else None
+
+    async def _adjust(self, item_id: int, type_id: int, quantity: Decimal, unit_cost=None) -> int:
+        payload = {
+            "item_id": item_id,
+            "transaction_type_id": type_id,
+            "transaction_date": datetime.now().isoformat(),
+            "quantity": str(quantity),
+            "reference": "STOCK-TAKE-TEST"
+        }
+        if unit_cost is not None:
+            payload["unit_cost"] = str(unit_cost)
+        response = await self.client.post("/inventory/adjustments", json=payload)
+        return response.status_code
+
+    async def test_stock_take(self):
+        """Count many items at once and post the variances"""
+        print(f"\n{Colors.BLUE}=== Stock Take ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        inventory_id = await self._create_account(f"1310-{timestamp}", "Inventory (stock take)", "ASSET")
+        contra_id = await self._create_account(f"5110-{timestamp}", "Stock count variances", "EXPENSE")
+        receipt_type = await self._create_type(f"ST+{timestamp}", True, inventory_id, contra_id)
+        issue_type = await self._create_type(f"ST-{timestamp}", False, inventory_id, contra_id)
+        if not all([inventory_id, contra_id, receipt_type, issue_type]):
+            self.print_result("Setup", False, "Could not create accounts or transaction types")
+            return
+
+        item_codes = []
+        for i in range(ITEM_COUNT):
+            code = f"ST{timestamp}{i:04d}"
+            response = await self.client.post("/inventory/items", json={"item_code": code, "description": "Stock take SKU"})
+            if response.status_code == 200:
+                await self._adjust(response.json()["id"], receipt_type, OPENING_QUANTITY, UNIT_COST)
+                item_codes.append(code)
+        self.print_result("Items created with stock", len(item_codes) == ITEM_COUNT, f"{len(item_codes)} items")
+
+        # A third counted short by 2, a third over by 3, the rest exact
+        lines = []
+        for i, code in enumerate(item_codes):
+            counted = OPENING_QUANTITY + (Decimal("-2"), Decimal("3"), Decimal("0"))[i % 3]
+            lines.append({"item_code": code, "counted_quantity": str(counted)})
+        request = {
+            "transaction_date": datetime.now().isoformat(),
+            "increase_type_id": receipt_type,
+            "decrease_type_id": issue_type,
+            "reference": f"COUNT-{timestamp}",
+            "lines": lines
+        }
+        shortages = len(range(0, len(item_codes), 3))
+        surpluses = len(range(1, len(item_codes), 3))
+        expected_increase = Decimal("3") * UNIT_COST * surpluses
+        expected_decrease = Decimal("2") * UNIT_COST * shortages
+
+        preview = (await self.client.post("/inventory/stock-takes", json={**request, "dry_run": True})).json()
+        self.print_result("Dry run reports variances", preview.get("items_adjusted") == shortages + surpluses
+                         and Decimal(str(preview["increase_value"])) == expected_increase,
+                         f"{preview.get('items_adjusted')} variances, +{preview.get('increase_value')} -{preview.get('decrease_value')}")
+
+        started = time.perf_counter()
+        response = await self.client.post("/inventory/stock-takes", json=request)
+        elapsed = time.perf_counter() - started
+        result = response.json()
+        self.print_result("Stock take posted", response.status_code == 200 and result["journal_entry_id"] is not None,
+                         f"{result.get('items_counted')} items in {elapsed:.2f}s, journal {result.get('journal_entry_id')}")
+        self.print_result("Posted values match the preview",
+                         Decimal(str(result.get("increase_value"))) == expected_increase
+                         and Decimal(str(result.get("decrease_value"))) == expected_decrease,
+                         f"+{result.get('increase_value')} -{result.get('decrease_value')}")
+
+        items = (await self.client.get("/inventory/items", params={"search": f"ST{timestamp}", "limit": 1000})).json()
+        quantities = {item["item_code"]: Decimal(str(item["quantity_on_hand"])) for item in items}
+        wrong = [line for line in lines if quantities.get(line["item_code"]) != Decimal(line["counted_quantity"])]
+        self.print_result("Quantities on hand match the count", not wrong, f"{len(wrong)} mismatches")
+
+        again = (await self.client.post("/inventory/stock-takes", json={**request, "dry_run": True})).json()
+        self.print_result("Recount shows no variances", again.get("items_adjusted") == 0, str(again.get("items_adjusted")))
+
+        response = await self.client.post("/inventory/stock-takes", json={**request, "lines": [{"item_code": "NO-SUCH-ITEM", "counted_quantity": "1"}]})
+        self.print_result("Unknown item is rejected", response.status_code == 400, response.text[:200])
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Stock Take Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_stock_take()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with StockTakeTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Stock Valuation Snapshot Test Script
+Posts receipts and a back-dated receipt against a new SKU and checks the
+stock quantity report, current and as at earlier dates, against them.
+"""
+
+import asyncio
+import httpx
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+REPORT_RUNS = 5
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class StockValuationTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _receive(self, item_id: int, type_id: int, when: datetime, quantity: str, unit_cost: str) -> int:
+        response = await self.client.post("/inventory/adjustments", json={
+            "item_id": item_id,
+            "transaction_type_id": type_id,
+            "transaction_date": when.isoformat(),
+            "quantity": quantity,
+            "unit_cost": unit_cost,
+            "reference": "VALUATION-TEST"
+        })
+        return response.status_code
+
+    async def _report_row(self, item_code: str, as_at=None):
+        payload = {"item_code_from": item_code, "item_code_to": item_code, "show_zero_qty": True}
+        if as_at is not None:
+            payload["as_at_date"] = as_at.date().isoformat()
+        response = await self.client.post("/inventory/reports/stock-quantity", json=payload)
+        items = response.json()["items"] if response.status_code == 200 else []
+        if not items:
+            return Decimal("0"), Decimal("0")
+        return Decimal(str(items[0]["quantity_on_hand"])), Decimal(str(items[0]["total_value"]))
+
+    async def test_as_at_report(self):
+        """Current and as-at quantities follow receipts, including back-dated ones"""
+        print(f"\n{Colors.BLUE}=== As-at Stock Quantity Report ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        inventory_id = await self._create_account(f"1310-{timestamp}", "Inventory (valuation)", "ASSET")
+        contra_id = await self._create_account(f"5110-{timestamp}", "Stock adjustments (valuation)", "EXPENSE")
+        response = await self.client.post("/inventory/transaction-types", json={
+            "code": f"SV{timestamp}",
+            "description": "Valuation test receipt",
+            "is_increase": True,
+            "gl_account_id": inventory_id,
+            "contra_gl_account_id": contra_id
+        })
+        receipt_type = response.json()["id"] if response.status_code == 200 else None
+        item_code = f"VAL{timestamp}"
+        response = await self.client.post("/inventory/items", json={
+            "item_code": item_code,
+            "description": "Valuation snapshot SKU"
+        })
+        item_id = response.json()["id"] if response.status_code == 200 else None
+        if not all([inventory_id, contra_id, receipt_type, item_id]):
+            self.print_result("Setup", False, "Could not create accounts, type or item")
+            return
+
+        today = datetime.now()
+        yesterday = today - timedelta(days=1)
+        status = await self._receive(item_id, receipt_type, today, "10", "5.00")
+        self.print_result("Receipt today", status == 200, f"status {status}")
+
+        quantity, value = await self._report_row(item_code, yesterday)
+        self.print_result("Nothing on hand as at yesterday", quantity == 0, f"{quantity} @ {value}")
+        quantity, value = await self._report_row(item_code, today)
+        self.print_result("As at today matches the receipt", (quantity, value) == (Decimal("10"), Decimal("50.00")),
+                         f"{quantity} @ {value}")
+
+        status = await self._receive(item_id, receipt_type, yesterday, "5", "8.00")
+        if status != 200:
+            self.print_result("Back-dated receipt", False, f"status {status} (is yesterday's period open?)")
+            return
+        quantity, value = await self._report_row(item_code, yesterday)
+        self.print_result("Back-dated receipt shows as at yesterday", (quantity, value) == (Decimal("5"), Decimal("40.00")),
+                         f"{quantity} @ {value}")
+        quantity, value = await self._report_row(item_code, today)
+        self.print_result("Later day includes the back-dated receipt", (quantity, value) == (Decimal("15"), Decimal("90.00")),
+                         f"{quantity} @ {value}")
+        current_quantity, current_value = await self._report_row(item_code)
+        self.print_result("As at today matches current stock", (quantity, value) == (current_quantity, current_value),
+                         f"{current_quantity} @ {current_value}")
+
+    async def test_report_totals(self):
+        """Summary totals match the rows"""
+        print(f"\n{Colors.BLUE}=== Report Totals ==={Colors.RESET}")
+        for label, payload in [("current", {}), ("as at today", {"as_at_date": datetime.now().date().isoformat()})]:
+            started = time.perf_counter()
+            for _ in range(REPORT_RUNS):
+                response = await self.client.post("/inventory/reports/stock-quantity", json=payload)
+            elapsed = (time.perf_counter() - started) / REPORT_RUNS
+            report = response.json()
+            row_value = sum(Decimal(str(row["total_value"])) for row in report["items"])
+            summary = report["summary"]
+            self.print_result(f"Totals ({label})",
+                             summary["total_items"] == len(report["items"]) and Decimal(str(summary["total_value"])) == row_value,
+                             f"{summary['total_items']} items, {summary['total_value']}, {elapsed * 1000:.0f} ms per report")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Stock Valuation Snapshot Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_as_at_report()
+            await self.test_report_totals()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with StockValuationTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Trial Balance Snapshot Test Script
+Posts journals before the first period of a year, inside two periods, in
+the calendar gap between them and after them, closes both periods and
+checks the snapshot trial balance against the raw ledger sum of the GL
+detail report.
+"""
+
+import asyncio
+import httpx
+from datetime import datetime
+from decimal import Decimal
+
+# Test configuration
+BASE_URL = "http://localhost:8000/api"
+TEST_USERNAME = "admin"
+TEST_PASSWORD = "admin123"
+JOB_TIMEOUT_SECONDS = 120
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+class TrialBalanceSnapshotTester:
+    def __init__(self):
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+        self.token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if success else f"{Colors.RED}✗ FAIL{Colors.RESET}"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"  {Colors.YELLOW}→{Colors.RESET} {details}")
+
+    async def login(self):
+        """Authenticate and get token"""
+        response = await self.client.post("/auth/login", json={
+            "username": TEST_USERNAME,
+            "password": TEST_PASSWORD
+        })
+        if response.status_code != 200:
+            self.print_result("Login", False, f"Status: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        self.print_result("Login", True)
+        return True
+
+    async def _create_account(self, code: str, name: str, account_type: str):
+        response = await self.client.post("/gl/accounts", json={
+            "account_code": code,
+            "account_name": name,
+            "account_type": account_type,
+            "is_active": True
+        })
+        return response.json()["id"] if response.status_code == 201 else None
+
+    async def _create_periods(self):
+        """February, April and June of the first far-future year that is still free (March is a gap)"""
+        months = [("02-01", "02-28"), ("04-01", "04-30"), ("06-01", "06-30")]
+        for year in range(2100, 2140):
+            ids = []
+            for start, end in months:
+                response = await self.client.post("/accounting-periods/", json={
+                    "period_name": f"{start[:2]}/{year} (snapshot test)",
+                    "start_date": f"{year}-{start}",
+                    "end_date": f"{year}-{end}",
+                    "financial_year": year
+                })
+                if response.status_code != 201:
+                    break
+                ids.append(response.json()["id"])
+            if len(ids) == len(months):
+                return year, ids
+        return None, []
+
+    async def _post(self, journal_id: str, day: str, debit_account: int, credit_account: int, amount: str) -> int:
+        response = await self.client.post("/gl/journal-entries", json={
+            "transaction_date": day,
+            "journal_entry_id": journal_id,
+            "reference": "SNAPSHOT-TEST",
+            "lines": [
+                {"account_id": debit_account, "debit_amount": amount, "credit_amount": "0.00"},
+                {"account_id": credit_account, "debit_amount": "0.00", "credit_amount": amount}
+            ]
+        })
+        return response.status_code
+
+    async def _run_job(self, period_id: int, action: str) -> dict:
+        """Submit a close or reopen and poll the job until it finishes"""
+        response = await self.client.post(f"/accounting-periods/{period_id}/{action}")
+        if response.status_code != 202:
+            return {"status": f"HTTP {response.status_code}", "error": response.text}
+        job = response.json()
+        for _ in range(JOB_TIMEOUT_SECONDS * 2):
+            if job["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.5)
+            job = (await self.client.get(f"/accounting-periods/close-jobs/{job['id']}")).json()
+        return job
+
+    async def _trial_balance(self, report_date: str, account_id: int) -> Decimal:
+        response = await self.client.get("/gl/reports/trial-balance", params={"report_date": report_date})
+        lines = response.json() if response.status_code == 200 else []
+        balances = {line["account_id"]: Decimal(str(line["balance"])) for line in lines}
+        return balances.get(account_id, Decimal("0.00"))
+
+    async def _ledger_sum(self, report_date: str, account_id: int) -> Decimal:
+        response = await self.client.get("/gl/reports/gl-detail", params={
+            "account_id": account_id, "start_date": "1900-01-01", "end_date": report_date
+        })
+        lines = response.json() if response.status_code == 200 else []
+        return sum((Decimal(str(l["debit_amount"])) - Decimal(str(l["credit_amount"])) for l in lines), Decimal("0.00"))
+
+    async def test_snapshot_matches_ledger(self):
+        """Snapshot trial balance equals the raw ledger sum"""
+        print(f"\n{Colors.BLUE}=== Trial Balance Snapshot ==={Colors.RESET}")
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        bank = await self._create_account(f"1TS{timestamp}", "Bank (snapshot test)", "ASSET")
+        capital = await self._create_account(f"3TS{timestamp}", "Capital (snapshot test)", "EQUITY")
+        year, periods = await self._create_periods()
+        if not all([bank, capital, year]):
+            self.print_result("Setup", False, "Could not create accounts or periods")
+            return
+
+        postings = [
+            ("01-15", "1.00"),   # before the first period
+            ("02-10", "2.00"),   # February
+            ("03-10", "4.00"),   # gap between February and April
+            ("04-10", "8.00"),   # April
+            ("05-10", "16.00"),  # gap between April and June
+            ("06-10", "32.00"),  # June (stays open)
+            ("08-10", "64.00"),  # after the last period
+        ]
+        statuses = [
+            await self._post(f"TS-{timestamp}-{i}", f"{year}-{day}", bank, capital, amount)
+            for i, (day, amount) in enumerate(postings)
+        ]
+        self.print_result("Journal entries inside and outside periods", all(s == 201 for s in statuses), f"statuses {statuses}")
+
+        jobs = [await self._run_job(period_id, "close") for period_id in periods[:2]]
+        self.print_result("Close February and April", all(job["status"] == "completed" for job in jobs),
+                         str([job.get("error") or job["status"] for job in jobs]))
+
+        for report_date in (f"{year}-04-30", f"{year}-05-31", f"{year}-12-31"):
+            snapshot = await self._trial_balance(report_date, bank)
+            ledger = await self._ledger_sum(report_date, bank)
+            self.print_result(f"Trial balance at {report_date} matches the ledger", snapshot == ledger,
+                             f"trial balance {snapshot}, ledger {ledger}")
+
+        # Posting into a gap after the close still shows up
+        status = await self._post(f"TS-{timestamp}-late", f"{year}-03-20", bank, capital, "128.00")
+        snapshot = await self._trial_balance(f"{year}-12-31", bank)
+        ledger = await self._ledger_sum(f"{year}-12-31", bank)
+        self.print_result("Late gap posting is included", status == 201 and snapshot == ledger == Decimal("255.00"),
+                         f"status {status}, trial balance {snapshot}, ledger {ledger}")
+
+        for period_id in reversed(periods[:2]):
+            await self._run_job(period_id, "reopen")
+
+    async def run_all_tests(self):
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+        print(f"{Colors.BLUE}Trial Balance Snapshot Test Suite{Colors.RESET}")
+        print(f"{Colors.BLUE}{'=' * 50}{Colors.RESET}")
+
+        if not await self.login():
+            print(f"\n{Colors.RED}Cannot proceed without authentication{Colors.RESET}")
+            return
+
+        try:
+            await self.test_snapshot_matches_ledger()
+        except Exception as e:
+            print(f"\n{Colors.RED}Test execution error: {e}{Colors.RESET}")
+
+async def main():
+    async with TrialBalanceSnapshotTester() as tester:
+        await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
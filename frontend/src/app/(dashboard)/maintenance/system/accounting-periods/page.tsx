@@ -15,6 +15,16 @@ interface AccountingPeriod {
   created_at: string;
 }
 
+interface PeriodCloseJob {
+  id: number;
+  period_id: number;
+  action: 'close' | 'reopen';
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  current_step: string | null;
+  progress: number;
+  error: string | null;
+}
+
 export default function AccountingPeriodsPage() {
   const [periods, setPeriods] = useState<AccountingPeriod[]>([]);
   const [total, setTotal] = useState(0);
@@ -23,6 +33,7 @@ export default function AccountingPeriodsPage() {
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [editingPeriod, setEditingPeriod] = useState<AccountingPeriod | null>(null);
   const [financialYearFilter, setFinancialYearFilter] = useState<string>('');
+  const [busyPeriodId, setBusyPeriodId] = useState<number | null>(null);
   
   const api = useApi();
 
@@ -47,12 +58,31 @@ export default function AccountingPeriodsPage() {
     fetchPeriods();
   }, [financialYearFilter]);
 
+  // Close and reopen run as background jobs; poll until they finish
+  const waitForCloseJob = async (job: PeriodCloseJob) => {
+    let current = job;
+    setBusyPeriodId(current.period_id);
+    try {
+      while (current.status === 'queued' || current.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await api.get(`/api/accounting-periods/close-jobs/${current.id}`);
+        current = response.data;
+      }
+      if (current.status === 'failed') {
+        alert(current.error || `Failed to ${current.action} period`);
+      }
+    } finally {
+      setBusyPeriodId(null);
+      fetchPeriods();
+    }
+  };
+
   const handleClosePeriod = async (periodId: number) => {
     if (!confirm('Are you sure you want to close this period? This action cannot be easily undone.')) return;
     
     try {
-      await api.post(`/api/accounting-periods/${periodId}/close`);
-      fetchPeriods();
+      const response = await api.post(`/api/accounting-periods/${periodId}/close`);
+      await waitForCloseJob(response.data);
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to close period');
     }
@@ -62,8 +92,8 @@ export default function AccountingPeriodsPage() {
     if (!confirm('Are you sure you want to reopen this period?')) return;
     
     try {
-      await api.post(`/api/accounting-periods/${periodId}/reopen`);
-      fetchPeriods();
+      const response = await api.post(`/api/accounting-periods/${periodId}/reopen`);
+      await waitForCloseJob(response.data);
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to reopen period');
     }
@@ -207,7 +237,7 @@ export default function AccountingPeriodsPage() {
                               : 'bg-green-100 text-green-800'
                           }`}
                         >
-                          {period.is_closed ? 'Closed' : 'Open'}
+                          {busyPeriodId === period.id ? 'Processing…' : period.is_closed ? 'Closed' : 'Open'}
                         </span>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-sm font-medium">
@@ -222,6 +252,7 @@ export default function AccountingPeriodsPage() {
                           {period.is_closed ? (
                             <button
                               onClick={() => handleReopenPeriod(period.id)}
+                              disabled={busyPeriodId !== null}
                               className="text-green-600 hover:text-green-900"
                               title="Reopen Period"
                             >
@@ -230,6 +261,7 @@ export default function AccountingPeriodsPage() {
                           ) : (
                             <button
                               onClick={() => handleClosePeriod(period.id)}
+                              disabled={busyPeriodId !== null}
                               className="text-orange-600 hover:text-orange-900"
                               title="Close Period"
                             >
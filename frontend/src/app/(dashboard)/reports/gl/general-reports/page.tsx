@@ -3,7 +3,7 @@
 import { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import axios from '@/lib/axios';
-import { TrialBalanceLine, GLTransaction, GLAccount } from '@/types/gl';
+import { TrialBalanceLine, GLDetailReport, GLAccount } from '@/types/gl';
 import { FileText, Download } from 'lucide-react';
 
 // Mock/Placeholder components
@@ -47,10 +47,11 @@ const fetchTrialBalance = async (reportDate: string): Promise<TrialBalanceLine[]
   return response.data;
 };
 
-const fetchGLDetail = async (accountId: number, startDate: string, endDate: string): Promise<GLTransaction[]> => {
-  const response = await axios.get('/gl/reports/gl-detail', {
+const fetchGLDetail = async (accountId: number, startDate: string, endDate: string): Promise<GLDetailReport> => {
+  // Opening and running balances are calculated by the server
+  const response = await axios.get('/gl/reports/gl-detail/balances', {
     params: { 
-      account_id: accountId,
+      account_ids: accountId,
       start_date: startDate,
       end_date: endDate
     }
@@ -98,11 +99,13 @@ export default function GLReportsPage() {
     enabled: activeTab === 'trial-balance'
   });
 
-  const { data: glDetail, isLoading: loadingDetail } = useQuery<GLTransaction[]>({
+  const { data: glDetailReport, isLoading: loadingDetail } = useQuery<GLDetailReport>({
     queryKey: ['glDetail', selectedAccountId, startDate, endDate],
     queryFn: () => fetchGLDetail(selectedAccountId, startDate, endDate),
     enabled: activeTab === 'gl-detail' && selectedAccountId > 0
   });
+  const glDetailAccount = glDetailReport?.accounts[0];
+  const glDetail = glDetailAccount?.lines;
 
   // Calculate totals for trial balance
   const trialBalanceTotals = trialBalance?.reduce(
@@ -251,31 +254,31 @@ export default function GLReportsPage() {
                   </tr>
                 </thead>
                 <tbody className="bg-white divide-y divide-gray-200">
-                  {glDetail?.map((trans, index) => {
-                    // Calculate running balance
-                    const runningBalance = glDetail.slice(0, index + 1).reduce(
-                      (sum, t) => sum + parseFloat(t.debit_amount) - parseFloat(t.credit_amount),
-                      0
-                    );
-                    
-                    return (
-                      <tr key={trans.id} className={trans.is_reversed ? 'bg-red-50' : ''}>
-                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700">{trans.transaction_date}</td>
-                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700">{trans.journal_entry_id}</td>
-                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700">{trans.reference || '-'}</td>
-                        <td className="px-6 py-4 text-sm text-gray-700">{trans.description || '-'}</td>
-                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right">
-                          {parseFloat(trans.debit_amount) > 0 ? parseFloat(trans.debit_amount).toFixed(2) : '-'}
-                        </td>
-                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right">
-                          {parseFloat(trans.credit_amount) > 0 ? parseFloat(trans.credit_amount).toFixed(2) : '-'}
-                        </td>
-                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right font-medium">
-                          {runningBalance.toFixed(2)}
-                        </td>
-                      </tr>
-                    );
-                  })}
+                  {glDetailAccount && (
+                    <tr className="bg-gray-50">
+                      <td colSpan={6} className="px-6 py-3 text-sm font-medium text-gray-700">Opening Balance</td>
+                      <td className="px-6 py-3 whitespace-nowrap text-sm text-gray-700 text-right font-medium">
+                        {parseFloat(glDetailAccount.opening_balance).toFixed(2)}
+                      </td>
+                    </tr>
+                  )}
+                  {glDetail?.map((trans) => (
+                    <tr key={trans.id} className={trans.is_reversed ? 'bg-red-50' : ''}>
+                      <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700">{trans.transaction_date}</td>
+                      <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700">{trans.journal_entry_id}</td>
+                      <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700">{trans.reference || '-'}</td>
+                      <td className="px-6 py-4 text-sm text-gray-700">{trans.description || '-'}</td>
+                      <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right">
+                        {parseFloat(trans.debit_amount) > 0 ? parseFloat(trans.debit_amount).toFixed(2) : '-'}
+                      </td>
+                      <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right">
+                        {parseFloat(trans.credit_amount) > 0 ? parseFloat(trans.credit_amount).toFixed(2) : '-'}
+                      </td>
+                      <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right font-medium">
+                        {parseFloat(trans.running_balance).toFixed(2)}
+                      </td>
+                    </tr>
+                  ))}
                   {glDetail?.length === 0 && (
                     <tr>
                       <td colSpan={7} className="px-6 py-4 text-center text-sm text-gray-500">No transactions found for selected criteria.</td>
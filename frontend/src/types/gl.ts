@@ -63,4 +63,35 @@ export interface TrialBalanceLine {
   debit: string;
   credit: string;
   balance: string;
-} 
\ No newline at end of file
+} 
+export interface GLDetailLine {
+  id: number;
+  transaction_date: string;
+  journal_entry_id: string;
+  reference?: string | null;
+  description?: string | null;
+  debit_amount: string;
+  credit_amount: string;
+  source_module?: string | null;
+  source_document_id?: number | null;
+  is_reversed: boolean;
+  running_balance: string;
+}
+
+export interface GLDetailAccount {
+  account_id: number;
+  account_code: string;
+  account_name: string;
+  account_type: string;
+  opening_balance: string;
+  total_debit: string;
+  total_credit: string;
+  closing_balance: string;
+  lines: GLDetailLine[];
+}
+
+export interface GLDetailReport {
+  start_date: string;
+  end_date: string;
+  accounts: GLDetailAccount[];
+}